@@ -0,0 +1,200 @@
+"""
+Benchmark del decodificador de filas CSV.
+
+Compara el camino anterior (`csv.DictReader` + `_dict_to_model` por fila)
+contra `ROW_DECODER` de cada repositorio, sobre un CSV generado con `rows`
+filas:
+
+- full_scan: lectura completa a modelos (`get_all`). Construir un dataclass y
+  sus fechas por fila domina ambos caminos: la aceleración queda por debajo
+  de 2.5x, sin alcanzar el objetivo de 3x que se pidió para esta lectura.
+- view_scan: lectura completa a vistas sobre las celdas (`scan`), donde cada
+  campo se convierte al leerlo. No convierte nada, así que se compara contra
+  un camino que tampoco convierte: las filas de `csv.DictReader` sin pasar por
+  `_dict_to_model`.
+- zone_scan: lectura filtrada por zona (el filtro se evalúa antes de construir
+  el modelo).
+- projected_scan: pocas columnas sobre el CSV mapeado en memoria (`project`).
+
+Verifica además que ambos caminos produzcan los mismos resultados (las vistas
+y las filas de view_scan se convierten a modelos fuera de la medición).
+
+Uso:
+    python -m benchmarks.decoder_benchmark --rows 1000000 --output decoder.json
+    python -m benchmarks.decoder_benchmark --rows 100000 --operations full_scan view_scan
+"""
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from models.resource import Resource, TipoRecurso, EstadoRecurso
+from models.threat import Threat, TipoAmenaza, EstadoAmenaza
+from repositories import resource_repository, threat_repository
+from repositories.resource_repository import ResourceRepository
+from repositories.threat_repository import ThreatRepository
+
+DEFAULT_ROWS = 1_000_000
+
+# Zonas sobre las que se reparten las filas generadas
+ZONES = 100
+
+# Columnas de la lectura proyectada (lo que suele pedir un poller)
+PROJECTED_COLUMNS = ["id", "zona_id", "estado"]
+
+OPERATIONS = ["full_scan", "view_scan", "zone_scan", "projected_scan"]
+
+
+def _write_rows(repo, fieldnames: List[str], make: Callable[[int], object], rows: int):
+    with open(repo.csv_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for entity_id in range(1, rows + 1):
+            writer.writerow(repo._model_to_dict(make(entity_id)))
+
+
+def _resource(now: datetime) -> Callable[[int], Resource]:
+    def make(entity_id: int) -> Resource:
+        collected = random.random() < 0.3
+        return Resource(
+            id=entity_id, zona_id=random.randint(1, ZONES), nombre=f"recurso {entity_id}",
+            tipo=random.choice(list(TipoRecurso)), cantidad_unitaria=random.randint(1, 20),
+            peso=random.randint(1, 10), duracion_recoleccion=random.randint(10, 120),
+            hormigas_requeridas=random.randint(1, 5),
+            estado=EstadoRecurso.RECOLECTADO if collected else EstadoRecurso.DISPONIBLE,
+            hora_creacion=now - timedelta(seconds=random.randint(0, 86400), microseconds=random.randint(0, 999999)),
+            hora_recoleccion=now if collected else None
+        )
+    return make
+
+
+def _threat(now: datetime) -> Callable[[int], Threat]:
+    def make(entity_id: int) -> Threat:
+        resolved = random.random() < 0.3
+        return Threat(
+            id=entity_id, zona_id=random.randint(1, ZONES), nombre=f"amenaza {entity_id}",
+            tipo=random.choice(list(TipoAmenaza)), costo_hormigas=random.randint(1, 10),
+            estado=EstadoAmenaza.RESUELTA if resolved else EstadoAmenaza.ACTIVA,
+            hora_deteccion=now - timedelta(seconds=random.randint(0, 86400), microseconds=random.randint(0, 999999)),
+            hora_resolucion=now if resolved else None
+        )
+    return make
+
+
+def _dict_reader_scan(repo, zona_id: Optional[int] = None) -> list:
+    """Camino anterior: un diccionario por fila y conversión campo a campo"""
+    entities = []
+    with open(repo.csv_file, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            entity = repo._dict_to_model(row)
+            if zona_id is not None and entity.zona_id != zona_id:
+                continue
+            entities.append(entity)
+    return entities
+
+
+def _dict_reader_rows(repo) -> list:
+    """Filas de csv.DictReader sin convertir (el mismo trabajo que una lectura a vistas)"""
+    with open(repo.csv_file, 'r', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def _timed(func: Callable[[], list], repeat: int):
+    """Mejor tiempo de `repeat` ejecuciones y el resultado de la última"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_decoder_benchmark(rows: int, repeat: int = 3, seed: int = 42,
+                          operations: Optional[List[str]] = None) -> dict:
+    """Mide lectura completa (modelos y vistas), filtrada y proyectada con ambos caminos para recursos y amenazas"""
+    operations = operations or OPERATIONS
+    random.seed(seed)
+    now = datetime.now()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="decoder_bench_") as data_dir:
+        suites = [
+            ("ResourceRepository", ResourceRepository(os.path.join(data_dir, "resources.csv")),
+             resource_repository.FIELDNAMES, _resource(now)),
+            ("ThreatRepository", ThreatRepository(os.path.join(data_dir, "threats.csv")),
+             threat_repository.FIELDNAMES, _threat(now)),
+        ]
+        for repository, repo, fieldnames, make in suites:
+            _write_rows(repo, fieldnames, make, rows)
+            scans = {
+                "full_scan": (lambda: _dict_reader_scan(repo), lambda: repo.get_all()),
+                "view_scan": (lambda: _dict_reader_rows(repo), lambda: repo.scan()),
+                "zone_scan": (lambda: _dict_reader_scan(repo, zona_id=1), lambda: repo.get_all(zona_id=1)),
+                "projected_scan": (
+                    lambda: [{c: getattr(e, c) for c in PROJECTED_COLUMNS} for e in _dict_reader_scan(repo)],
+                    lambda: repo.project(PROJECTED_COLUMNS)
+                ),
+            }
+            for operation in operations:
+                baseline, decoder = scans[operation]
+                baseline_seconds, expected = _timed(baseline, repeat)
+                decoder_seconds, decoded = _timed(decoder, repeat)
+                if operation == "view_scan":
+                    expected = [repo._dict_to_model(row) for row in expected]
+                    decoded = [view.to_model() for view in decoded]
+                if decoded != expected:
+                    raise AssertionError(f"{repository}.{operation}: el decodificador no coincide con csv.DictReader")
+                result = {
+                    "repository": repository,
+                    "operation": operation,
+                    "rows": rows,
+                    "matched": len(decoded),
+                    "dict_reader_s": round(baseline_seconds, 4),
+                    "decoder_s": round(decoder_seconds, 4),
+                    "speedup": round(baseline_seconds / decoder_seconds, 2) if decoder_seconds else None,
+                }
+                results.append(result)
+                print(
+                    f"{repository:<19} {operation:<14} rows={rows:<8} "
+                    f"DictReader={result['dict_reader_s']}s decoder={result['decoder_s']}s "
+                    f"speedup={result['speedup']}x"
+                )
+    return {"meta": {"created_at": now.isoformat(), "repeat": repeat}, "results": results}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada de la línea de comandos; retorna 1 si alguna aceleración queda bajo el mínimo"""
+    parser = argparse.ArgumentParser(description="Benchmark del decodificador de filas CSV")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="Filas por tabla")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por medición (se toma la mejor)")
+    parser.add_argument("--min-speedup", type=float, default=None, help="Aceleración mínima exigida")
+    parser.add_argument("--operations", nargs="+", choices=OPERATIONS, default=OPERATIONS,
+                        help="Lecturas a medir (y a exigir con --min-speedup)")
+    parser.add_argument("--output", default=None, help="Archivo JSON de resultados")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    results = run_decoder_benchmark(args.rows, args.repeat, args.seed, args.operations)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Resultados guardados en {args.output}")
+
+    if args.min_speedup is not None:
+        slow = [r for r in results["results"] if r["speedup"] is not None and r["speedup"] < args.min_speedup]
+        for r in slow:
+            print(f"❌ {r['repository']}.{r['operation']}: {r['speedup']}x < {args.min_speedup}x")
+        if slow:
+            return 1
+        print(f"✅ Todas las lecturas al menos {args.min_speedup}x más rápidas")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+"""
+Arnés de carga HTTP en proceso para la app `main:app`.
+
+Lanza peticiones contra la app ASGI mediante httpx (sin red), siguiendo una
+mezcla de tráfico configurable y con los schedulers de recursos y amenazas
+corriendo. Reporta throughput, histogramas de latencia y tasa de errores por ruta.
+
+La carga corre en un intérprete hijo con `DATA_DIR` apuntando al directorio de
+trabajo: los repositorios de la app fijan sus rutas al importarse, así que el
+proceso que llama no cambia de cwd ni de configuración.
+
+Uso:
+    python -m benchmarks.load_harness --rows 10000 --requests 2000 --concurrency 16 \\
+        --mix "GET /resources?zona_id=:70,PUT /threats/{id}:15,POST /resources/zone/{id}:10,GET /threats/{id}:5"
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import importlib
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+# Límites superiores (ms) de los buckets del histograma de latencia
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+# Raíz del proyecto, desde donde el proceso hijo importa la app
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MIX = "GET /resources?zona_id=:70,PUT /threats/{id}:15,POST /resources/zone/{id}:10,GET /threats/{id}:5"
+
+
+class HarnessContext:
+    """IDs conocidos del mundo sembrado, usados para construir las peticiones"""
+
+    def __init__(self, zone_ids: List[int], resource_ids: List[int], threat_ids: List[int]):
+        self.zone_ids = zone_ids
+        self.resource_ids = resource_ids
+        self.threat_ids = threat_ids
+        self._sequence = itertools.count(1)
+
+    def next_name(self) -> str:
+        return f"carga {next(self._sequence)}"
+
+
+# Operaciones disponibles: nombre de ruta -> fábrica de (método, url, json)
+ROUTES: Dict[str, Callable[[HarnessContext], Tuple[str, str, Optional[dict]]]] = {
+    "GET /resources?zona_id=": lambda ctx: ("GET", f"/resources?zona_id={random.choice(ctx.zone_ids)}", None),
+    "GET /resources/{id}": lambda ctx: ("GET", f"/resources/{random.choice(ctx.resource_ids)}", None),
+    "POST /resources/zone/{id}": lambda ctx: ("POST", f"/resources/zone/{random.choice(ctx.zone_ids)}", {
+        "nombre": ctx.next_name(), "tipo": "HOJA", "cantidad_unitaria": 10,
+        "peso": 2, "duracion_recoleccion": 30, "hormigas_requeridas": 2
+    }),
+    "GET /threats?zona_id=": lambda ctx: ("GET", f"/threats?zona_id={random.choice(ctx.zone_ids)}", None),
+    "GET /threats/{id}": lambda ctx: ("GET", f"/threats/{random.choice(ctx.threat_ids)}", None),
+    # Se alterna entre estados que no requieren transición previa para evitar 409
+    "PUT /threats/{id}": lambda ctx: ("PUT", f"/threats/{random.choice(ctx.threat_ids)}", {
+        "estado": random.choice(["activa", "en_combate"])
+    }),
+    "GET /zones": lambda ctx: ("GET", "/zones", None),
+}
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Convierte 'RUTA:peso,RUTA:peso' en un diccionario de pesos"""
+    weights = {}
+    for item in mix.split(","):
+        route, _, weight = item.strip().rpartition(":")
+        if route not in ROUTES:
+            raise ValueError(f"Ruta desconocida en la mezcla: '{route}'. Disponibles: {list(ROUTES)}")
+        weights[route] = float(weight)
+    if not weights or sum(weights.values()) <= 0:
+        raise ValueError("La mezcla de tráfico debe tener al menos un peso positivo.")
+    return weights
+
+
+class RouteStats:
+    """Latencias y códigos de estado acumulados para una ruta"""
+
+    def __init__(self):
+        self.latencies_ms: List[float] = []
+        self.status_codes: Dict[str, int] = {}
+        self.errors = 0
+
+    def record(self, latency_ms: float, status: Optional[int]):
+        self.latencies_ms.append(latency_ms)
+        key = str(status) if status is not None else "exception"
+        self.status_codes[key] = self.status_codes.get(key, 0) + 1
+        if status is None or status >= 400:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> dict:
+        ordered = sorted(self.latencies_ms)
+        count = len(ordered)
+
+        def pct(p):
+            return round(ordered[min(count - 1, int(p / 100 * count))], 3) if count else None
+
+        histogram = {}
+        for bound in LATENCY_BUCKETS_MS:
+            histogram[f"le_{bound}ms"] = sum(1 for v in ordered if v <= bound)
+        histogram["le_inf"] = count
+
+        return {
+            "requests": count,
+            "throughput_rps": round(count / elapsed, 2) if elapsed else None,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "status_codes": self.status_codes,
+            "p50_ms": pct(50),
+            "p90_ms": pct(90),
+            "p99_ms": pct(99),
+            "max_ms": round(ordered[-1], 3) if count else None,
+            "latency_histogram": histogram,
+        }
+
+
+async def run_load(
+    app,
+    context: HarnessContext,
+    mix: Dict[str, float],
+    total_requests: int,
+    concurrency: int = 8
+) -> dict:
+    """Ejecuta `total_requests` peticiones repartidas entre `concurrency` workers"""
+    routes = list(mix.keys())
+    weights = list(mix.values())
+    stats = {route: RouteStats() for route in routes}
+    remaining = itertools.count()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://harness") as client:
+
+        async def worker():
+            while next(remaining) < total_requests:
+                route = random.choices(routes, weights=weights)[0]
+                method, url, body = ROUTES[route](context)
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, url, json=body)
+                    status = response.status_code
+                except Exception:
+                    status = None
+                stats[route].record((time.perf_counter() - started) * 1000, status)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    total = sum(len(s.latencies_ms) for s in stats.values())
+    errors = sum(s.errors for s in stats.values())
+    return {
+        "total_requests": total,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else None,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "routes": {route: s.summary(elapsed) for route, s in stats.items()},
+    }
+
+
+def _seed(rows: int, zones: int) -> HarnessContext:
+    """Siembra el directorio de datos configurado (StorageConfig.DATA_DIR) con el simulador del mundo"""
+    from repositories.storage import create_resource_repository, create_threat_repository
+    from repositories.zone_repository import ZoneRepository
+    from services.world_simulator import WorldSimulator
+
+    simulator = WorldSimulator(create_resource_repository(), create_threat_repository(), ZoneRepository())
+    zone_ids = simulator.ensure_zones(zones)
+    per_tick = max(1, min(rows, 1000))
+    simulator.run(ticks=-(-rows // per_tick), zone_ids=zone_ids,
+                  resources_per_tick=per_tick, threats_per_tick=per_tick)
+    return HarnessContext(zone_ids, list(range(1, rows + 1)), list(range(1, rows + 1)))
+
+
+def _run(args, mix: Dict[str, float]) -> dict:
+    """Siembra los datos y ejecuta la carga contra la app (en el proceso hijo, con DATA_DIR ya fijado)"""
+    from config.scheduler_config import SchedulerConfig
+    from config.resources_scheduler_config import ResourcesSchedulerConfig
+
+    context = _seed(args.rows, args.zones)
+    app = importlib.import_module("main").app
+
+    from services.threat_scheduler import threat_scheduler
+    from services.resource_scheduler import resource_scheduler
+
+    original_intervals = (SchedulerConfig.INTERVAL_SECONDS, ResourcesSchedulerConfig.INTERVAL_SECONDS)
+    try:
+        if args.scheduler_interval > 0:
+            SchedulerConfig.INTERVAL_SECONDS = args.scheduler_interval
+            ResourcesSchedulerConfig.INTERVAL_SECONDS = args.scheduler_interval
+            threat_scheduler.start()
+            resource_scheduler.start()
+        return asyncio.run(run_load(app, context, mix, args.requests, args.concurrency))
+    finally:
+        if args.scheduler_interval > 0:
+            threat_scheduler.stop()
+            resource_scheduler.stop()
+        SchedulerConfig.INTERVAL_SECONDS, ResourcesSchedulerConfig.INTERVAL_SECONDS = original_intervals
+
+
+def main(argv: Optional[List[str]] = None) -> dict:
+    """Punto de entrada de la línea de comandos"""
+    parser = argparse.ArgumentParser(description="Arnés de carga HTTP en proceso")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Mezcla 'RUTA:peso,...' (ver ROUTES)")
+    parser.add_argument("--requests", type=int, default=1000, help="Total de peticiones a enviar")
+    parser.add_argument("--concurrency", type=int, default=8, help="Peticiones concurrentes")
+    parser.add_argument("--rows", type=int, default=1000, help="Recursos y amenazas a sembrar")
+    parser.add_argument("--zones", type=int, default=20, help="Zonas a sembrar")
+    parser.add_argument("--workdir", default=None, help="Directorio de trabajo (default: temporal)")
+    parser.add_argument("--scheduler-interval", type=int, default=1,
+                        help="Intervalo (s) de los schedulers durante la carga; 0 para no iniciarlos")
+    parser.add_argument("--output", default=None, help="Archivo JSON para el reporte")
+    parser.add_argument("--seed", type=int, default=42)
+    # Uso interno: el proceso hijo ejecuta la carga y deja el reporte en este archivo
+    parser.add_argument("--child-report", default=None, help=argparse.SUPPRESS)
+    argv = list(sys.argv[1:] if argv is None else argv)
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    mix = parse_mix(args.mix)
+
+    if args.child_report:
+        report = _run(args, mix)
+        with open(args.child_report, "w", encoding="utf-8") as f:
+            json.dump(report, f)
+        return report
+
+    # Los datos de la app van a un directorio aislado, pasado al hijo mediante DATA_DIR
+    workdir = args.workdir or tempfile.mkdtemp(prefix="load_")
+    data_dir = os.path.abspath(os.path.join(workdir, "data"))
+    os.makedirs(data_dir, exist_ok=True)
+    report_file = os.path.join(workdir, "load_report.json")
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.load_harness", *argv, "--child-report", report_file],
+        cwd=PROJECT_ROOT, env={**os.environ, "DATA_DIR": data_dir}, check=True,
+    )
+    with open(report_file, encoding="utf-8") as f:
+        report = json.load(f)
+
+    print(f"Total: {report['total_requests']} peticiones en {report['elapsed_seconds']}s "
+          f"({report['throughput_rps']} req/s, errores {report['error_rate']:.2%})")
+    for route, summary in report["routes"].items():
+        print(f"  {route:<28} {summary['requests']:>7} req  p50={summary['p50_ms']}ms "
+              f"p99={summary['p99_ms']}ms  errores={summary['error_rate']:.2%}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+Micro-benchmarks de los repositorios (recursos, amenazas y zonas).
+
+Mide cada método público a distintos tamaños de tabla y reporta ops/seg,
+p50/p99 (ms) y memoria pico. No todos los repositorios tienen las mismas
+operaciones (las zonas no tienen update ni búsqueda por nombre, las amenazas
+no tienen búsqueda por nombre): las que faltan se informan en
+`meta.not_applicable` en lugar de quedar como huecos. Los resultados se escriben en JSON y pueden
+compararse contra una línea base guardada con un umbral de regresión.
+
+Uso:
+    python -m benchmarks.repository_benchmark --rows 1000 10000 --output bench.json
+    python -m benchmarks.repository_benchmark --rows 1000 --baseline bench.json --threshold 0.25
+"""
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from models.resource import Resource, TipoRecurso, EstadoRecurso
+from models.threat import Threat, TipoAmenaza, EstadoAmenaza
+from models.zone import Zona, TipoZona
+from repositories.resource_repository import ResourceRepository
+from repositories.threat_repository import ThreatRepository
+from repositories.zone_repository import ZoneRepository
+from repositories.partitioned_repository import PartitionedResourceRepository, PartitionedThreatRepository
+from services.world_simulator import WorldSimulator
+
+DEFAULT_ROWS = [1_000, 10_000, 100_000, 1_000_000]
+
+# Cantidad máxima de zonas sobre las que se reparten recursos y amenazas
+MAX_WORLD_ZONES = 1000
+
+# Backends de almacenamiento disponibles: nombre -> fábrica(data_dir) -> repositorios
+BACKENDS: Dict[str, Callable[[str], dict]] = {
+    "csv": lambda data_dir: {
+        "resources": ResourceRepository(os.path.join(data_dir, "resources.csv")),
+        "threats": ThreatRepository(os.path.join(data_dir, "threats.csv")),
+        "zones": ZoneRepository(os.path.join(data_dir, "zones.csv")),
+    },
+    "partitioned": lambda data_dir: {
+        "resources": PartitionedResourceRepository(os.path.join(data_dir, "resources.csv")),
+        "threats": PartitionedThreatRepository(os.path.join(data_dir, "threats.csv")),
+        "zones": ZoneRepository(os.path.join(data_dir, "zones.csv")),
+    },
+}
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    """Percentil por rango más cercano sobre una lista de muestras"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _measure(operation: Callable[[int], object], iterations: int) -> dict:
+    """Ejecuta la operación `iterations` veces y calcula latencias y memoria pico"""
+    samples = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        operation(i)
+        samples.append(time.perf_counter() - started)
+
+    # La memoria se mide en una ejecución aparte para no distorsionar los tiempos
+    tracemalloc.start()
+    operation(iterations)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = sum(samples)
+    return {
+        "iterations": iterations,
+        "ops_per_sec": round(iterations / total, 3) if total else None,
+        "p50_ms": round(statistics.median(samples) * 1000, 4),
+        "p99_ms": round(_percentile(samples, 99) * 1000, 4),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def _seed_world(repos: dict, rows: int):
+    """Puebla recursos, amenazas y zonas con `rows` registros cada uno"""
+    simulator = WorldSimulator(repos["resources"], repos["threats"], repos["zones"])
+    world_zones = simulator.ensure_zones(min(MAX_WORLD_ZONES, max(2, rows // 100)))
+
+    # Se generan tantos recursos como amenazas por tick para llegar a `rows` de cada uno
+    per_tick = min(rows, 1000)
+    ticks = -(-rows // per_tick)
+    simulator.run(ticks=ticks, zone_ids=world_zones, resources_per_tick=per_tick, threats_per_tick=per_tick)
+
+    # Completar la tabla de zonas hasta `rows` registros
+    simulator.ensure_zones(rows)
+    return world_zones
+
+
+def _resource_operations(repo, rows: int, zone_ids: List[int]) -> Dict[str, Callable[[int], object]]:
+    created: List[int] = []
+
+    def create(i):
+        resource = repo.create(Resource(
+            id=0, zona_id=random.choice(zone_ids), nombre=f"bench recurso {i}", tipo=TipoRecurso.HOJA,
+            cantidad_unitaria=10, peso=2, duracion_recoleccion=30, hormigas_requeridas=2
+        ))
+        created.append(resource.id)
+
+    def update(i):
+        resource = repo.get_by_id(random.randint(1, rows))
+        if resource:
+            resource.estado = EstadoRecurso.EN_RECOLECCION
+            repo.update(resource.id, resource)
+
+    return {
+        "create": create,
+        "get_by_id": lambda i: repo.get_by_id(random.randint(1, rows)),
+        "get_all_filtered": lambda i: repo.get_all(zona_id=random.choice(zone_ids), estado=EstadoRecurso.DISPONIBLE.value),
+        "update": update,
+        "name_exists": lambda i: repo.resource_name_exists_in_zone(f"hoja {random.randint(1, rows)}", random.choice(zone_ids)),
+        # Se eliminan los registros creados para mantener el tamaño de la tabla
+        "delete": lambda i: repo.delete(created.pop() if created else random.randint(1, rows)),
+    }
+
+
+def _threat_operations(repo, rows: int, zone_ids: List[int]) -> Dict[str, Callable[[int], object]]:
+    created: List[int] = []
+
+    def create(i):
+        threat = repo.create(Threat(
+            id=0, zona_id=random.choice(zone_ids), nombre=f"bench amenaza {i}", tipo=TipoAmenaza.ARANA,
+            costo_hormigas=3, hora_deteccion=datetime.now()
+        ))
+        created.append(threat.id)
+
+    def update(i):
+        threat = repo.get_by_id(random.randint(1, rows))
+        if threat:
+            threat.estado = EstadoAmenaza.EN_COMBATE
+            repo.update(threat.id, threat)
+
+    return {
+        "create": create,
+        "get_by_id": lambda i: repo.get_by_id(random.randint(1, rows)),
+        "get_all_filtered": lambda i: repo.get_all(zona_id=random.choice(zone_ids), estado=EstadoAmenaza.ACTIVA.value),
+        "update": update,
+        "delete": lambda i: repo.delete(created.pop() if created else random.randint(1, rows)),
+    }
+
+
+def _zone_operations(repo, rows: int) -> Dict[str, Callable[[int], object]]:
+    created: List[int] = []
+
+    def create(i):
+        zone_id = rows + 1 + len(created) + i
+        repo.crearZona(Zona(id=zone_id, nombre=f"bench zona {i}", tipo=TipoZona.JARDIN, fecha_creacion=datetime.now()))
+        created.append(zone_id)
+
+    return {
+        "create": create,
+        "get_by_id": lambda i: repo.obtenerZonaPorId(random.randint(1, rows)),
+        "get_all_filtered": lambda i: repo.obtenerZonasPorTipo(random.choice(list(TipoZona))),
+        # Existencia por ID: las zonas no tienen búsqueda por nombre
+        "exists": lambda i: repo.zone_exists(random.randint(1, rows)),
+        "delete": lambda i: repo.eliminarZona(created.pop() if created else random.randint(1, rows)),
+    }
+
+
+def run_benchmarks(
+    rows_list: List[int],
+    iterations: int = 20,
+    backends: Optional[List[str]] = None,
+    seed: int = 42
+) -> dict:
+    """Ejecuta la suite completa y retorna los resultados en forma serializable"""
+    random.seed(seed)
+    results = []
+    # Operaciones que se miden en algún repositorio pero que otro no tiene
+    not_applicable: Dict[str, List[str]] = {}
+
+    for backend in backends or list(BACKENDS):
+        for rows in rows_list:
+            with tempfile.TemporaryDirectory(prefix="bench_") as data_dir:
+                repos = BACKENDS[backend](data_dir)
+                world_zones = _seed_world(repos, rows)
+
+                suites = {
+                    "ResourceRepository": _resource_operations(repos["resources"], rows, world_zones),
+                    "ThreatRepository": _threat_operations(repos["threats"], rows, world_zones),
+                    "ZoneRepository": _zone_operations(repos["zones"], rows),
+                }
+                measured = {operation for operations in suites.values() for operation in operations}
+                for repository, operations in suites.items():
+                    missing = sorted(measured - set(operations))
+                    if missing and repository not in not_applicable:
+                        not_applicable[repository] = missing
+                        print(f"{repository} no tiene: {', '.join(missing)} (no se mide)")
+                for repository, operations in suites.items():
+                    for operation, func in operations.items():
+                        stats = _measure(func, iterations)
+                        results.append({
+                            "backend": backend,
+                            "repository": repository,
+                            "operation": operation,
+                            "rows": rows,
+                            **stats,
+                        })
+                        print(
+                            f"{backend:>8} {repository:<19} {operation:<17} rows={rows:<8} "
+                            f"{stats['ops_per_sec']:>10} ops/s p50={stats['p50_ms']}ms "
+                            f"p99={stats['p99_ms']}ms peak={stats['peak_memory_kb']}KB"
+                        )
+
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": iterations,
+            "not_applicable": not_applicable,
+        },
+        "results": results,
+    }
+
+
+def compare_with_baseline(current: dict, baseline: dict, threshold: float) -> List[dict]:
+    """
+    Compara contra la línea base. Una operación regresa si su p50 empeora más
+    que `threshold` (fracción) o si sus ops/seg caen más que `threshold`.
+    """
+    def key(r):
+        return (r["backend"], r["repository"], r["operation"], r["rows"])
+
+    baseline_by_key = {key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in current["results"]:
+        base = baseline_by_key.get(key(result))
+        if not base:
+            continue
+        slower = result["p50_ms"] > base["p50_ms"] * (1 + threshold)
+        fewer_ops = (
+            base.get("ops_per_sec") and result.get("ops_per_sec") is not None
+            and result["ops_per_sec"] < base["ops_per_sec"] * (1 - threshold)
+        )
+        if slower or fewer_ops:
+            regressions.append({
+                "backend": result["backend"],
+                "repository": result["repository"],
+                "operation": result["operation"],
+                "rows": result["rows"],
+                "baseline_p50_ms": base["p50_ms"],
+                "p50_ms": result["p50_ms"],
+                "baseline_ops_per_sec": base.get("ops_per_sec"),
+                "ops_per_sec": result.get("ops_per_sec"),
+            })
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada de la línea de comandos; retorna 1 si hay regresiones"""
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de los repositorios")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="Tamaños de tabla a medir")
+    parser.add_argument("--iterations", type=int, default=20, help="Repeticiones por operación")
+    parser.add_argument("--backend", action="append", choices=list(BACKENDS), help="Backends a medir (default: todos)")
+    parser.add_argument("--output", default="bench_results.json", help="Archivo JSON de resultados")
+    parser.add_argument("--baseline", default=None, help="Archivo JSON de línea base para comparar")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Regresión tolerada (0.25 = 25%%)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.rows, args.iterations, args.backend, args.seed)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Resultados guardados en {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        for r in regressions:
+            print(
+                f"❌ Regresión: {r['backend']} {r['repository']}.{r['operation']} rows={r['rows']} "
+                f"p50 {r['baseline_p50_ms']}ms -> {r['p50_ms']}ms"
+            )
+        if regressions:
+            return 1
+        print("✅ Sin regresiones respecto a la línea base")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
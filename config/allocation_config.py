@@ -0,0 +1,18 @@
+"""
+Configuración del optimizador de asignación de hormigas.
+"""
+import os
+
+
+class AllocationConfig:
+    """Límites del solver de asignación (mochila 0/1 sobre los recursos disponibles)"""
+    
+    # Celdas máximas (candidatos * hormigas) para resolver la mochila completa de forma exacta
+    # Puede ser configurado mediante variable de entorno ALLOCATION_DP_MAX_CELLS
+    DP_MAX_CELLS: int = int(os.getenv("ALLOCATION_DP_MAX_CELLS", "500000"))
+    
+    # Por encima de ese límite, solo se resuelven de forma exacta los candidatos a
+    # cada lado del punto de corte de la solución voraz (el "núcleo"); los de mejor
+    # densidad se toman y los de peor se descartan
+    # Puede ser configurado mediante variable de entorno ALLOCATION_CORE_SIZE
+    CORE_SIZE: int = int(os.getenv("ALLOCATION_CORE_SIZE", "64"))
@@ -0,0 +1,23 @@
+"""
+Configuración del archivado de recursos recolectados y amenazas resueltas.
+"""
+import os
+
+
+class ArchiveConfig:
+    """Configuración para mover las filas en estado terminal a archivos comprimidos"""
+    
+    # Horas que una fila en estado terminal permanece en el CSV principal
+    # Puede ser configurado mediante variable de entorno ARCHIVE_RETENTION_HOURS
+    RETENTION_HOURS: float = float(os.getenv("ARCHIVE_RETENTION_HOURS", "24"))
+    
+    # Cada cuántos minutos se ejecuta el archivado
+    # Puede ser configurado mediante variable de entorno ARCHIVE_INTERVAL_MINUTES
+    INTERVAL_MINUTES: float = float(os.getenv("ARCHIVE_INTERVAL_MINUTES", "60"))
+    
+    # Subdirectorio (junto a los CSV) donde se guardan las particiones mensuales .csv.gz
+    ARCHIVE_SUBDIR: str = os.getenv("ARCHIVE_SUBDIR", "archive")
+    
+    # Habilitar/deshabilitar el archivado periódico
+    # Puede ser configurado mediante variable de entorno AUTO_START_ARCHIVE
+    AUTO_START: bool = os.getenv("AUTO_START_ARCHIVE", "true").lower() == "true"
@@ -0,0 +1,24 @@
+"""
+Configuración del registro de cambios y del feed de eventos (SSE).
+"""
+import os
+
+
+class ChangeFeedConfig:
+    """Configuración para el registro de cambios de los repositorios"""
+    
+    # Cantidad máxima de eventos retenidos en memoria para reanudar clientes
+    # Puede ser configurado mediante variable de entorno CHANGE_LOG_SIZE
+    MAX_EVENTS: int = int(os.getenv("CHANGE_LOG_SIZE", "10000"))
+    
+    # Intervalo (en segundos) de los comentarios keep-alive del stream SSE
+    HEARTBEAT_SECONDS: float = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+    
+    # Tiempo (en milisegundos) que el cliente espera antes de reconectarse
+    RETRY_MILLISECONDS: int = int(os.getenv("EVENTS_RETRY_MS", "3000"))
+    
+    # Ventana (en milisegundos) en la que se agrupan los cambios de un frame delta del WebSocket
+    DELTA_FLUSH_MILLISECONDS: int = int(os.getenv("WS_DELTA_FLUSH_MS", "50"))
+    
+    # Cantidad máxima de transiciones aceptadas en un solo mensaje del WebSocket
+    MAX_TRANSITIONS_PER_MESSAGE: int = int(os.getenv("WS_MAX_TRANSITIONS", "1000"))
@@ -0,0 +1,19 @@
+"""
+Configuración de los temporizadores que completan las recolecciones en curso.
+"""
+import os
+
+
+class CollectionTimersConfig:
+    """Configuración para la transición automática de recursos en recolección"""
+    
+    # Cada cuántos segundos se revisan los temporizadores vencidos
+    # Puede ser configurado mediante variable de entorno COLLECTION_TIMERS_INTERVAL
+    FLUSH_INTERVAL_SECONDS: float = float(os.getenv("COLLECTION_TIMERS_INTERVAL", "1"))
+    
+    # Cantidad máxima de recursos completados por escritura del CSV
+    BATCH_SIZE: int = int(os.getenv("COLLECTION_TIMERS_BATCH_SIZE", "10000"))
+    
+    # Habilitar/deshabilitar los temporizadores al iniciar
+    # Puede ser configurado mediante variable de entorno AUTO_START_COLLECTION_TIMERS
+    AUTO_START: bool = os.getenv("AUTO_START_COLLECTION_TIMERS", "true").lower() == "true"
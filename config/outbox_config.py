@@ -0,0 +1,44 @@
+"""
+Configuración del outbox de notificaciones a otros subsistemas de la colonia.
+"""
+from typing import List
+import os
+
+from config.storage_config import StorageConfig
+
+
+class OutboxConfig:
+    """Configuración para la entrega de cambios a suscriptores HTTP"""
+    
+    # URLs que reciben los cambios (POST con lotes JSON), separadas por comas
+    # Puede ser configurado mediante variable de entorno OUTBOX_SUBSCRIBERS
+    SUBSCRIBERS: List[str] = [url.strip() for url in os.getenv("OUTBOX_SUBSCRIBERS", "").split(",") if url.strip()]
+    
+    # Archivos de persistencia del outbox y de los cursores por suscriptor
+    OUTBOX_FILE: str = os.getenv("OUTBOX_FILE", os.path.join(StorageConfig.DATA_DIR, "outbox.csv"))
+    CURSORS_FILE: str = os.getenv("OUTBOX_CURSORS_FILE", os.path.join(StorageConfig.DATA_DIR, "outbox_cursors.csv"))
+    # Lotes rechazados de forma permanente (HTTP 4xx no reintentable), para revisarlos a mano
+    DEAD_LETTER_FILE: str = os.getenv("OUTBOX_DEAD_LETTER_FILE", os.path.join(StorageConfig.DATA_DIR, "outbox_dead_letter.csv"))
+    
+    # Cantidad máxima de cambios por petición
+    BATCH_SIZE: int = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))
+    
+    # Lotes en vuelo simultáneamente hacia un mismo suscriptor
+    MAX_IN_FLIGHT_PER_SUBSCRIBER: int = int(os.getenv("OUTBOX_MAX_IN_FLIGHT", "2"))
+    
+    # Conexiones máximas del pool HTTP compartido
+    MAX_CONNECTIONS: int = int(os.getenv("OUTBOX_MAX_CONNECTIONS", "20"))
+    
+    # Reintentos por lote y backoff exponencial (en segundos)
+    MAX_RETRIES: int = int(os.getenv("OUTBOX_MAX_RETRIES", "5"))
+    BACKOFF_BASE_SECONDS: float = float(os.getenv("OUTBOX_BACKOFF_BASE", "0.5"))
+    BACKOFF_MAX_SECONDS: float = float(os.getenv("OUTBOX_BACKOFF_MAX", "30"))
+    
+    # Timeout de cada petición (en segundos)
+    TIMEOUT_SECONDS: float = float(os.getenv("OUTBOX_TIMEOUT", "5"))
+    
+    # Intervalo máximo entre rondas de entrega si no llegan cambios nuevos (en segundos)
+    POLL_SECONDS: float = float(os.getenv("OUTBOX_POLL_SECONDS", "5"))
+    
+    # Iniciar la entrega automáticamente si hay suscriptores configurados
+    AUTO_START: bool = os.getenv("AUTO_START_OUTBOX", "true").lower() == "true"
@@ -0,0 +1,13 @@
+"""
+Configuración del agotamiento gradual de los recursos en recolección.
+"""
+import os
+
+
+class ResourceDepletionConfig:
+    """Configuración del modelo de agotamiento de recursos"""
+    
+    # Habilitar/deshabilitar el agotamiento (deshabilitado por defecto: la cantidad
+    # solo cambia con PUT /resources/{id})
+    # Puede ser configurado mediante variable de entorno RESOURCE_DEPLETION_ENABLED
+    ENABLED: bool = os.getenv("RESOURCE_DEPLETION_ENABLED", "false").lower() == "true"
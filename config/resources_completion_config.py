@@ -0,0 +1,26 @@
+"""
+Configuración de la tarea que sondea la API de recolección para completar recursos.
+"""
+from typing import List
+import os
+
+
+class ResourcesCompletionConfig:
+    """Configuración del sondeo de recolecciones completadas"""
+    
+    # URLs de la API de recolección a sondear, separadas por comas
+    # Puede ser configurado mediante variable de entorno COLLECTION_API_URLS
+    COLLECTION_API_URLS: List[str] = [url.strip() for url in os.getenv("COLLECTION_API_URLS", "").split(",") if url.strip()]
+    
+    # Timeout de cada petición (en segundos)
+    TIMEOUT_SECONDS: float = float(os.getenv("COLLECTION_API_TIMEOUT", "5"))
+    
+    # Conexiones máximas del pool HTTP compartido
+    MAX_CONNECTIONS: int = int(os.getenv("COLLECTION_API_MAX_CONNECTIONS", "10"))
+    
+    # Tiempo máximo (en segundos) que una ronda de sondeo puede bloquear al job que la dispara
+    POLL_TIMEOUT_SECONDS: float = float(os.getenv("COLLECTION_POLL_TIMEOUT", "60"))
+    
+    # Archivo donde se guardan los cursores confirmados por URL (vacío: junto al CSV de recursos)
+    # Puede ser configurado mediante variable de entorno COLLECTION_CURSORS_FILE
+    CURSORS_FILE: str = os.getenv("COLLECTION_CURSORS_FILE", "")
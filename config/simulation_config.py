@@ -0,0 +1,40 @@
+"""
+Configuración de la simulación acelerada del mundo (generación masiva de datos).
+"""
+from models.resource import EstadoRecurso
+from models.threat import EstadoAmenaza
+from models.zone import TipoZona
+from typing import Dict, List
+import os
+
+
+class SimulationConfig:
+    """Configuración para la simulación acelerada del mundo"""
+    
+    # Segundos virtuales que avanza el reloj en cada tick
+    # Puede ser configurado mediante variable de entorno SIMULATION_TICK_SECONDS
+    TICK_SECONDS: int = int(os.getenv("SIMULATION_TICK_SECONDS", "60"))
+    
+    # Cantidad de recursos y amenazas generados por tick
+    RESOURCES_PER_TICK: int = int(os.getenv("SIMULATION_RESOURCES_PER_TICK", "10"))
+    THREATS_PER_TICK: int = int(os.getenv("SIMULATION_THREATS_PER_TICK", "3"))
+    
+    # Cantidad de registros acumulados antes de escribirlos en bloque
+    BATCH_SIZE: int = int(os.getenv("SIMULATION_BATCH_SIZE", "50000"))
+    
+    # Distribución de estados de los recursos generados (pesos relativos)
+    RESOURCE_STATE_WEIGHTS: Dict[EstadoRecurso, float] = {
+        EstadoRecurso.DISPONIBLE: 0.60,
+        EstadoRecurso.EN_RECOLECCION: 0.15,
+        EstadoRecurso.RECOLECTADO: 0.25
+    }
+    
+    # Distribución de estados de las amenazas generadas (pesos relativos)
+    THREAT_STATE_WEIGHTS: Dict[EstadoAmenaza, float] = {
+        EstadoAmenaza.ACTIVA: 0.50,
+        EstadoAmenaza.EN_COMBATE: 0.15,
+        EstadoAmenaza.RESUELTA: 0.35
+    }
+    
+    # Tipos de zona a rotar al crear las zonas de la simulación
+    ZONE_TYPES: List[TipoZona] = list(TipoZona)
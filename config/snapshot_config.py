@@ -0,0 +1,19 @@
+"""
+Configuración de los snapshots binarios de recursos y amenazas.
+"""
+import os
+
+
+class SnapshotConfig:
+    """Configuración para escribir periódicamente snapshots binarios de los CSV"""
+    
+    # Cada cuántos minutos se escribe un snapshot nuevo
+    # Puede ser configurado mediante variable de entorno SNAPSHOT_INTERVAL_MINUTES
+    INTERVAL_MINUTES: float = float(os.getenv("SNAPSHOT_INTERVAL_MINUTES", "10"))
+    
+    # Extensión agregada al nombre del CSV (data/resources.csv -> data/resources.csv.snap)
+    SUFFIX: str = os.getenv("SNAPSHOT_SUFFIX", ".snap")
+    
+    # Habilitar/deshabilitar la escritura periódica de snapshots
+    # Puede ser configurado mediante variable de entorno AUTO_START_SNAPSHOT
+    AUTO_START: bool = os.getenv("AUTO_START_SNAPSHOT", "true").lower() == "true"
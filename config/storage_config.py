@@ -0,0 +1,22 @@
+"""
+Configuración del almacenamiento de recursos y amenazas.
+"""
+import os
+
+CSV = "csv"
+PARTITIONED = "partitioned"
+
+
+class StorageConfig:
+    """Backend de almacenamiento de los repositorios de recursos y amenazas"""
+    
+    # - csv: un archivo por tipo de entidad (data/resources.csv, data/threats.csv)
+    # - partitioned: un archivo por zona (data/resources/zona-<id>.csv, ...). Al activarse
+    #   reparte el CSV único y lo renombra a data/resources.csv.migrated
+    # Puede ser configurado mediante variable de entorno STORAGE_BACKEND
+    BACKEND: str = os.getenv("STORAGE_BACKEND", CSV).lower()
+    
+    # Directorio de los CSV de la app (recursos, amenazas, zonas, outbox). Se lee al importar
+    # los repositorios, así que debe fijarse antes de cargar la app
+    # Puede ser configurado mediante variable de entorno DATA_DIR
+    DATA_DIR: str = os.getenv("DATA_DIR", "data")
@@ -0,0 +1,35 @@
+"""
+Configuración del escalamiento de amenazas activas.
+"""
+from models.threat import TipoAmenaza
+import os
+
+LINEAR = "linear"
+EXPONENTIAL = "exponential"
+
+
+class ThreatEscalationConfig:
+    """Curvas de crecimiento de costo_hormigas para amenazas no atendidas"""
+    
+    # Habilitar/deshabilitar el escalamiento
+    # Puede ser configurado mediante variable de entorno THREAT_ESCALATION_ENABLED
+    ENABLED: bool = os.getenv("THREAT_ESCALATION_ENABLED", "true").lower() == "true"
+    
+    # Curva por tipo de amenaza:
+    # (tipo de curva, segundos de gracia, crecimiento por hora, multiplicador máximo)
+    # - linear: costo * (1 + crecimiento * horas)
+    # - exponential: costo * (1 + crecimiento) ** horas
+    CURVES = {
+        TipoAmenaza.AGUILA: (EXPONENTIAL, 300, 0.50, 4.0),
+        TipoAmenaza.ARANA: (LINEAR, 600, 0.50, 3.0),
+        TipoAmenaza.ABEJA: (EXPONENTIAL, 300, 0.35, 3.0),
+        TipoAmenaza.SALTAMONTES: (LINEAR, 900, 0.25, 2.0),
+        TipoAmenaza.ESCARABAJO: (LINEAR, 900, 0.20, 2.0),
+        TipoAmenaza.MANTIS: (LINEAR, 600, 0.40, 3.0),
+        TipoAmenaza.LAGARTIJA: (EXPONENTIAL, 600, 0.30, 3.0),
+        TipoAmenaza.PAJARO: (EXPONENTIAL, 300, 0.40, 4.0),
+        TipoAmenaza.SERPIENTE: (EXPONENTIAL, 300, 0.60, 5.0),
+    }
+    
+    # Curva para tipos sin configuración específica
+    DEFAULT_CURVE = (LINEAR, 600, 0.25, 2.0)
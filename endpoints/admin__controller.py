@@ -0,0 +1,59 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+
+from services.profiler import profiler, ProfilerBusyError, MAX_SECONDS, MAX_HZ
+from services.outbox import outbox_service
+from services.archiver import archiver
+from services.snapshotter import snapshotter
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def capturar_perfil(
+    seconds: float = Query(5, gt=0, le=MAX_SECONDS),
+    hz: int = Query(100, gt=0, le=MAX_HZ),
+    thread: Optional[str] = Query(None)
+):
+    """
+    Muestrea las pilas de todos los hilos del worker durante `seconds` segundos
+    y retorna las pilas colapsadas para generar un flamegraph.
+    `thread` filtra por prefijo del nombre del hilo (ej: 'APScheduler', 'ThreadPoolExecutor').
+    """
+    try:
+        collapsed = await run_in_threadpool(profiler.capture, seconds, hz, thread)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail={"error": str(e)})
+    return PlainTextResponse(collapsed)
+
+
+@router.get("/outbox")
+async def estado_outbox():
+    """Estado del outbox: suscriptores, cursores y entregas/fallos acumulados"""
+    return await run_in_threadpool(outbox_service.get_status)
+
+
+@router.get("/archive")
+async def estado_archivo():
+    """Estado del archivado: retención, última ejecución y particiones existentes"""
+    return await run_in_threadpool(archiver.get_status)
+
+
+@router.post("/archive")
+async def archivar():
+    """Archiva ahora los recursos recolectados y amenazas resueltas fuera de la ventana de retención"""
+    return await run_in_threadpool(archiver.archive)
+
+
+@router.get("/snapshot")
+async def estado_snapshot():
+    """Estado de los snapshots binarios: última escritura y filas guardadas"""
+    return await run_in_threadpool(snapshotter.get_status)
+
+
+@router.post("/snapshot")
+async def escribir_snapshot():
+    """Escribe ahora el snapshot binario de recursos y amenazas"""
+    return await run_in_threadpool(snapshotter.snapshot)
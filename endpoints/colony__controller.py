@@ -0,0 +1,42 @@
+from fastapi import APIRouter, HTTPException
+
+from schemas.colony_schema import AllocationRequest
+from services.allocation import allocation_candidates
+from services.demand_ledger import demand_ledger
+
+router = APIRouter(prefix="/colony", tags=["colony"])
+
+
+@router.get("/demand")
+async def obtener_demanda():
+    """
+    Hormigas necesarias en este momento, en total y por zona: hormigas_requeridas
+    de los recursos disponibles más costo_hormigas de las amenazas activas o en combate.
+    Los cambios también se publican en /events como eventos 'demand.updated'.
+    """
+    return demand_ledger.snapshot()
+
+
+@router.get("/demand/{zona_id}")
+async def obtener_demanda_zona(zona_id: int):
+    """Hormigas necesarias en una zona"""
+    demand = demand_ledger.demand(zona_id)
+    if demand is None:
+        raise HTTPException(status_code=404, detail={"error": f"La zona {zona_id} no existe"})
+    return demand
+
+
+@router.post("/allocation")
+async def asignar_hormigas(request: AllocationRequest):
+    """
+    Reparte las hormigas disponibles de cada zona: primero neutraliza las amenazas
+    activas (de menor a mayor costo escalado) y con las restantes elige los
+    recursos disponibles que maximizan el valor recolectado por segundo
+    (cantidad_unitaria * peso / duracion_recoleccion, usando hormigas_requeridas
+    como peso). `cota_superior` es el óptimo fraccionario: si `exacto` es false
+    la solución es aproximada y la diferencia acota lo que se deja de ganar.
+    """
+    negativas = [zona_id for zona_id, hormigas in request.hormigas.items() if hormigas < 0]
+    if negativas:
+        raise HTTPException(status_code=400, detail={"error": f"Cantidad de hormigas negativa para las zonas {negativas}"})
+    return allocation_candidates.allocate(request.hormigas)
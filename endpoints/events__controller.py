@@ -0,0 +1,113 @@
+from fastapi import APIRouter, HTTPException, Query, Header, Request
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional
+import asyncio
+import json
+
+from config.change_feed_config import ChangeFeedConfig
+from repositories.change_log import ChangeLog, ChangeEvent, event_to_dict, ENTITIES
+from repositories.storage import create_resource_repository
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+# El feed publica los cambios del directorio de datos de la aplicación
+change_log = create_resource_repository().change_log
+
+
+def _format_sse(event: ChangeEvent) -> str:
+    """Serializa un evento en formato Server-Sent Events"""
+    payload = json.dumps(event_to_dict(event), ensure_ascii=False)
+    return f"id: {event.seq}\nevent: {event.entity}.{event.action}\ndata: {payload}\n\n"
+
+
+def _matches(event: ChangeEvent, zona_id: Optional[int], entidad: Optional[str]) -> bool:
+    if entidad is not None and event.entity != entidad:
+        return False
+    if zona_id is not None and event.zona_id != zona_id:
+        return False
+    return True
+
+
+async def event_stream(
+    log: ChangeLog,
+    request: Request,
+    zona_id: Optional[int] = None,
+    entidad: Optional[str] = None,
+    last_event_id: Optional[int] = None
+) -> AsyncIterator[str]:
+    """
+    Genera el stream SSE: primero los eventos retenidos posteriores a
+    `last_event_id` (si se indica) y luego los cambios en vivo.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+
+    def listener(event: ChangeEvent):
+        # Los repositorios publican desde otros hilos (p. ej. los schedulers)
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+        except RuntimeError:
+            pass
+
+    # Suscribirse antes de leer el historial para no perder eventos intermedios
+    log.subscribe(listener)
+    try:
+        yield f"retry: {ChangeFeedConfig.RETRY_MILLISECONDS}\n\n"
+
+        last_seq = log.version
+        if last_event_id is not None:
+            backlog = log.since(last_event_id)
+            if backlog is None:
+                # El cliente quedó fuera de la ventana retenida: debe resincronizar
+                reset = {"version": last_seq, "reason": "history_unavailable"}
+                yield f"event: reset\ndata: {json.dumps(reset)}\n\n"
+            else:
+                for event in backlog:
+                    if _matches(event, zona_id, entidad):
+                        yield _format_sse(event)
+                last_seq = backlog[-1].seq if backlog else last_event_id
+
+        while True:
+            if await request.is_disconnected():
+                break
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=ChangeFeedConfig.HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if event.seq <= last_seq:
+                continue
+            last_seq = event.seq
+            if _matches(event, zona_id, entidad):
+                yield _format_sse(event)
+    finally:
+        log.unsubscribe(listener)
+
+
+@router.get("")
+async def stream_eventos(
+    request: Request,
+    zona_id: Optional[int] = Query(None),
+    entidad: Optional[str] = Query(None),
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    Stream Server-Sent Events con los cambios de recursos, amenazas y zonas.
+    Filtros opcionales por zona y entidad ('resource', 'threat', 'zone').
+    Enviar el encabezado Last-Event-ID reanuda desde esa secuencia.
+    """
+    if entidad is not None and entidad not in ENTITIES:
+        raise HTTPException(status_code=400, detail={"error": f"Entidad inválida. Valores permitidos: {list(ENTITIES)}"})
+
+    resume_from = None
+    if last_event_id:
+        try:
+            resume_from = int(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail={"error": "Last-Event-ID inválido"})
+
+    return StreamingResponse(
+        event_stream(change_log, request, zona_id, entidad, resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
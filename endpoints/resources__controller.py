@@ -1,19 +1,34 @@
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
 from typing import Optional, List
 from datetime import datetime
 
 from schemas.resource_schema import ResourceCreate, ResourceUpdate, ResourceResponse
 from models.resource import Resource, EstadoRecurso, TipoRecurso
 from repositories.zone_repository import ZoneRepository
-from repositories.resource_repository import ResourceRepository
+from repositories.storage import create_resource_repository
+from repositories.resource_repository import FIELDNAMES as RESOURCE_FIELDS
 #from repositories.minimal_test_pass.resource_repository_minimal_test_pass import ResourceRepository
 from services.resource_scheduler import resource_scheduler
+from services.collection_timers import collection_timers
+from services.resource_depletion import remaining_quantity, with_depletion, with_depletion_all, materialize_depletion, set_quantity
+from services.top_index import top_index, RESOURCE_ORDERS
+from services.time_index import time_index, RESOURCE_TIME_FIELDS
+from services.archiver import list_archived, merge_archived
+from services.field_projection import parse_fields, project_resources, select_fields
 
 router = APIRouter(prefix="/resources", tags=["resources"])
 
-resource_repo = ResourceRepository()
+resource_repo = create_resource_repository()
 zone_repo = ZoneRepository()
 
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Campos pedidos con `?fields=`; 400 si alguno no pertenece al recurso"""
+    try:
+        return parse_fields(fields, RESOURCE_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail={"error": str(e)})
+
 @router.get("/types", response_model=List[dict])
 async def obtener_tipos_recursos():
     """Obtiene los tipos de recursos disponibles"""
@@ -70,20 +85,65 @@ async def crear_recurso(zona_id: int, resource_data: ResourceCreate):
 @router.get("", response_model=List[ResourceResponse])
 async def listar_recursos(
     zona_id: Optional[int] = Query(None),
-    estado: Optional[str] = Query(None)
+    estado: Optional[str] = Query(None),
+    created_after: Optional[datetime] = Query(None),
+    created_before: Optional[datetime] = Query(None),
+    time_field: str = Query("hora_creacion"),
+    include_archived: bool = Query(False),
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por comas (p. ej. id,estado)")
 ):
     """Lista todos los recursos con filtros opcionales"""
-    resources = resource_repo.get_all(zona_id=zona_id, estado=estado)
+    if time_field not in RESOURCE_TIME_FIELDS:
+        raise HTTPException(status_code=400, detail={"error": f"Campo de fecha inválido. Valores permitidos: {list(RESOURCE_TIME_FIELDS)}"})
+    selected = _parse_fields(fields)
+    if selected is not None and created_after is None and created_before is None and not include_archived:
+        # Solo se leen del CSV las columnas pedidas, sin construir modelos ni validar el esquema
+        return JSONResponse(project_resources(resource_repo, selected, zona_id, estado))
+    if created_after is not None or created_before is not None:
+        # Rango [created_after, created_before) resuelto con el índice temporal
+        resources = time_index.resources_between(time_field, created_after, created_before, zona_id, estado)
+    else:
+        resources = resource_repo.get_all(zona_id=zona_id, estado=estado)
+    if include_archived:
+        # Las particiones archivadas solo se leen cuando se piden
+        archived = list_archived(resource_repo, "hora_recoleccion", zona_id, estado, time_field, created_after, created_before)
+        resources = merge_archived(resources, archived)
+    # La cantidad de los recursos en recolección se calcula al leer (si el agotamiento está habilitado)
+    resources = with_depletion_all(resources)
+    if selected is not None:
+        return JSONResponse(select_fields(resources, selected))
     return resources
 
 
+@router.get("/top", response_model=List[ResourceResponse])
+async def recursos_prioritarios(
+    k: int = Query(10, ge=1),
+    zona_id: Optional[int] = Query(None),
+    by: str = Query("value")
+):
+    """
+    Los k recursos disponibles de mayor prioridad, desde un índice ordenado:
+    by=value (mayor cantidad_unitaria * peso), by=weight (mayor peso) o
+    by=duration (menor duracion_recoleccion)
+    """
+    if by not in RESOURCE_ORDERS:
+        raise HTTPException(status_code=400, detail={"error": f"Orden inválido. Valores permitidos: {list(RESOURCE_ORDERS)}"})
+    return top_index.top_resources(k, by, zona_id)
+
+
 @router.get("/{resource_id}", response_model=ResourceResponse)
-async def obtener_recurso(resource_id: int):
+async def obtener_recurso(
+    resource_id: int,
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por comas (p. ej. id,estado)")
+):
     """Obtiene un recurso por ID"""
+    selected = _parse_fields(fields)
     resource = resource_repo.get_by_id(resource_id)
     if not resource:
         raise HTTPException(status_code=404, detail={"error": f"El recurso {resource_id} no existe"})
-    return resource
+    if selected is not None:
+        return JSONResponse(select_fields([with_depletion(resource)], selected)[0])
+    return with_depletion(resource)
 
 
 
@@ -93,22 +153,29 @@ async def actualizar_recurso(resource_id: int, update_data: ResourceUpdate):
     if not resource:
         raise HTTPException(status_code=404, detail={"error": f"El recurso {resource_id} no existe"})
     
+    now = datetime.now()
+    
     # Validar y aplicar cantidad si se proporciona
     if update_data.cantidad_unitaria is not None:
-        if update_data.cantidad_unitaria <= 0 or update_data.cantidad_unitaria > resource.cantidad_unitaria:
+        if update_data.cantidad_unitaria <= 0 or update_data.cantidad_unitaria > remaining_quantity(resource, now):
             raise HTTPException(status_code=400, detail={"error": "Cantidad inválida"})
-        resource.cantidad_unitaria = update_data.cantidad_unitaria
+        set_quantity(resource, update_data.cantidad_unitaria, now)
 
     # Actualizar estado si se proporciona
     if update_data.estado:
         if update_data.estado == "recolectado":
-            resource.hora_recoleccion = datetime.now()
+            resource.hora_recoleccion = now
+        elif update_data.estado == "en_recoleccion" and resource.estado != EstadoRecurso.EN_RECOLECCION:
+            # Inicio de la recolección: a partir de aquí corre duracion_recoleccion
+            resource.hora_inicio_recoleccion = now
+        # Si la recolección se interrumpe, la cantidad restante queda fija
+        materialize_depletion(resource, EstadoRecurso(update_data.estado), now)
         resource.estado = EstadoRecurso(update_data.estado)
     
     updated = resource_repo.update(resource_id, resource)
     if not updated:
         raise HTTPException(status_code=404, detail={"error": f"El recurso {resource_id} no existe"})
-    return updated
+    return with_depletion(updated, now)
 
 
 @router.delete("/{resource_id}")
@@ -142,4 +209,10 @@ async def iniciar_scheduler_recursos():
 async def detener_scheduler_recursos():
     """Detiene el scheduler automático de generación de recursos"""
     resource_scheduler.stop()
-    return {"message": "Scheduler de recursos detenido exitosamente", "status": resource_scheduler.get_status()}
\ No newline at end of file
+    return {"message": "Scheduler de recursos detenido exitosamente", "status": resource_scheduler.get_status()}
+
+
+@router.get("/timers/status")
+async def estado_temporizadores_recoleccion():
+    """Obtiene el estado de los temporizadores que completan las recolecciones en curso"""
+    return collection_timers.get_status()
@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Query
+from fastapi.concurrency import run_in_threadpool
+from typing import Dict, List, Optional, Tuple
+
+from repositories.change_log import (
+    ChangeEvent, serialize_entity, ENTITY_RESOURCE, ENTITY_THREAT, ENTITY_ZONE, ACTION_DELETED, ACTION_ARCHIVED
+)
+from repositories.zone_repository import ZoneRepository
+from repositories.resource_repository import FIELDNAMES as RESOURCE_FIELDS
+from repositories.threat_repository import FIELDNAMES as THREAT_FIELDS
+from repositories.storage import create_resource_repository, create_threat_repository
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+resource_repo = create_resource_repository()
+threat_repo = create_threat_repository()
+zone_repo = ZoneRepository()
+
+# Clave de cada entidad en la respuesta
+COLLECTIONS = {ENTITY_RESOURCE: "resources", ENTITY_THREAT: "threats", ENTITY_ZONE: "zones"}
+
+
+def _empty_response(version: int, epoch: str, full: bool) -> dict:
+    response = {"version": version, "epoch": epoch, "full": full}
+    for collection in COLLECTIONS.values():
+        response[collection] = []
+    response["deleted"] = {collection: [] for collection in COLLECTIONS.values()}
+    return response
+
+
+def _full_snapshot(version: int, epoch: str) -> dict:
+    """Estado completo; la versión se toma antes de leer los CSV (reaplicar cambios es idempotente)"""
+    response = _empty_response(version, epoch, full=True)
+    # Proyección en texto desde el CSV mapeado: mismo JSON que serialize_entity sin construir los modelos
+    response["resources"] = resource_repo.project(RESOURCE_FIELDS, raw=True)
+    response["threats"] = threat_repo.project(THREAT_FIELDS, raw=True)
+    response["zones"] = [serialize_entity(z) for z in zone_repo.obtenerTodasLasZonas()]
+    return response
+
+
+def _incremental(events: List[ChangeEvent], since: int, epoch: str) -> dict:
+    """Último estado de cada entidad modificada, o su tombstone si fue eliminada"""
+    latest: Dict[Tuple[str, int], ChangeEvent] = {}
+    for event in events:
+        # Solo entidades persistidas (se omiten, p. ej., los eventos de demanda)
+        if event.entity in COLLECTIONS:
+            latest[(event.entity, event.entity_id)] = event
+    response = _empty_response(events[-1].seq if events else since, epoch, full=False)
+    for (entity, entity_id), event in latest.items():
+        collection = COLLECTIONS[entity]
+        # Las filas archivadas salen del estado sincronizado igual que las eliminadas
+        if event.action in (ACTION_DELETED, ACTION_ARCHIVED):
+            response["deleted"][collection].append(entity_id)
+        else:
+            response[collection].append(serialize_entity(event.data))
+    return response
+
+
+@router.get("")
+async def sincronizar(
+    since: int = Query(0, ge=0),
+    epoch: Optional[str] = Query(None)
+):
+    """
+    Cambios posteriores a la versión `since`: entidades creadas o actualizadas
+    (estado actual) y los IDs eliminados. Si la versión ya no está en el registro
+    de cambios, si `epoch` falta o no coincide (las versiones solo son
+    comparables dentro de una misma época del servidor) o si `since` es 0,
+    retorna el estado completo con `full: true`.
+    """
+    log = resource_repo.change_log
+    if since > 0 and epoch == log.epoch:
+        events = log.since(since)
+        if events is not None:
+            return _incremental(events, since, log.epoch)
+    return await run_in_threadpool(_full_snapshot, log.version, log.epoch)
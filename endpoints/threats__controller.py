@@ -1,19 +1,34 @@
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
 from typing import Optional, List
 from datetime import datetime
 
 from schemas.threat_schema import ThreatCreate, ThreatUpdate, ThreatResponse
 from models.threat import Threat, TipoAmenaza, EstadoAmenaza
-from repositories.threat_repository import ThreatRepository
 from repositories.zone_repository import ZoneRepository
+from repositories.storage import create_threat_repository
+from repositories.threat_repository import FIELDNAMES as THREAT_FIELDS
 from services.threat_scheduler import threat_scheduler
+from services.threat_escalation import with_escalation, with_escalation_all, materialize_escalation
+from services.top_index import top_index, THREAT_ORDERS
+from services.time_index import time_index, THREAT_TIME_FIELDS
+from services.archiver import list_archived, merge_archived
+from services.field_projection import parse_fields, project_threats, select_fields
 #from repositories.minimal_test_pass.threat_repository_minimal_test_pass import ThreatRepository
 router = APIRouter(prefix="/threats", tags=["threats"])
 
-threat_repo = ThreatRepository()
+threat_repo = create_threat_repository()
 zone_repo = ZoneRepository()
 
 
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Campos pedidos con `?fields=`; 400 si alguno no pertenece a la amenaza"""
+    try:
+        return parse_fields(fields, THREAT_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail={"error": str(e)})
+
+
 @router.get("/types", response_model=List[dict])
 async def obtener_tipos_amenaza():
     """Retorna todos los tipos de amenaza disponibles"""
@@ -65,16 +80,58 @@ async def crear_amenaza(zona_id: int, threat_data: ThreatCreate):
 @router.get("", response_model=List[ThreatResponse])
 async def listar_amenazas(
     zona_id: Optional[int] = Query(None),
-    estado: Optional[str] = Query(None)
+    estado: Optional[str] = Query(None),
+    created_after: Optional[datetime] = Query(None),
+    created_before: Optional[datetime] = Query(None),
+    time_field: str = Query("hora_deteccion"),
+    include_archived: bool = Query(False),
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por comas (p. ej. id,estado)")
 ):
     """Lista todas las amenazas con filtros opcionales"""
-    threats = threat_repo.get_all(zona_id=zona_id, estado=estado)
+    if time_field not in THREAT_TIME_FIELDS:
+        raise HTTPException(status_code=400, detail={"error": f"Campo de fecha inválido. Valores permitidos: {list(THREAT_TIME_FIELDS)}"})
+    selected = _parse_fields(fields)
+    if selected is not None and created_after is None and created_before is None and not include_archived:
+        # Solo se leen del CSV las columnas pedidas, sin construir modelos ni validar el esquema
+        return JSONResponse(project_threats(threat_repo, selected, zona_id, estado))
+    if created_after is not None or created_before is not None:
+        # Rango [created_after, created_before) resuelto con el índice temporal
+        threats = time_index.threats_between(time_field, created_after, created_before, zona_id, estado)
+    else:
+        threats = threat_repo.get_all(zona_id=zona_id, estado=estado)
+    if include_archived:
+        # Las particiones archivadas solo se leen cuando se piden
+        archived = list_archived(threat_repo, "hora_resolucion", zona_id, estado, time_field, created_after, created_before)
+        threats = merge_archived(threats, archived)
+    # El costo de las amenazas activas se escala al leer, sin reescribir el CSV
+    threats = with_escalation_all(threats)
+    if selected is not None:
+        return JSONResponse(select_fields(threats, selected))
     return threats
 
 
+@router.get("/top", response_model=List[ThreatResponse])
+async def amenazas_prioritarias(
+    k: int = Query(10, ge=1),
+    zona_id: Optional[int] = Query(None),
+    by: str = Query("cost")
+):
+    """
+    Las k amenazas activas de mayor prioridad, desde un índice ordenado:
+    by=cost (mayor costo escalado primero) o by=age (detectada hace más tiempo primero)
+    """
+    if by not in THREAT_ORDERS:
+        raise HTTPException(status_code=400, detail={"error": f"Orden inválido. Valores permitidos: {list(THREAT_ORDERS)}"})
+    return top_index.top_threats(k, by, zona_id)
+
+
 @router.get("/{threat_id}", response_model=ThreatResponse)
-async def obtener_amenaza(threat_id: int):
+async def obtener_amenaza(
+    threat_id: int,
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por comas (p. ej. id,estado)")
+):
     """Obtiene una amenaza por ID"""
+    selected = _parse_fields(fields)
     threat = threat_repo.get_by_id(threat_id)
     if not threat:
         raise HTTPException(status_code=404, detail={"error": f"La amenaza {threat_id} no existe"})
@@ -84,7 +141,9 @@ async def obtener_amenaza(threat_id: int):
         threat.hora_deteccion = datetime.now()
         threat_repo.update(threat_id, threat)
     
-    return threat
+    if selected is not None:
+        return JSONResponse(select_fields([with_escalation(threat)], selected)[0])
+    return with_escalation(threat)
 
 
 @router.put("/{threat_id}", response_model=ThreatResponse)
@@ -109,11 +168,14 @@ async def actualizar_amenaza(threat_id: int, update_data: ThreatUpdate):
             )
         threat.hora_resolucion = datetime.now()
     
+    # Al salir de 'activa' el costo escalado queda fijo
+    materialize_escalation(threat, update_data.estado, datetime.now())
+    
     # Actualizar estado
     threat.estado = update_data.estado
     
     updated_threat = threat_repo.update(threat_id, threat)
-    return updated_threat
+    return with_escalation(updated_threat)
 
 
 @router.delete("/{threat_id}")
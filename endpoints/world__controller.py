@@ -0,0 +1,134 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional, Set
+import asyncio
+import logging
+
+from config.change_feed_config import ChangeFeedConfig
+from repositories.change_log import ChangeEvent
+from repositories.zone_repository import ZoneRepository
+from repositories.storage import create_resource_repository, create_threat_repository
+from services.world_stream import build_snapshot, build_delta, apply_transitions
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["world"])
+
+resource_repo = create_resource_repository()
+threat_repo = create_threat_repository()
+zone_repo = ZoneRepository()
+
+
+def _parse_zonas(message: dict) -> Optional[Set[int]]:
+    """Zonas de la suscripción; None (o lista ausente) significa todas"""
+    zonas = message.get("zonas")
+    if zonas is None:
+        return None
+    if not isinstance(zonas, list) or not all(isinstance(z, int) for z in zonas):
+        raise ValueError("'zonas' debe ser una lista de enteros")
+    return set(zonas)
+
+
+def _read_snapshot(zonas: Optional[Set[int]]) -> dict:
+    version = resource_repo.change_log.version
+    return build_snapshot(
+        version, zonas,
+        # Vistas: las filas de zonas no suscritas solo convierten su zona_id
+        resource_repo.scan(), threat_repo.scan(), zone_repo.obtenerTodasLasZonas()
+    )
+
+
+@router.websocket("/ws/world")
+async def world_socket(websocket: WebSocket):
+    """
+    Suscripción al estado del mundo por zonas.
+
+    Mensajes del cliente:
+      {"type": "subscribe", "zonas": [1, 2]}      -> snapshot y luego frames delta
+      {"type": "transitions", "ref": 7, "changes": [{"entity": "threat", "id": 3, "estado": "en_combate"}]}
+                                                   -> ack con las transiciones aplicadas/rechazadas
+    """
+    await websocket.accept()
+    log = resource_repo.change_log
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def listener(event: ChangeEvent):
+        # Los repositorios publican desde otros hilos (schedulers, threadpool)
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+        except RuntimeError:
+            pass
+
+    # Mientras se lee un snapshot, los eventos se guardan en `pending` en lugar de
+    # descartarse; al terminar pasan a `replay` y se envían antes que los nuevos
+    state = {"subscribed": False, "zonas": None, "version": 0, "pending": None, "replay": []}
+
+    async def send_deltas():
+        flush_seconds = ChangeFeedConfig.DELTA_FLUSH_MILLISECONDS / 1000
+        while True:
+            events: List[Optional[ChangeEvent]] = [await queue.get()]
+            # Agrupar los cambios que lleguen dentro de la ventana en un solo frame
+            await asyncio.sleep(flush_seconds)
+            while not queue.empty():
+                events.append(queue.get_nowait())
+            # None solo despierta la tarea para enviar lo guardado durante el snapshot
+            events = [e for e in events if e is not None]
+            if state["pending"] is not None:
+                state["pending"].extend(events)
+                continue
+            if not state["subscribed"]:
+                continue
+            if state["replay"]:
+                events = state["replay"] + events
+                state["replay"] = []
+            # Descartar lo que ya estaba incluido en el snapshot
+            events = [e for e in events if e.seq > state["version"]]
+            frame = build_delta(events, state["zonas"]) if events else None
+            if frame is not None:
+                await websocket.send_json(frame)
+
+    async def receive_messages():
+        while True:
+            message = await websocket.receive_json()
+            kind = message.get("type") if isinstance(message, dict) else None
+            if kind == "subscribe":
+                try:
+                    zonas = _parse_zonas(message)
+                except ValueError as e:
+                    await websocket.send_json({"type": "error", "error": str(e)})
+                    continue
+                # Desde aquí los eventos se guardan: los confirmados después de tomar
+                # la versión (antes de leer los CSV) se reenvían como delta, y aplicar
+                # de nuevo uno que ya estaba en el snapshot es idempotente
+                state["pending"] = []
+                snapshot = await run_in_threadpool(_read_snapshot, zonas)
+                await websocket.send_json(snapshot)
+                state.update(subscribed=True, zonas=zonas, version=snapshot["version"],
+                             replay=state["pending"], pending=None)
+                queue.put_nowait(None)
+            elif kind == "transitions":
+                changes = message.get("changes")
+                if not isinstance(changes, list) or len(changes) > ChangeFeedConfig.MAX_TRANSITIONS_PER_MESSAGE:
+                    await websocket.send_json({
+                        "type": "error", "ref": message.get("ref"),
+                        "error": f"'changes' debe ser una lista de hasta {ChangeFeedConfig.MAX_TRANSITIONS_PER_MESSAGE} transiciones"
+                    })
+                    continue
+                result = await run_in_threadpool(apply_transitions, changes, resource_repo, threat_repo)
+                await websocket.send_json({"type": "ack", "ref": message.get("ref"), **result})
+            else:
+                await websocket.send_json({"type": "error", "error": f"Tipo de mensaje desconocido: {kind!r}"})
+
+    log.subscribe(listener)
+    tasks = [asyncio.create_task(send_deltas()), asyncio.create_task(receive_messages())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                logger.error(f"❌ Error en la suscripción del mundo: {error}")
+    finally:
+        log.unsubscribe(listener)
+        for task in tasks:
+            task.cancel()
@@ -7,6 +7,7 @@ from models.zone import Zona, TipoZona
 from repositories.zone_repository import ZoneRepository
 #from repositories.minimal_test_pass.zone_repository_minimal_test_pass import ZoneRepository
 from schemas.zone_schema import ZoneCreate, ZoneResponse  # Te explico más abajo este schema
+from services.zone_summary import zone_summary_view
 
 router = APIRouter(prefix="/zones", tags=["zones"])
 
@@ -50,6 +51,21 @@ async def listar_zonas_por_tipo(tipo_zona: str):
     return zonas
 
 
+@router.get("/summary", response_model=List[dict])
+async def resumen_zonas():
+    """Resumen por zona de recursos y amenazas (mantenido en memoria, sin recorrer los CSV)"""
+    return zone_summary_view.summaries()
+
+
+@router.get("/{zona_id}/summary")
+async def resumen_zona(zona_id: int):
+    """Resumen de recursos y amenazas de una zona"""
+    summary = zone_summary_view.summary(zona_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail={"error": f"La zona {zona_id} no existe"})
+    return summary
+
+
 @router.get("/{zona_id}", response_model=ZoneResponse)
 async def obtener_zona(zona_id: int):
     """Obtiene una zona por su ID"""
@@ -2,15 +2,37 @@ from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
+import time
 from scheduled_tasks.resources_check_task import resources_completion_task
+from scheduled_tasks.archive_task import archive_task
+from scheduled_tasks.snapshot_task import snapshot_task
+from services.resources_completion import resources_completion_poller
 from apscheduler.schedulers.background import BackgroundScheduler
 import endpoints.zones__controller as zones_controller
 import endpoints.threats__controller as threats_controller
 import endpoints.resources__controller as resources_controller
+import endpoints.metrics__controller as metrics_controller
+import endpoints.admin__controller as admin_controller
+import endpoints.events__controller as events_controller
+import endpoints.world__controller as world_controller
+import endpoints.sync__controller as sync_controller
+import endpoints.colony__controller as colony_controller
+from services.metrics import metrics, request_io
 from services.threat_scheduler import threat_scheduler
 from config.scheduler_config import SchedulerConfig
 from services.resource_scheduler import resource_scheduler
 from config.resources_scheduler_config import ResourcesSchedulerConfig
+from services.outbox import outbox_service
+from services.collection_timers import collection_timers
+from services.zone_summary import zone_summary_view
+from services.demand_ledger import demand_ledger
+from services.allocation import allocation_candidates
+from services.top_index import top_index
+from services.time_index import time_index
+from config.collection_timers_config import CollectionTimersConfig
+from config.outbox_config import OutboxConfig
+from config.archive_config import ArchiveConfig
+from config.snapshot_config import SnapshotConfig
 
 ###### START THE SERVER ######
 # To run the server, use the command: uvicorn main:app --reload
@@ -22,7 +44,11 @@ scheduler = BackgroundScheduler()
 @app.on_event("startup")
 def start_scheduler():
     print("Starting scheduler...")
-    scheduler.add_job(resources_completion_task, "interval", minutes=2)
+    scheduler.add_job(metrics.timed_job("resources_completion")(resources_completion_task), "interval", minutes=2)
+    if ArchiveConfig.AUTO_START:
+        scheduler.add_job(metrics.timed_job("archive")(archive_task), "interval", minutes=ArchiveConfig.INTERVAL_MINUTES)
+    if SnapshotConfig.AUTO_START:
+        scheduler.add_job(metrics.timed_job("snapshot")(snapshot_task), "interval", minutes=SnapshotConfig.INTERVAL_MINUTES)
     scheduler.start()
     print("Scheduler started")
 
@@ -30,6 +56,7 @@ def start_scheduler():
 def stop_scheduler():
     print("Stopping scheduler...")
     scheduler.shutdown()
+    resources_completion_poller.stop()
     print("Scheduler stopped")
 
 # Manejador global para convertir 422 a 400
@@ -42,6 +69,26 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    """Registra la latencia y la E/S de repositorios de cada petición, por ruta"""
+    io = {"rows": 0, "bytes": 0}
+    token = request_io.set(io)
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        request_io.reset(token)
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        metrics.http_request_duration.observe(time.perf_counter() - started, request.method, path, str(status_code))
+        metrics.http_request_rows_read.observe(io["rows"], path)
+        metrics.http_request_bytes_read.observe(io["bytes"], path)
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -53,6 +100,12 @@ app.add_middleware(
 app.include_router(zones_controller.router)
 app.include_router(resources_controller.router)
 app.include_router(threats_controller.router)
+app.include_router(metrics_controller.router)
+app.include_router(admin_controller.router)
+app.include_router(events_controller.router)
+app.include_router(world_controller.router)
+app.include_router(sync_controller.router)
+app.include_router(colony_controller.router)
 
 
 @app.on_event("startup")
@@ -62,6 +115,16 @@ async def startup_event():
         threat_scheduler.start()
     if ResourcesSchedulerConfig.AUTO_START:
         resource_scheduler.start()
+    # Construir las vistas en memoria antes de recibir peticiones
+    zone_summary_view.ensure_started()
+    demand_ledger.ensure_started()
+    allocation_candidates.ensure_started()
+    top_index.ensure_started()
+    time_index.ensure_started()
+    if CollectionTimersConfig.AUTO_START:
+        collection_timers.start(resources_controller.resource_repo.change_log)
+    if OutboxConfig.AUTO_START and outbox_service.subscribers:
+        outbox_service.start(resources_controller.resource_repo.change_log)
 
 
 @app.on_event("shutdown")
@@ -69,6 +132,8 @@ async def shutdown_event():
     """Evento de cierre: detiene el scheduler de amenazas automáticas"""
     threat_scheduler.stop()
     resource_scheduler.stop()
+    collection_timers.stop()
+    outbox_service.stop()
 
 
 @app.get("/")
@@ -33,6 +33,7 @@ class Resource:
     estado: EstadoRecurso = EstadoRecurso.DISPONIBLE
     hora_creacion: Optional[datetime] = None
     hora_recoleccion: Optional[datetime] = None
+    hora_inicio_recoleccion: Optional[datetime] = None
 
     def __post_init__(self):
         if self.hora_creacion is None:
@@ -0,0 +1,69 @@
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+import csv
+import gzip
+import os
+import re
+
+from repositories.csv_io import file_lock, record_write
+
+
+class ArchiveRepository:
+    """
+    Archivo de filas en estado terminal, particionado por mes en archivos
+    `<nombre>-AAAA-MM.csv.gz`. Cada archivado agrega un miembro gzip al final de
+    la partición (sin reescribirla) y la lectura recorre las particiones de forma
+    perezosa, solo cuando se pide.
+    """
+
+    def __init__(self, archive_dir: str, name: str, fieldnames: List[str]):
+        self.archive_dir = archive_dir
+        self.name = name
+        self.fieldnames = fieldnames
+        self._pattern = re.compile(rf"^{re.escape(name)}-(\d{{4}}-\d{{2}})\.csv\.gz$")
+
+    def partition_path(self, month: str) -> str:
+        return os.path.join(self.archive_dir, f"{self.name}-{month}.csv.gz")
+
+    def partitions(self) -> List[str]:
+        """Meses archivados (AAAA-MM), en orden"""
+        if not os.path.isdir(self.archive_dir):
+            return []
+        months = []
+        for filename in os.listdir(self.archive_dir):
+            match = self._pattern.match(filename)
+            if match:
+                months.append(match.group(1))
+        return sorted(months)
+
+    def append(self, rows: List[dict], archived_at: Callable[[dict], datetime]) -> Dict[str, int]:
+        """Agrega las filas a la partición del mes de `archived_at(fila)`. Retorna filas por mes"""
+        by_month: Dict[str, List[dict]] = {}
+        for row in rows:
+            by_month.setdefault(archived_at(row).strftime("%Y-%m"), []).append(row)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        for month, month_rows in by_month.items():
+            path = self.partition_path(month)
+            with file_lock(path):
+                is_new = not os.path.exists(path)
+                with gzip.open(path, 'at', newline='', encoding='utf-8') as f:
+                    writer = csv.DictWriter(f, fieldnames=self.fieldnames)
+                    if is_new:
+                        writer.writeheader()
+                    writer.writerows(month_rows)
+                record_write(path, 'append')
+        return {month: len(month_rows) for month, month_rows in by_month.items()}
+
+    def read_rows(self, months: Optional[List[str]] = None) -> Iterator[dict]:
+        """Itera las filas archivadas, partición por partición"""
+        for month in (months if months is not None else self.partitions()):
+            path = self.partition_path(month)
+            with file_lock(path):
+                if not os.path.exists(path):
+                    continue
+                with gzip.open(path, 'rt', newline='', encoding='utf-8') as f:
+                    yield from csv.DictReader(f)
+
+    def max_id(self) -> int:
+        """Mayor ID archivado (recorre todas las particiones)"""
+        return max((int(row['id']) for row in self.read_rows()), default=0)
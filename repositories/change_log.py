@@ -0,0 +1,233 @@
+"""
+Registro de cambios de los repositorios.
+Cada creación, actualización o eliminación publica un evento con un número de
+secuencia creciente, que alimenta el feed de eventos y las vistas en memoria.
+Hay un registro por directorio de datos, compartido por todas las instancias
+de repositorio que escriben en él.
+
+Los repositorios publican dentro del lock de su archivo (la secuencia queda en
+el orden de las escrituras), pero los suscriptores se notifican después de que
+el hilo suelta sus locks de archivo: un suscriptor lento no detiene las
+escrituras de otras particiones. La publicación retorna cuando su evento ya
+fue entregado, en orden de secuencia.
+
+Los journals (p. ej. el outbox) se llaman en cambio dentro de la publicación,
+es decir, dentro de la sección crítica de la escritura. Cuando se publica, la
+fila ya está en el CSV: un error de un journal se registra (log y métrica) y
+no se propaga, para que el resto de los eventos de la misma escritura (p. ej.
+un update_many) se publiquen igual. Cada journal reintenta por su cuenta lo
+que no pudo registrar.
+"""
+from collections import deque
+from dataclasses import dataclass, field, fields, is_dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Callable, Dict, List, Optional
+import copy
+import logging
+import os
+import threading
+import uuid
+
+from config.change_feed_config import ChangeFeedConfig
+from repositories.csv_io import call_after_unlock
+from services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+ENTITY_RESOURCE = "resource"
+ENTITY_THREAT = "threat"
+ENTITY_ZONE = "zone"
+# Demanda de hormigas por zona (publicada por el ledger de demanda, no por un repositorio)
+ENTITY_DEMAND = "demand"
+ENTITIES = (ENTITY_RESOURCE, ENTITY_THREAT, ENTITY_ZONE, ENTITY_DEMAND)
+
+ACTION_CREATED = "created"
+ACTION_UPDATED = "updated"
+ACTION_DELETED = "deleted"
+# La fila salió del CSV principal hacia el archivo (sigue disponible con include_archived)
+ACTION_ARCHIVED = "archived"
+
+
+@dataclass
+class ChangeEvent:
+    seq: int
+    entity: str
+    action: str
+    entity_id: int
+    zona_id: Optional[int]
+    # Copia de la entidad tras el cambio (None si fue eliminada)
+    data: Optional[object] = None
+    # Copia de la entidad antes del cambio (None si fue creada)
+    previous: Optional[object] = None
+    timestamp: datetime = field(default_factory=datetime.now)
+
+
+def serialize_entity(entity) -> Optional[dict]:
+    """Convierte un modelo (dataclass) en un diccionario serializable a JSON"""
+    if entity is None:
+        return None
+    if not is_dataclass(entity):
+        return dict(entity)
+    result = {}
+    for f in fields(entity):
+        value = getattr(entity, f.name)
+        if isinstance(value, Enum):
+            value = value.value
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        result[f.name] = value
+    return result
+
+
+def event_to_dict(event: ChangeEvent) -> dict:
+    """Representación pública de un evento (sin el estado anterior)"""
+    return {
+        "seq": event.seq,
+        "entity": event.entity,
+        "action": event.action,
+        "id": event.entity_id,
+        "zona_id": event.zona_id,
+        "timestamp": event.timestamp.isoformat(),
+        "data": serialize_entity(event.data),
+    }
+
+
+class ChangeLog:
+    """Registro acotado de eventos con suscriptores en proceso"""
+
+    def __init__(self, max_events: int = ChangeFeedConfig.MAX_EVENTS):
+        self._events: deque = deque(maxlen=max_events)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[ChangeEvent], None]] = []
+        # Registros durables que deben quedar escritos antes de que retorne la escritura
+        self._journals: List[Callable[[ChangeEvent], None]] = []
+        # Eventos publicados y aún no entregados; un solo hilo a la vez los entrega en orden
+        self._queue: deque = deque()
+        self._delivered = 0
+        self._dispatcher: Optional[int] = None
+        self._delivery = threading.Condition(self._lock)
+        # Identifica esta instancia del registro: las secuencias se reinician con el proceso
+        self.epoch = uuid.uuid4().hex[:12]
+
+    @property
+    def version(self) -> int:
+        """Número de secuencia del último evento publicado"""
+        return self._seq
+
+    def publish(self, entity: str, action: str, entity_id: int, zona_id: Optional[int],
+                data=None, previous=None) -> ChangeEvent:
+        """Registra un cambio, lo escribe en los journals y notifica a los suscriptores (al soltar los locks de archivo).
+        No lanza excepciones de los journals: el cambio ya fue escrito"""
+        with self._lock:
+            self._seq += 1
+            event = ChangeEvent(
+                seq=self._seq,
+                entity=entity,
+                action=action,
+                entity_id=entity_id,
+                zona_id=zona_id,
+                data=copy.copy(data),
+                previous=copy.copy(previous)
+            )
+            self._events.append(event)
+            self._queue.append(event)
+            journals = list(self._journals)
+        for journal in journals:
+            try:
+                journal(event)
+            except Exception as e:
+                # El cambio ya está en el repositorio: propagar cortaría la publicación del resto del lote
+                logger.error(f"❌ Error registrando el cambio {event.seq} en un journal: {e}")
+                metrics.change_log_journal_errors.inc()
+        if not call_after_unlock(lambda: self._deliver(event.seq)):
+            self._deliver(event.seq)
+        return event
+
+    def _deliver(self, seq: int):
+        """
+        Entrega los eventos pendientes hasta incluir `seq`. Si otro hilo ya está
+        entregando, espera a que llegue a `seq`; si el que entrega es este mismo
+        hilo (un suscriptor publicó durante una notificación), el evento se
+        entrega al terminar la notificación en curso.
+        """
+        me = threading.get_ident()
+        with self._delivery:
+            while self._delivered < seq and self._dispatcher not in (None, me):
+                self._delivery.wait()
+            if self._delivered >= seq or self._dispatcher == me:
+                return
+            self._dispatcher = me
+        try:
+            while True:
+                with self._delivery:
+                    if not self._queue:
+                        return
+                    event = self._queue.popleft()
+                self._notify(event)
+                with self._delivery:
+                    self._delivered = event.seq
+                    self._delivery.notify_all()
+        finally:
+            with self._delivery:
+                self._dispatcher = None
+                self._delivery.notify_all()
+
+    def _notify(self, event: ChangeEvent):
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"❌ Error notificando cambio {event.seq} a un suscriptor: {e}")
+
+    def since(self, seq: int) -> Optional[List[ChangeEvent]]:
+        """
+        Eventos con secuencia mayor a `seq`. Retorna None si el registro ya no
+        retiene todos los eventos posteriores a `seq` (el cliente quedó atrás).
+        """
+        with self._lock:
+            if seq > self._seq:
+                return None
+            if seq == self._seq:
+                return []
+            oldest = self._events[0].seq if self._events else self._seq + 1
+            if seq < oldest - 1:
+                return None
+            return [e for e in self._events if e.seq > seq]
+
+    def subscribe(self, listener: Callable[[ChangeEvent], None]):
+        with self._lock:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[ChangeEvent], None]):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def add_journal(self, journal: Callable[[ChangeEvent], None]):
+        """Registra `journal` para que se llame dentro de cada publicación (sus errores se propagan)"""
+        with self._lock:
+            self._journals.append(journal)
+
+    def remove_journal(self, journal: Callable[[ChangeEvent], None]):
+        with self._lock:
+            if journal in self._journals:
+                self._journals.remove(journal)
+
+
+_change_logs: Dict[str, ChangeLog] = {}
+_change_logs_guard = threading.Lock()
+
+
+def get_change_log(csv_file: str) -> ChangeLog:
+    """Retorna el registro de cambios del directorio de datos del archivo"""
+    key = os.path.dirname(os.path.abspath(csv_file))
+    with _change_logs_guard:
+        log = _change_logs.get(key)
+        if log is None:
+            log = ChangeLog()
+            _change_logs[key] = log
+        return log
@@ -0,0 +1,149 @@
+"""
+Utilidades de E/S compartidas por los repositorios CSV.
+Serializan el acceso a cada archivo con un lock por ruta (las escrituras
+reescriben el archivo completo) y registran las métricas de lectura/escritura.
+"""
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+import csv
+import gc
+import mmap
+import os
+import threading
+import time
+
+from services.metrics import metrics, record_read
+
+_file_locks: Dict[str, threading.RLock] = {}
+_file_locks_guard = threading.Lock()
+# Cuántos locks de archivo tiene el hilo actual y qué ejecutar al soltar el último
+_held = threading.local()
+
+
+def get_file_lock(csv_file: str) -> threading.RLock:
+    """Retorna el lock (reentrante) asociado a un archivo, compartido por todas las instancias"""
+    key = os.path.abspath(csv_file)
+    with _file_locks_guard:
+        lock = _file_locks.get(key)
+        if lock is None:
+            lock = threading.RLock()
+            _file_locks[key] = lock
+        return lock
+
+
+@contextmanager
+def file_lock(csv_file: str):
+    """Adquiere el lock del archivo registrando el tiempo de espera"""
+    lock = get_file_lock(csv_file)
+    started = time.perf_counter()
+    lock.acquire()
+    metrics.repository_lock_wait.observe(time.perf_counter() - started, csv_file)
+    depth = getattr(_held, "depth", 0)
+    if depth == 0:
+        _held.after = []
+    _held.depth = depth + 1
+    try:
+        yield
+    finally:
+        lock.release()
+        _held.depth = depth
+        if depth == 0 and _held.after:
+            callbacks, _held.after = _held.after, []
+            for callback in callbacks:
+                callback()
+
+
+def call_after_unlock(callback: Callable[[], None]) -> bool:
+    """
+    Programa `callback` para cuando el hilo actual suelte todos sus locks de
+    archivo. Retorna False (sin programarlo) si el hilo no tiene ninguno.
+    """
+    if not getattr(_held, "depth", 0):
+        return False
+    _held.after.append(callback)
+    return True
+
+
+def read_rows(csv_file: str) -> Iterator[dict]:
+    """Itera las filas del CSV como diccionarios, bajo el lock del archivo"""
+    with file_lock(csv_file):
+        if not os.path.exists(csv_file):
+            return
+        rows = 0
+        with open(csv_file, 'r', encoding='utf-8') as f:
+            try:
+                for row in csv.DictReader(f):
+                    rows += 1
+                    yield row
+            finally:
+                # Bytes consumidos del archivo (con granularidad de bloque del buffer)
+                record_read(csv_file, rows, f.buffer.tell())
+
+
+def read_models(csv_file: str, decoder, where: Optional[dict] = None) -> Iterator:
+    """Itera las filas del CSV ya convertidas por `decoder` (un RowDecoder), bajo el lock del archivo"""
+    with file_lock(csv_file):
+        if not os.path.exists(csv_file):
+            return
+        stats = {"rows": 0}
+        with open(csv_file, 'r', encoding='utf-8') as f:
+            try:
+                yield from decoder.decode(f, where, stats)
+            finally:
+                # Cuenta las filas recorridas, también las descartadas por `where`
+                record_read(csv_file, stats["rows"], f.buffer.tell())
+
+
+@contextmanager
+def gc_paused():
+    """
+    Suspende el recolector de ciclos mientras se crean muchos objetos que no
+    forman ciclos; si ya estaba suspendido (lectura anidada) no lo reactiva.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def read_views(csv_file: str, decoder, where: Optional[dict] = None) -> Iterator:
+    """
+    Itera vistas sobre las celdas de cada fila (`RowDecoder.views`), bajo el
+    lock del archivo. Las vistas son objetos rastreados por el recolector de
+    ciclos: en un recorrido de un millón de filas las pasadas del recolector
+    sobre vistas recién creadas costaban tanto como decodificarlas, así que se
+    suspende durante la lectura.
+    """
+    with file_lock(csv_file), gc_paused():
+        if not os.path.exists(csv_file):
+            return
+        stats = {"rows": 0}
+        with open(csv_file, 'r', encoding='utf-8') as f:
+            try:
+                yield from decoder.views(f, where, stats)
+            finally:
+                record_read(csv_file, stats["rows"], f.buffer.tell())
+
+
+def scan_columns(csv_file: str, decoder, columns, where: Optional[dict] = None, raw: bool = False) -> Iterator[tuple]:
+    """
+    Itera tuplas con solo `columns` de cada fila, recorriendo el CSV mapeado en
+    memoria (sin decodificar cada línea a str ni armar un dict), bajo el lock del archivo
+    """
+    with file_lock(csv_file):
+        if not os.path.exists(csv_file) or os.path.getsize(csv_file) == 0:
+            return
+        stats = {"rows": 0}
+        with open(csv_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            try:
+                yield from decoder.project(data, columns, where, raw, stats)
+            finally:
+                record_read(csv_file, stats["rows"], data.tell())
+
+
+def record_write(csv_file: str, mode: str):
+    """Registra una escritura ('rewrite' o 'append') sobre el archivo"""
+    metrics.repository_writes.inc(csv_file, mode)
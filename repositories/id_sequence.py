@@ -0,0 +1,49 @@
+"""
+Secuencia persistida de IDs de un repositorio CSV.
+
+El próximo ID no se puede deducir solo del CSV: si la fila con el mayor ID se
+archiva o se elimina, create() volvería a entregarlo y el mismo ID quedaría a
+la vez en el archivo histórico y en el CSV. La secuencia guarda el último ID
+asignado en `<csv>.seq`; se lee y se avanza bajo el lock del CSV.
+"""
+from typing import Callable
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def sequence_path(csv_file: str) -> str:
+    return csv_file + ".seq"
+
+
+class IdSequence:
+    """Último ID asignado, que nunca retrocede"""
+
+    def __init__(self, path: str, initial: Callable[[], int]):
+        self.path = path
+        # Mayor ID conocido cuando aún no hay secuencia (p. ej. el máximo del archivo histórico)
+        self._initial = initial
+
+    def last(self) -> int:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return int(f.read())
+        except FileNotFoundError:
+            return self._initial()
+        except ValueError:
+            logger.warning(f"⚠️ Secuencia de IDs ilegible en {self.path}, se reconstruye desde el archivo histórico")
+            return self._initial()
+
+    def next_id(self, floor: int = 0) -> int:
+        """Primer ID libre: mayor que todo ID asignado antes y que `floor` (el mayor ID del CSV)"""
+        return max(self.last(), floor) + 1
+
+    def advance(self, last_id: int):
+        """Registra `last_id` como último ID asignado si es mayor que el actual (escritura atómica)"""
+        if last_id <= self.last():
+            return
+        temporary = self.path + ".tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            f.write(str(last_id))
+        os.replace(temporary, self.path)
@@ -0,0 +1,146 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+import csv
+import json
+import os
+
+from config.storage_config import StorageConfig
+from repositories.csv_io import file_lock, read_rows, record_write
+from repositories.change_log import ChangeEvent, serialize_entity
+
+
+class OutboxRepository:
+    """
+    Outbox persistente en CSV: cada cambio se agrega con una secuencia propia
+    (sobrevive a reinicios) y cada suscriptor guarda el último `seq` entregado.
+    Los lotes que un suscriptor rechaza de forma permanente se copian a un
+    archivo de descarte (dead letter) para que no bloqueen los siguientes.
+    """
+    FIELDNAMES = ['seq', 'entity', 'action', 'entity_id', 'zona_id', 'timestamp', 'payload']
+    CURSOR_FIELDNAMES = ['subscriber', 'seq']
+    DEAD_LETTER_FIELDNAMES = ['subscriber', 'status', 'rejected_at'] + FIELDNAMES
+
+    def __init__(self, csv_file: str = os.path.join(StorageConfig.DATA_DIR, "outbox.csv"),
+                 cursors_file: str = os.path.join(StorageConfig.DATA_DIR, "outbox_cursors.csv"),
+                 dead_letter_file: Optional[str] = None):
+        self.csv_file = csv_file
+        self.cursors_file = cursors_file
+        # Por defecto junto al outbox (data/outbox.csv -> data/outbox_dead_letter.csv)
+        self.dead_letter_file = dead_letter_file or os.path.splitext(csv_file)[0] + "_dead_letter.csv"
+        self._ensure_file_exists()
+        # La secuencia continúa desde la mayor conocida (registros o cursores, por si se compactó todo)
+        last_rows = max((int(row['seq']) for row in read_rows(self.csv_file)), default=0)
+        self.last_seq = max([last_rows] + list(self.get_cursors().values()))
+
+    def _ensure_file_exists(self):
+        """Crea los archivos CSV si no existen"""
+        for path, fieldnames in ((self.csv_file, self.FIELDNAMES), (self.cursors_file, self.CURSOR_FIELDNAMES)):
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                with open(path, 'w', newline='', encoding='utf-8') as f:
+                    csv.writer(f).writerow(fieldnames)
+
+    def append(self, events: Iterable[ChangeEvent]) -> int:
+        """Agrega los cambios al final del outbox. Retorna la última secuencia asignada"""
+        with file_lock(self.csv_file):
+            with open(self.csv_file, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=self.FIELDNAMES)
+                for event in events:
+                    self.last_seq += 1
+                    writer.writerow({
+                        'seq': self.last_seq,
+                        'entity': event.entity,
+                        'action': event.action,
+                        'entity_id': event.entity_id,
+                        'zona_id': event.zona_id if event.zona_id is not None else '',
+                        'timestamp': event.timestamp.isoformat(),
+                        'payload': json.dumps(serialize_entity(event.data), ensure_ascii=False),
+                    })
+            record_write(self.csv_file, 'append')
+            return self.last_seq
+
+    def read_after(self, seq: int, limit: int) -> List[dict]:
+        """Retorna hasta `limit` registros con secuencia mayor a `seq`, en orden"""
+        records = []
+        for row in read_rows(self.csv_file):
+            if int(row['seq']) <= seq:
+                continue
+            records.append({
+                'seq': int(row['seq']),
+                'entity': row['entity'],
+                'action': row['action'],
+                'id': int(row['entity_id']),
+                'zona_id': int(row['zona_id']) if row['zona_id'] else None,
+                'timestamp': row['timestamp'],
+                'data': json.loads(row['payload']),
+            })
+            if len(records) >= limit:
+                break
+        return records
+
+    def dead_letter(self, subscriber: str, records: List[dict], status: int):
+        """Copia al archivo de descarte un lote que `subscriber` rechazó con `status`"""
+        rejected_at = datetime.now().isoformat()
+        with file_lock(self.dead_letter_file):
+            exists = os.path.exists(self.dead_letter_file)
+            with open(self.dead_letter_file, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=self.DEAD_LETTER_FIELDNAMES)
+                if not exists:
+                    writer.writeheader()
+                for record in records:
+                    writer.writerow({
+                        'subscriber': subscriber,
+                        'status': status,
+                        'rejected_at': rejected_at,
+                        'seq': record['seq'],
+                        'entity': record['entity'],
+                        'action': record['action'],
+                        'entity_id': record['id'],
+                        'zona_id': record['zona_id'] if record['zona_id'] is not None else '',
+                        'timestamp': record['timestamp'],
+                        'payload': json.dumps(record['data'], ensure_ascii=False),
+                    })
+            record_write(self.dead_letter_file, 'append')
+
+    def read_dead_letters(self) -> List[dict]:
+        """Registros descartados, en el orden en que se rechazaron"""
+        return list(read_rows(self.dead_letter_file))
+
+    def get_cursors(self) -> Dict[str, int]:
+        """Último `seq` entregado por suscriptor"""
+        return {row['subscriber']: int(row['seq']) for row in read_rows(self.cursors_file)}
+
+    def get_cursor(self, subscriber: str) -> int:
+        return self.get_cursors().get(subscriber, 0)
+
+    def set_cursor(self, subscriber: str, seq: int):
+        """Persiste el avance de un suscriptor"""
+        with file_lock(self.cursors_file):
+            cursors = self.get_cursors()
+            cursors[subscriber] = seq
+            with open(self.cursors_file, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=self.CURSOR_FIELDNAMES)
+                writer.writeheader()
+                for name, value in cursors.items():
+                    writer.writerow({'subscriber': name, 'seq': value})
+            record_write(self.cursors_file, 'rewrite')
+
+    def compact(self, subscribers: List[str]) -> int:
+        """Elimina los registros ya entregados a todos los suscriptores. Retorna cuántos se eliminaron"""
+        if not subscribers:
+            return 0
+        cursors = self.get_cursors()
+        delivered = min(cursors.get(url, 0) for url in subscribers)
+        if delivered <= 0:
+            return 0
+        with file_lock(self.csv_file):
+            rows = list(read_rows(self.csv_file))
+            pending = [row for row in rows if int(row['seq']) > delivered]
+            removed = len(rows) - len(pending)
+            if removed:
+                with open(self.csv_file, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.DictWriter(f, fieldnames=self.FIELDNAMES)
+                    writer.writeheader()
+                    writer.writerows(pending)
+                record_write(self.csv_file, 'rewrite')
+        return removed
@@ -0,0 +1,422 @@
+"""
+Repositorios de recursos y amenazas particionados por zona.
+
+Cada zona tiene su propio CSV (`data/resources/zona-<id>.csv`), con su propio
+lock: las lecturas y escrituras de una zona solo tocan su partición, y las
+escrituras en zonas distintas avanzan en paralelo. Un mapa global id -> zona,
+compartido por todas las instancias sobre el mismo directorio, enruta
+`get_by_id`, `update` y `delete` a la partición correcta sin recorrer las demás.
+
+Al activarse por primera vez reparte el CSV único por zona y lo renombra a
+`<csv>.migrated`: volver al backend `csv` no sirve en silencio datos viejos
+(para volver, renombrar de nuevo el archivo tras unir las particiones).
+"""
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Dict, List, Optional
+import copy
+import csv
+import logging
+import os
+import re
+import threading
+
+from config.archive_config import ArchiveConfig
+from config.storage_config import StorageConfig
+from models.resource import Resource
+from models.threat import Threat
+from repositories.archive_repository import ArchiveRepository
+from repositories.change_log import (
+    ChangeLog, get_change_log, ENTITY_RESOURCE, ENTITY_THREAT,
+    ACTION_CREATED, ACTION_UPDATED, ACTION_DELETED, ACTION_ARCHIVED
+)
+from repositories.csv_io import file_lock, record_write
+from repositories.id_sequence import IdSequence, sequence_path
+from repositories import resource_repository, threat_repository
+from repositories.resource_repository import ResourceRepository
+from repositories.threat_repository import ThreatRepository
+
+logger = logging.getLogger(__name__)
+
+MIGRATED_SUFFIX = ".migrated"
+PARTITION_PATTERN = re.compile(r"^zona-(\d+)\.csv$")
+
+
+class _PartitionState:
+    """Particiones y mapa id -> zona de un directorio, compartidos entre instancias"""
+
+    def __init__(self):
+        # Protege el mapa y el próximo ID; nunca se toma otro lock mientras se tiene
+        self.guard = threading.Lock()
+        # Alta de particiones; se toma antes que cualquier lock de partición
+        self.structure = threading.RLock()
+        self.partitions: Dict[int, object] = {}
+        self.zone_of: Dict[int, int] = {}
+        self.next_id = 1
+        # Último ID asignado, persistido (compartido con el backend CSV único)
+        self.ids: Optional[IdSequence] = None
+        self.loaded = False
+
+
+_states: Dict[str, _PartitionState] = {}
+_states_guard = threading.Lock()
+
+
+def _get_state(directory: str) -> _PartitionState:
+    key = os.path.abspath(directory)
+    with _states_guard:
+        state = _states.get(key)
+        if state is None:
+            state = _PartitionState()
+            _states[key] = state
+        return state
+
+
+class _ZonePartitions:
+    """
+    Enrutamiento por zona común a recursos y amenazas. Las subclases heredan
+    además del repositorio CSV, del que reutilizan la conversión de filas y el
+    archivado, y definen la entidad, las columnas y si se respetan IDs previos.
+    """
+    _partition_class = None
+    _entity = None
+    _fieldnames: List[str] = []
+    _respect_ids = False
+
+    def _init_partitions(self, csv_file: str, change_log: Optional[ChangeLog]):
+        self.csv_file = csv_file
+        self.directory = os.path.splitext(csv_file)[0]
+        self.change_log = change_log if change_log is not None else get_change_log(csv_file)
+        self._deleted_ids = set()
+        self._state = _get_state(self.directory)
+        with self._state.structure:
+            if not self._state.loaded:
+                self._state.ids = IdSequence(sequence_path(csv_file), self.archive_repo.max_id)
+                self._load()
+                self._state.loaded = True
+
+    def _open(self, zona_id: int):
+        """Registra la partición de una zona (requiere el lock de estructura)"""
+        partition = self._partition_class(
+            os.path.join(self.directory, f"zona-{zona_id}.csv"), change_log=self.change_log
+        )
+        self._state.partitions[zona_id] = partition
+        return partition
+
+    def _load(self):
+        """Abre las particiones existentes; si no hay ninguna, reparte el CSV único por zona"""
+        if not os.path.isdir(self.directory) and os.path.exists(self.csv_file):
+            by_zone: Dict[int, list] = {}
+            for entity in self._partition_class(self.csv_file, change_log=self.change_log).get_all():
+                by_zone.setdefault(entity.zona_id, []).append(entity)
+            os.makedirs(self.directory, exist_ok=True)
+            for zona_id, entities in by_zone.items():
+                self._open(zona_id)._save_all(entities)
+            # Desde aquí las particiones son la única copia vigente
+            os.replace(self.csv_file, self.csv_file + MIGRATED_SUFFIX)
+            logger.warning(f"⚠️ {self.csv_file} repartido en {self.directory}; el original quedó como "
+                           f"{self.csv_file + MIGRATED_SUFFIX}")
+        os.makedirs(self.directory, exist_ok=True)
+        for filename in os.listdir(self.directory):
+            match = PARTITION_PATTERN.match(filename)
+            if match and int(match.group(1)) not in self._state.partitions:
+                self._open(int(match.group(1)))
+        for zona_id, partition in self._state.partitions.items():
+            for entity in partition.load_all():
+                self._state.zone_of[entity.id] = zona_id
+        self._state.next_id = self._state.ids.next_id(max(self._state.zone_of, default=0))
+
+    def _partition(self, zona_id: int, create: bool = False):
+        partition = self._state.partitions.get(zona_id)
+        if partition is None and create:
+            with self._state.structure:
+                partition = self._state.partitions.get(zona_id) or self._open(zona_id)
+        return partition
+
+    def partitions(self) -> List[int]:
+        """IDs de las zonas con partición"""
+        return sorted(self._state.partitions)
+
+    @contextmanager
+    def lock_all(self):
+        """Bloquea el alta de particiones y las escrituras en todas ellas"""
+        with self._state.structure:
+            with ExitStack() as stack:
+                for zona_id in sorted(self._state.partitions):
+                    stack.enter_context(file_lock(self._state.partitions[zona_id].csv_file))
+                yield
+
+    # --- Lectura ---
+
+    def get_all(self, zona_id: Optional[int] = None, estado: Optional[str] = None) -> list:
+        """Con `zona_id` solo se lee su partición; sin él se unen todas en orden de ID"""
+        if zona_id is not None:
+            partition = self._partition(zona_id)
+            return partition.get_all(estado=estado) if partition is not None else []
+        entities = []
+        for zona_id in self.partitions():
+            entities.extend(self._state.partitions[zona_id].get_all(estado=estado))
+        entities.sort(key=lambda e: e.id)
+        return entities
+
+    def scan(self, zona_id: Optional[int] = None, estado: Optional[str] = None) -> list:
+        """Vistas de solo lectura (ver `ResourceRepository.scan`); sin `zona_id` se unen en orden de ID"""
+        if zona_id is not None:
+            partition = self._partition(zona_id)
+            return partition.scan(estado=estado) if partition is not None else []
+        views = []
+        for zona_id in self.partitions():
+            views.extend(self._state.partitions[zona_id].scan(estado=estado))
+        views.sort(key=lambda view: view.id)
+        return views
+
+    def project(self, columns: List[str], zona_id: Optional[int] = None, estado: Optional[str] = None,
+                raw: bool = False) -> List[dict]:
+        """Proyección de columnas por partición; sin `zona_id` se unen en orden de ID"""
+        if zona_id is not None:
+            partition = self._partition(zona_id)
+            return partition.project(columns, estado=estado, raw=raw) if partition is not None else []
+        # El ID se lee siempre para poder ordenar la unión
+        keyed = list(columns) if 'id' in columns else ['id'] + list(columns)
+        rows = []
+        for zona_id in self.partitions():
+            rows.extend(self._state.partitions[zona_id].project(keyed, estado=estado, raw=raw))
+        rows.sort(key=lambda row: row['id'])
+        if 'id' not in columns:
+            for row in rows:
+                del row['id']
+        return rows
+
+    def load_all(self) -> list:
+        """Todas las filas, cada partición desde su snapshot binario más su cola"""
+        entities = []
+        for zona_id in self.partitions():
+            entities.extend(self._state.partitions[zona_id].load_all())
+        entities.sort(key=lambda e: e.id)
+        return entities
+
+    def write_snapshot(self) -> int:
+        """Escribe el snapshot de cada partición. Retorna cuántas filas guardó en total"""
+        return sum(self._state.partitions[zona_id].write_snapshot() for zona_id in self.partitions())
+
+    def get_by_id(self, entity_id: int):
+        zona_id = self._state.zone_of.get(entity_id)
+        if zona_id is None:
+            return None
+        return self._partition(zona_id).get_by_id(entity_id)
+
+    # --- Escritura ---
+
+    def _append(self, partition, entities: list):
+        with open(partition.csv_file, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=self._fieldnames)
+            for entity in entities:
+                writer.writerow(partition._model_to_dict(entity))
+        record_write(partition.csv_file, 'append')
+        partition.snapshot.record(partition.csv_file, entities, [e.id for e in entities], partition._model_to_dict)
+
+    def create_many(self, entities: list) -> list:
+        """Crea las entidades agregándolas a la partición de su zona (una escritura por zona)"""
+        if not entities:
+            return []
+        by_zone: Dict[int, list] = {}
+        for entity in entities:
+            by_zone.setdefault(entity.zona_id, []).append(entity)
+        partitions = {zona_id: self._partition(zona_id, create=True) for zona_id in by_zone}
+        with self._state.guard:
+            for entity in entities:
+                if not (self._respect_ids and entity.id):
+                    entity.id = self._state.next_id
+                self._state.next_id = max(self._state.next_id, entity.id + 1)
+            self._state.ids.advance(self._state.next_id - 1)
+        for zona_id, zone_entities in by_zone.items():
+            partition = partitions[zona_id]
+            with file_lock(partition.csv_file):
+                self._append(partition, zone_entities)
+                with self._state.guard:
+                    for entity in zone_entities:
+                        self._state.zone_of[entity.id] = zona_id
+                for entity in zone_entities:
+                    self.change_log.publish(self._entity, ACTION_CREATED, entity.id, zona_id, data=entity)
+        return entities
+
+    def create(self, entity):
+        self.create_many([entity])
+        return entity
+
+    def _rewrite_partition(self, zona_id: int, change: Callable[[object], Optional[object]]) -> list:
+        """
+        Reescribe la partición aplicando `change` a cada fila (None = sin cambios).
+        Retorna los pares (anterior, nuevo) modificados. Requiere el lock de la partición.
+        """
+        partition = self._state.partitions[zona_id]
+        entities = partition.get_all()
+        changed = []
+        for idx, entity in enumerate(entities):
+            updated = change(entity)
+            if updated is not None:
+                entities[idx] = updated
+                changed.append((entity, updated))
+        if changed:
+            partition._save_all(entities, [updated.id for _, updated in changed])
+        return changed
+
+    def _move(self, entity_id: int, updated):
+        """Mueve una entidad a la partición de su nueva zona"""
+        target = self._partition(updated.zona_id, create=True)
+        source_zone = self._state.zone_of.get(entity_id)
+        if source_zone is None:
+            return None
+        source = self._state.partitions[source_zone]
+        with ExitStack() as stack:
+            # Mismo orden que lock_all para no bloquearse mutuamente
+            for zona_id in sorted({source_zone, updated.zona_id}):
+                stack.enter_context(file_lock(self._state.partitions[zona_id].csv_file))
+            entities = source.get_all()
+            previous = next((e for e in entities if e.id == entity_id), None)
+            if previous is None:
+                return None
+            source._save_all([e for e in entities if e.id != entity_id], [entity_id])
+            self._append(target, [updated])
+            with self._state.guard:
+                self._state.zone_of[entity_id] = updated.zona_id
+            self.change_log.publish(
+                self._entity, ACTION_UPDATED, entity_id, updated.zona_id, data=updated, previous=previous
+            )
+        return updated
+
+    def update_many(self, updated_entities: list) -> list:
+        """Actualiza varias entidades con una reescritura por partición afectada"""
+        by_zone: Dict[int, Dict[int, object]] = {}
+        moved = []
+        for entity in updated_entities:
+            zona_id = self._state.zone_of.get(entity.id)
+            if zona_id is None:
+                continue
+            if entity.zona_id != zona_id:
+                moved.append(entity)
+            else:
+                by_zone.setdefault(zona_id, {})[entity.id] = entity
+        result = []
+        for zona_id, by_id in sorted(by_zone.items()):
+            partition = self._state.partitions[zona_id]
+            with file_lock(partition.csv_file):
+                changed = self._rewrite_partition(zona_id, lambda e: by_id.get(e.id))
+                for previous, updated in changed:
+                    self.change_log.publish(
+                        self._entity, ACTION_UPDATED, updated.id, zona_id, data=updated, previous=previous
+                    )
+            result.extend(updated for _, updated in changed)
+        for entity in moved:
+            if self._move(entity.id, entity) is not None:
+                result.append(entity)
+        return result
+
+    def update(self, entity_id: int, updated_entity):
+        updated_entity.id = entity_id
+        updated = self.update_many([updated_entity])
+        return updated[0] if updated else None
+
+    def _delete(self, entity_id: int):
+        """Elimina la entidad de su partición. Retorna la entidad eliminada o None"""
+        zona_id = self._state.zone_of.get(entity_id)
+        if zona_id is None:
+            return None
+        partition = self._state.partitions[zona_id]
+        with file_lock(partition.csv_file):
+            entities = partition.get_all()
+            removed = next((e for e in entities if e.id == entity_id), None)
+            if removed is None:
+                return None
+            partition._save_all([e for e in entities if e.id != entity_id], [entity_id])
+            with self._state.guard:
+                self._state.zone_of.pop(entity_id, None)
+            self.change_log.publish(self._entity, ACTION_DELETED, entity_id, zona_id, previous=removed)
+        return removed
+
+    def archive(self, before) -> int:
+        """Archiva las filas terminales de cada partición (sus IDs no se reutilizan: ver `IdSequence`)"""
+        total = 0
+        for zona_id in self.partitions():
+            partition = self._state.partitions[zona_id]
+            with file_lock(partition.csv_file):
+                entities = partition.get_all()
+                archived = [e for e in entities if self._is_archivable(e, before)]
+                if not archived:
+                    continue
+                self._archive_rows(archived)
+                archived_ids = {e.id for e in archived}
+                partition._save_all([e for e in entities if e.id not in archived_ids], archived_ids)
+                with self._state.guard:
+                    for entity_id in archived_ids:
+                        self._state.zone_of.pop(entity_id, None)
+                for entity in archived:
+                    self.change_log.publish(self._entity, ACTION_ARCHIVED, entity.id, zona_id, previous=entity)
+            total += len(archived)
+        return total
+
+
+class PartitionedResourceRepository(_ZonePartitions, ResourceRepository):
+    """ResourceRepository con un CSV por zona"""
+    _partition_class = ResourceRepository
+    _entity = ENTITY_RESOURCE
+    _fieldnames = resource_repository.FIELDNAMES
+
+    def __init__(self, csv_file: str = os.path.join(StorageConfig.DATA_DIR, "resources.csv"), change_log: Optional[ChangeLog] = None):
+        self.archive_repo = ArchiveRepository(
+            os.path.join(os.path.dirname(csv_file), ArchiveConfig.ARCHIVE_SUBDIR), "resources", self._fieldnames
+        )
+        self._init_partitions(csv_file, change_log)
+
+    def update_fields(self, changes: Dict[int, dict], condition: Optional[Callable[[Resource], bool]] = None) -> List[Resource]:
+        """Igual que en ResourceRepository, con una reescritura por partición afectada"""
+        if any('zona_id' in fields for fields in changes.values()):
+            raise ValueError("update_fields no puede cambiar la zona de un recurso")
+        by_zone: Dict[int, Dict[int, dict]] = {}
+        for resource_id, fields in changes.items():
+            zona_id = self._state.zone_of.get(resource_id)
+            if zona_id is not None:
+                by_zone.setdefault(zona_id, {})[resource_id] = fields
+
+        def apply(resource: Resource, zone_changes: Dict[int, dict]) -> Optional[Resource]:
+            fields = zone_changes.get(resource.id)
+            if fields is None or (condition is not None and not condition(resource)):
+                return None
+            updated = copy.copy(resource)
+            for name, value in fields.items():
+                setattr(updated, name, value)
+            return updated
+
+        result = []
+        for zona_id, zone_changes in sorted(by_zone.items()):
+            partition = self._state.partitions[zona_id]
+            with file_lock(partition.csv_file):
+                changed = self._rewrite_partition(zona_id, lambda r: apply(r, zone_changes))
+                for previous, updated in changed:
+                    self.change_log.publish(
+                        ENTITY_RESOURCE, ACTION_UPDATED, updated.id, zona_id, data=updated, previous=previous
+                    )
+            result.extend(updated for _, updated in changed)
+        return result
+
+    def delete(self, resource_id: int) -> str:
+        if self._delete(resource_id) is not None:
+            self._deleted_ids.add(resource_id)
+            return "deleted"
+        return "already_deleted" if resource_id in self._deleted_ids else "never_existed"
+
+
+class PartitionedThreatRepository(_ZonePartitions, ThreatRepository):
+    """ThreatRepository con un CSV por zona"""
+    _partition_class = ThreatRepository
+    _entity = ENTITY_THREAT
+    _fieldnames = threat_repository.FIELDNAMES
+    _respect_ids = True
+
+    def __init__(self, csv_file: str = os.path.join(StorageConfig.DATA_DIR, "threats.csv"), change_log: Optional[ChangeLog] = None):
+        self.archive_repo = ArchiveRepository(
+            os.path.join(os.path.dirname(csv_file), ArchiveConfig.ARCHIVE_SUBDIR), "threats", self._fieldnames
+        )
+        self._init_partitions(csv_file, change_log)
+
+    def delete(self, threat_id: int) -> bool:
+        return self._delete(threat_id) is not None
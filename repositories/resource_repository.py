@@ -1,41 +1,100 @@
-from typing import List, Optional
+from typing import Callable, Dict, Iterable, List, Optional
 from models.resource import Resource, TipoRecurso, EstadoRecurso
 from datetime import datetime
+import copy
 import os
 import csv
 
+from config.archive_config import ArchiveConfig
+from config.storage_config import StorageConfig
+from repositories.archive_repository import ArchiveRepository
+from repositories.csv_io import file_lock, read_models, read_views, scan_columns, record_write
+from repositories.id_sequence import IdSequence, sequence_path
+from repositories.row_decoder import RowDecoder, INT, TEXT, TIME
+from repositories.snapshot import BinarySnapshot, snapshot_path, load_csv_snapshot, write_csv_snapshot
+from repositories.change_log import ChangeLog, get_change_log, ENTITY_RESOURCE, ACTION_CREATED, ACTION_UPDATED, ACTION_DELETED, ACTION_ARCHIVED
+
+FIELDNAMES = ['id','zona_id','nombre','tipo','cantidad_unitaria','peso','duracion_recoleccion','hormigas_requeridas','estado','hora_creacion','hora_recoleccion','hora_inicio_recoleccion']
+
+# Decodificador de filas: columnas en el orden del constructor de Resource
+ROW_DECODER = RowDecoder(Resource, {
+    'id': INT, 'zona_id': INT, 'nombre': TEXT, 'tipo': TipoRecurso, 'cantidad_unitaria': INT, 'peso': INT,
+    'duracion_recoleccion': INT, 'hormigas_requeridas': INT, 'estado': EstadoRecurso,
+    'hora_creacion': TIME, 'hora_recoleccion': TIME, 'hora_inicio_recoleccion': TIME,
+})
+
 class ResourceRepository:
-    def __init__(self, csv_file: str = "data/resources.csv"):
+    def __init__(self, csv_file: str = os.path.join(StorageConfig.DATA_DIR, "resources.csv"), change_log: Optional[ChangeLog] = None):
         self.csv_file = csv_file
+        self.change_log = change_log if change_log is not None else get_change_log(csv_file)
+        self.archive_repo = ArchiveRepository(
+            os.path.join(os.path.dirname(csv_file), ArchiveConfig.ARCHIVE_SUBDIR), "resources", FIELDNAMES
+        )
+        self.snapshot = BinarySnapshot(snapshot_path(csv_file), Resource, ROW_DECODER.columns)
+        # Último ID asignado, para no reutilizar IDs archivados o eliminados
+        self.ids = IdSequence(sequence_path(csv_file), self.archive_repo.max_id)
         self._ensure_file_exists()
         # Registrar IDs que fueron eliminados en esta instancia (para distinguir "nunca existió" vs "ya eliminado")
         self._deleted_ids = set()
 
     def _ensure_file_exists(self):
-        """Crea el archivo CSV si no existe"""
+        """Crea el archivo CSV si no existe y migra encabezados de versiones anteriores"""
         if not os.path.exists(self.csv_file):
             os.makedirs(os.path.dirname(self.csv_file), exist_ok=True)
             with open(self.csv_file, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.writer(f)
-                writer.writerow(['id','zona_id','nombre','tipo','cantidad_unitaria','peso','duracion_recoleccion','hormigas_requeridas','estado','hora_creacion','hora_recoleccion'])
+                writer.writerow(FIELDNAMES)
+            return
+        with file_lock(self.csv_file):
+            with open(self.csv_file, 'r', encoding='utf-8') as f:
+                header = next(csv.reader(f), [])
+            if header != FIELDNAMES:
+                # Las columnas nuevas quedan vacías; las escrituras en modo append requieren el encabezado actual
+                self._save_all(self.get_all())
 
     def get_all(self, zona_id: Optional[int] = None, estado: Optional[str] = None) -> List[Resource]:
-        """Lee todos los registros del CSV con filtros opcionales"""
-        resources = []
-        if not os.path.exists(self.csv_file):
-            return resources
+        """Lee todos los registros del CSV con filtros opcionales (aplicados antes de construir cada recurso)"""
+        where = {}
+        if zona_id is not None:
+            where['zona_id'] = zona_id
+        if estado is not None:
+            where['estado'] = estado
+        return list(read_models(self.csv_file, ROW_DECODER, where))
 
-        with open(self.csv_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                resource = self._dict_to_model(row)
-                if zona_id is not None and resource.zona_id != zona_id:
-                    continue
-                if estado is not None and resource.estado.value != estado:
-                    continue
-                resources.append(resource)
-        return resources
+    def scan(self, zona_id: Optional[int] = None, estado: Optional[str] = None) -> list:
+        """Como get_all, pero con vistas de solo lectura que convierten cada campo al leerlo
+        (para recorridos completos que usan pocos campos; `to_model()` arma el recurso)"""
+        where = {}
+        if zona_id is not None:
+            where['zona_id'] = zona_id
+        if estado is not None:
+            where['estado'] = estado
+        return list(read_views(self.csv_file, ROW_DECODER, where))
         
+    def project(self, columns: List[str], zona_id: Optional[int] = None, estado: Optional[str] = None,
+                raw: bool = False) -> List[dict]:
+        """Solo las columnas pedidas de cada recurso, sin construir el modelo. Con `raw` los enums
+        y las fechas quedan como texto (igual que al serializar el modelo a JSON)"""
+        where = {}
+        if zona_id is not None:
+            where['zona_id'] = zona_id
+        if estado is not None:
+            where['estado'] = estado
+        return [dict(zip(columns, row)) for row in scan_columns(self.csv_file, ROW_DECODER, columns, where, raw)]
+
+    def lock_all(self):
+        """Bloquea todas las escrituras del repositorio (p. ej. para leer un estado consistente)"""
+        return file_lock(self.csv_file)
+
+    def load_all(self) -> List[Resource]:
+        """Todos los recursos: desde el snapshot binario más las filas agregadas después,
+        o desde el CSV completo si fue reescrito desde el último snapshot"""
+        return load_csv_snapshot(self.csv_file, self.snapshot, ROW_DECODER)
+
+    def write_snapshot(self) -> int:
+        """Escribe el snapshot binario del CSV actual. Retorna cuántas filas guardó"""
+        return write_csv_snapshot(self.csv_file, self.snapshot, ROW_DECODER)
+
     def _dict_to_model(self, data: dict) -> Resource:
         """Convierte un diccionario a modelo Resource"""
         return Resource(
@@ -49,7 +108,8 @@ class ResourceRepository:
             hormigas_requeridas=int(data['hormigas_requeridas']),
             estado=EstadoRecurso(data['estado']),
             hora_creacion=datetime.fromisoformat(data['hora_creacion']) if data['hora_creacion'] else None, # type: ignore
-            hora_recoleccion=datetime.fromisoformat(data['hora_recoleccion']) if data.get('hora_recoleccion') and data['hora_recoleccion'] else None
+            hora_recoleccion=datetime.fromisoformat(data['hora_recoleccion']) if data.get('hora_recoleccion') and data['hora_recoleccion'] else None,
+            hora_inicio_recoleccion=datetime.fromisoformat(data['hora_inicio_recoleccion']) if data.get('hora_inicio_recoleccion') else None
         )
 
     def _model_to_dict(self, resource: Resource) -> dict:
@@ -65,26 +125,54 @@ class ResourceRepository:
             'hormigas_requeridas': resource.hormigas_requeridas,
             'estado': resource.estado.value,
             'hora_creacion': resource.hora_creacion.isoformat() if resource.hora_creacion else '',
-            'hora_recoleccion': resource.hora_recoleccion.isoformat() if resource.hora_recoleccion else ''
+            'hora_recoleccion': resource.hora_recoleccion.isoformat() if resource.hora_recoleccion else '',
+            'hora_inicio_recoleccion': resource.hora_inicio_recoleccion.isoformat() if resource.hora_inicio_recoleccion else ''
         }
         
-    def _save_all(self, resources: List[Resource]):
-        """Guarda todos los registros en el CSV"""
+    def _save_all(self, resources: List[Resource], touched: Optional[Iterable[int]] = None):
+        """Guarda todos los registros en el CSV. `touched` son los IDs creados, modificados
+        o eliminados, para el registro del snapshot (None si cambió todo el archivo)"""
         with open(self.csv_file, 'w', newline='', encoding='utf-8') as f:
-            fieldnames = ['id','zona_id','nombre','tipo','cantidad_unitaria','peso','duracion_recoleccion','hormigas_requeridas','estado','hora_creacion','hora_recoleccion']
+            fieldnames = FIELDNAMES
             writer = csv.DictWriter(f, fieldnames=fieldnames)
             writer.writeheader()
             for r in resources:
                 writer.writerow(self._model_to_dict(r))
+        record_write(self.csv_file, 'rewrite')
+        self.snapshot.record(self.csv_file, resources, touched, self._model_to_dict)
     
     def create(self, resource: Resource) -> Resource:
         """Crea un nuevo recurso y lo guarda en el CSV"""
-        resources = self.get_all()
-        resource.id = max([r.id for r in resources], default=0) + 1
-        resources.append(resource)
-        self._save_all(resources)
+        with file_lock(self.csv_file):
+            resources = self.get_all()
+            resource.id = self.ids.next_id(max([r.id for r in resources], default=0))
+            self.ids.advance(resource.id)
+            resources.append(resource)
+            self._save_all(resources, [resource.id])
+            self.change_log.publish(ENTITY_RESOURCE, ACTION_CREATED, resource.id, resource.zona_id, data=resource)
         return resource
     
+    def create_many(self, resources: List[Resource]) -> List[Resource]:
+        """Crea varios recursos con una sola lectura del CSV y una sola escritura en modo append"""
+        if not resources:
+            return []
+        with file_lock(self.csv_file):
+            next_id = self.ids.next_id(max([r.id for r in self.get_all()], default=0))
+            for resource in resources:
+                resource.id = next_id
+                next_id += 1
+            self.ids.advance(next_id - 1)
+            with open(self.csv_file, 'a', newline='', encoding='utf-8') as f:
+                fieldnames = FIELDNAMES
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                for resource in resources:
+                    writer.writerow(self._model_to_dict(resource))
+            record_write(self.csv_file, 'append')
+            self.snapshot.record(self.csv_file, resources, [r.id for r in resources], self._model_to_dict)
+            for resource in resources:
+                self.change_log.publish(ENTITY_RESOURCE, ACTION_CREATED, resource.id, resource.zona_id, data=resource)
+        return resources
+    
     def resource_name_exists_in_zone(self, nombre: str, zona_id: int) -> bool:
         """Verifica si un recurso con el mismo nombre ya existe en la zona"""
         resources = self.get_all(zona_id=zona_id)
@@ -95,22 +183,78 @@ class ResourceRepository:
     
     def get_by_id(self, resource_id: int) -> Optional[Resource]:
         """Obtiene un recurso por su ID"""
-        resources = self.get_all()
-        for resource in resources:
-            if resource.id == resource_id:
-                return resource
-        return None
+        matches = list(read_models(self.csv_file, ROW_DECODER, {'id': resource_id}))
+        return matches[0] if matches else None
     
     def update(self, resource_id: int, updated_resource: Resource) -> Optional[Resource]:
         """Actualiza un recurso existente"""
-        resources = self.get_all()
-        for idx, resource in enumerate(resources):
-            if resource.id == resource_id:
-                resources[idx] = updated_resource
-                self._save_all(resources)
-                return updated_resource
+        with file_lock(self.csv_file):
+            resources = self.get_all()
+            for idx, resource in enumerate(resources):
+                if resource.id == resource_id:
+                    resources[idx] = updated_resource
+                    self._save_all(resources, {resource_id, updated_resource.id})
+                    self.change_log.publish(
+                        ENTITY_RESOURCE, ACTION_UPDATED, resource_id, updated_resource.zona_id,
+                        data=updated_resource, previous=resource
+                    )
+                    return updated_resource
         return None
     
+    def update_many(self, updated_resources: List[Resource]) -> List[Resource]:
+        """Actualiza varios recursos con una sola lectura y una sola reescritura del CSV.
+        Retorna los recursos actualizados (los IDs inexistentes se ignoran)."""
+        if not updated_resources:
+            return []
+        by_id = {r.id: r for r in updated_resources}
+        with file_lock(self.csv_file):
+            resources = self.get_all()
+            changed = []
+            for idx, resource in enumerate(resources):
+                updated = by_id.get(resource.id)
+                if updated is not None:
+                    resources[idx] = updated
+                    changed.append((resource, updated))
+            if changed:
+                self._save_all(resources, [updated.id for _, updated in changed])
+                for previous, updated in changed:
+                    self.change_log.publish(
+                        ENTITY_RESOURCE, ACTION_UPDATED, updated.id, updated.zona_id,
+                        data=updated, previous=previous
+                    )
+        return [updated for _, updated in changed]
+    
+    def update_fields(
+        self,
+        changes: Dict[int, dict],
+        condition: Optional[Callable[[Resource], bool]] = None
+    ) -> List[Resource]:
+        """Actualiza solo los campos indicados ({id: {campo: valor}}) de varios recursos,
+        con una sola lectura y una sola reescritura del CSV. Si se indica `condition`,
+        solo se modifican los recursos que la cumplen. Retorna los recursos modificados."""
+        if not changes:
+            return []
+        with file_lock(self.csv_file):
+            resources = self.get_all()
+            changed = []
+            for idx, resource in enumerate(resources):
+                fields = changes.get(resource.id)
+                if fields is None or (condition is not None and not condition(resource)):
+                    continue
+                updated = copy.copy(resource)
+                for name, value in fields.items():
+                    setattr(updated, name, value)
+                resources[idx] = updated
+                changed.append((resource, updated))
+            if changed:
+                self._save_all(resources, [updated.id for _, updated in changed])
+                for previous, updated in changed:
+                    self.change_log.publish(
+                        ENTITY_RESOURCE, ACTION_UPDATED, updated.id, updated.zona_id,
+                        data=updated, previous=previous
+                    )
+        return [updated for _, updated in changed]
+    
     def delete(self, resource_id: int) -> str:
         """Elimina un recurso por su ID.
         Retorna:
@@ -118,14 +262,59 @@ class ResourceRepository:
           - 'already_deleted' si ya fue eliminado antes en esta instancia,
           - 'never_existed' si nunca hubo un recurso con ese ID.
         """
-        resources = self.get_all()
-        for idx, resource in enumerate(resources):
-            if resource.id == resource_id:
-                del resources[idx]
-                self._save_all(resources)
-                self._deleted_ids.add(resource_id)
-                return "deleted"
+        with file_lock(self.csv_file):
+            resources = self.get_all()
+            for idx, resource in enumerate(resources):
+                if resource.id == resource_id:
+                    del resources[idx]
+                    self._save_all(resources, [resource_id])
+                    self._deleted_ids.add(resource_id)
+                    self.change_log.publish(ENTITY_RESOURCE, ACTION_DELETED, resource_id, resource.zona_id, previous=resource)
+                    return "deleted"
         # no está en el CSV
         if resource_id in self._deleted_ids:
             return "already_deleted"
-        return "never_existed"
\ No newline at end of file
+        return "never_existed"
+
+    @staticmethod
+    def _archived_at(resource: Resource) -> Optional[datetime]:
+        return resource.hora_recoleccion or resource.hora_creacion
+
+    def _is_archivable(self, resource: Resource, before: datetime) -> bool:
+        archived_at = self._archived_at(resource)
+        return resource.estado == EstadoRecurso.RECOLECTADO and archived_at is not None and archived_at < before
+
+    def _archive_rows(self, resources: List[Resource]):
+        """Agrega los recursos al archivo, en la partición del mes de su recolección"""
+        months = {r.id: self._archived_at(r) for r in resources}
+        self.archive_repo.append([self._model_to_dict(r) for r in resources], lambda row: months[row['id']])
+
+    def archive(self, before: datetime) -> int:
+        """Mueve al archivo los recursos recolectados antes de `before`. Retorna cuántos se movieron.
+        Sus IDs no se reutilizan: create() asigna desde la secuencia persistida."""
+        with file_lock(self.csv_file):
+            resources = self.get_all()
+            archived = [r for r in resources if self._is_archivable(r, before)]
+            if not archived:
+                return 0
+            # Primero el archivo y luego el CSV: si el proceso se interrumpe entre ambos,
+            # la fila queda duplicada (y se descarta al leer) en lugar de perderse
+            self._archive_rows(archived)
+            archived_ids = {r.id for r in archived}
+            self._save_all([r for r in resources if r.id not in archived_ids], archived_ids)
+            for r in archived:
+                self.change_log.publish(ENTITY_RESOURCE, ACTION_ARCHIVED, r.id, r.zona_id, previous=r)
+        return len(archived)
+
+    def get_archived(self, zona_id: Optional[int] = None, estado: Optional[str] = None,
+                     months: Optional[List[str]] = None) -> List[Resource]:
+        """Lee los recursos archivados (solo las particiones `months`, si se indican)"""
+        resources = []
+        for row in self.archive_repo.read_rows(months):
+            resource = self._dict_to_model(row)
+            if zona_id is not None and resource.zona_id != zona_id:
+                continue
+            if estado is not None and resource.estado.value != estado:
+                continue
+            resources.append(resource)
+        return resources
@@ -0,0 +1,391 @@
+"""
+Decodificador especializado de filas CSV a modelos.
+
+`csv.DictReader` arma un diccionario por fila y el repositorio convierte cada
+campo buscando por nombre. Este decodificador genera, a partir del encabezado
+del archivo, una función por esquema que toma cada columna de su posición y la
+convierte en línea (enteros con `int`, enums con una tabla de búsqueda, fechas
+con una caché de strings repetidos), y parte las líneas sin comillas con
+`str.split`. Solo las líneas con comillas (textos con comas, comillas o saltos
+de línea) pasan por el módulo csv.
+
+Los filtros (`where`) se evalúan sobre la columna antes de construir el
+modelo, así una búsqueda por zona o por ID no crea objetos para las filas
+descartadas.
+
+Las lecturas completas que usan pocos campos de cada fila pueden pedir vistas
+(`views`) en lugar de modelos: cada vista guarda las celdas de su línea y
+convierte una columna recién al leer el atributo, así el recorrido no paga un
+dataclass (ni sus fechas) por fila.
+
+Para lecturas que solo necesitan algunas columnas, `project` recorre el archivo
+mapeado en memoria línea por línea como bytes: parte cada línea solo hasta la
+última columna pedida y convierte únicamente esas celdas, sin decodificar la
+línea completa a str ni construir el modelo.
+"""
+from datetime import datetime
+from enum import Enum
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import csv
+import io
+
+# Tipos de columna (los enums se indican con su clase)
+INT = "int"
+TEXT = "text"
+TIME = "time"
+
+# Tamaño máximo de la caché de fechas (se vacía al llenarse)
+TIME_CACHE_SIZE = 65536
+
+Column = Union[str, type]
+
+
+class _TimeCache:
+    """Fechas ISO ya parseadas; los strings repetidos no se vuelven a parsear"""
+
+    def __init__(self):
+        self.values: Dict[str, datetime] = {}
+
+    def parse(self, value: str) -> datetime:
+        parsed = self.values.get(value)
+        if parsed is None:
+            if len(self.values) >= TIME_CACHE_SIZE:
+                self.values.clear()
+            parsed = self.values[value] = datetime.fromisoformat(value)
+        return parsed
+
+
+class RowCells:
+    """Vista de solo lectura sobre las celdas de una fila; `to_model()` arma el modelo"""
+    __slots__ = ("_v",)
+
+    def __init__(self, values: Tuple[str, ...]):
+        self._v = values
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_model()!r})"
+
+
+class RowDecoder:
+    """Convierte las líneas de un CSV (con encabezado) en instancias de `model`"""
+
+    def __init__(self, model: type, columns: Dict[str, Column]):
+        # `columns` sigue el orden de los argumentos del constructor del modelo
+        self.model = model
+        self.columns = columns
+        self._times = _TimeCache()
+        self._compiled: Dict[Tuple, Tuple[Callable, int]] = {}
+        self._projections: Dict[Tuple, Tuple[Callable, int, int, bool]] = {}
+        self._views: Dict[Tuple, Tuple[type, Callable, int]] = {}
+
+    def _expression(self, name: str, position: int, namespace: dict) -> str:
+        """Expresión que convierte la columna `name` tomada de `v[position]`"""
+        kind = self.columns[name]
+        cell = f"v[{position}]"
+        if kind == INT:
+            return f"int({cell})"
+        if kind == TEXT:
+            return cell
+        if kind == TIME:
+            return f"(parse_time({cell}) if {cell} else None)"
+        # Enum: búsqueda directa por valor; un valor desconocido cae al camino lento
+        namespace[f"enum_{name}"] = {member.value: member for member in kind}
+        return f"enum_{name}[{cell}]"
+
+    def _compile(self, header: List[str], where: Tuple[str, ...]) -> Tuple[Callable, int]:
+        """Función `decode(v, expected)` para este encabezado y estos filtros (None si la fila
+        no pasa) y el largo mínimo que debe tener la fila"""
+        key = (tuple(header), where)
+        compiled = self._compiled.get(key)
+        if compiled is not None:
+            return compiled
+        positions, min_length = self._positions(header)
+        namespace = {"model": self.model, "parse_time": self._times.parse}
+        lines = ["def decode(v, expected):"]
+        for number, name in enumerate(where):
+            lines.append(f"    if {self._expression(name, positions[name], namespace)} != expected[{number}]: return None")
+        arguments = ", ".join(self._expression(name, positions[name], namespace) for name in self.columns)
+        lines.append(f"    return model({arguments})")
+        exec("\n".join(lines), namespace)
+        compiled = self._compiled[key] = (namespace["decode"], min_length)
+        return compiled
+
+    def _positions(self, header: List[str]) -> Tuple[Dict[str, int], int]:
+        """Posición de cada columna y largo mínimo de la fila"""
+        width = len(header)
+        index = {name: position for position, name in enumerate(header)}
+        # Las columnas ausentes del encabezado leen la celda de relleno (vacía) al final de la fila
+        positions = {name: index.get(name, width) for name in self.columns}
+        min_length = width + 1 if any(position == width for position in positions.values()) else width
+        return positions, min_length
+
+    def _compile_views(self, header: List[str], where: Tuple[str, ...]) -> Tuple[type, Callable, int]:
+        """
+        Clase de vista para este encabezado (una propiedad por columna que
+        convierte su celda al leerla), función `accept(v, expected)` de los
+        filtros y largo mínimo de la fila
+        """
+        key = (tuple(header), where)
+        compiled = self._views.get(key)
+        if compiled is not None:
+            return compiled
+        positions, min_length = self._positions(header)
+        namespace = {"model": self.model, "parse_time": self._times.parse, "RowCells": RowCells}
+        lines = [f"class {self.model.__name__}Cells(RowCells):", "    __slots__ = ()"]
+        for name, kind in self.columns.items():
+            if isinstance(kind, type):
+                # Un valor desconocido falla igual que `Enum(valor)`
+                namespace[f"kind_{name}"] = kind
+                namespace[f"enum_{name}"] = {member.value: member for member in kind}
+                lines += [
+                    "    @property",
+                    f"    def {name}(self):",
+                    f"        cell = self._v[{positions[name]}]",
+                    f"        member = enum_{name}.get(cell)",
+                    f"        return kind_{name}(cell) if member is None else member",
+                ]
+            else:
+                lines += [
+                    "    @property",
+                    f"    def {name}(self):",
+                    "        v = self._v",
+                    f"        return {self._expression(name, positions[name], namespace)}",
+                ]
+        arguments = ", ".join(f"self.{name}" for name in self.columns)
+        lines += ["    def to_model(self):", f"        return model({arguments})"]
+        conditions = " and ".join(
+            f"{self._expression(name, positions[name], namespace)} == expected[{number}]"
+            for number, name in enumerate(where)
+        )
+        lines += ["def accept(v, expected):", f"    return {conditions or 'True'}"]
+        exec("\n".join(lines), namespace)
+        compiled = self._views[key] = (namespace[f"{self.model.__name__}Cells"], namespace["accept"], min_length)
+        return compiled
+
+    def _decode_slow(self, values: List[str], positions: Dict[str, int]):
+        """Conversión campo a campo; reporta los valores inválidos como `Enum(valor)`"""
+        converted = []
+        for name, kind in self.columns.items():
+            value = values[positions[name]]
+            if kind == INT:
+                converted.append(int(value))
+            elif kind == TEXT:
+                converted.append(value)
+            elif kind == TIME:
+                converted.append(self._times.parse(value) if value else None)
+            else:
+                converted.append(kind(value))
+        return self.model(*converted)
+
+    def decode(self, lines: Iterable[str], where: Optional[Dict[str, object]] = None,
+               stats: Optional[dict] = None) -> Iterator:
+        """
+        Itera los modelos de las líneas (la primera es el encabezado). `where`
+        ({columna: valor}) descarta las filas cuyo valor convertido difiere.
+        Si se indica `stats`, al terminar deja en stats["rows"] las filas recorridas.
+        """
+        lines = iter(lines)
+        header_line = next(lines, None)
+        if header_line is None:
+            return
+        header = next(csv.reader([header_line]))
+        where = where or {}
+        decode, min_length = self._compile(header, tuple(where))
+        expected = tuple(where.values())
+        scanned = 0
+        try:
+            for line in lines:
+                if '"' in line:
+                    # Campo entre comillas: puede seguir en las líneas siguientes
+                    record = [line]
+                    while sum(part.count('"') for part in record) % 2:
+                        continuation = next(lines, None)
+                        if continuation is None:
+                            break
+                        record.append(continuation)
+                    values = next(csv.reader(record), [])
+                else:
+                    values = line.rstrip('\r\n').split(',')
+                    if values == ['']:
+                        # csv.DictReader también salta las líneas vacías
+                        continue
+                scanned += 1
+                if len(values) < min_length:
+                    # Filas cortas (o columnas ausentes en el encabezado) quedan vacías
+                    values.extend([''] * (min_length - len(values)))
+                try:
+                    entity = decode(values, expected)
+                except KeyError:
+                    positions = {name: header.index(name) if name in header else len(header) for name in self.columns}
+                    entity = self._decode_slow(values, positions)
+                    if any(getattr(entity, name) != value for name, value in where.items()):
+                        entity = None
+                if entity is not None:
+                    yield entity
+        finally:
+            if stats is not None:
+                stats["rows"] = stats.get("rows", 0) + scanned
+
+    def views(self, lines: Iterable[str], where: Optional[Dict[str, object]] = None,
+              stats: Optional[dict] = None) -> Iterator[RowCells]:
+        """
+        Como `decode`, pero itera vistas sobre las celdas de cada fila en lugar
+        de modelos: solo se convierten las columnas de `where` y las que se lean
+        después de la vista.
+        """
+        lines = iter(lines)
+        header_line = next(lines, None)
+        if header_line is None:
+            return
+        header = next(csv.reader([header_line]))
+        where = where or {}
+        view, accept, min_length = self._compile_views(header, tuple(where))
+        expected = tuple(where.values())
+        scanned = 0
+        try:
+            for line in lines:
+                if '"' in line:
+                    record = [line]
+                    while sum(part.count('"') for part in record) % 2:
+                        continuation = next(lines, None)
+                        if continuation is None:
+                            break
+                        record.append(continuation)
+                    values = next(csv.reader(record), [])
+                else:
+                    values = line.rstrip('\r\n').split(',')
+                    if values == ['']:
+                        continue
+                scanned += 1
+                if len(values) < min_length:
+                    values.extend([''] * (min_length - len(values)))
+                if where:
+                    try:
+                        if not accept(values, expected):
+                            continue
+                    except KeyError:
+                        # Valor de enum desconocido en un filtro: se informa como `Enum(valor)`
+                        self._decode_slow(values, self._positions(header)[0])
+                        raise
+                # Una tupla de strings sale del seguimiento del recolector de ciclos (una lista no)
+                yield view(tuple(values))
+        finally:
+            if stats is not None:
+                stats["rows"] = stats.get("rows", 0) + scanned
+
+    # --- Proyección sobre bytes ---
+
+    def _cell_expression(self, name: str, position: int, raw: bool, namespace: dict) -> str:
+        """Expresión que convierte la celda en bytes `v[position]` de la columna `name`"""
+        kind = self.columns[name]
+        cell = f"v[{position}]"
+        if kind == INT:
+            return f"int({cell})"
+        if kind == TEXT:
+            return f"{cell}.decode()"
+        if kind == TIME:
+            if raw:
+                # Tal como está en el CSV (escrito con isoformat)
+                return f"({cell}.decode() if {cell} else None)"
+            return f"(parse_time({cell}.decode()) if {cell} else None)"
+        # Enum: la tabla por bytes valida el valor; con raw se devuelve su texto
+        table = f"enum_{'raw' if raw else 'member'}_{name}"
+        namespace[table] = {member.value.encode(): member.value if raw else member for member in kind}
+        return f"{table}[{cell}]"
+
+    def _compile_projection(self, header: List[str], columns: Tuple[str, ...], where: Tuple[str, ...],
+                            raw: bool) -> Tuple[Callable, int, int, bool]:
+        """
+        Función `project(v, expected)` que retorna la tupla de `columns` (None si la
+        fila no pasa los filtros), la última posición que hay que partir, el largo
+        mínimo de la fila y si esa posición es la última columna (hay que quitar el
+        salto de línea).
+        """
+        key = (tuple(header), columns, where, raw)
+        compiled = self._projections.get(key)
+        if compiled is not None:
+            return compiled
+        unknown = [name for name in columns + where if name not in self.columns]
+        if unknown:
+            raise ValueError(f"Columnas desconocidas: {unknown}")
+        width = len(header)
+        index = {name: position for position, name in enumerate(header)}
+        positions = {name: index.get(name, width) for name in columns + where}
+        namespace = {"parse_time": self._times.parse}
+        lines = ["def project(v, expected):"]
+        for number, name in enumerate(where):
+            lines.append(
+                f"    if {self._cell_expression(name, positions[name], False, namespace)} != expected[{number}]: return None"
+            )
+        values = "".join(f"{self._cell_expression(name, positions[name], raw, namespace)}, " for name in columns)
+        lines.append(f"    return ({values})")
+        exec("\n".join(lines), namespace)
+        last = max(positions.values(), default=0)
+        compiled = self._projections[key] = (namespace["project"], last, last + 1, last >= width - 1)
+        return compiled
+
+    def _raise_invalid(self, values: List[bytes], header: List[str], names: Sequence[str], error: KeyError):
+        """Reporta un valor de enum desconocido de las columnas leídas como `Enum(valor)`"""
+        for name in names:
+            kind = self.columns[name]
+            if isinstance(kind, type) and name in header:
+                kind(values[header.index(name)].decode())
+        raise error
+
+    def project(self, data, columns: Sequence[str], where: Optional[Dict[str, object]] = None,
+                raw: bool = False, stats: Optional[dict] = None) -> Iterator[tuple]:
+        """
+        Itera tuplas con las columnas `columns` de cada fila de `data` (un buffer
+        con `readline`, p. ej. el CSV mapeado con mmap). Con `raw` las fechas y
+        los enums se devuelven como texto, listos para serializar.
+        """
+        readline = data.readline
+        header_line = readline()
+        if not header_line:
+            return
+        header = next(csv.reader([header_line.decode("utf-8")]))
+        where = where or {}
+        project, last, min_length, strip = self._compile_projection(header, tuple(columns), tuple(where), raw)
+        expected = tuple(where.values())
+        scanned = 0
+        try:
+            while True:
+                line = readline()
+                if not line:
+                    break
+                if b'"' in line:
+                    # Campo entre comillas: se arma el registro completo y se parte con el módulo csv
+                    record = [line]
+                    while sum(part.count(b'"') for part in record) % 2:
+                        continuation = readline()
+                        if not continuation:
+                            break
+                        record.append(continuation)
+                    text = io.StringIO(b"".join(record).decode("utf-8"), newline=None)
+                    values = [cell.encode("utf-8") for cell in next(csv.reader(text), [])]
+                    if not values:
+                        continue
+                else:
+                    if line == b"\n" or line == b"\r\n":
+                        # csv.DictReader también salta las líneas vacías
+                        continue
+                    if strip:
+                        line = line.rstrip(b"\r\n")
+                    # Solo se parte hasta la última columna necesaria
+                    values = line.split(b",", last + 1)
+                    if len(values) <= min_length:
+                        # La línea terminó antes del resto sin partir: su última celda trae el salto de línea
+                        values[-1] = values[-1].rstrip(b"\r\n")
+                scanned += 1
+                if len(values) < min_length:
+                    # Fila corta (o columna ausente en el encabezado): las celdas faltantes quedan vacías
+                    values.extend([b""] * (min_length - len(values)))
+                try:
+                    row = project(values, expected)
+                except KeyError as e:
+                    self._raise_invalid(values, header, list(columns) + list(where), e)
+                if row is not None:
+                    yield row
+        finally:
+            if stats is not None:
+                stats["rows"] = stats.get("rows", 0) + scanned
@@ -0,0 +1,330 @@
+"""
+Snapshots binarios de los CSV de recursos y amenazas.
+
+Reconstruir el estado parseando el CSV de texto es el costo dominante al
+arrancar (cada vista en memoria lee todas las filas). Un snapshot guarda las
+mismas filas en registros de ancho fijo (`struct`) más una tabla de strings,
+con un CRC32 del contenido y la versión del CSV que representa (tamaño y
+mtime en nanosegundos).
+
+Cada escritura posterior del repositorio (altas en modo append y también las
+reescrituras de updates, deletes y archivado) agrega al registro del snapshot
+(`<csv>.snap.log`) las filas que creó o modificó y los IDs que eliminó, junto
+con la nueva versión del CSV. Al cargar, si la última versión registrada es
+la del CSV actual, se decodifican solo esas filas y se aplican sobre el
+snapshot, sin leer el CSV. Si no coincide (el CSV se escribió sin pasar por
+el registro, p. ej. una caída entre ambas escrituras o una edición manual) se
+lee el CSV completo. Cada snapshot nuevo vacía el registro.
+
+Formato (little-endian):
+    cabecera | registros (filas * tamaño de registro) | offsets de strings (u64) | strings UTF-8
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+import csv
+import io
+import logging
+import mmap
+import os
+import struct
+import zlib
+
+from config.snapshot_config import SnapshotConfig
+from repositories.csv_io import file_lock, record_write
+from repositories.row_decoder import RowDecoder, INT, TEXT, TIME
+from services.metrics import record_read
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"ANTSNAP\x00"
+FORMAT_VERSION = 2
+# magic, versión de formato, CRC del esquema, filas, strings, bytes del CSV, mtime del CSV (ns), CRC del contenido
+_HEADER = struct.Struct("<8sHxxIQQQqI")
+
+# Operaciones del registro de cambios posteriores al snapshot
+UPSERT = "U"
+DELETE = "D"
+
+EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+# Valor reservado para fechas vacías (None)
+NO_TIME = -(2 ** 63)
+
+# Código struct de cada tipo de columna (los enums se guardan como su posición en un byte)
+_CODES = {INT: "q", TEXT: "I", TIME: "q"}
+
+
+def snapshot_path(csv_file: str) -> str:
+    return csv_file + SnapshotConfig.SUFFIX
+
+
+def csv_version(csv_file: str) -> tuple:
+    """Versión de un CSV para el snapshot: (tamaño, mtime en nanosegundos)"""
+    stat = os.stat(csv_file)
+    return stat.st_size, stat.st_mtime_ns
+
+
+@dataclass
+class SnapshotData:
+    entities: list
+    # Versión del CSV que representa el snapshot
+    csv_bytes: int
+    csv_mtime: int
+
+
+class BinarySnapshot:
+    """Snapshot de ancho fijo de un modelo, con las columnas de su RowDecoder"""
+
+    def __init__(self, path: str, model: type, columns: Dict[str, object]):
+        self.path = path
+        self.model = model
+        self.columns = columns
+        self._record = struct.Struct("<" + "".join(_CODES.get(kind, "B") for kind in columns.values()))
+        # Un cambio de columnas o de valores de un enum invalida los snapshots anteriores
+        schema = ";".join(
+            f"{name}:{kind if isinstance(kind, str) else ','.join(member.value for member in kind)}"
+            for name, kind in columns.items()
+        )
+        self._schema_crc = zlib.crc32(schema.encode("utf-8"))
+        self._build = None
+        self.log_path = path + ".log"
+        self._log_fields = ["op", "csv_bytes", "csv_mtime"] + list(columns)
+
+    # --- Escritura ---
+
+    def _encoders(self, strings: Dict[str, int]) -> List[Callable]:
+        def text(value: str) -> int:
+            code = strings.get(value)
+            if code is None:
+                code = strings[value] = len(strings)
+            return code
+
+        def time(value: Optional[datetime]) -> int:
+            if value is None:
+                return NO_TIME
+            if value.tzinfo is not None:
+                raise ValueError("El snapshot solo guarda fechas sin zona horaria, como las del CSV")
+            return (value - EPOCH) // _MICROSECOND
+
+        encoders = []
+        for kind in self.columns.values():
+            if kind == INT:
+                encoders.append(int)
+            elif kind == TEXT:
+                encoders.append(text)
+            elif kind == TIME:
+                encoders.append(time)
+            else:
+                encoders.append({member: code for code, member in enumerate(kind)}.__getitem__)
+        return encoders
+
+    def write(self, entities: list, csv_bytes: int, csv_mtime: int):
+        """Escribe el snapshot de forma atómica (archivo temporal + rename)"""
+        strings: Dict[str, int] = {}
+        encoders = list(zip(self.columns, self._encoders(strings)))
+        pack = self._record.pack
+        records = bytearray()
+        for entity in entities:
+            records += pack(*[encode(getattr(entity, name)) for name, encode in encoders])
+        blobs = [value.encode("utf-8") for value in strings]
+        offsets = [0]
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+        payload = b"".join([bytes(records), struct.pack(f"<{len(offsets)}Q", *offsets)] + blobs)
+        header = _HEADER.pack(
+            MAGIC, FORMAT_VERSION, self._schema_crc, len(entities), len(strings),
+            csv_bytes, csv_mtime, zlib.crc32(payload)
+        )
+        temporary = self.path + ".tmp"
+        with open(temporary, "wb") as f:
+            f.write(header)
+            f.write(payload)
+        os.replace(temporary, self.path)
+
+    # --- Lectura ---
+
+    def _builder(self) -> Callable:
+        """Función `build(registro, strings)` que arma el modelo desde la tupla de struct"""
+        if self._build is None:
+            namespace = {"model": self.model, "EPOCH": EPOCH, "timedelta": timedelta, "NO_TIME": NO_TIME}
+            arguments = []
+            for position, (name, kind) in enumerate(self.columns.items()):
+                cell = f"r[{position}]"
+                if kind == INT:
+                    arguments.append(cell)
+                elif kind == TEXT:
+                    arguments.append(f"strings[{cell}]")
+                elif kind == TIME:
+                    arguments.append(f"(None if {cell} == NO_TIME else EPOCH + timedelta(microseconds={cell}))")
+                else:
+                    namespace[f"enum_{name}"] = list(kind)
+                    arguments.append(f"enum_{name}[{cell}]")
+            exec(f"def build(r, strings):\n    return model({', '.join(arguments)})", namespace)
+            self._build = namespace["build"]
+        return self._build
+
+    def _decode(self, data: mmap.mmap) -> Optional[SnapshotData]:
+        if len(data) < _HEADER.size:
+            return None
+        magic, version, schema_crc, count, string_count, csv_bytes, csv_mtime, payload_crc = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION or schema_crc != self._schema_crc:
+            return None
+        payload = memoryview(data)[_HEADER.size:]
+        try:
+            records_end = count * self._record.size
+            strings_start = records_end + 8 * (string_count + 1)
+            if len(payload) < strings_start or zlib.crc32(payload) != payload_crc:
+                logger.warning(f"⚠️ Snapshot dañado, se ignora: {self.path}")
+                return None
+            offsets = struct.unpack_from(f"<{string_count + 1}Q", payload, records_end)
+            blob = bytes(payload[strings_start:])
+            strings = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(string_count)]
+            build = self._builder()
+            entities = [build(record, strings) for record in self._record.iter_unpack(payload[:records_end])]
+        finally:
+            payload.release()
+        return SnapshotData(entities, csv_bytes, csv_mtime)
+
+    def load(self) -> Optional[SnapshotData]:
+        """Lee el snapshot (mapeado en memoria); None si no existe, es de otro esquema o está dañado"""
+        try:
+            with open(self.path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return None
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    return self._decode(data)
+        except FileNotFoundError:
+            return None
+
+    # --- Registro de cambios posteriores al snapshot ---
+
+    def reset_log(self):
+        """Vacía el registro (el snapshot recién escrito ya incluye todo)"""
+        temporary = self.log_path + ".tmp"
+        with open(temporary, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerow(self._log_fields)
+        os.replace(temporary, self.log_path)
+
+    def record(self, csv_file: str, entities: list, touched: Optional[Iterable[int]], to_row: Callable[[object], dict]):
+        """
+        Registra una escritura del CSV: de los IDs `touched`, los presentes en
+        `entities` como filas nuevas o modificadas y los ausentes como
+        eliminados. Sin `touched` (reescritura completa) el registro se
+        descarta y la próxima carga lee el CSV. No hace nada si no hay
+        snapshot. Requiere el lock del CSV.
+        """
+        if not os.path.exists(self.log_path):
+            return
+        if touched is None:
+            os.remove(self.log_path)
+            return
+        pending = set(touched)
+        version = list(csv_version(csv_file))
+        with open(self.log_path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            for entity in entities:
+                if entity.id in pending:
+                    pending.discard(entity.id)
+                    row = to_row(entity)
+                    writer.writerow([UPSERT] + version + [row[name] for name in self.columns])
+            for entity_id in sorted(pending):
+                writer.writerow([DELETE] + version + [entity_id if name == "id" else "" for name in self.columns])
+        record_write(self.log_path, "append")
+
+    def replay(self, loaded: SnapshotData, csv_file: str, decoder: RowDecoder, stats: dict) -> Optional[list]:
+        """
+        Filas del snapshot con el registro aplicado, si el resultado corresponde
+        a la versión actual del CSV; None si no corresponde o el registro está dañado
+        """
+        try:
+            with open(self.log_path, "r", newline="", encoding="utf-8") as f:
+                changes = list(csv.reader(f))[1:]
+        except FileNotFoundError:
+            changes = []
+        if any(len(change) != len(self._log_fields) for change in changes):
+            logger.warning(f"⚠️ Registro del snapshot dañado, se ignora: {self.log_path}")
+            return None
+        version = (loaded.csv_bytes, loaded.csv_mtime)
+        if changes:
+            version = (int(changes[-1][1]), int(changes[-1][2]))
+        if version != csv_version(csv_file):
+            return None
+
+        # Las filas modificadas se decodifican juntas, igual que las del CSV
+        upserts = io.StringIO()
+        writer = csv.writer(upserts)
+        writer.writerow(self.columns)
+        writer.writerows(change[3:] for change in changes if change[0] == UPSERT)
+        decoded = iter(decoder.decode(io.StringIO(upserts.getvalue(), newline=None), stats=stats))
+
+        entities = list(loaded.entities)
+        position = {entity.id: index for index, entity in enumerate(entities)}
+        id_column = 3 + list(self.columns).index("id")
+        for change in changes:
+            if change[0] == UPSERT:
+                entity = next(decoded)
+                index = position.get(entity.id)
+                if index is None:
+                    position[entity.id] = len(entities)
+                    entities.append(entity)
+                else:
+                    entities[index] = entity
+            else:
+                index = position.pop(int(change[id_column]), None)
+                if index is not None:
+                    entities[index] = None
+        return [entity for entity in entities if entity is not None]
+
+
+def _lines(data: bytes) -> io.StringIO:
+    """Líneas del CSV con la misma traducción de saltos de línea que `open()`"""
+    return io.StringIO(data.decode("utf-8"), newline=None)
+
+
+def _read_current(csv_file: str, snapshot: BinarySnapshot, decoder: RowDecoder) -> list:
+    """Filas actuales del CSV: snapshot + registro si corresponden a él, o el CSV completo"""
+    stats = {"rows": 0}
+    loaded = snapshot.load()
+    if loaded is not None:
+        try:
+            entities = snapshot.replay(loaded, csv_file, decoder, stats)
+        except (ValueError, StopIteration, csv.Error) as e:
+            logger.warning(f"⚠️ No se pudo aplicar el registro {snapshot.log_path}, se lee el CSV: {e}")
+            entities = None
+        if entities is not None:
+            log_bytes = os.path.getsize(snapshot.log_path) if os.path.exists(snapshot.log_path) else 0
+            record_read(csv_file, stats["rows"], log_bytes)
+            return entities
+        stats = {"rows": 0}
+    with open(csv_file, "rb") as f:
+        data = f.read()
+    entities = list(decoder.decode(_lines(data), stats=stats))
+    record_read(csv_file, stats["rows"], len(data))
+    return entities
+
+
+def load_csv_snapshot(csv_file: str, snapshot: BinarySnapshot, decoder: RowDecoder) -> list:
+    """Todas las filas del CSV, usando el snapshot cuando corresponde a su contenido"""
+    with file_lock(csv_file):
+        if not os.path.exists(csv_file):
+            return []
+        return _read_current(csv_file, snapshot, decoder)
+
+
+def write_csv_snapshot(csv_file: str, snapshot: BinarySnapshot, decoder: RowDecoder) -> int:
+    """Escribe el snapshot del contenido actual del CSV. Retorna cuántas filas guardó (0 si no se pudo)"""
+    with file_lock(csv_file):
+        if not os.path.exists(csv_file):
+            return 0
+        entities = _read_current(csv_file, snapshot, decoder)
+        try:
+            snapshot.write(entities, *csv_version(csv_file))
+        except ValueError as e:
+            # El snapshot anterior (si lo hay) sigue siendo válido para su versión del CSV, con su registro
+            logger.warning(f"⚠️ No se escribió el snapshot de {csv_file}: {e}")
+            return 0
+        # Si el proceso se interrumpe antes de vaciarlo, volver a aplicar el registro no cambia el resultado
+        snapshot.reset_log()
+    record_write(snapshot.path, 'rewrite')
+    return len(entities)
@@ -0,0 +1,30 @@
+"""
+Fábricas de repositorios según el backend de almacenamiento configurado.
+"""
+import os
+
+from config.storage_config import StorageConfig, CSV, PARTITIONED
+from repositories.resource_repository import ResourceRepository
+from repositories.threat_repository import ThreatRepository
+from repositories.partitioned_repository import PartitionedResourceRepository, PartitionedThreatRepository
+
+
+def _check_backend(backend: str):
+    if backend not in (CSV, PARTITIONED):
+        raise ValueError(f"STORAGE_BACKEND inválido: {backend}. Valores permitidos: {[CSV, PARTITIONED]}")
+
+
+def create_resource_repository(csv_file: str = os.path.join(StorageConfig.DATA_DIR, "resources.csv")) -> ResourceRepository:
+    """Repositorio de recursos del backend configurado"""
+    _check_backend(StorageConfig.BACKEND)
+    if StorageConfig.BACKEND == PARTITIONED:
+        return PartitionedResourceRepository(csv_file)
+    return ResourceRepository(csv_file)
+
+
+def create_threat_repository(csv_file: str = os.path.join(StorageConfig.DATA_DIR, "threats.csv")) -> ThreatRepository:
+    """Repositorio de amenazas del backend configurado"""
+    _check_backend(StorageConfig.BACKEND)
+    if StorageConfig.BACKEND == PARTITIONED:
+        return PartitionedThreatRepository(csv_file)
+    return ThreatRepository(csv_file)
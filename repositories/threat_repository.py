@@ -1,13 +1,36 @@
 import csv
 import os
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from models.threat import Threat, TipoAmenaza, EstadoAmenaza
 from datetime import datetime
+from config.archive_config import ArchiveConfig
+from config.storage_config import StorageConfig
+from repositories.archive_repository import ArchiveRepository
+from repositories.csv_io import file_lock, read_models, read_views, scan_columns, record_write
+from repositories.id_sequence import IdSequence, sequence_path
+from repositories.row_decoder import RowDecoder, INT, TEXT, TIME
+from repositories.snapshot import BinarySnapshot, snapshot_path, load_csv_snapshot, write_csv_snapshot
+from repositories.change_log import ChangeLog, get_change_log, ENTITY_THREAT, ACTION_CREATED, ACTION_UPDATED, ACTION_DELETED, ACTION_ARCHIVED
+
+FIELDNAMES = ['id', 'zona_id', 'nombre', 'tipo', 'costo_hormigas', 'estado', 'hora_deteccion', 'hora_resolucion']
+
+# Decodificador de filas: columnas en el orden del constructor de Threat
+ROW_DECODER = RowDecoder(Threat, {
+    'id': INT, 'zona_id': INT, 'nombre': TEXT, 'tipo': TipoAmenaza, 'costo_hormigas': INT,
+    'estado': EstadoAmenaza, 'hora_deteccion': TIME, 'hora_resolucion': TIME,
+})
 
 
 class ThreatRepository:
-    def __init__(self, csv_file: str = "data/threats.csv"):
+    def __init__(self, csv_file: str = os.path.join(StorageConfig.DATA_DIR, "threats.csv"), change_log: Optional[ChangeLog] = None):
         self.csv_file = csv_file
+        self.change_log = change_log if change_log is not None else get_change_log(csv_file)
+        self.archive_repo = ArchiveRepository(
+            os.path.join(os.path.dirname(csv_file), ArchiveConfig.ARCHIVE_SUBDIR), "threats", FIELDNAMES
+        )
+        self.snapshot = BinarySnapshot(snapshot_path(csv_file), Threat, ROW_DECODER.columns)
+        # Último ID asignado, para no reutilizar IDs archivados o eliminados
+        self.ids = IdSequence(sequence_path(csv_file), self.archive_repo.max_id)
         self._ensure_file_exists()
 
     def _ensure_file_exists(self):
@@ -16,29 +39,51 @@ class ThreatRepository:
             os.makedirs(os.path.dirname(self.csv_file), exist_ok=True)
             with open(self.csv_file, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.writer(f)
-                writer.writerow(['id', 'zona_id', 'nombre', 'tipo', 'costo_hormigas', 
-                               'estado', 'hora_deteccion', 'hora_resolucion'])
+                writer.writerow(FIELDNAMES)
 
     def get_all(self, zona_id: Optional[int] = None, estado: Optional[str] = None) -> List[Threat]:
-        """Lee todos los registros del CSV con filtros opcionales"""
-        threats = []
-        if not os.path.exists(self.csv_file):
-            return threats
-
-        with open(self.csv_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                threat = self._dict_to_model(row)
-                
-                # Aplicar filtros
-                if zona_id is not None and threat.zona_id != zona_id:
-                    continue
-                if estado is not None and threat.estado.value != estado:
-                    continue
-                    
-                threats.append(threat)
-        return threats
+        """Lee todos los registros del CSV con filtros opcionales (aplicados antes de construir cada amenaza)"""
+        where = {}
+        if zona_id is not None:
+            where['zona_id'] = zona_id
+        if estado is not None:
+            where['estado'] = estado
+        return list(read_models(self.csv_file, ROW_DECODER, where))
+
+    def scan(self, zona_id: Optional[int] = None, estado: Optional[str] = None) -> list:
+        """Como get_all, pero con vistas de solo lectura que convierten cada campo al leerlo
+        (para recorridos completos que usan pocos campos; `to_model()` arma la amenaza)"""
+        where = {}
+        if zona_id is not None:
+            where['zona_id'] = zona_id
+        if estado is not None:
+            where['estado'] = estado
+        return list(read_views(self.csv_file, ROW_DECODER, where))
         
+    def project(self, columns: List[str], zona_id: Optional[int] = None, estado: Optional[str] = None,
+                raw: bool = False) -> List[dict]:
+        """Solo las columnas pedidas de cada amenaza, sin construir el modelo. Con `raw` los enums
+        y las fechas quedan como texto (igual que al serializar el modelo a JSON)"""
+        where = {}
+        if zona_id is not None:
+            where['zona_id'] = zona_id
+        if estado is not None:
+            where['estado'] = estado
+        return [dict(zip(columns, row)) for row in scan_columns(self.csv_file, ROW_DECODER, columns, where, raw)]
+
+    def lock_all(self):
+        """Bloquea todas las escrituras del repositorio (p. ej. para leer un estado consistente)"""
+        return file_lock(self.csv_file)
+
+    def load_all(self) -> List[Threat]:
+        """Todas las amenazas: desde el snapshot binario más las filas agregadas después,
+        o desde el CSV completo si fue reescrito desde el último snapshot"""
+        return load_csv_snapshot(self.csv_file, self.snapshot, ROW_DECODER)
+
+    def write_snapshot(self) -> int:
+        """Escribe el snapshot binario del CSV actual. Retorna cuántas filas guardó"""
+        return write_csv_snapshot(self.csv_file, self.snapshot, ROW_DECODER)
+
     def _dict_to_model(self, data: dict) -> Threat:
         """Convierte un diccionario a modelo Threat"""
         return Threat(
@@ -65,59 +110,148 @@ class ThreatRepository:
             'hora_resolucion': threat.hora_resolucion.isoformat() if threat.hora_resolucion else ''
         }
 
-    def _save_all(self, threats: List[Threat]):
-        """Guarda todos los registros en el CSV"""
+    def _save_all(self, threats: List[Threat], touched: Optional[Iterable[int]] = None):
+        """Guarda todos los registros en el CSV. `touched` son los IDs creados, modificados
+        o eliminados, para el registro del snapshot (None si cambió todo el archivo)"""
         with open(self.csv_file, 'w', newline='', encoding='utf-8') as f:
-            fieldnames = ['id', 'zona_id', 'nombre', 'tipo', 'costo_hormigas', 
-                         'estado', 'hora_deteccion', 'hora_resolucion']
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
             writer.writeheader()
             for threat in threats:
                 writer.writerow(self._model_to_dict(threat))
+        record_write(self.csv_file, 'rewrite')
+        self.snapshot.record(self.csv_file, threats, touched, self._model_to_dict)
 
     def create(self, threat: Threat) -> Threat:
         """Crea una nueva amenaza"""
-        all_threats = self.get_all()
-        
-        # Asignar ID
-        if not threat.id:
-            max_id = max([t.id for t in all_threats], default=0)
-            threat.id = max_id + 1
-        
-        all_threats.append(threat)
-        self._save_all(all_threats)
+        with file_lock(self.csv_file):
+            all_threats = self.get_all()
+            
+            # Asignar ID
+            if not threat.id:
+                threat.id = self.ids.next_id(max([t.id for t in all_threats], default=0))
+            self.ids.advance(threat.id)
+            
+            all_threats.append(threat)
+            self._save_all(all_threats, [threat.id])
+            self.change_log.publish(ENTITY_THREAT, ACTION_CREATED, threat.id, threat.zona_id, data=threat)
         return threat
 
+    def create_many(self, threats: List[Threat]) -> List[Threat]:
+        """Crea varias amenazas con una sola lectura del CSV y una sola escritura en modo append"""
+        if not threats:
+            return []
+        with file_lock(self.csv_file):
+            next_id = self.ids.next_id(max([t.id for t in self.get_all()], default=0))
+            for threat in threats:
+                # Respetar IDs asignados previamente, igual que create()
+                if not threat.id:
+                    threat.id = next_id
+                next_id = max(next_id, threat.id) + 1
+            self.ids.advance(next_id - 1)
+            with open(self.csv_file, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+                for threat in threats:
+                    writer.writerow(self._model_to_dict(threat))
+            record_write(self.csv_file, 'append')
+            self.snapshot.record(self.csv_file, threats, [t.id for t in threats], self._model_to_dict)
+            for threat in threats:
+                self.change_log.publish(ENTITY_THREAT, ACTION_CREATED, threat.id, threat.zona_id, data=threat)
+        return threats
 
     def get_by_id(self, threat_id: int) -> Optional[Threat]:
         """Busca una amenaza por ID"""
-        all_threats = self.get_all()
-        for threat in all_threats:
-            if threat.id == threat_id:
-                return threat
-        return None
+        matches = list(read_models(self.csv_file, ROW_DECODER, {'id': threat_id}))
+        return matches[0] if matches else None
 
 
     def update(self, threat_id: int, threat: Threat) -> Optional[Threat]:
         """Actualiza una amenaza existente"""
-        all_threats = self.get_all()
-        for i, t in enumerate(all_threats):
-            if t.id == threat_id:
-                threat.id = threat_id
-                all_threats[i] = threat
-                self._save_all(all_threats)
-                return threat
+        with file_lock(self.csv_file):
+            all_threats = self.get_all()
+            for i, t in enumerate(all_threats):
+                if t.id == threat_id:
+                    threat.id = threat_id
+                    all_threats[i] = threat
+                    self._save_all(all_threats, [threat_id])
+                    self.change_log.publish(
+                        ENTITY_THREAT, ACTION_UPDATED, threat_id, threat.zona_id, data=threat, previous=t
+                    )
+                    return threat
         return None
 
+    def update_many(self, threats: List[Threat]) -> List[Threat]:
+        """Actualiza varias amenazas con una sola lectura y una sola reescritura del CSV"""
+        if not threats:
+            return []
+        by_id = {t.id: t for t in threats}
+        with file_lock(self.csv_file):
+            all_threats = self.get_all()
+            changed = []
+            for i, t in enumerate(all_threats):
+                threat = by_id.get(t.id)
+                if threat is not None:
+                    all_threats[i] = threat
+                    changed.append((t, threat))
+            if changed:
+                self._save_all(all_threats, [threat.id for _, threat in changed])
+                for previous, threat in changed:
+                    self.change_log.publish(
+                        ENTITY_THREAT, ACTION_UPDATED, threat.id, threat.zona_id, data=threat, previous=previous
+                    )
+        return [threat for _, threat in changed]
+
     def delete(self, threat_id: int) -> bool:
         """Elimina una amenaza"""
-        all_threats = self.get_all()
-        initial_length = len(all_threats)
-        all_threats = [t for t in all_threats if t.id != threat_id]
-        
-        if len(all_threats) < initial_length:
-            self._save_all(all_threats)
-            return True
+        with file_lock(self.csv_file):
+            all_threats = self.get_all()
+            removed = [t for t in all_threats if t.id == threat_id]
+            all_threats = [t for t in all_threats if t.id != threat_id]
+            
+            if removed:
+                self._save_all(all_threats, [threat_id])
+                for t in removed:
+                    self.change_log.publish(ENTITY_THREAT, ACTION_DELETED, threat_id, t.zona_id, previous=t)
+                return True
         return False
 
+    @staticmethod
+    def _archived_at(threat: Threat) -> Optional[datetime]:
+        return threat.hora_resolucion or threat.hora_deteccion
+
+    def _is_archivable(self, threat: Threat, before: datetime) -> bool:
+        archived_at = self._archived_at(threat)
+        return threat.estado == EstadoAmenaza.RESUELTA and archived_at is not None and archived_at < before
+
+    def _archive_rows(self, threats: List[Threat]):
+        """Agrega las amenazas al archivo, en la partición del mes de su resolución"""
+        months = {t.id: self._archived_at(t) for t in threats}
+        self.archive_repo.append([self._model_to_dict(t) for t in threats], lambda row: months[row['id']])
 
+    def archive(self, before: datetime) -> int:
+        """Mueve al archivo las amenazas resueltas antes de `before`. Retorna cuántas se movieron.
+        Sus IDs no se reutilizan: create() asigna desde la secuencia persistida."""
+        with file_lock(self.csv_file):
+            all_threats = self.get_all()
+            archived = [t for t in all_threats if self._is_archivable(t, before)]
+            if not archived:
+                return 0
+            # Primero el archivo y luego el CSV (una interrupción deja un duplicado, no una pérdida)
+            self._archive_rows(archived)
+            archived_ids = {t.id for t in archived}
+            self._save_all([t for t in all_threats if t.id not in archived_ids], archived_ids)
+            for t in archived:
+                self.change_log.publish(ENTITY_THREAT, ACTION_ARCHIVED, t.id, t.zona_id, previous=t)
+        return len(archived)
+
+    def get_archived(self, zona_id: Optional[int] = None, estado: Optional[str] = None,
+                     months: Optional[List[str]] = None) -> List[Threat]:
+        """Lee las amenazas archivadas (solo las particiones `months`, si se indican)"""
+        threats = []
+        for row in self.archive_repo.read_rows(months):
+            threat = self._dict_to_model(row)
+            if zona_id is not None and threat.zona_id != zona_id:
+                continue
+            if estado is not None and threat.estado.value != estado:
+                continue
+            threats.append(threat)
+        return threats
@@ -2,12 +2,16 @@ import csv
 import os
 from typing import List, Optional
 from datetime import datetime
+from config.storage_config import StorageConfig
 from models.zone import Zona, TipoZona
+from repositories.csv_io import file_lock, read_rows, record_write
+from repositories.change_log import get_change_log, ENTITY_ZONE, ACTION_CREATED, ACTION_DELETED
 
 
 class ZoneRepository:
-    def __init__(self, csv_file: str = "data/zones.csv"):
+    def __init__(self, csv_file: str = os.path.join(StorageConfig.DATA_DIR, "zones.csv")):
         self.csv_file = csv_file
+        self.change_log = get_change_log(csv_file)
         self._ensure_file_exists()
 
     def _ensure_file_exists(self):
@@ -18,43 +22,79 @@ class ZoneRepository:
                 writer = csv.writer(f)
                 writer.writerow(['id', 'nombre', 'tipo', 'fecha_creacion', 'elementos_asociados'])
 
+    def lock_all(self):
+        """Bloquea todas las escrituras del repositorio (p. ej. para leer un estado consistente)"""
+        return file_lock(self.csv_file)
+
+    def _row_to_zona(self, row: dict) -> Zona:
+        """Convierte una fila del CSV a modelo Zona"""
+        return Zona(
+            id=int(row['id']),
+            nombre=row['nombre'],
+            tipo=TipoZona(row['tipo']),
+            fecha_creacion=datetime.strptime(row['fecha_creacion'], '%Y-%m-%d %H:%M:%S')
+        )
+
     def zone_exists(self, zone_id: int) -> bool:
         """Verifica si una zona existe"""
 
-        if not os.path.exists(self.csv_file):
-            return False
-
-        with open(self.csv_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                raw_id = row.get('id')
+        for row in read_rows(self.csv_file):
+            raw_id = row.get('id')
 
-                # Ignorar IDs vacíos o None
-                if not raw_id or raw_id.strip() == "":
-                    continue
+            # Ignorar IDs vacíos o None
+            if not raw_id or raw_id.strip() == "":
+                continue
 
-                try:
-                    if int(raw_id) == zone_id:
-                        return True
-                except ValueError:
-                    # Si el CSV tiene basura (ej: texto donde debería haber un número)
-                    continue
+            try:
+                if int(raw_id) == zone_id:
+                    return True
+            except ValueError:
+                # Si el CSV tiene basura (ej: texto donde debería haber un número)
+                continue
 
         return False
 
     def crearZona(self, zona: Zona) -> None:
         """Agrega una nueva zona al CSV"""
-        if self.zone_exists(zona.id):
-            raise ValueError(f"La zona con id {zona.id} ya existe.")
-
-        with open(self.csv_file, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                zona.id,
-                zona.nombre,
-                zona.tipo.value,
-                zona.fecha_creacion.strftime('%Y-%m-%d %H:%M:%S')
-            ])
+        with file_lock(self.csv_file):
+            if self.zone_exists(zona.id):
+                raise ValueError(f"La zona con id {zona.id} ya existe.")
+
+            with open(self.csv_file, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow([
+                    zona.id,
+                    zona.nombre,
+                    zona.tipo.value,
+                    zona.fecha_creacion.strftime('%Y-%m-%d %H:%M:%S')
+                ])
+            record_write(self.csv_file, 'append')
+            self.change_log.publish(ENTITY_ZONE, ACTION_CREATED, zona.id, zona.id, data=zona)
+
+    def crearZonas(self, zonas: List[Zona]) -> List[Zona]:
+        """Agrega varias zonas al CSV con una sola lectura y una sola escritura"""
+        nuevas = []
+        with file_lock(self.csv_file):
+            existentes = {z.id for z in self.obtenerTodasLasZonas()}
+
+            with open(self.csv_file, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                for zona in zonas:
+                    # Las zonas ya existentes se omiten en lugar de fallar
+                    if zona.id in existentes:
+                        continue
+                    existentes.add(zona.id)
+                    nuevas.append(zona)
+                    writer.writerow([
+                        zona.id,
+                        zona.nombre,
+                        zona.tipo.value,
+                        zona.fecha_creacion.strftime('%Y-%m-%d %H:%M:%S')
+                    ])
+            record_write(self.csv_file, 'append')
+            for zona in nuevas:
+                self.change_log.publish(ENTITY_ZONE, ACTION_CREATED, zona.id, zona.id, data=zona)
+        return nuevas
 
     def eliminarZona(self, zone_id: int) -> bool:
         """Elimina una zona por ID. Devuelve True si se eliminó."""
@@ -62,56 +102,40 @@ class ZoneRepository:
             return False
 
         zonas = []
-        eliminado = False
+        eliminado = None
 
-        with open(self.csv_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
+        with file_lock(self.csv_file):
+            # Conservar el encabezado original (puede incluir 'elementos_asociados')
+            fieldnames = ['id', 'nombre', 'tipo', 'fecha_creacion']
+            for row in read_rows(self.csv_file):
+                fieldnames = list(row.keys())
                 if int(row['id']) != zone_id:
                     zonas.append(row)
                 else:
-                    eliminado = True
+                    eliminado = self._row_to_zona(row)
 
-        if eliminado:
-            with open(self.csv_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=['id', 'nombre', 'tipo', 'fecha_creacion'])
-                writer.writeheader()
-                writer.writerows(zonas)
+            if eliminado is not None:
+                with open(self.csv_file, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.DictWriter(f, fieldnames=fieldnames)
+                    writer.writeheader()
+                    writer.writerows(zonas)
+                record_write(self.csv_file, 'rewrite')
+                self.change_log.publish(ENTITY_ZONE, ACTION_DELETED, zone_id, zone_id, previous=eliminado)
 
-        return eliminado
+        return eliminado is not None
 
     def obtenerZonaPorId(self, zone_id: int) -> Optional[Zona]:
         """Devuelve una zona por su ID o None si no existe"""
-        if not os.path.exists(self.csv_file):
-            return None
-
-        with open(self.csv_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if int(row['id']) == zone_id:
-                    return Zona(
-                        id=int(row['id']),
-                        nombre=row['nombre'],
-                        tipo=TipoZona(row['tipo']),
-                        fecha_creacion=datetime.strptime(row['fecha_creacion'], '%Y-%m-%d %H:%M:%S')
-                    )
+        for row in read_rows(self.csv_file):
+            if int(row['id']) == zone_id:
+                return self._row_to_zona(row)
         return None
 
     def obtenerTodasLasZonas(self) -> List[Zona]:
         """Devuelve una lista con todas las zonas"""
         zonas = []
-        if not os.path.exists(self.csv_file):
-            return zonas
-
-        with open(self.csv_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                zonas.append(Zona(
-                    id=int(row['id']),
-                    nombre=row['nombre'],
-                    tipo=TipoZona(row['tipo']),
-                    fecha_creacion=datetime.strptime(row['fecha_creacion'], '%Y-%m-%d %H:%M:%S')
-                ))
+        for row in read_rows(self.csv_file):
+            zonas.append(self._row_to_zona(row))
         return zonas
     
     def obtenerZonasPorTipo(self, tipo: TipoZona) -> List[Zona]:
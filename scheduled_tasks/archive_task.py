@@ -0,0 +1,9 @@
+from services.archiver import archiver
+
+def archive_task():
+    print("Iniciando tarea programada: archive_task")
+    
+    result = archiver.archive()
+    if result["resources"] or result["threats"]:
+        print(f"Archivados: {result['resources']} recursos - {result['threats']} amenazas")
+    return result
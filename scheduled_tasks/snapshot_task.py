@@ -0,0 +1,8 @@
+from services.snapshotter import snapshotter
+
+def snapshot_task():
+    print("Iniciando tarea programada: snapshot_task")
+    
+    result = snapshotter.snapshot()
+    print(f"Snapshot: {result['resources']} recursos - {result['threats']} amenazas")
+    return result
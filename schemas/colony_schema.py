@@ -0,0 +1,7 @@
+from pydantic import BaseModel, Field
+from typing import Dict
+
+
+class AllocationRequest(BaseModel):
+    # Hormigas disponibles por ID de zona
+    hormigas: Dict[int, int] = Field(..., min_length=1)
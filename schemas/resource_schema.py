@@ -27,6 +27,7 @@ class ResourceResponse(BaseModel):
     estado: EstadoRecurso
     hora_creacion: datetime
     hora_recoleccion: Optional[datetime] = None
+    hora_inicio_recoleccion: Optional[datetime] = None
 
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -0,0 +1,226 @@
+"""
+Optimizador de asignación de hormigas por zona.
+
+Con las hormigas disponibles de una zona, primero se neutralizan sus amenazas
+activas (de menor a mayor costo, lo que maximiza la cantidad neutralizada) y
+con las restantes se eligen los recursos disponibles que maximizan el valor
+recolectado por segundo: una mochila 0/1 donde el peso es `hormigas_requeridas`
+y el valor `cantidad_unitaria * peso / duracion_recoleccion`, de modo que la
+densidad de cada candidato es su valor por hormiga-segundo.
+
+Los candidatos se mantienen indexados por zona a partir del registro de cambios,
+así que una consulta no relee los CSV.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from config.allocation_config import AllocationConfig
+from models.resource import EstadoRecurso, Resource
+from models.threat import EstadoAmenaza, Threat
+from services.materialized_view import MaterializedView
+from services.threat_escalation import with_escalation_all
+
+
+@dataclass
+class KnapsackResult:
+    selected: List[int]
+    value: float
+    # Cota superior de la relajación lineal (valor fraccionario óptimo)
+    bound: float
+    exact: bool
+
+
+def _dp(weights: Sequence[int], values: Sequence[float], items: List[int], capacity: int) -> List[int]:
+    """
+    Mochila 0/1 exacta por programación dinámica sobre la capacidad. Cada fila se
+    calcula con operaciones sobre listas completas en lugar de celda por celda.
+    """
+    best = [0.0] * (capacity + 1)
+    rows = []
+    for i in items:
+        w, v = weights[i], values[i]
+        if w > capacity:
+            rows.append(b"")
+            continue
+        candidates = [b + v for b in best[:capacity + 1 - w]]
+        current = best[w:]
+        rows.append(bytes(c > b for c, b in zip(candidates, current)))
+        best[w:] = [c if c > b else b for c, b in zip(candidates, current)]
+
+    selected = []
+    remaining = capacity
+    for i, row in zip(reversed(items), reversed(rows)):
+        w = weights[i]
+        if remaining >= w and row[remaining - w]:
+            selected.append(i)
+            remaining -= w
+    return selected
+
+
+def _greedy(weights: Sequence[int], items: List[int], capacity: int) -> List[int]:
+    """Toma en orden los candidatos que todavía caben"""
+    selected = []
+    for i in items:
+        if weights[i] <= capacity:
+            selected.append(i)
+            capacity -= weights[i]
+    return selected
+
+
+def solve_knapsack(
+    weights: Sequence[int],
+    values: Sequence[float],
+    capacity: int,
+    max_cells: Optional[int] = None,
+    core_size: Optional[int] = None
+) -> KnapsackResult:
+    """
+    Elige los índices que maximizan la suma de `values` sin superar `capacity`.
+
+    Si candidatos * capacidad no supera `max_cells` la solución es exacta. Si no,
+    se ordena por densidad, se toman los candidatos anteriores al núcleo, se
+    descartan los posteriores y solo el núcleo se resuelve de forma exacta; la
+    capacidad que sobre se completa de forma voraz. `bound` permite medir la
+    distancia al óptimo.
+    """
+    max_cells = AllocationConfig.DP_MAX_CELLS if max_cells is None else max_cells
+    core_size = AllocationConfig.CORE_SIZE if core_size is None else core_size
+
+    # Los candidatos sin peso siempre se toman; los que no caben nunca
+    free = [i for i in range(len(weights)) if weights[i] <= 0 and values[i] > 0]
+    candidates = [i for i in range(len(weights)) if 0 < weights[i] <= capacity and values[i] > 0]
+    candidates.sort(key=lambda i: values[i] / weights[i], reverse=True)
+
+    base = sum(values[i] for i in free)
+    bound = base
+    remaining = capacity
+    split = len(candidates)
+    for position, i in enumerate(candidates):
+        if weights[i] > remaining:
+            bound += values[i] * remaining / weights[i]
+            split = position
+            break
+        remaining -= weights[i]
+        bound += values[i]
+
+    if split == len(candidates):
+        chosen = candidates
+    elif len(candidates) * capacity <= max_cells:
+        chosen = _dp(weights, values, candidates, capacity)
+    else:
+        start, end = max(0, split - core_size), min(len(candidates), split + core_size)
+        chosen = candidates[:start]
+        left = capacity - sum(weights[i] for i in chosen)
+        core = candidates[start:end]
+        core_chosen = _dp(weights, values, core, left) if len(core) * left <= max_cells else _greedy(weights, core, left)
+        chosen += core_chosen
+        left -= sum(weights[i] for i in core_chosen)
+        chosen += _greedy(weights, candidates[end:], left)
+
+    selected = free + chosen
+    value = sum(values[i] for i in selected)
+    exact = split == len(candidates) or len(candidates) * capacity <= max_cells or value >= bound - 1e-9
+    return KnapsackResult(selected=sorted(selected), value=value, bound=bound, exact=exact)
+
+
+def resource_value(resource: Resource) -> float:
+    """Valor recolectado por segundo (cantidad * peso / duración)"""
+    return resource.cantidad_unitaria * resource.peso / max(resource.duracion_recoleccion, 1)
+
+
+def allocate_zone(zona_id: int, hormigas: int, resources: List[Resource], threats: List[Threat]) -> dict:
+    """Asignación de `hormigas` entre las amenazas activas y los recursos disponibles de una zona"""
+    amenazas = []
+    pendientes = []
+    remaining = hormigas
+    for threat in sorted(threats, key=lambda t: (t.costo_hormigas, t.id)):
+        if threat.costo_hormigas <= remaining:
+            amenazas.append(threat)
+            remaining -= threat.costo_hormigas
+        else:
+            pendientes.append(threat.id)
+
+    resources = sorted(resources, key=lambda r: r.id)
+    values = [resource_value(r) for r in resources]
+    result = solve_knapsack([r.hormigas_requeridas for r in resources], values, remaining)
+    recursos = [resources[i] for i in result.selected]
+    asignadas = hormigas - remaining + sum(r.hormigas_requeridas for r in recursos)
+
+    return {
+        "zona_id": zona_id,
+        "hormigas_disponibles": hormigas,
+        "hormigas_asignadas": asignadas,
+        "hormigas_libres": hormigas - asignadas,
+        "amenazas": [
+            {"id": t.id, "nombre": t.nombre, "costo_hormigas": t.costo_hormigas}
+            for t in sorted(amenazas, key=lambda t: t.id)
+        ],
+        "amenazas_pendientes": sorted(pendientes),
+        "recursos": [
+            {
+                "id": r.id,
+                "nombre": r.nombre,
+                "hormigas_requeridas": r.hormigas_requeridas,
+                "duracion_recoleccion": r.duracion_recoleccion,
+                "valor_por_segundo": round(values[i], 6),
+            }
+            for i, r in zip(result.selected, recursos)
+        ],
+        "valor_por_segundo": round(result.value, 6),
+        "cota_superior": round(result.bound, 6),
+        "exacto": result.exact,
+        "candidatos": len(resources) + len(threats),
+    }
+
+
+class AllocationCandidates(MaterializedView):
+    """Recursos disponibles y amenazas activas indexados por zona"""
+
+    def reset(self):
+        self._resources: Dict[int, Dict[int, Resource]] = {}
+        self._threats: Dict[int, Dict[int, Threat]] = {}
+
+    @staticmethod
+    def _index(index: Dict[int, dict], entity, sign: int):
+        if sign > 0:
+            index.setdefault(entity.zona_id, {})[entity.id] = entity
+            return
+        bucket = index.get(entity.zona_id)
+        if bucket is not None:
+            bucket.pop(entity.id, None)
+            if not bucket:
+                del index[entity.zona_id]
+
+    def apply_resource(self, resource: Resource, sign: int):
+        if resource.estado == EstadoRecurso.DISPONIBLE:
+            self._index(self._resources, resource, sign)
+
+    def apply_threat(self, threat: Threat, sign: int):
+        if threat.estado == EstadoAmenaza.ACTIVA:
+            self._index(self._threats, threat, sign)
+
+    def allocate(self, hormigas_por_zona: Dict[int, int], now: Optional[datetime] = None) -> dict:
+        """Asignación óptima para cada zona de `hormigas_por_zona`"""
+        self.ensure_started()
+        with self.lock:
+            version = self.version
+            candidates = {
+                zona_id: (list(self._resources.get(zona_id, {}).values()), list(self._threats.get(zona_id, {}).values()))
+                for zona_id in hormigas_por_zona
+            }
+        now = now or datetime.now()
+        zonas = [
+            allocate_zone(zona_id, hormigas, candidates[zona_id][0], with_escalation_all(candidates[zona_id][1], now))
+            for zona_id, hormigas in sorted(hormigas_por_zona.items())
+        ]
+        return {
+            "version": version,
+            "valor_por_segundo": round(sum(z["valor_por_segundo"] for z in zonas), 6),
+            "hormigas_asignadas": sum(z["hormigas_asignadas"] for z in zonas),
+            "zonas": zonas,
+        }
+
+
+# Instancia global del índice de candidatos
+allocation_candidates = AllocationCandidates()
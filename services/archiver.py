@@ -0,0 +1,104 @@
+"""
+Archivado de filas en estado terminal (hot/cold).
+
+Los recursos recolectados y las amenazas resueltas no vuelven a cambiar: pasada
+la ventana de retención se mueven a particiones mensuales comprimidas, de modo
+que el CSV principal (el que se recorre y reescribe en cada operación) solo
+contiene las filas vivas. Las consultas con `include_archived=true` leen además
+el archivo, recorriendo solo las particiones que pueden contener el rango pedido.
+"""
+from datetime import datetime, timedelta
+from typing import List, Optional
+import logging
+
+from config.archive_config import ArchiveConfig
+from repositories.resource_repository import ResourceRepository
+from repositories.threat_repository import ThreatRepository
+from repositories.storage import create_resource_repository, create_threat_repository
+
+logger = logging.getLogger(__name__)
+
+
+def _local(value: datetime) -> datetime:
+    """Las fechas con zona horaria se comparan en hora local, como las del CSV"""
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+def list_archived(repo, archive_field: str, zona_id: Optional[int] = None, estado: Optional[str] = None,
+                  time_field: Optional[str] = None, after: Optional[datetime] = None,
+                  before: Optional[datetime] = None) -> list:
+    """
+    Filas archivadas de `repo` con los mismos filtros que el listado. Si el rango
+    es sobre `archive_field` (el campo que define la partición) solo se leen los
+    meses que lo intersectan.
+    """
+    after = _local(after) if after is not None else None
+    before = _local(before) if before is not None else None
+    months = None
+    if time_field == archive_field and (after is not None or before is not None):
+        months = [
+            month for month in repo.archive_repo.partitions()
+            if (after is None or month >= after.strftime("%Y-%m"))
+            and (before is None or month <= before.strftime("%Y-%m"))
+        ]
+    archived = repo.get_archived(zona_id=zona_id, estado=estado, months=months)
+    if after is None and before is None:
+        return archived
+    selected = []
+    for entity in archived:
+        value = getattr(entity, time_field)
+        if value is None or (after is not None and value < after) or (before is not None and value >= before):
+            continue
+        selected.append(entity)
+    return selected
+
+
+def merge_archived(hot: list, archived: list) -> list:
+    """Une filas vivas y archivadas por ID (la fila viva gana si quedó duplicada)"""
+    hot_ids = {entity.id for entity in hot}
+    return sorted(hot + [entity for entity in archived if entity.id not in hot_ids], key=lambda e: e.id)
+
+
+class Archiver:
+    """Mueve al archivo las filas terminales más antiguas que la ventana de retención"""
+
+    def __init__(
+        self,
+        resource_repo: Optional[ResourceRepository] = None,
+        threat_repo: Optional[ThreatRepository] = None
+    ):
+        self.resource_repo = resource_repo if resource_repo is not None else create_resource_repository()
+        self.threat_repo = threat_repo if threat_repo is not None else create_threat_repository()
+        self.retention = timedelta(hours=ArchiveConfig.RETENTION_HOURS)
+        self.archived = {"resources": 0, "threats": 0}
+        self.last_run: Optional[datetime] = None
+
+    def archive(self, now: Optional[datetime] = None) -> dict:
+        """Archiva recursos y amenazas terminales anteriores a `now - retención`"""
+        now = now or datetime.now()
+        before = now - self.retention
+        result = {
+            "resources": self.resource_repo.archive(before),
+            "threats": self.threat_repo.archive(before),
+        }
+        for key, count in result.items():
+            self.archived[key] += count
+        self.last_run = now
+        if result["resources"] or result["threats"]:
+            logger.info(f"🗄️ Archivados {result['resources']} recursos y {result['threats']} amenazas anteriores a {before.isoformat()}")
+        return result
+
+    def get_status(self) -> dict:
+        return {
+            "retention_hours": self.retention.total_seconds() / 3600,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "archived": dict(self.archived),
+            "partitions": {
+                "resources": self.resource_repo.archive_repo.partitions(),
+                "threats": self.threat_repo.archive_repo.partitions(),
+            },
+        }
+
+
+# Instancia global del archivador
+archiver = Archiver()
@@ -0,0 +1,89 @@
+"""
+Event loop de asyncio en un hilo propio.
+Permite que los servicios en segundo plano mantengan recursos ligados al loop
+(p. ej. un pool de conexiones httpx.AsyncClient) entre ejecuciones, sin
+bloquear el loop del servidor.
+"""
+from typing import Awaitable, Callable, Optional
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundLoop:
+    """Ejecuta una corrutina principal en un loop dedicado hasta que se detiene"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._ready = threading.Event()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, main: Callable[[asyncio.Event], Awaitable[None]]):
+        """Inicia el hilo; `main` recibe el evento que se activa al detener"""
+        if self.is_running:
+            return
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, args=(main,), name=self.name, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self, main):
+        try:
+            asyncio.run(self._main(main))
+        except Exception as e:
+            logger.error(f"❌ Error en el loop '{self.name}': {e}")
+        finally:
+            self._loop = None
+            self._ready.set()
+
+    async def _main(self, main):
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        self._ready.set()
+        await main(self._stop_event)
+
+    def call_soon(self, callback: Callable, *args):
+        """Programa un callback en el loop desde cualquier hilo"""
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            # El loop ya se cerró
+            pass
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Ejecuta una corrutina en el loop desde otro hilo y espera su resultado"""
+        loop = self._loop
+        if loop is None:
+            coro.close()
+            raise RuntimeError(f"El loop '{self.name}' no está en ejecución")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+    def stop(self, timeout: float = 10):
+        """Solicita la detención y espera a que termine el hilo"""
+        if self._stop_event is not None:
+            self.call_soon(self._stop_event.set)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+
+async def wait_for_signal(stop_event: asyncio.Event, wake_event: asyncio.Event, timeout: float):
+    """Espera hasta `timeout` segundos o hasta que se active alguno de los eventos"""
+    waiters = [asyncio.ensure_future(stop_event.wait()), asyncio.ensure_future(wake_event.wait())]
+    try:
+        await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for waiter in waiters:
+            waiter.cancel()
+    wake_event.clear()
@@ -0,0 +1,197 @@
+"""
+Temporizadores de recolección.
+
+Cuando un recurso entra en `en_recoleccion` se programa su paso a `recolectado`
+para `hora_inicio_recoleccion + duracion_recoleccion`. Los temporizadores viven
+en un heap en memoria (sin un job de APScheduler por recurso), se alimentan de
+los eventos del registro de cambios y un único job periódico aplica los
+vencidos en lotes, con una escritura del CSV por lote. Al iniciar se
+reconstruyen a partir de los recursos persistidos.
+"""
+from apscheduler.schedulers.background import BackgroundScheduler
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import heapq
+import logging
+import threading
+
+from config.collection_timers_config import CollectionTimersConfig
+from models.resource import EstadoRecurso, Resource
+from repositories.change_log import ChangeEvent, ChangeLog, ENTITY_RESOURCE
+from repositories.resource_repository import ResourceRepository
+from repositories.storage import create_resource_repository
+from services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def collection_due_time(resource: Resource) -> datetime:
+    """Momento en que termina la recolección de un recurso"""
+    return resource.hora_inicio_recoleccion + timedelta(seconds=resource.duracion_recoleccion)
+
+
+class CollectionTimers:
+    """Heap de vencimientos con cancelación perezosa"""
+
+    def __init__(self, resource_repo: Optional[ResourceRepository] = None):
+        self.scheduler = BackgroundScheduler()
+        self.resource_repo = resource_repo if resource_repo is not None else create_resource_repository()
+        self.is_running = False
+        self._heap: List[Tuple[datetime, int]] = []
+        # Vencimiento vigente por recurso; las entradas del heap que no coinciden están canceladas
+        self._due: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._change_log: Optional[ChangeLog] = None
+        self.completed = 0
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def schedule(self, resource_id: int, due: datetime):
+        with self._lock:
+            if self._due.get(resource_id) == due:
+                return
+            self._due[resource_id] = due
+            heapq.heappush(self._heap, (due, resource_id))
+            # Compactar si las entradas canceladas dominan el heap
+            if len(self._heap) > 2 * len(self._due) + 1024:
+                self._heap = [(d, rid) for rid, d in self._due.items()]
+                heapq.heapify(self._heap)
+
+    def cancel(self, resource_id: int):
+        with self._lock:
+            self._due.pop(resource_id, None)
+
+    def track(self, resource: Resource):
+        """Programa o cancela el temporizador según el estado actual del recurso"""
+        if resource.estado == EstadoRecurso.EN_RECOLECCION and resource.hora_inicio_recoleccion is not None:
+            self.schedule(resource.id, collection_due_time(resource))
+        else:
+            self.cancel(resource.id)
+
+    def on_change(self, event: ChangeEvent):
+        """Listener del registro de cambios"""
+        if event.entity != ENTITY_RESOURCE:
+            return
+        if event.data is None:
+            self.cancel(event.entity_id)
+        else:
+            self.track(event.data)
+
+    def rebuild(self, now: Optional[datetime] = None) -> int:
+        """
+        Reconstruye los temporizadores desde el CSV. Los recursos en recolección
+        sin hora de inicio (datos anteriores a la columna) empiezan a contar ahora.
+        """
+        now = now or datetime.now()
+        with self._lock:
+            self._heap = []
+            self._due = {}
+        for resource in self.resource_repo.get_all(estado=EstadoRecurso.EN_RECOLECCION.value):
+            if resource.hora_inicio_recoleccion is None:
+                resource.hora_inicio_recoleccion = now
+            self.schedule(resource.id, collection_due_time(resource))
+        logger.info(f"Temporizadores de recolección reconstruidos: {len(self._due)}")
+        return len(self._due)
+
+    def pop_due(self, now: datetime, limit: int) -> Dict[int, datetime]:
+        """Extrae hasta `limit` temporizadores vencidos"""
+        due: Dict[int, datetime] = {}
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now and len(due) < limit:
+                when, resource_id = heapq.heappop(self._heap)
+                if self._due.get(resource_id) == when:
+                    del self._due[resource_id]
+                    due[resource_id] = when
+        return due
+
+    def flush_due(self, now: Optional[datetime] = None) -> int:
+        """Completa los recursos cuyo temporizador venció. Retorna cuántos se completaron"""
+        now = now or datetime.now()
+        total = 0
+        while True:
+            due = self.pop_due(now, CollectionTimersConfig.BATCH_SIZE)
+            if not due:
+                break
+            changes = {
+                resource_id: {"estado": EstadoRecurso.RECOLECTADO, "hora_recoleccion": when}
+                for resource_id, when in due.items()
+            }
+            try:
+                # Si el recurso cambió de estado entretanto (p. ej. por la API), no se toca
+                completed = self.resource_repo.update_fields(
+                    changes, condition=lambda r: r.estado == EstadoRecurso.EN_RECOLECCION
+                )
+            except Exception:
+                # Reprogramar el lote para el siguiente ciclo
+                for resource_id, when in due.items():
+                    self.schedule(resource_id, when)
+                raise
+            total += len(completed)
+        self.completed += total
+        return total
+
+    @metrics.timed_job("collection_timers")
+    def _flush_job(self):
+        try:
+            completed = self.flush_due()
+            if completed:
+                logger.info(f"✅ Recolecciones completadas por temporizador: {completed}")
+        except Exception as e:
+            logger.error(f"❌ Error completando recolecciones: {e}")
+
+    def start(self, change_log: Optional[ChangeLog] = None):
+        """Reconstruye los temporizadores, escucha los cambios e inicia el job periódico"""
+        if self.is_running:
+            logger.warning("Los temporizadores de recolección ya están en ejecución")
+            return
+        try:
+            # Escuchar antes de reconstruir para no perder transiciones intermedias
+            self._change_log = change_log or self.resource_repo.change_log
+            self._change_log.subscribe(self.on_change)
+            self.rebuild()
+            self.scheduler.add_job(
+                func=self._flush_job,
+                trigger="interval",
+                seconds=CollectionTimersConfig.FLUSH_INTERVAL_SECONDS,
+                id="collection_timers",
+                name="Temporizadores de Recolección",
+                replace_existing=True
+            )
+            self.scheduler.start()
+            self.is_running = True
+            logger.info("🚀 Temporizadores de recolección iniciados")
+        except Exception as e:
+            logger.error(f"❌ Error iniciando temporizadores de recolección: {e}")
+            self.is_running = False
+
+    def stop(self):
+        """Detiene el job periódico y deja de escuchar cambios"""
+        if self._change_log is not None:
+            self._change_log.unsubscribe(self.on_change)
+            self._change_log = None
+        if not self.is_running:
+            return
+        try:
+            self.scheduler.shutdown(wait=True)
+            self.is_running = False
+            logger.info("🛑 Temporizadores de recolección detenidos")
+        except Exception as e:
+            logger.error(f"❌ Error deteniendo temporizadores de recolección: {e}")
+
+    def get_status(self) -> dict:
+        with self._lock:
+            # Descartar entradas canceladas del tope del heap
+            while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            next_due = self._heap[0][0] if self._heap else None
+        return {
+            "is_running": self.is_running,
+            "pending": len(self._due),
+            "next_due": next_due.isoformat() if next_due else None,
+            "completed": self.completed,
+        }
+
+
+# Instancia global de los temporizadores
+collection_timers = CollectionTimers()
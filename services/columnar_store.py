@@ -0,0 +1,180 @@
+"""
+Almacén columnar compacto para mantener muchas entidades en memoria.
+
+En lugar de un dataclass por fila (con su `__dict__`, objetos datetime y
+referencias a enums), cada campo se guarda en un `array` tipado: enteros en
+int64, fechas como microsegundos desde 1970-01-01 (sin zona horaria, igual que
+en el CSV), enums como su posición en un int8 y textos como índice a una tabla
+de strings internados. La fila se indexa directamente por su ID (los IDs son
+secuenciales), así que no hace falta un diccionario id -> fila.
+
+Las lecturas devuelven vistas livianas (`__slots__`) con los mismos atributos
+que el modelo, válidas para los schemas Pydantic con `from_attributes`, y
+`to_model()` reconstruye el dataclass cuando se necesita uno real.
+"""
+from array import array
+from dataclasses import fields
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Callable, Dict, Iterator, List, Optional, Type, get_type_hints
+import sys
+
+EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+# Valor reservado para fechas vacías (None)
+NO_TIME = -(2 ** 63)
+
+INT = "int"
+TIME = "time"
+ENUM = "enum"
+STR = "str"
+
+
+def _base_type(annotation):
+    """Tipo de la anotación, con Optional[X] tratado como X"""
+    candidates = [arg for arg in getattr(annotation, "__args__", (annotation,)) if arg is not type(None)]
+    return candidates[0] if candidates else annotation
+
+
+def _column_kind(annotation) -> str:
+    """Tipo de columna a partir de la anotación del campo"""
+    kind = _base_type(annotation)
+    if isinstance(kind, type) and issubclass(kind, Enum):
+        return ENUM
+    if kind is datetime:
+        return TIME
+    if kind is int:
+        return INT
+    if kind is str:
+        return STR
+    raise TypeError(f"Tipo de campo no soportado en el almacén columnar: {annotation}")
+
+
+class RowView:
+    """Vista de solo lectura sobre una fila del almacén"""
+    __slots__ = ("_store", "id")
+
+    def __init__(self, store: "ColumnarStore", entity_id: int):
+        self._store = store
+        self.id = entity_id
+
+    def to_model(self):
+        """Dataclass equivalente a la fila"""
+        return self._store.model(**{name: getattr(self, name) for name in self._store.field_names})
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._store.field_names)
+        return f"{type(self).__name__}({values})"
+
+
+class ColumnarStore:
+    """Filas de un modelo (dataclass) guardadas por columnas e indexadas por ID"""
+
+    def __init__(self, model: Type):
+        self.model = model
+        hints = get_type_hints(model)
+        self.field_names = [f.name for f in fields(model)]
+        self._kinds = {name: _column_kind(hints[name]) for name in self.field_names if name != "id"}
+        self._present = bytearray()
+        self._count = 0
+        self._strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self._columns: Dict[str, array] = {}
+        self._enums: Dict[str, list] = {}
+        self._enum_codes: Dict[str, Dict[Enum, int]] = {}
+        for name, kind in self._kinds.items():
+            if kind == ENUM:
+                members = list(_base_type(hints[name]))
+                self._enums[name] = members
+                self._enum_codes[name] = {member: code for code, member in enumerate(members)}
+            self._columns[name] = array({INT: "q", TIME: "q", ENUM: "b", STR: "I"}[kind])
+        self.view_class = self._build_view_class()
+
+    # --- Codificación ---
+
+    def _intern(self, value: str) -> int:
+        code = self._string_ids.get(value)
+        if code is None:
+            code = len(self._strings)
+            self._strings.append(sys.intern(value))
+            self._string_ids[value] = code
+        return code
+
+    def _encode(self, name: str, value) -> int:
+        kind = self._kinds[name]
+        if kind == INT:
+            return value
+        if kind == TIME:
+            if value is None:
+                return NO_TIME
+            if value.tzinfo is not None:
+                # Las fechas con zona horaria se guardan en hora local, como las del CSV
+                value = value.astimezone().replace(tzinfo=None)
+            return (value - EPOCH) // _MICROSECOND
+        if kind == ENUM:
+            return self._enum_codes[name][value]
+        return self._intern(value)
+
+    def _decoder(self, name: str) -> Callable[[int], object]:
+        kind = self._kinds[name]
+        column = self._columns[name]
+        if kind == INT:
+            return column.__getitem__
+        if kind == TIME:
+            return lambda slot: None if column[slot] == NO_TIME else EPOCH + column[slot] * _MICROSECOND
+        if kind == ENUM:
+            members = self._enums[name]
+            return lambda slot: members[column[slot]]
+        strings = self._strings
+        return lambda slot: strings[column[slot]]
+
+    def _build_view_class(self) -> type:
+        """Clase de vista con una propiedad por campo que decodifica solo ese valor"""
+        namespace = {"__slots__": ()}
+        for name in self._kinds:
+            decode = self._decoder(name)
+            namespace[name] = property(lambda view, decode=decode: decode(view.id))
+        return type(f"{self.model.__name__}View", (RowView,), namespace)
+
+    # --- Operaciones ---
+
+    def _grow(self, size: int):
+        missing = size - len(self._present)
+        if missing <= 0:
+            return
+        # Crecimiento geométrico para amortizar las extensiones
+        missing = max(missing, len(self._present) // 2)
+        self._present.extend(bytes(missing))
+        for column in self._columns.values():
+            column.extend(array(column.typecode, [0]) * missing)
+
+    def put(self, entity):
+        """Inserta o reemplaza la fila con el ID de la entidad"""
+        self._grow(entity.id + 1)
+        for name, column in self._columns.items():
+            column[entity.id] = self._encode(name, getattr(entity, name))
+        if not self._present[entity.id]:
+            self._present[entity.id] = 1
+            self._count += 1
+
+    def remove(self, entity_id: int):
+        if 0 <= entity_id < len(self._present) and self._present[entity_id]:
+            self._present[entity_id] = 0
+            self._count -= 1
+
+    def get(self, entity_id: int) -> Optional[RowView]:
+        if 0 <= entity_id < len(self._present) and self._present[entity_id]:
+            return self.view_class(self, entity_id)
+        return None
+
+    def __contains__(self, entity_id: int) -> bool:
+        return 0 <= entity_id < len(self._present) and bool(self._present[entity_id])
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[RowView]:
+        """Vistas de todas las filas, en orden de ID"""
+        present = self._present
+        return (self.view_class(self, entity_id) for entity_id in range(len(present)) if present[entity_id])
+
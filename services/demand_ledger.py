@@ -0,0 +1,120 @@
+"""
+Ledger de demanda de hormigas por zona.
+
+La demanda de una zona es la suma de `hormigas_requeridas` de sus recursos
+disponibles más el `costo_hormigas` de sus amenazas activas o en combate. Se
+mantiene en O(1) por cambio a partir del registro de cambios, y cada variación
+se publica en ese mismo registro como un evento 'demand' (visible en /events).
+
+El costo de una amenaza activa escala con el tiempo (ver threat_escalation):
+las amenazas activas se guardan por zona y su costo escalado se suma al leer,
+el mismo que reportan GET /threats y la asignación. El paso del tiempo por sí
+solo no publica eventos; cada evento lleva la demanda al momento del cambio.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from models.resource import EstadoRecurso, Resource
+from models.threat import EstadoAmenaza, Threat
+from repositories.change_log import ChangeEvent, ENTITY_DEMAND, ACTION_UPDATED
+from services.materialized_view import MaterializedView
+from services.threat_escalation import escalated_cost
+
+# Estados de amenaza que requieren hormigas
+THREAT_DEMAND_STATES = (EstadoAmenaza.ACTIVA, EstadoAmenaza.EN_COMBATE)
+
+
+class DemandLedger(MaterializedView):
+    """Demanda de hormigas acumulada por zona"""
+
+    def reset(self):
+        self._zones: Set[int] = set()
+        self._resource_demand: Dict[int, int] = {}
+        # Costo persistido de las amenazas en combate (ya no escala)
+        self._threat_demand: Dict[int, int] = {}
+        # Amenazas activas por zona: su costo escalado se calcula al leer
+        self._active_threats: Dict[int, Dict[int, Threat]] = {}
+        self._dirty: Set[int] = set()
+
+    def _add(self, ledger: Dict[int, int], zona_id: int, amount: int):
+        if amount:
+            ledger[zona_id] = ledger.get(zona_id, 0) + amount
+            self._dirty.add(zona_id)
+
+    def apply_zone(self, zona, sign: int):
+        if sign > 0:
+            self._zones.add(zona.id)
+        else:
+            self._zones.discard(zona.id)
+
+    def apply_resource(self, resource: Resource, sign: int):
+        if resource.estado == EstadoRecurso.DISPONIBLE:
+            self._add(self._resource_demand, resource.zona_id, sign * resource.hormigas_requeridas)
+
+    def apply_threat(self, threat: Threat, sign: int):
+        if threat.estado == EstadoAmenaza.ACTIVA:
+            active = self._active_threats.setdefault(threat.zona_id, {})
+            if sign > 0:
+                active[threat.id] = threat
+            else:
+                active.pop(threat.id, None)
+                if not active:
+                    del self._active_threats[threat.zona_id]
+            self._dirty.add(threat.zona_id)
+        elif threat.estado in THREAT_DEMAND_STATES:
+            self._add(self._threat_demand, threat.zona_id, sign * threat.costo_hormigas)
+
+    def _render(self, zona_id: int, now: datetime) -> dict:
+        recursos = self._resource_demand.get(zona_id, 0)
+        amenazas = self._threat_demand.get(zona_id, 0) + sum(
+            escalated_cost(threat, now) for threat in self._active_threats.get(zona_id, {}).values()
+        )
+        return {"zona_id": zona_id, "recursos": recursos, "amenazas": amenazas, "total": recursos + amenazas}
+
+    def _known(self) -> Set[int]:
+        return self._zones | set(self._resource_demand) | set(self._threat_demand) | set(self._active_threats)
+
+    def after_change(self, event: ChangeEvent):
+        """Publica la nueva demanda de las zonas que cambiaron"""
+        now = datetime.now()
+        with self.lock:
+            dirty, self._dirty = self._dirty, set()
+            updates = [self._render(zona_id, now) for zona_id in sorted(dirty)]
+        for update in updates:
+            self.change_log.publish(ENTITY_DEMAND, ACTION_UPDATED, update["zona_id"], update["zona_id"], data=update)
+
+    def bootstrap(self):
+        super().bootstrap()
+        with self.lock:
+            # La carga inicial no se publica como cambio
+            self._dirty = set()
+
+    def demand(self, zona_id: int, now: Optional[datetime] = None) -> Optional[dict]:
+        """Demanda de una zona, o None si no hay zona ni demanda con ese ID"""
+        self.ensure_started()
+        now = now or datetime.now()
+        with self.lock:
+            if zona_id not in self._known():
+                return None
+            return self._render(zona_id, now)
+
+    def snapshot(self, now: Optional[datetime] = None) -> dict:
+        """Demanda total y por zona"""
+        self.ensure_started()
+        now = now or datetime.now()
+        with self.lock:
+            zonas = [self._render(zona_id, now) for zona_id in sorted(self._known())]
+            return {
+                "version": self.version,
+                "total": sum(zona["total"] for zona in zonas),
+                "zonas": zonas,
+            }
+
+    @property
+    def total(self) -> int:
+        """Demanda total de la colonia en este momento"""
+        return self.snapshot()["total"]
+
+
+# Instancia global del ledger
+demand_ledger = DemandLedger()
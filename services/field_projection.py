@@ -0,0 +1,99 @@
+"""
+Proyección de campos (`?fields=id,estado`) en los listados y detalles.
+
+Los consumidores que consultan con frecuencia suelen necesitar solo unos pocos
+campos. Con `fields` el listado lee del CSV únicamente esas columnas (con
+`repo.project`, sin construir el modelo ni validar el esquema de respuesta) y
+las devuelve como texto listo para JSON. Los campos que se calculan al leer
+agregan a la lectura las columnas de las que dependen: la cantidad de un
+recurso en recolección (agotamiento) y el costo de una amenaza activa
+(escalamiento). Solo las filas afectadas se convierten para el cálculo.
+"""
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config.resource_depletion_config import ResourceDepletionConfig
+from config.threat_escalation_config import ThreatEscalationConfig
+from models.resource import EstadoRecurso
+from models.threat import EstadoAmenaza, TipoAmenaza
+from repositories.change_log import serialize_entity
+from services.resource_depletion import remaining_quantity
+from services.threat_escalation import escalated_cost
+
+# Columnas adicionales que necesita cada campo calculado al leer
+RESOURCE_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    "cantidad_unitaria": ("estado", "hora_inicio_recoleccion", "duracion_recoleccion", "hormigas_requeridas"),
+}
+THREAT_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    "costo_hormigas": ("estado", "tipo", "hora_deteccion"),
+}
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """Campos pedidos en `fields` (separados por comas, sin repetir); None si no se pidió proyección"""
+    if fields is None:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in allowed]
+    if not names or unknown:
+        raise ValueError(f"Campos inválidos: {unknown or fields!r}. Valores permitidos: {list(allowed)}")
+    return names
+
+
+def _with_dependencies(fields: List[str], dependencies: Dict[str, Tuple[str, ...]]) -> List[str]:
+    columns = list(fields)
+    for name in fields:
+        columns.extend(column for column in dependencies.get(name, ()) if column not in columns)
+    return columns
+
+
+def _trim(rows: List[dict], fields: List[str], columns: List[str]) -> List[dict]:
+    """Quita de cada fila las columnas que solo se leyeron para calcular"""
+    if len(columns) == len(fields):
+        return rows
+    return [{name: row[name] for name in fields} for row in rows]
+
+
+def project_resources(repo, fields: List[str], zona_id: Optional[int] = None, estado: Optional[str] = None,
+                      now: Optional[datetime] = None) -> List[dict]:
+    """Recursos con solo `fields`, con la cantidad actual si el agotamiento está habilitado"""
+    depletion = ResourceDepletionConfig.ENABLED and "cantidad_unitaria" in fields
+    columns = _with_dependencies(fields, RESOURCE_DEPENDENCIES) if depletion else list(fields)
+    rows = repo.project(columns, zona_id=zona_id, estado=estado, raw=True)
+    if depletion:
+        now = now or datetime.now()
+        for row in rows:
+            if row["estado"] == EstadoRecurso.EN_RECOLECCION.value and row["hora_inicio_recoleccion"]:
+                row["cantidad_unitaria"] = remaining_quantity(SimpleNamespace(
+                    estado=EstadoRecurso.EN_RECOLECCION,
+                    hora_inicio_recoleccion=datetime.fromisoformat(row["hora_inicio_recoleccion"]),
+                    duracion_recoleccion=row["duracion_recoleccion"],
+                    hormigas_requeridas=row["hormigas_requeridas"],
+                    cantidad_unitaria=row["cantidad_unitaria"],
+                ), now)
+    return _trim(rows, fields, columns)
+
+
+def project_threats(repo, fields: List[str], zona_id: Optional[int] = None, estado: Optional[str] = None,
+                    now: Optional[datetime] = None) -> List[dict]:
+    """Amenazas con solo `fields`, con el costo escalado si el escalamiento está habilitado"""
+    escalation = ThreatEscalationConfig.ENABLED and "costo_hormigas" in fields
+    columns = _with_dependencies(fields, THREAT_DEPENDENCIES) if escalation else list(fields)
+    rows = repo.project(columns, zona_id=zona_id, estado=estado, raw=True)
+    if escalation:
+        now = now or datetime.now()
+        for row in rows:
+            if row["estado"] == EstadoAmenaza.ACTIVA.value and row["hora_deteccion"]:
+                row["costo_hormigas"] = escalated_cost(SimpleNamespace(
+                    estado=EstadoAmenaza.ACTIVA,
+                    tipo=TipoAmenaza(row["tipo"]),
+                    hora_deteccion=datetime.fromisoformat(row["hora_deteccion"]),
+                    costo_hormigas=row["costo_hormigas"],
+                ), now)
+    return _trim(rows, fields, columns)
+
+
+def select_fields(entities: Iterable, fields: List[str]) -> List[dict]:
+    """Proyección de modelos ya construidos (lecturas que no pasan por el CSV)"""
+    return [{name: data[name] for name in fields} for data in map(serialize_entity, entities)]
@@ -0,0 +1,122 @@
+"""
+Base de las vistas materializadas en memoria.
+
+Una vista se construye una sola vez leyendo los repositorios y a partir de ahí
+se mantiene aplicando los eventos del registro de cambios: se resta la
+contribución del estado anterior de la entidad y se suma la del nuevo, sin
+volver a recorrer los CSV.
+"""
+from abc import ABC, abstractmethod
+from contextlib import ExitStack
+from typing import Optional
+import threading
+
+from repositories.change_log import ChangeEvent, ENTITY_RESOURCE, ENTITY_THREAT, ENTITY_ZONE
+from repositories.resource_repository import ResourceRepository
+from repositories.threat_repository import ThreatRepository
+from repositories.zone_repository import ZoneRepository
+from repositories.storage import create_resource_repository, create_threat_repository
+
+
+class MaterializedView(ABC):
+    """Vista derivada de recursos, amenazas y zonas, mantenida de forma incremental"""
+
+    def __init__(
+        self,
+        resource_repo: Optional[ResourceRepository] = None,
+        threat_repo: Optional[ThreatRepository] = None,
+        zone_repo: Optional[ZoneRepository] = None
+    ):
+        self.resource_repo = resource_repo if resource_repo is not None else create_resource_repository()
+        self.threat_repo = threat_repo if threat_repo is not None else create_threat_repository()
+        self.zone_repo = zone_repo if zone_repo is not None else ZoneRepository()
+        self.change_log = self.resource_repo.change_log
+        self.lock = threading.RLock()
+        # Secuencia del último evento reflejado en la vista
+        self.version = 0
+        self._started = False
+        self._start_lock = threading.Lock()
+        self.reset()
+
+    # --- Contribuciones (a implementar por cada vista) ---
+
+    @abstractmethod
+    def reset(self):
+        """Vacía el estado de la vista"""
+
+    def apply_resource(self, resource, sign: int):
+        pass
+
+    def apply_threat(self, threat, sign: int):
+        pass
+
+    def apply_zone(self, zona, sign: int):
+        pass
+
+    def finish_bootstrap(self):
+        """Se llama tras cargar todas las filas en `bootstrap` (p. ej. para ordenar índices de una vez)"""
+
+    def after_change(self, event: ChangeEvent):
+        """Se llama tras aplicar cada evento (fuera del lock de la vista)"""
+
+    # --- Ciclo de vida ---
+
+    def ensure_started(self):
+        """Suscribe la vista y la construye la primera vez que se usa"""
+        if self._started:
+            return
+        with self._start_lock:
+            if self._started:
+                return
+            self.change_log.subscribe(self.on_change)
+            self.bootstrap()
+            self._started = True
+
+    def stop(self):
+        with self._start_lock:
+            self.change_log.unsubscribe(self.on_change)
+            self._started = False
+
+    def bootstrap(self):
+        """
+        Construye la vista desde los CSV. Se bloquean las escrituras de los tres
+        repositorios: publican sus eventos dentro de esos locks, así que todo
+        evento con secuencia <= a la versión leída ya está reflejado en los datos.
+        """
+        with ExitStack() as stack:
+            for repo in (self.resource_repo, self.threat_repo, self.zone_repo):
+                stack.enter_context(repo.lock_all())
+            version = self.change_log.version
+            # Desde el snapshot binario más la cola del CSV, cuando lo hay
+            resources = self.resource_repo.load_all()
+            threats = self.threat_repo.load_all()
+            zones = self.zone_repo.obtenerTodasLasZonas()
+            with self.lock:
+                self.reset()
+                for zona in zones:
+                    self.apply_zone(zona, 1)
+                for resource in resources:
+                    self.apply_resource(resource, 1)
+                for threat in threats:
+                    self.apply_threat(threat, 1)
+                self.finish_bootstrap()
+                self.version = version
+
+    def on_change(self, event: ChangeEvent):
+        """Listener del registro de cambios: resta el estado anterior y suma el nuevo"""
+        apply = {
+            ENTITY_RESOURCE: self.apply_resource,
+            ENTITY_THREAT: self.apply_threat,
+            ENTITY_ZONE: self.apply_zone,
+        }.get(event.entity)
+        with self.lock:
+            if event.seq <= self.version:
+                return
+            self.version = event.seq
+            if apply is None:
+                return
+            if event.previous is not None:
+                apply(event.previous, -1)
+            if event.data is not None:
+                apply(event.data, 1)
+        self.after_change(event)
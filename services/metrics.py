@@ -0,0 +1,201 @@
+"""
+Métricas del proceso en formato de texto de Prometheus.
+Registra latencias por ruta, E/S de los repositorios CSV, esperas de locks
+y duración de los jobs de los schedulers.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+import functools
+from typing import Callable, Dict, List, Optional, Tuple
+import threading
+import time
+
+# Buckets por defecto (en segundos) para histogramas de latencia
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Buckets para cantidades por petición (filas y bytes leídos)
+ROWS_BUCKETS = (0, 1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+BYTES_BUCKETS = (0, 1_024, 10_240, 102_400, 1_048_576, 10_485_760, 104_857_600)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Contador monotónico con etiquetas"""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Histograma acumulativo con etiquetas"""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets=DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # label_values -> [conteos por bucket..., suma, total]
+        self._series: Dict[LabelValues, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = [0] * len(self.buckets) + [0.0, 0]
+                self._series[label_values] = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return series[-1] if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    labels = _format_labels(self.labels, label_values, ("le", _format_value(float(bound))))
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _format_labels(self.labels, label_values, ("le", "+Inf"))
+                lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+                plain = _format_labels(self.labels, label_values)
+                lines.append(f"{self.name}_sum{plain} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{plain} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Registro central de métricas del proceso"""
+
+    def __init__(self):
+        self.http_request_duration = Histogram(
+            "http_request_duration_seconds", "Latencia de las peticiones HTTP por ruta",
+            ("method", "route", "status")
+        )
+        self.http_request_rows_read = Histogram(
+            "http_request_rows_read", "Filas CSV leídas por petición", ("route",), ROWS_BUCKETS
+        )
+        self.http_request_bytes_read = Histogram(
+            "http_request_bytes_read", "Bytes CSV leídos por petición", ("route",), BYTES_BUCKETS
+        )
+        self.repository_rows_read = Counter(
+            "repository_rows_read_total", "Filas leídas de cada archivo CSV", ("file",)
+        )
+        self.repository_bytes_read = Counter(
+            "repository_bytes_read_total", "Bytes leídos de cada archivo CSV", ("file",)
+        )
+        self.repository_writes = Counter(
+            "repository_writes_total", "Escrituras sobre cada archivo CSV", ("file", "mode")
+        )
+        self.repository_lock_wait = Histogram(
+            "repository_lock_wait_seconds", "Tiempo de espera para adquirir el lock de un archivo CSV", ("file",)
+        )
+        self.scheduler_job_duration = Histogram(
+            "scheduler_job_duration_seconds", "Duración de los jobs de los schedulers", ("job",)
+        )
+        self.outbox_dead_lettered = Counter(
+            "outbox_dead_lettered_total", "Cambios del outbox rechazados de forma permanente por un suscriptor",
+            ("subscriber",)
+        )
+        self.change_log_journal_errors = Counter(
+            "change_log_journal_errors_total", "Errores al registrar un cambio publicado en un journal (p. ej. el outbox)"
+        )
+        self._metrics = [
+            self.http_request_duration,
+            self.http_request_rows_read,
+            self.http_request_bytes_read,
+            self.repository_rows_read,
+            self.repository_bytes_read,
+            self.repository_writes,
+            self.repository_lock_wait,
+            self.scheduler_job_duration,
+            self.outbox_dead_lettered,
+            self.change_log_journal_errors,
+        ]
+
+    def render(self) -> str:
+        """Serializa todas las métricas en formato de texto de Prometheus"""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    @contextmanager
+    def time_job(self, job: str):
+        """Mide la duración de un job de scheduler"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.scheduler_job_duration.observe(time.perf_counter() - started, job)
+
+    def timed_job(self, job: str) -> Callable[[Callable], Callable]:
+        """Decorador para registrar un job de scheduler midiendo su duración con `time_job`"""
+        def decorate(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def timed(*args, **kwargs):
+                with self.time_job(job):
+                    return func(*args, **kwargs)
+            return timed
+        return decorate
+
+
+# E/S acumulada de la petición HTTP en curso: {"rows": int, "bytes": int}
+request_io: ContextVar[Optional[dict]] = ContextVar("request_io", default=None)
+
+
+def record_read(csv_file: str, rows: int, num_bytes: int):
+    """Registra una lectura de CSV en los contadores globales y en la petición en curso"""
+    metrics.repository_rows_read.inc(csv_file, amount=rows)
+    metrics.repository_bytes_read.inc(csv_file, amount=num_bytes)
+    current = request_io.get()
+    if current is not None:
+        current["rows"] += rows
+        current["bytes"] += num_bytes
+
+
+# Instancia global del registro de métricas
+metrics = MetricsRegistry()
@@ -0,0 +1,250 @@
+"""
+Servicio de outbox: entrega los cambios de los repositorios a otros
+subsistemas de la colonia por HTTP, en lotes.
+
+Los cambios se registran de forma durable en el outbox (CSV) como journal del
+registro de cambios: el append ocurre dentro de la sección crítica de la
+escritura del repositorio. Si falla (p. ej. disco lleno), el cambio queda
+pendiente en memoria y se reintenta, en orden y antes que los cambios
+siguientes, con la próxima escritura o en la próxima vuelta del loop de
+entrega; la escritura del repositorio no falla por el outbox. (La fila del
+repositorio se escribe antes que la del outbox: una caída del proceso con
+cambios pendientes todavía puede omitirlos.) Un loop en
+segundo plano los envía a cada suscriptor con un cliente HTTP asíncrono
+compartido (pool de conexiones), reintentos con backoff exponencial y un
+límite de lotes en vuelo por suscriptor. Un lote rechazado de forma
+permanente (HTTP no reintentable) se copia al archivo de descarte y el
+cursor sigue avanzando.
+"""
+from typing import Dict, List, Optional
+import asyncio
+import logging
+import random
+import threading
+
+import httpx
+
+from config.outbox_config import OutboxConfig
+from repositories.change_log import ChangeEvent, ChangeLog
+from repositories.outbox_repository import OutboxRepository
+from services.background_loop import BackgroundLoop, wait_for_signal
+from services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Códigos HTTP que justifican reintentar el mismo lote
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class OutboxService:
+    """Registra cambios en el outbox y los entrega a los suscriptores configurados"""
+
+    def __init__(
+        self,
+        outbox_repo: Optional[OutboxRepository] = None,
+        subscribers: Optional[List[str]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self._outbox_repo = outbox_repo
+        self.subscribers = list(subscribers) if subscribers is not None else list(OutboxConfig.SUBSCRIBERS)
+        # Transporte alternativo (p. ej. un servidor de prueba ASGI); None usa la red
+        self.transport = transport
+        self.batch_size = OutboxConfig.BATCH_SIZE
+        self.max_in_flight = OutboxConfig.MAX_IN_FLIGHT_PER_SUBSCRIBER
+        self.max_retries = OutboxConfig.MAX_RETRIES
+        self.backoff_base = OutboxConfig.BACKOFF_BASE_SECONDS
+        self.backoff_max = OutboxConfig.BACKOFF_MAX_SECONDS
+        self._loop = BackgroundLoop("outbox")
+        self._wake: Optional[asyncio.Event] = None
+        self._change_log: Optional[ChangeLog] = None
+        self.delivered: Dict[str, int] = {}
+        self.failures: Dict[str, int] = {}
+        self.dead_lettered: Dict[str, int] = {}
+        # Cambios publicados que aún no se pudieron agregar al outbox, en orden
+        self._unrecorded: List[ChangeEvent] = []
+        self._unrecorded_lock = threading.Lock()
+
+    @property
+    def outbox_repo(self) -> OutboxRepository:
+        # Se crea bajo demanda para no tocar el disco si el outbox no se usa
+        if self._outbox_repo is None:
+            self._outbox_repo = OutboxRepository(
+                OutboxConfig.OUTBOX_FILE, OutboxConfig.CURSORS_FILE, OutboxConfig.DEAD_LETTER_FILE
+            )
+        return self._outbox_repo
+
+    @property
+    def is_running(self) -> bool:
+        return self._loop.is_running
+
+    def attach(self, change_log: ChangeLog):
+        """Comienza a registrar en el outbox los cambios publicados en `change_log`"""
+        if self._change_log is not None:
+            return
+        self.outbox_repo
+        change_log.add_journal(self.record)
+        self._change_log = change_log
+
+    def detach(self):
+        if self._change_log is not None:
+            self._change_log.remove_journal(self.record)
+            self._change_log = None
+
+    def record(self, event: ChangeEvent):
+        """Persiste un cambio en el outbox (dentro de la escritura que lo publica) y despierta al loop de entrega"""
+        with self._unrecorded_lock:
+            self._unrecorded.append(event)
+            recorded = self._flush_unrecorded()
+        if recorded and self._wake is not None:
+            self._loop.call_soon(self._wake.set)
+
+    def _flush_unrecorded(self) -> bool:
+        """Agrega al outbox los cambios pendientes (con el lock tomado). Retorna False si el append falló"""
+        try:
+            self.outbox_repo.append(self._unrecorded)
+        except OSError as e:
+            logger.error(f"❌ No se pudo registrar en el outbox ({len(self._unrecorded)} cambios pendientes): {e}")
+            return False
+        self._unrecorded.clear()
+        return True
+
+    def retry_unrecorded(self) -> int:
+        """Reintenta agregar los cambios pendientes. Retorna cuántos siguen pendientes"""
+        with self._unrecorded_lock:
+            if self._unrecorded:
+                self._flush_unrecorded()
+            return len(self._unrecorded)
+
+    def _backoff(self, attempt: int) -> float:
+        """Backoff exponencial con jitter completo"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def _post_batch(self, client: httpx.AsyncClient, url: str, batch: List[dict]) -> int:
+        """
+        Envía un lote con reintentos. Retorna el último código HTTP recibido
+        (0 si no hubo respuesta): 2xx aceptado, no reintentable rechazado.
+        """
+        payload = {"events": batch, "first_seq": batch[0]["seq"], "last_seq": batch[-1]["seq"]}
+        status = 0
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await client.post(url, json=payload)
+                status = response.status_code
+                if status < 300 or status not in RETRYABLE_STATUS:
+                    return status
+            except httpx.HTTPError as e:
+                status = 0
+                logger.warning(f"Error enviando lote a {url} (intento {attempt + 1}): {e}")
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._backoff(attempt))
+        return status
+
+    async def deliver_subscriber(self, client: httpx.AsyncClient, url: str) -> int:
+        """
+        Envía los cambios pendientes de un suscriptor: hasta `max_in_flight` lotes
+        concurrentes. El cursor solo avanza hasta el último lote de la racha
+        inicial de lotes aceptados o rechazados de forma permanente (estos van
+        al archivo de descarte), para no saltar cambios. Retorna cuántos se entregaron.
+        """
+        cursor = self.outbox_repo.get_cursor(url)
+        records = self.outbox_repo.read_after(cursor, self.batch_size * self.max_in_flight)
+        if not records:
+            return 0
+        batches = [records[i:i + self.batch_size] for i in range(0, len(records), self.batch_size)]
+        results = await asyncio.gather(*(self._post_batch(client, url, batch) for batch in batches))
+
+        delivered = 0
+        advanced = cursor
+        for batch, status in zip(batches, results):
+            if 200 <= status < 300:
+                delivered += len(batch)
+            elif status and status not in RETRYABLE_STATUS:
+                # Reenviarlo obtendría el mismo rechazo y bloquearía al suscriptor para siempre
+                logger.error(f"❌ El suscriptor {url} rechazó el lote {batch[0]['seq']}-{batch[-1]['seq']}: "
+                             f"HTTP {status}; se mueve al archivo de descarte")
+                self.outbox_repo.dead_letter(url, batch, status)
+                self.dead_lettered[url] = self.dead_lettered.get(url, 0) + len(batch)
+                metrics.outbox_dead_lettered.inc(url, amount=len(batch))
+            else:
+                self.failures[url] = self.failures.get(url, 0) + 1
+                break
+            advanced = batch[-1]["seq"]
+        if advanced != cursor:
+            self.outbox_repo.set_cursor(url, advanced)
+        if delivered:
+            self.delivered[url] = self.delivered.get(url, 0) + delivered
+        return delivered
+
+    async def deliver_pending(self, client: httpx.AsyncClient) -> Dict[str, int]:
+        """
+        Entrega todo lo pendiente a todos los suscriptores (en paralelo entre
+        suscriptores). Retorna la cantidad entregada por suscriptor.
+        """
+        totals = {url: 0 for url in self.subscribers}
+        self.retry_unrecorded()
+
+        async def drain(url: str):
+            while True:
+                delivered = await self.deliver_subscriber(client, url)
+                totals[url] += delivered
+                if delivered < self.batch_size * self.max_in_flight:
+                    return
+
+        await asyncio.gather(*(drain(url) for url in self.subscribers))
+        self.outbox_repo.compact(self.subscribers)
+        return totals
+
+    def create_client(self) -> httpx.AsyncClient:
+        """Cliente HTTP compartido por todas las entregas del loop"""
+        limits = httpx.Limits(
+            max_connections=OutboxConfig.MAX_CONNECTIONS,
+            max_keepalive_connections=OutboxConfig.MAX_CONNECTIONS
+        )
+        return httpx.AsyncClient(transport=self.transport, timeout=OutboxConfig.TIMEOUT_SECONDS, limits=limits)
+
+    async def _run(self, stop_event: asyncio.Event):
+        self._wake = asyncio.Event()
+        async with self.create_client() as client:
+            while not stop_event.is_set():
+                try:
+                    await self.deliver_pending(client)
+                except Exception as e:
+                    logger.error(f"❌ Error entregando el outbox: {e}")
+                await wait_for_signal(stop_event, self._wake, OutboxConfig.POLL_SECONDS)
+        self._wake = None
+
+    def start(self, change_log: ChangeLog):
+        """Registra los cambios de `change_log` e inicia la entrega en segundo plano"""
+        if not self.subscribers:
+            logger.warning("No hay suscriptores configurados para el outbox (OUTBOX_SUBSCRIBERS)")
+            return
+        if self.is_running:
+            logger.warning("El outbox ya está en ejecución")
+            return
+        self.attach(change_log)
+        self._loop.start(self._run)
+        logger.info(f"🚀 Outbox iniciado. Suscriptores: {self.subscribers}")
+
+    def stop(self):
+        """Deja de registrar cambios y detiene la entrega"""
+        self.detach()
+        if not self.is_running:
+            return
+        self._loop.stop()
+        logger.info("🛑 Outbox detenido")
+
+    def get_status(self) -> dict:
+        return {
+            "is_running": self.is_running,
+            "subscribers": self.subscribers,
+            "last_seq": self.outbox_repo.last_seq if self._outbox_repo is not None else 0,
+            "cursors": self.outbox_repo.get_cursors() if self._outbox_repo is not None else {},
+            "delivered": dict(self.delivered),
+            "failures": dict(self.failures),
+            "dead_lettered": dict(self.dead_lettered),
+            "unrecorded": len(self._unrecorded),
+        }
+
+
+# Instancia global del outbox
+outbox_service = OutboxService()
@@ -0,0 +1,79 @@
+"""
+Profiler por muestreo de todos los hilos del proceso.
+Toma instantáneas periódicas de las pilas (incluidos los hilos de APScheduler
+que inician los schedulers) y las agrega en formato "collapsed stacks",
+listo para herramientas de flamegraph (flamegraph.pl, speedscope, etc.).
+"""
+from collections import Counter
+from typing import Dict, Optional
+import os
+import sys
+import threading
+import time
+
+# Límites para evitar capturas que degraden el worker
+MAX_SECONDS = 60
+MAX_HZ = 1000
+
+
+class ProfilerBusyError(RuntimeError):
+    """Se lanzó una captura mientras otra estaba en curso"""
+
+
+class SamplingProfiler:
+    """Muestrea las pilas de todos los hilos a una frecuencia fija"""
+
+    def __init__(self):
+        self._capture_lock = threading.Lock()
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _sample(self, counts: Counter, thread_names: Dict[int, str], own_ident: int):
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_label(frame))
+                frame = frame.f_back
+            stack.append(thread_names.get(ident, f"thread-{ident}"))
+            # El formato collapsed va de la raíz a la hoja, separado por ';'
+            counts[";".join(reversed(stack))] += 1
+
+    def capture(self, seconds: float, hz: int, thread_filter: Optional[str] = None) -> str:
+        """
+        Muestrea durante `seconds` segundos a `hz` muestras por segundo y retorna
+        las pilas colapsadas ("hilo;frame;...;frame N"), ordenadas por frecuencia.
+        """
+        if not self._capture_lock.acquire(blocking=False):
+            raise ProfilerBusyError("Ya hay una captura de perfil en curso")
+        try:
+            counts: Counter = Counter()
+            own_ident = threading.get_ident()
+            interval = 1.0 / hz
+            deadline = time.perf_counter() + seconds
+            next_sample = time.perf_counter()
+
+            while True:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                thread_names = {t.ident: t.name for t in threading.enumerate()}
+                self._sample(counts, thread_names, own_ident)
+                next_sample += interval
+                time.sleep(max(0.0, next_sample - time.perf_counter()))
+
+            lines = [
+                f"{stack} {count}" for stack, count in counts.most_common()
+                if thread_filter is None or stack.split(";", 1)[0].startswith(thread_filter)
+            ]
+            return "\n".join(lines) + ("\n" if lines else "")
+        finally:
+            self._capture_lock.release()
+
+
+# Instancia global del profiler
+profiler = SamplingProfiler()
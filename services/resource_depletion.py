@@ -0,0 +1,60 @@
+"""
+Agotamiento de recursos en recolección.
+
+Un recurso en `en_recoleccion` es recolectado por sus `hormigas_requeridas`
+hormigas a un ritmo constante que lo agota en `duracion_recoleccion` segundos:
+cada hormiga retira cantidad / (duracion * hormigas) unidades por segundo. La
+cantidad actual se calcula en forma cerrada al leer, a partir de
+`hora_inicio_recoleccion`, y solo se persiste cuando la recolección se
+interrumpe (el recurso vuelve a `disponible`).
+"""
+from dataclasses import replace
+from datetime import datetime
+from typing import Iterable, List, Optional
+import math
+
+from config.resource_depletion_config import ResourceDepletionConfig
+from models.resource import EstadoRecurso, Resource
+
+
+def remaining_quantity(resource: Resource, now: Optional[datetime] = None) -> int:
+    """Cantidad que queda del recurso en el instante `now`"""
+    if (not ResourceDepletionConfig.ENABLED
+            or resource.estado != EstadoRecurso.EN_RECOLECCION
+            or resource.hora_inicio_recoleccion is None
+            or resource.duracion_recoleccion <= 0):
+        return resource.cantidad_unitaria
+    elapsed = max(0.0, ((now or datetime.now()) - resource.hora_inicio_recoleccion).total_seconds())
+    ants = max(1, resource.hormigas_requeridas)
+    rate_per_ant = resource.cantidad_unitaria / (resource.duracion_recoleccion * ants)
+    collected = rate_per_ant * ants * elapsed
+    # Se redondea hacia arriba: una unidad empezada sigue en la zona hasta retirarse completa
+    return max(0, math.ceil(resource.cantidad_unitaria - collected - 1e-9))
+
+
+def with_depletion(resource: Resource, now: Optional[datetime] = None) -> Resource:
+    """Copia del recurso con la cantidad actual, para responder sin modificar el CSV"""
+    quantity = remaining_quantity(resource, now)
+    return resource if quantity == resource.cantidad_unitaria else replace(resource, cantidad_unitaria=quantity)
+
+
+def with_depletion_all(resources: Iterable[Resource], now: Optional[datetime] = None) -> List[Resource]:
+    now = now or datetime.now()
+    return [with_depletion(r, now) for r in resources]
+
+
+def set_quantity(resource: Resource, quantity: int, now: datetime):
+    """
+    Escribe la cantidad actual del recurso. Si está en recolección, la cantidad
+    escrita ya descuenta lo recolectado hasta `now`, así que el agotamiento
+    vuelve a contar desde ahí (si no, se descontaría dos veces).
+    """
+    resource.cantidad_unitaria = quantity
+    if resource.estado == EstadoRecurso.EN_RECOLECCION:
+        resource.hora_inicio_recoleccion = now
+
+
+def materialize_depletion(resource: Resource, new_estado: EstadoRecurso, now: datetime):
+    """Fija la cantidad restante cuando la recolección se interrumpe"""
+    if resource.estado == EstadoRecurso.EN_RECOLECCION and new_estado == EstadoRecurso.DISPONIBLE:
+        resource.cantidad_unitaria = remaining_quantity(resource, now)
@@ -11,6 +11,8 @@ import random
 from models.resource import Resource, TipoRecurso, EstadoRecurso
 from repositories.resource_repository import ResourceRepository
 from repositories.zone_repository import ZoneRepository
+from repositories.storage import create_resource_repository
+from services.metrics import metrics
 from config.resources_scheduler_config import ResourcesSchedulerConfig
 
 # Configurar logging
@@ -24,10 +26,10 @@ class ResourceScheduler:
     (hoja 1, hoja 2, etc.)
     """
     
-    def __init__(self):
+    def __init__(self, resource_repo=None, zone_repo=None):
         self.scheduler = BackgroundScheduler()
-        self.resource_repo = ResourceRepository()
-        self.zone_repo = ZoneRepository()
+        self.resource_repo = resource_repo if resource_repo is not None else ResourceRepository()
+        self.zone_repo = zone_repo if zone_repo is not None else ZoneRepository()
         self.is_running = False
         
         # Contadores para cada tipo de recurso
@@ -78,6 +80,51 @@ class ResourceScheduler:
         return resource_types
                
             
+    def _build_resource(self, zona_id: int, hora_creacion: datetime) -> Resource:
+        """
+        Construye el siguiente recurso de la rotación sin persistirlo.
+        Avanza la rotación y el contador del tipo correspondiente, de modo que
+        puede reutilizarse fuera del scheduler (p. ej. en la simulación acelerada).
+        """
+        # Obtener el siguiente tipo de recurso en la rotación
+        resource_type = self._get_next_resource_type()
+        
+        # Incrementar el contador para este tipo de recurso
+        self.resource_counters[resource_type] += 1
+        resource_number = self.resource_counters[resource_type]
+        
+        # Construir el nombre del recurso
+        base_name = ResourcesSchedulerConfig.RESOURCE_NAMES.get(resource_type, "recurso")
+        resource_name = f"{base_name} {resource_number}"
+        
+        # Obtener cantidades y peso aleatorios dentro del rango definido
+        quantity_range = ResourcesSchedulerConfig.RESOURCE_QUANTITIES.get(resource_type, (1, 1))
+        weight_range = ResourcesSchedulerConfig.RESOURCE_WEIGHTS.get(resource_type, (1, 1))
+        
+        cantidad_unitaria = random.randint(quantity_range[0], quantity_range[1])
+        peso = random.randint(weight_range[0], weight_range[1])
+        
+        # Obtener duración de recolección y hormigas requeridas aleatorias
+        duration_range = ResourcesSchedulerConfig.RESOURCE_COLLECTION_DURATIONS.get(resource_type, (10, 10))
+        ants_range = ResourcesSchedulerConfig.RESOURCE_ANT_REQUIREMENTS.get(resource_type, (1, 1))
+        
+        rango_duracion = random.randint(duration_range[0], duration_range[1])
+        rango_hormigas = random.randint(ants_range[0], ants_range[1])
+        
+        return Resource(
+            id=0,
+            zona_id=zona_id,
+            nombre=resource_name,
+            tipo=resource_type,
+            cantidad_unitaria=cantidad_unitaria,
+            peso=peso,
+            duracion_recoleccion=rango_duracion,  
+            hormigas_requeridas=rango_hormigas,
+            estado=EstadoRecurso.DISPONIBLE,
+            hora_creacion=hora_creacion
+        )
+            
+    @metrics.timed_job("resource_generator")
     def _generate_resource(self):   
         """
         Genera un nuevo recurso y lo guarda en el repositorio automáticamente. 
@@ -93,31 +140,6 @@ class ResourceScheduler:
                 )
                 return
             
-            # Obtener el siguiente tipo de recurso en la rotación
-            resource_type = self._get_next_resource_type()
-            
-            # Incrementar el contador para este tipo de recurso
-            self.resource_counters[resource_type] += 1
-            resource_number = self.resource_counters[resource_type]
-            
-            # Construir el nombre del recurso
-            base_name = ResourcesSchedulerConfig.RESOURCE_NAMES.get(resource_type, "recurso")
-            resource_name = f"{base_name} {resource_number}"
-            
-            # Obtener cantidades y peso aleatorios dentro del rango definido
-            quantity_range = ResourcesSchedulerConfig.RESOURCE_QUANTITIES.get(resource_type, (1, 1))
-            weight_range = ResourcesSchedulerConfig.RESOURCE_WEIGHTS.get(resource_type, (1, 1))
-            
-            cantidad_unitaria = random.randint(quantity_range[0], quantity_range[1])
-            peso = random.randint(weight_range[0], weight_range[1])
-            
-            # Obtener duración de recolección y hormigas requeridas aleatorias
-            duration_range = ResourcesSchedulerConfig.RESOURCE_COLLECTION_DURATIONS.get(resource_type, (10, 10))
-            ants_range = ResourcesSchedulerConfig.RESOURCE_ANT_REQUIREMENTS.get(resource_type, (1, 1))
-            
-            rango_duracion = random.randint(duration_range[0], duration_range[1])
-            rango_hormigas = random.randint(ants_range[0], ants_range[1])
-            
             # Seleccionar una zona aleatoria existente (o la zona por defecto)
             zones = self.zone_repo.obtenerTodasLasZonas()
             if not zones:
@@ -130,18 +152,7 @@ class ResourceScheduler:
                 return
             
             # Crear el recurso
-            new_resource = Resource(
-                id=0,
-                zona_id=selected_zone.id,
-                nombre=resource_name,
-                tipo=resource_type,
-                cantidad_unitaria=cantidad_unitaria,
-                peso=peso,
-                duracion_recoleccion=rango_duracion,  
-                hormigas_requeridas=rango_hormigas,
-                estado=EstadoRecurso.DISPONIBLE,
-                hora_creacion=datetime.now()
-            )
+            new_resource = self._build_resource(selected_zone.id, datetime.now())
             
             # Guardar el recurso en el repositorio
             self.resource_repo.create(new_resource)
@@ -216,5 +227,5 @@ class ResourceScheduler:
         }
         
         
-# Instancia global del scheduler
-resource_scheduler = ResourceScheduler()
\ No newline at end of file
+# Instancia global del scheduler (sobre el backend de almacenamiento configurado)
+resource_scheduler = ResourceScheduler(resource_repo=create_resource_repository())
\ No newline at end of file
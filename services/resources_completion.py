@@ -0,0 +1,183 @@
+"""
+Sondeo de la API de recolección para marcar recursos como recolectados.
+
+Mantiene un loop asyncio propio con un cliente HTTP persistente (pool de
+conexiones), consulta todas las URLs configuradas en paralelo con timeouts y
+cursores incrementales, y aplica todas las recolecciones completadas de una
+ronda con una sola actualización parcial del CSV de recursos. Los cursores se
+guardan en disco después de cada escritura, así que un reinicio retoma desde
+el último confirmado (si el proceso cae entre ambas escrituras se vuelven a
+recibir detalles ya aplicados, que la condición de la actualización ignora).
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import os
+
+import httpx
+
+from config.resources_completion_config import ResourcesCompletionConfig
+from models.resource import EstadoRecurso, Resource
+from repositories.resource_repository import ResourceRepository
+from repositories.storage import create_resource_repository
+from services.background_loop import BackgroundLoop
+
+logger = logging.getLogger(__name__)
+
+STATUS_COMPLETED = "completed"
+
+
+class ResourcesCompletionPoller:
+    """Aplica en bloque las recolecciones completadas reportadas por la API de recolección"""
+
+    def __init__(
+        self,
+        resource_repo: Optional[ResourceRepository] = None,
+        urls: Optional[List[str]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        cursors_file: Optional[str] = None
+    ):
+        self.resource_repo = resource_repo if resource_repo is not None else create_resource_repository()
+        self.urls = list(urls) if urls is not None else list(ResourcesCompletionConfig.COLLECTION_API_URLS)
+        # Transporte alternativo (p. ej. un servidor de prueba ASGI); None usa la red
+        self.transport = transport
+        self.cursors_file = cursors_file or ResourcesCompletionConfig.CURSORS_FILE or os.path.join(
+            os.path.dirname(self.resource_repo.csv_file), "collection_cursors.json"
+        )
+        # Último cursor confirmado por URL
+        self.cursors: Dict[str, str] = self._load_cursors()
+        self._loop = BackgroundLoop("resources-completion")
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _load_cursors(self) -> Dict[str, str]:
+        try:
+            with open(self.cursors_file, "r", encoding="utf-8") as f:
+                cursors = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            logger.warning(f"⚠️ Cursores de recolección ilegibles en {self.cursors_file}, se parte desde el inicio")
+            return {}
+        return {url: cursor for url, cursor in cursors.items() if isinstance(cursor, str)} if isinstance(cursors, dict) else {}
+
+    def _save_cursors(self):
+        """Guarda los cursores de forma atómica (archivo temporal + rename)"""
+        temporary = self.cursors_file + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(self.cursors, f)
+        os.replace(temporary, self.cursors_file)
+
+    def create_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=ResourcesCompletionConfig.MAX_CONNECTIONS,
+            max_keepalive_connections=ResourcesCompletionConfig.MAX_CONNECTIONS
+        )
+        return httpx.AsyncClient(transport=self.transport, timeout=ResourcesCompletionConfig.TIMEOUT_SECONDS, limits=limits)
+
+    async def fetch(self, client: httpx.AsyncClient, url: str) -> Tuple[List[dict], Optional[str]]:
+        """
+        Consulta una URL desde su cursor. Acepta una lista de detalles o un objeto
+        {"items": [...], "cursor": "..."}. Retorna los detalles y el cursor siguiente.
+        """
+        params = {"cursor": self.cursors[url]} if url in self.cursors else None
+        response = await client.get(url, params=params)
+        response.raise_for_status()
+        payload = response.json()
+        if isinstance(payload, dict):
+            return payload.get("items", []), payload.get("cursor")
+        return payload, None
+
+    @staticmethod
+    def _completion_fields(detail: dict, now: datetime) -> dict:
+        completed_at = detail.get("completed_at")
+        hora_recoleccion = datetime.fromisoformat(completed_at) if completed_at else now
+        if hora_recoleccion.tzinfo is not None:
+            # El CSV guarda hora local sin zona horaria (p. ej. "...Z" de la API)
+            hora_recoleccion = hora_recoleccion.astimezone().replace(tzinfo=None)
+        return {"estado": EstadoRecurso.RECOLECTADO, "hora_recoleccion": hora_recoleccion}
+
+    async def poll(self, client: httpx.AsyncClient) -> dict:
+        """
+        Ejecuta una ronda: consulta todas las URLs en paralelo y aplica las
+        recolecciones completadas con una sola escritura. Los cursores solo
+        avanzan si la escritura se realizó.
+        """
+        results = await asyncio.gather(*(self.fetch(client, url) for url in self.urls), return_exceptions=True)
+
+        now = datetime.now()
+        changes: Dict[int, dict] = {}
+        next_cursors: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+        for url, result in zip(self.urls, results):
+            if isinstance(result, Exception):
+                errors[url] = str(result) or type(result).__name__
+                logger.error(f"❌ Error consultando recolecciones en {url}: {errors[url]}")
+                continue
+            details, cursor = result
+            invalid = 0
+            for detail in details:
+                # Un detalle mal formado se omite sin bloquear al resto ni al cursor
+                try:
+                    if detail.get("status") == STATUS_COMPLETED:
+                        changes[int(detail["resource_id"])] = self._completion_fields(detail, now)
+                except (AttributeError, KeyError, TypeError, ValueError) as e:
+                    invalid += 1
+                    logger.warning(f"⚠️ Detalle de recolección inválido en {url}, se omite: {detail!r} ({e})")
+            if invalid:
+                errors[url] = f"{invalid} detalles inválidos omitidos"
+            if cursor is not None:
+                next_cursors[url] = cursor
+
+        applied: List[Resource] = []
+        if changes:
+            # Solo se completan recursos que aún no estaban recolectados; el resto de
+            # los campos (cantidad, peso, etc.) se conserva
+            applied = self.resource_repo.update_fields(
+                changes, condition=lambda r: r.estado != EstadoRecurso.RECOLECTADO
+            )
+        if any(self.cursors.get(url) != cursor for url, cursor in next_cursors.items()):
+            self.cursors.update(next_cursors)
+            self._save_cursors()
+
+        if applied:
+            logger.info(f"✅ Recursos recolectados: {[r.id for r in applied]}")
+        return {
+            "polled": len(self.urls),
+            "completions": len(changes),
+            "applied": len(applied),
+            "errors": errors,
+        }
+
+    async def _run(self, stop_event: asyncio.Event):
+        await stop_event.wait()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _poll_with_shared_client(self) -> dict:
+        # El cliente se crea en el loop dedicado y se reutiliza entre rondas
+        if self._client is None:
+            self._client = self.create_client()
+        return await self.poll(self._client)
+
+    def poll_now(self, timeout: Optional[float] = None) -> dict:
+        """Ejecuta una ronda desde cualquier hilo (p. ej. un job de APScheduler)"""
+        if not self.urls:
+            return {"polled": 0, "completions": 0, "applied": 0, "errors": {}}
+        if not self._loop.is_running:
+            self._loop.start(self._run)
+        return self._loop.run(
+            self._poll_with_shared_client(),
+            timeout if timeout is not None else ResourcesCompletionConfig.POLL_TIMEOUT_SECONDS
+        )
+
+    def stop(self):
+        """Cierra el pool de conexiones y detiene el loop"""
+        if self._loop.is_running:
+            self._loop.stop()
+
+
+# Instancia global del sondeo
+resources_completion_poller = ResourcesCompletionPoller()
@@ -0,0 +1,51 @@
+"""
+Escritura periódica de los snapshots binarios de recursos y amenazas.
+
+Al arrancar, las vistas en memoria cargan cada repositorio desde su snapshot y
+solo decodifican las filas agregadas al CSV después de él; cuanto más reciente
+el snapshot, menos texto queda por parsear.
+"""
+from datetime import datetime
+from typing import Optional
+import logging
+
+from repositories.resource_repository import ResourceRepository
+from repositories.threat_repository import ThreatRepository
+from repositories.storage import create_resource_repository, create_threat_repository
+
+logger = logging.getLogger(__name__)
+
+
+class Snapshotter:
+    """Escribe el snapshot binario de los repositorios de recursos y amenazas"""
+
+    def __init__(
+        self,
+        resource_repo: Optional[ResourceRepository] = None,
+        threat_repo: Optional[ThreatRepository] = None
+    ):
+        self.resource_repo = resource_repo if resource_repo is not None else create_resource_repository()
+        self.threat_repo = threat_repo if threat_repo is not None else create_threat_repository()
+        self.last_run: Optional[datetime] = None
+        self.last_result: Optional[dict] = None
+
+    def snapshot(self) -> dict:
+        """Escribe ambos snapshots. Retorna cuántas filas guardó cada uno"""
+        result = {
+            "resources": self.resource_repo.write_snapshot(),
+            "threats": self.threat_repo.write_snapshot(),
+        }
+        self.last_run = datetime.now()
+        self.last_result = result
+        logger.info(f"📸 Snapshot escrito: {result['resources']} recursos y {result['threats']} amenazas")
+        return result
+
+    def get_status(self) -> dict:
+        return {
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "rows": dict(self.last_result) if self.last_result else None,
+        }
+
+
+# Instancia global del escritor de snapshots
+snapshotter = Snapshotter()
@@ -0,0 +1,66 @@
+"""
+Escalamiento de amenazas activas.
+
+El costo de una amenaza en estado `activa` crece con el tiempo desde
+`hora_deteccion` según la curva de su tipo. El valor se calcula al leer (sin
+reescribir el CSV periódicamente) y solo se persiste cuando la amenaza sale
+de `activa`, momento a partir del cual deja de crecer.
+"""
+from dataclasses import replace
+from datetime import datetime
+from typing import Iterable, List, Optional
+import math
+
+from config.threat_escalation_config import ThreatEscalationConfig, EXPONENTIAL
+from models.threat import Threat, EstadoAmenaza
+
+
+def escalation_multiplier(threat: Threat, now: datetime) -> float:
+    """Multiplicador del costo base según el tiempo que la amenaza lleva activa"""
+    if not ThreatEscalationConfig.ENABLED or threat.estado != EstadoAmenaza.ACTIVA or threat.hora_deteccion is None:
+        return 1.0
+    kind, grace_seconds, growth, max_multiplier = ThreatEscalationConfig.CURVES.get(
+        threat.tipo, ThreatEscalationConfig.DEFAULT_CURVE
+    )
+    hours = max(0.0, (now - threat.hora_deteccion).total_seconds() - grace_seconds) / 3600
+    if hours <= 0:
+        return 1.0
+    if kind == EXPONENTIAL:
+        # Comparar en escala logarítmica evita desbordes con amenazas muy antiguas
+        if hours * math.log1p(growth) >= math.log(max_multiplier):
+            return max_multiplier
+        multiplier = (1 + growth) ** hours
+    else:
+        multiplier = 1 + growth * hours
+    return min(multiplier, max_multiplier)
+
+
+def max_escalation_multiplier() -> float:
+    """Mayor multiplicador que puede alcanzar cualquier amenaza (cota para búsquedas)"""
+    if not ThreatEscalationConfig.ENABLED:
+        return 1.0
+    curves = list(ThreatEscalationConfig.CURVES.values()) + [ThreatEscalationConfig.DEFAULT_CURVE]
+    return max(1.0, max(curve[3] for curve in curves))
+
+
+def escalated_cost(threat: Threat, now: Optional[datetime] = None) -> int:
+    """Costo actual de la amenaza (el costo persistido nunca disminuye)"""
+    multiplier = escalation_multiplier(threat, now or datetime.now())
+    return max(threat.costo_hormigas, math.floor(threat.costo_hormigas * multiplier + 1e-9))
+
+
+def with_escalation(threat: Threat, now: Optional[datetime] = None) -> Threat:
+    """Copia de la amenaza con el costo escalado, para responder sin modificar el CSV"""
+    cost = escalated_cost(threat, now)
+    return threat if cost == threat.costo_hormigas else replace(threat, costo_hormigas=cost)
+
+
+def with_escalation_all(threats: Iterable[Threat], now: Optional[datetime] = None) -> List[Threat]:
+    now = now or datetime.now()
+    return [with_escalation(t, now) for t in threats]
+
+
+def materialize_escalation(threat: Threat, new_estado: EstadoAmenaza, now: datetime):
+    """Fija el costo escalado en la amenaza cuando deja de estar activa"""
+    if threat.estado == EstadoAmenaza.ACTIVA and new_estado != EstadoAmenaza.ACTIVA:
+        threat.costo_hormigas = escalated_cost(threat, now)
@@ -11,6 +11,8 @@ import random
 from models.threat import Threat, TipoAmenaza, EstadoAmenaza
 from repositories.threat_repository import ThreatRepository
 from repositories.zone_repository import ZoneRepository
+from repositories.storage import create_threat_repository
+from services.metrics import metrics
 from config.scheduler_config import SchedulerConfig
 
 # Configurar logging
@@ -25,10 +27,10 @@ class ThreatScheduler:
     genera instancias secuenciales (araña 1, araña 2, etc.)
     """
     
-    def __init__(self):
+    def __init__(self, threat_repo=None, zone_repo=None):
         self.scheduler = BackgroundScheduler()
-        self.threat_repo = ThreatRepository()
-        self.zone_repo = ZoneRepository()
+        self.threat_repo = threat_repo if threat_repo is not None else ThreatRepository()
+        self.zone_repo = zone_repo if zone_repo is not None else ZoneRepository()
         self.is_running = False
         
         # Contadores para cada tipo de amenaza
@@ -78,6 +80,37 @@ class ThreatScheduler:
         
         return threat_type
     
+    def _build_threat(self, zona_id: int, hora_deteccion: datetime) -> Threat:
+        """
+        Construye la siguiente amenaza de la rotación sin persistirla.
+        Avanza la rotación y el contador del tipo correspondiente, de modo que
+        puede reutilizarse fuera del scheduler (p. ej. en la simulación acelerada).
+        """
+        # Obtener el siguiente tipo de amenaza en la rotación
+        threat_type = self._get_next_threat_type()
+        
+        # Incrementar contador para este tipo
+        self.threat_counters[threat_type] += 1
+        counter = self.threat_counters[threat_type]
+        
+        # Generar nombre (ej: "araña 1", "abeja 2")
+        base_name = SchedulerConfig.THREAT_NAMES[threat_type]
+        threat_name = f"{base_name} {counter}"
+        
+        # Obtener costo para este tipo de amenaza
+        cost = SchedulerConfig.get_threat_cost(threat_type)
+        
+        return Threat(
+            id=0,  # Se auto-asignará en el repositorio
+            zona_id=zona_id,
+            nombre=threat_name,
+            tipo=threat_type,
+            costo_hormigas=cost,
+            estado=EstadoAmenaza.ACTIVA,
+            hora_deteccion=hora_deteccion
+        )
+    
+    @metrics.timed_job("threat_generator")
     def _generate_threat(self):
         """
         Genera una nueva amenaza automáticamente.
@@ -89,30 +122,8 @@ class ThreatScheduler:
                 logger.error(f"La zona {SchedulerConfig.DEFAULT_ZONE_ID} no existe. No se puede generar amenaza.")
                 return
             
-            # Obtener el siguiente tipo de amenaza en la rotación
-            threat_type = self._get_next_threat_type()
-            
-            # Incrementar contador para este tipo
-            self.threat_counters[threat_type] += 1
-            counter = self.threat_counters[threat_type]
-            
-            # Generar nombre (ej: "araña 1", "abeja 2")
-            base_name = SchedulerConfig.THREAT_NAMES[threat_type]
-            threat_name = f"{base_name} {counter}"
-            
-            # Obtener costo para este tipo de amenaza
-            cost = SchedulerConfig.get_threat_cost(threat_type)
-            
-            # Crear la amenaza
-            threat = Threat(
-                id=0,  # Se auto-asignará en el repositorio
-                zona_id=SchedulerConfig.DEFAULT_ZONE_ID,
-                nombre=threat_name,
-                tipo=threat_type,
-                costo_hormigas=cost,
-                estado=EstadoAmenaza.ACTIVA,
-                hora_deteccion=datetime.now()
-            )
+            # Construir la amenaza en la zona por defecto
+            threat = self._build_threat(SchedulerConfig.DEFAULT_ZONE_ID, datetime.now())
             
             # Guardar en el repositorio
             created_threat = self.threat_repo.create(threat)
@@ -183,5 +194,5 @@ class ThreatScheduler:
         }
 
 
-# Instancia global del scheduler
-threat_scheduler = ThreatScheduler()
+# Instancia global del scheduler (sobre el backend de almacenamiento configurado)
+threat_scheduler = ThreatScheduler(threat_repo=create_threat_repository())
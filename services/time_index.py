@@ -0,0 +1,125 @@
+"""
+Índice temporal de recursos y amenazas.
+
+Por cada campo de fecha se mantiene una lista ordenada de `(timestamp, id)`,
+así un rango como "lo creado en los últimos 5 minutos" se resuelve con dos
+búsquedas binarias en lugar de parsear cada fecha ISO del CSV. Al construir
+el índice las claves se acumulan y se ordenan una sola vez. Las filas se
+guardan en un almacén columnar y solo se reconstruyen las que se devuelven.
+"""
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from models.resource import Resource
+from models.threat import Threat
+from services.columnar_store import ColumnarStore
+from services.materialized_view import MaterializedView
+
+RESOURCE_TIME_FIELDS = ("hora_creacion", "hora_recoleccion")
+THREAT_TIME_FIELDS = ("hora_deteccion", "hora_resolucion")
+
+
+def _timestamp(value: datetime) -> float:
+    """Segundos desde epoch; las fechas con zona horaria se comparan en hora local como las del CSV"""
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.timestamp()
+
+
+class _TimeKeys:
+    """Claves `(timestamp, id)` ordenadas de un campo de fecha; mientras `loading`, se ordenan en `seal()`"""
+
+    def __init__(self, field: str):
+        self.field = field
+        self.keys: List[tuple] = []
+        self.loading = True
+
+    def seal(self):
+        self.keys.sort()
+        self.loading = False
+
+    def _key(self, entity) -> Optional[tuple]:
+        value = getattr(entity, self.field)
+        return (_timestamp(value), entity.id) if value is not None else None
+
+    def apply(self, entity, sign: int):
+        key = self._key(entity)
+        if key is None:
+            return
+        if sign > 0:
+            if self.loading:
+                self.keys.append(key)
+            else:
+                insort(self.keys, key)
+            return
+        position = bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            del self.keys[position]
+
+    def between(self, after: Optional[datetime], before: Optional[datetime]) -> List[int]:
+        """IDs con after <= fecha < before"""
+        start = bisect_left(self.keys, (_timestamp(after),)) if after is not None else 0
+        end = bisect_left(self.keys, (_timestamp(before),)) if before is not None else len(self.keys)
+        return [key[1] for key in self.keys[start:end]]
+
+
+class TimeIndex(MaterializedView):
+    """Recursos y amenazas indexados por cada uno de sus campos de fecha"""
+
+    def reset(self):
+        self._resources = ColumnarStore(Resource)
+        self._threats = ColumnarStore(Threat)
+        self._resource_keys = {field: _TimeKeys(field) for field in RESOURCE_TIME_FIELDS}
+        self._threat_keys = {field: _TimeKeys(field) for field in THREAT_TIME_FIELDS}
+
+    def finish_bootstrap(self):
+        for keys in (*self._resource_keys.values(), *self._threat_keys.values()):
+            keys.seal()
+
+    @staticmethod
+    def _apply(entities: ColumnarStore, indexes: Dict[str, _TimeKeys], entity, sign: int):
+        for index in indexes.values():
+            index.apply(entity, sign)
+        if sign > 0:
+            entities.put(entity)
+        else:
+            entities.remove(entity.id)
+
+    def apply_resource(self, resource: Resource, sign: int):
+        self._apply(self._resources, self._resource_keys, resource, sign)
+
+    def apply_threat(self, threat: Threat, sign: int):
+        self._apply(self._threats, self._threat_keys, threat, sign)
+
+    @staticmethod
+    def _select(entities: ColumnarStore, ids: List[int], zona_id: Optional[int], estado: Optional[str]) -> list:
+        selected = []
+        for entity_id in sorted(ids):
+            entity = entities.get(entity_id)
+            if zona_id is not None and entity.zona_id != zona_id:
+                continue
+            if estado is not None and entity.estado.value != estado:
+                continue
+            selected.append(entity.to_model())
+        return selected
+
+    def resources_between(self, field: str, after: Optional[datetime] = None, before: Optional[datetime] = None,
+                          zona_id: Optional[int] = None, estado: Optional[str] = None) -> List[Resource]:
+        """Recursos con `field` en [after, before), ordenados por ID como en el CSV"""
+        self.ensure_started()
+        with self.lock:
+            ids = self._resource_keys[field].between(after, before)
+            return self._select(self._resources, ids, zona_id, estado)
+
+    def threats_between(self, field: str, after: Optional[datetime] = None, before: Optional[datetime] = None,
+                        zona_id: Optional[int] = None, estado: Optional[str] = None) -> List[Threat]:
+        """Amenazas con `field` en [after, before), ordenadas por ID como en el CSV"""
+        self.ensure_started()
+        with self.lock:
+            ids = self._threat_keys[field].between(after, before)
+            return self._select(self._threats, ids, zona_id, estado)
+
+
+# Instancia global del índice
+time_index = TimeIndex()
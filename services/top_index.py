@@ -0,0 +1,150 @@
+"""
+Índices ordenados para consultas top-k de amenazas y recursos.
+
+Cada criterio mantiene una lista ordenada global y una por zona de claves
+`(orden, id)`, actualizada con búsqueda binaria en cada cambio. Al construir
+la vista las claves solo se acumulan y se ordenan una vez al final: insertar
+fila por fila desplaza la lista en cada inserción (cuadrático). Una consulta
+top-k lee los primeros k elementos sin recorrer ni ordenar la tabla completa.
+Las filas indexadas se guardan en un almacén columnar compacto.
+"""
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+import heapq
+
+from models.resource import EstadoRecurso, Resource
+from models.threat import EstadoAmenaza, Threat
+from services.columnar_store import ColumnarStore
+from services.materialized_view import MaterializedView
+from services.threat_escalation import escalated_cost, max_escalation_multiplier, with_escalation
+
+# Criterios de orden: cada uno define la clave ascendente (la primera es la de mayor prioridad)
+THREAT_ORDERS: Dict[str, Callable[[Threat], tuple]] = {
+    # Mayor costo primero
+    "cost": lambda t: (-t.costo_hormigas, t.id),
+    # Detectada hace más tiempo primero
+    "age": lambda t: (t.hora_deteccion.timestamp() if t.hora_deteccion else 0.0, t.id),
+}
+RESOURCE_ORDERS: Dict[str, Callable[[Resource], tuple]] = {
+    # Mayor masa (cantidad_unitaria * peso) primero
+    "value": lambda r: (-r.cantidad_unitaria * r.peso, r.id),
+    # Mayor peso primero
+    "weight": lambda r: (-r.peso, r.id),
+    # Menor duración de recolección primero
+    "duration": lambda r: (r.duracion_recoleccion, r.id),
+}
+
+
+class _SortedKeys:
+    """Claves ordenadas global y por zona; mientras `loading`, las altas se ordenan en `seal()`"""
+
+    def __init__(self):
+        self.all: List[tuple] = []
+        self.by_zone: Dict[int, List[tuple]] = {}
+        self.loading = True
+
+    def seal(self):
+        self.all.sort()
+        for keys in self.by_zone.values():
+            keys.sort()
+        self.loading = False
+
+    @staticmethod
+    def _remove(keys: List[tuple], key: tuple):
+        position = bisect_left(keys, key)
+        if position < len(keys) and keys[position] == key:
+            del keys[position]
+
+    def add(self, zona_id: int, key: tuple):
+        if self.loading:
+            self.all.append(key)
+            self.by_zone.setdefault(zona_id, []).append(key)
+            return
+        insort(self.all, key)
+        insort(self.by_zone.setdefault(zona_id, []), key)
+
+    def remove(self, zona_id: int, key: tuple):
+        self._remove(self.all, key)
+        keys = self.by_zone.get(zona_id)
+        if keys is not None:
+            self._remove(keys, key)
+            if not keys:
+                del self.by_zone[zona_id]
+
+    def keys(self, zona_id: Optional[int]) -> List[tuple]:
+        return self.all if zona_id is None else self.by_zone.get(zona_id, [])
+
+
+class TopIndex(MaterializedView):
+    """Amenazas activas y recursos disponibles, ordenados por cada criterio"""
+
+    def reset(self):
+        self._threats = ColumnarStore(Threat)
+        self._resources = ColumnarStore(Resource)
+        self._threat_keys = {order: _SortedKeys() for order in THREAT_ORDERS}
+        self._resource_keys = {order: _SortedKeys() for order in RESOURCE_ORDERS}
+
+    def finish_bootstrap(self):
+        for keys in (*self._threat_keys.values(), *self._resource_keys.values()):
+            keys.seal()
+
+    @staticmethod
+    def _apply(entities: ColumnarStore, indexes: Dict[str, _SortedKeys], orders: dict, entity, sign: int):
+        for order, key in orders.items():
+            if sign > 0:
+                indexes[order].add(entity.zona_id, key(entity))
+            else:
+                indexes[order].remove(entity.zona_id, key(entity))
+        if sign > 0:
+            entities.put(entity)
+        else:
+            entities.remove(entity.id)
+
+    def apply_threat(self, threat: Threat, sign: int):
+        if threat.estado == EstadoAmenaza.ACTIVA:
+            self._apply(self._threats, self._threat_keys, THREAT_ORDERS, threat, sign)
+
+    def apply_resource(self, resource: Resource, sign: int):
+        if resource.estado == EstadoRecurso.DISPONIBLE:
+            self._apply(self._resources, self._resource_keys, RESOURCE_ORDERS, resource, sign)
+
+    def top_threats(self, k: int, order: str = "cost", zona_id: Optional[int] = None,
+                    now: Optional[datetime] = None) -> List[Threat]:
+        """
+        Las k amenazas activas de mayor prioridad, con el costo escalado. Para
+        "cost" se recorre el índice por costo persistido y se corta cuando ni el
+        multiplicador máximo permitiría superar a la k-ésima ya encontrada.
+        """
+        self.ensure_started()
+        now = now or datetime.now()
+        with self.lock:
+            keys = self._threat_keys[order].keys(zona_id)
+            if order != "cost":
+                return [with_escalation(self._threats.get(key[-1]).to_model(), now) for key in keys[:k]]
+            if k <= 0:
+                return []
+            ceiling = max_escalation_multiplier()
+            best: List[Tuple[int, int]] = []
+            for key in keys:
+                threat = self._threats.get(key[-1])
+                if len(best) == k and threat.costo_hormigas * ceiling < best[0][0]:
+                    break
+                entry = (escalated_cost(threat, now), -threat.id)
+                if len(best) < k:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+            chosen = [self._threats.get(-threat_id).to_model() for _, threat_id in sorted(best, reverse=True)]
+        return [with_escalation(threat, now) for threat in chosen]
+
+    def top_resources(self, k: int, order: str = "value", zona_id: Optional[int] = None) -> List[Resource]:
+        """Los k recursos disponibles de mayor prioridad según `order`"""
+        self.ensure_started()
+        with self.lock:
+            keys = self._resource_keys[order].keys(zona_id)
+            return [self._resources.get(key[-1]).to_model() for key in keys[:max(k, 0)]]
+
+
+# Instancia global del índice
+top_index = TopIndex()
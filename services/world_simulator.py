@@ -0,0 +1,203 @@
+"""
+Simulación acelerada del mundo para generación masiva de datos.
+Reutiliza la lógica de generación de los schedulers de recursos y amenazas,
+pero avanza un reloj virtual en lugar de esperar al reloj de pared y escribe
+en bloque sobre los repositorios.
+
+Uso:
+    python -m services.world_simulator --ticks 10000 --zones 1000 --data-dir data_bench
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import argparse
+import logging
+import os
+import random
+
+from models.resource import Resource, EstadoRecurso
+from models.threat import Threat, EstadoAmenaza
+from models.zone import Zona
+from repositories.zone_repository import ZoneRepository
+from repositories.storage import create_resource_repository, create_threat_repository
+from services.resource_scheduler import ResourceScheduler
+from services.threat_scheduler import ThreatScheduler
+from config.simulation_config import SimulationConfig
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class WorldSimulator:
+    """
+    Ejecuta N ticks virtuales del mundo generando recursos y amenazas con una
+    distribución de estados realista, sin dormir entre ticks.
+    """
+
+    def __init__(self, resource_repo, threat_repo, zone_repo, batch_size: int = SimulationConfig.BATCH_SIZE):
+        self.resource_repo = resource_repo
+        self.threat_repo = threat_repo
+        self.zone_repo = zone_repo
+        self.batch_size = batch_size
+
+        # Los schedulers sólo se usan como generadores: nunca se inician
+        self.resource_generator = ResourceScheduler(resource_repo=resource_repo, zone_repo=zone_repo)
+        self.threat_generator = ThreatScheduler(threat_repo=threat_repo, zone_repo=zone_repo)
+
+        self._pending_resources: List[Resource] = []
+        self._pending_threats: List[Threat] = []
+
+    def ensure_zones(self, count: int, fecha_creacion: Optional[datetime] = None) -> List[int]:
+        """Garantiza que existan al menos `count` zonas y retorna los IDs disponibles"""
+        fecha_creacion = fecha_creacion or datetime.now()
+        existentes = {z.id for z in self.zone_repo.obtenerTodasLasZonas()}
+
+        nuevas = []
+        zone_id = 1
+        while len(existentes) + len(nuevas) < count:
+            if zone_id not in existentes:
+                tipo = SimulationConfig.ZONE_TYPES[zone_id % len(SimulationConfig.ZONE_TYPES)]
+                nuevas.append(Zona(
+                    id=zone_id,
+                    nombre=f"Zona {tipo.value.capitalize()} {zone_id}",
+                    tipo=tipo,
+                    fecha_creacion=fecha_creacion
+                ))
+            zone_id += 1
+
+        if nuevas:
+            self.zone_repo.crearZonas(nuevas)
+        return sorted(existentes | {z.id for z in nuevas})
+
+    def run(
+        self,
+        ticks: int,
+        zone_ids: List[int],
+        resources_per_tick: int = SimulationConfig.RESOURCES_PER_TICK,
+        threats_per_tick: int = SimulationConfig.THREATS_PER_TICK,
+        tick_seconds: int = SimulationConfig.TICK_SECONDS,
+        start: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        """
+        Ejecuta la simulación. El reloj virtual arranca en `start` y avanza
+        `tick_seconds` por tick; retorna la cantidad de entidades escritas.
+        """
+        if not zone_ids:
+            raise ValueError("Se requiere al menos una zona para simular.")
+
+        start = start or datetime.now() - timedelta(seconds=ticks * tick_seconds)
+        totals = {"resources": 0, "threats": 0}
+
+        for tick in range(ticks):
+            now = start + timedelta(seconds=tick * tick_seconds)
+
+            for _ in range(resources_per_tick):
+                resource = self.resource_generator._build_resource(random.choice(zone_ids), now)
+                self._pending_resources.append(self._apply_resource_state(resource, tick_seconds))
+
+            for _ in range(threats_per_tick):
+                threat = self.threat_generator._build_threat(random.choice(zone_ids), now)
+                self._pending_threats.append(self._apply_threat_state(threat, tick_seconds))
+
+            if len(self._pending_resources) >= self.batch_size:
+                totals["resources"] += self._flush_resources()
+            if len(self._pending_threats) >= self.batch_size:
+                totals["threats"] += self._flush_threats()
+
+        totals["resources"] += self._flush_resources()
+        totals["threats"] += self._flush_threats()
+
+        logger.info(
+            f"✅ Simulación completada: {ticks} ticks, {totals['resources']} recursos, "
+            f"{totals['threats']} amenazas en {len(zone_ids)} zonas"
+        )
+        return totals
+
+    def _apply_resource_state(self, resource: Resource, tick_seconds: int) -> Resource:
+        """Asigna un estado según la distribución configurada, con horas coherentes"""
+        estados = list(SimulationConfig.RESOURCE_STATE_WEIGHTS.keys())
+        pesos = list(SimulationConfig.RESOURCE_STATE_WEIGHTS.values())
+        resource.estado = random.choices(estados, weights=pesos)[0]
+
+        if resource.estado != EstadoRecurso.DISPONIBLE:
+            resource.hora_inicio_recoleccion = resource.hora_creacion + timedelta(
+                seconds=random.randint(0, tick_seconds)
+            )
+        if resource.estado == EstadoRecurso.RECOLECTADO:
+            resource.hora_recoleccion = resource.hora_inicio_recoleccion + timedelta(
+                seconds=resource.duracion_recoleccion
+            )
+        return resource
+
+    def _apply_threat_state(self, threat: Threat, tick_seconds: int) -> Threat:
+        """Asigna un estado según la distribución configurada, con horas coherentes"""
+        estados = list(SimulationConfig.THREAT_STATE_WEIGHTS.keys())
+        pesos = list(SimulationConfig.THREAT_STATE_WEIGHTS.values())
+        threat.estado = random.choices(estados, weights=pesos)[0]
+
+        if threat.estado == EstadoAmenaza.RESUELTA:
+            threat.hora_resolucion = threat.hora_deteccion + timedelta(
+                seconds=random.randint(1, max(1, tick_seconds))
+            )
+        return threat
+
+    def _flush_resources(self) -> int:
+        """Escribe en bloque los recursos pendientes"""
+        pending, self._pending_resources = self._pending_resources, []
+        if pending:
+            self._write_many(self.resource_repo, pending)
+        return len(pending)
+
+    def _flush_threats(self) -> int:
+        """Escribe en bloque las amenazas pendientes"""
+        pending, self._pending_threats = self._pending_threats, []
+        if pending:
+            self._write_many(self.threat_repo, pending)
+        return len(pending)
+
+    @staticmethod
+    def _write_many(repo, entities: list):
+        """Usa la escritura en bloque del repositorio si la soporta"""
+        create_many = getattr(repo, "create_many", None)
+        if create_many is not None:
+            create_many(entities)
+            return
+        for entity in entities:
+            repo.create(entity)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Punto de entrada de la línea de comandos"""
+    parser = argparse.ArgumentParser(description="Simulación acelerada del mundo de la colonia")
+    parser.add_argument("--ticks", type=int, required=True, help="Cantidad de ticks virtuales a simular")
+    parser.add_argument("--zones", type=int, default=2, help="Cantidad mínima de zonas del mundo")
+    parser.add_argument("--resources-per-tick", type=int, default=SimulationConfig.RESOURCES_PER_TICK)
+    parser.add_argument("--threats-per-tick", type=int, default=SimulationConfig.THREATS_PER_TICK)
+    parser.add_argument("--tick-seconds", type=int, default=SimulationConfig.TICK_SECONDS)
+    parser.add_argument("--batch-size", type=int, default=SimulationConfig.BATCH_SIZE)
+    parser.add_argument("--data-dir", default="data", help="Directorio de los archivos CSV destino")
+    parser.add_argument("--seed", type=int, default=None, help="Semilla para resultados reproducibles")
+    args = parser.parse_args(argv)
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    simulator = WorldSimulator(
+        resource_repo=create_resource_repository(os.path.join(args.data_dir, "resources.csv")),
+        threat_repo=create_threat_repository(os.path.join(args.data_dir, "threats.csv")),
+        zone_repo=ZoneRepository(os.path.join(args.data_dir, "zones.csv")),
+        batch_size=args.batch_size
+    )
+    zone_ids = simulator.ensure_zones(args.zones)
+    totals = simulator.run(
+        ticks=args.ticks,
+        zone_ids=zone_ids,
+        resources_per_tick=args.resources_per_tick,
+        threats_per_tick=args.threats_per_tick,
+        tick_seconds=args.tick_seconds
+    )
+    print(f"Recursos: {totals['resources']} - Amenazas: {totals['threats']} - Zonas: {len(zone_ids)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Codificación compacta del estado del mundo para las suscripciones por WebSocket.
+
+Las entidades se envían como arreglos en el orden de campos anunciado en el
+snapshot inicial (en vez de objetos con claves repetidas), y los cambios se
+agrupan en frames delta. También valida y aplica en bloque las transiciones
+de estado enviadas por los clientes.
+"""
+from dataclasses import fields
+from datetime import datetime
+from enum import Enum
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from models.resource import Resource, EstadoRecurso
+from models.threat import Threat, EstadoAmenaza
+from models.zone import Zona
+from repositories.change_log import (
+    ChangeEvent, ENTITY_RESOURCE, ENTITY_THREAT, ENTITY_ZONE, ACTION_CREATED, ACTION_DELETED, ACTION_ARCHIVED
+)
+from services.resource_depletion import remaining_quantity, materialize_depletion, set_quantity
+from services.threat_escalation import materialize_escalation
+
+# Orden de los campos de cada entidad en los arreglos compactos
+FIELDS: Dict[str, List[str]] = {
+    ENTITY_RESOURCE: [f.name for f in fields(Resource)],
+    ENTITY_THREAT: [f.name for f in fields(Threat)],
+    ENTITY_ZONE: [f.name for f in fields(Zona)],
+}
+
+
+def _encode_value(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_row(entity: str, obj) -> list:
+    """Serializa una entidad como arreglo en el orden de FIELDS"""
+    return [_encode_value(getattr(obj, name)) for name in FIELDS[entity]]
+
+
+def _in_zones(zona_id: Optional[int], zonas: Optional[Set[int]]) -> bool:
+    return zonas is None or zona_id in zonas
+
+
+def build_snapshot(
+    version: int,
+    zonas: Optional[Set[int]],
+    resources: Iterable[Resource],
+    threats: Iterable[Threat],
+    zones: Iterable[Zona]
+) -> dict:
+    """Frame inicial con el estado de las zonas suscritas (todas si `zonas` es None)"""
+    return {
+        "type": "snapshot",
+        "version": version,
+        "fields": FIELDS,
+        ENTITY_RESOURCE: [encode_row(ENTITY_RESOURCE, r) for r in resources if _in_zones(r.zona_id, zonas)],
+        ENTITY_THREAT: [encode_row(ENTITY_THREAT, t) for t in threats if _in_zones(t.zona_id, zonas)],
+        ENTITY_ZONE: [encode_row(ENTITY_ZONE, z) for z in zones if _in_zones(z.id, zonas)],
+    }
+
+
+def build_delta(events: List[ChangeEvent], zonas: Optional[Set[int]]) -> Optional[dict]:
+    """
+    Agrupa los eventos en un frame delta: [entidad, acción, id, fila|null].
+    Varios cambios sobre la misma entidad se colapsan en el último.
+    Retorna None si ningún evento corresponde a las zonas suscritas.
+    """
+    latest: Dict[Tuple[str, int], Tuple[str, ChangeEvent]] = {}
+    for event in events:
+        if event.entity not in FIELDS or not _in_zones(event.zona_id, zonas):
+            continue
+        key = (event.entity, event.entity_id)
+        action = event.action
+        pending = latest.pop(key, None)
+        if pending is not None and pending[0] == ACTION_CREATED:
+            if action in (ACTION_DELETED, ACTION_ARCHIVED):
+                # Creada y eliminada dentro del mismo frame: el cliente nunca la vio
+                continue
+            action = ACTION_CREATED
+        latest[key] = (action, event)
+    if not latest:
+        return None
+    changes = []
+    for action, event in latest.values():
+        row = encode_row(event.entity, event.data) if event.data is not None else None
+        changes.append([event.entity, action, event.entity_id, row])
+    return {"type": "delta", "version": events[-1].seq, "changes": changes}
+
+
+class TransitionError(ValueError):
+    """Transición de estado rechazada"""
+
+
+def _apply_resource_transition(resource: Resource, change: dict, now: datetime):
+    try:
+        estado = EstadoRecurso(change.get("estado"))
+    except ValueError:
+        raise TransitionError(f"Estado de recurso inválido: {change.get('estado')!r}")
+    cantidad = change.get("cantidad_unitaria")
+    if cantidad is not None:
+        if not isinstance(cantidad, int) or cantidad <= 0 or cantidad > remaining_quantity(resource, now):
+            raise TransitionError("Cantidad inválida")
+        set_quantity(resource, cantidad, now)
+    if estado == EstadoRecurso.RECOLECTADO:
+        resource.hora_recoleccion = now
+    elif estado == EstadoRecurso.EN_RECOLECCION and resource.estado != EstadoRecurso.EN_RECOLECCION:
+        resource.hora_inicio_recoleccion = now
+    materialize_depletion(resource, estado, now)
+    resource.estado = estado
+
+
+def _apply_threat_transition(threat: Threat, change: dict, now: datetime):
+    try:
+        estado = EstadoAmenaza(change.get("estado"))
+    except ValueError:
+        raise TransitionError(f"Estado de amenaza inválido: {change.get('estado')!r}")
+    if estado == EstadoAmenaza.RESUELTA:
+        if threat.estado == EstadoAmenaza.RESUELTA:
+            return
+        # Solo se puede pasar a "resuelta" desde "en_combate" (misma regla que PUT /threats)
+        if threat.estado != EstadoAmenaza.EN_COMBATE:
+            raise TransitionError(
+                f"No se puede cambiar de '{threat.estado.value}' a 'resuelta'. La amenaza debe estar 'en_combate' primero."
+            )
+        threat.hora_resolucion = now
+    materialize_escalation(threat, estado, now)
+    threat.estado = estado
+
+
+def apply_transitions(changes: List[dict], resource_repo, threat_repo) -> dict:
+    """
+    Valida y aplica un lote de transiciones [{entidad, id, estado, ...}].
+    Cada tipo de entidad se lee una sola vez, valida y persiste bajo el lock
+    del repositorio, con una sola escritura: una escritura
+    concurrente (schedulers, temporizadores, poller) no se pierde al escribir.
+    Retorna {"applied": [[entidad, id], ...], "rejected": [{entity, id, error}, ...]}.
+    """
+    now = datetime.now()
+    rejected = []
+    pending: Dict[str, Dict[int, dict]] = {ENTITY_RESOURCE: {}, ENTITY_THREAT: {}}
+    for change in changes:
+        entity = change.get("entity") if isinstance(change, dict) else None
+        entity_id = change.get("id") if isinstance(change, dict) else None
+        if entity not in pending or not isinstance(entity_id, int):
+            rejected.append({"entity": entity, "id": entity_id, "error": "Transición inválida"})
+            continue
+        # Si el lote repite una entidad prevalece la última transición
+        pending[entity][entity_id] = change
+
+    applied = []
+    repos = {ENTITY_RESOURCE: (resource_repo, _apply_resource_transition),
+             ENTITY_THREAT: (threat_repo, _apply_threat_transition)}
+    for entity, by_id in pending.items():
+        if not by_id:
+            continue
+        repo, apply = repos[entity]
+        with repo.lock_all():
+            # Una sola lectura por lote: get_by_id recorre el CSV completo en cada llamada
+            current = {obj.id: obj for obj in repo.get_all()}
+            updates = []
+            for entity_id, change in by_id.items():
+                obj = current.get(entity_id)
+                if obj is None:
+                    rejected.append({"entity": entity, "id": entity_id, "error": "No existe"})
+                    continue
+                try:
+                    apply(obj, change, now)
+                except TransitionError as e:
+                    rejected.append({"entity": entity, "id": entity_id, "error": str(e)})
+                    continue
+                updates.append(obj)
+            for obj in repo.update_many(updates):
+                applied.append([entity, obj.id])
+    return {"applied": applied, "rejected": rejected}
@@ -0,0 +1,123 @@
+"""
+Resumen agregado por zona, mantenido de forma incremental.
+
+La demanda de hormigas de las amenazas usa el costo escalado de las activas
+(el mismo que GET /threats): se guardan por zona y se suman al leer.
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from models.resource import EstadoRecurso, Resource
+from models.threat import EstadoAmenaza, Threat
+from services.materialized_view import MaterializedView
+from services.threat_escalation import escalated_cost
+
+
+class _ZoneTotals:
+    """Acumuladores de una zona"""
+
+    __slots__ = ("existe", "recursos_por_tipo", "recursos_por_estado", "masa_disponible",
+                 "amenazas_por_tipo", "demanda_amenazas", "amenazas_activas")
+
+    def __init__(self):
+        self.existe = False
+        self.recursos_por_tipo: Counter = Counter()
+        self.recursos_por_estado: Counter = Counter()
+        self.masa_disponible = 0
+        self.amenazas_por_tipo: Counter = Counter()
+        # Costo persistido de las amenazas en combate; las activas escalan y se suman al leer
+        self.demanda_amenazas = 0
+        self.amenazas_activas: Dict[int, Threat] = {}
+
+    def is_empty(self) -> bool:
+        return (not self.existe and not +self.recursos_por_estado and not +self.amenazas_por_tipo)
+
+
+def _positive(counter: Counter) -> Dict[str, int]:
+    return {key.value: value for key, value in sorted(counter.items()) if value > 0}
+
+
+class ZoneSummaryView(MaterializedView):
+    """
+    Por zona: recursos por tipo y estado, masa disponible (cantidad * peso de los
+    recursos disponibles), amenazas sin resolver por tipo y su demanda de hormigas.
+    """
+
+    def reset(self):
+        self._zones: Dict[int, _ZoneTotals] = {}
+
+    def _totals(self, zona_id: int) -> _ZoneTotals:
+        totals = self._zones.get(zona_id)
+        if totals is None:
+            totals = _ZoneTotals()
+            self._zones[zona_id] = totals
+        return totals
+
+    def _discard_if_empty(self, zona_id: int):
+        totals = self._zones.get(zona_id)
+        if totals is not None and totals.is_empty():
+            del self._zones[zona_id]
+
+    def apply_zone(self, zona, sign: int):
+        self._totals(zona.id).existe = sign > 0
+        self._discard_if_empty(zona.id)
+
+    def apply_resource(self, resource: Resource, sign: int):
+        totals = self._totals(resource.zona_id)
+        totals.recursos_por_tipo[resource.tipo] += sign
+        totals.recursos_por_estado[resource.estado] += sign
+        if resource.estado == EstadoRecurso.DISPONIBLE:
+            totals.masa_disponible += sign * resource.cantidad_unitaria * resource.peso
+        self._discard_if_empty(resource.zona_id)
+
+    def apply_threat(self, threat: Threat, sign: int):
+        if threat.estado == EstadoAmenaza.RESUELTA:
+            return
+        totals = self._totals(threat.zona_id)
+        totals.amenazas_por_tipo[threat.tipo] += sign
+        if threat.estado != EstadoAmenaza.ACTIVA:
+            totals.demanda_amenazas += sign * threat.costo_hormigas
+        elif sign > 0:
+            totals.amenazas_activas[threat.id] = threat
+        else:
+            totals.amenazas_activas.pop(threat.id, None)
+        self._discard_if_empty(threat.zona_id)
+
+    def _render(self, zona_id: int, totals: _ZoneTotals, now: datetime) -> dict:
+        demanda = totals.demanda_amenazas + sum(
+            escalated_cost(threat, now) for threat in totals.amenazas_activas.values()
+        )
+        return {
+            "zona_id": zona_id,
+            "recursos": {
+                "total": sum(totals.recursos_por_estado.values()),
+                "por_tipo": _positive(totals.recursos_por_tipo),
+                "por_estado": _positive(totals.recursos_por_estado),
+                "masa_disponible": totals.masa_disponible,
+            },
+            "amenazas": {
+                "activas": sum(totals.amenazas_por_tipo.values()),
+                "por_tipo": _positive(totals.amenazas_por_tipo),
+                "demanda_hormigas": demanda,
+            },
+        }
+
+    def summary(self, zona_id: int, now: Optional[datetime] = None) -> Optional[dict]:
+        """Resumen de una zona, o None si no hay zona ni entidades con ese ID"""
+        self.ensure_started()
+        now = now or datetime.now()
+        with self.lock:
+            totals = self._zones.get(zona_id)
+            return self._render(zona_id, totals, now) if totals is not None else None
+
+    def summaries(self, now: Optional[datetime] = None) -> List[dict]:
+        """Resumen de todas las zonas, ordenado por ID"""
+        self.ensure_started()
+        now = now or datetime.now()
+        with self.lock:
+            return [self._render(zona_id, totals, now) for zona_id, totals in sorted(self._zones.items())]
+
+
+# Instancia global de la vista
+zone_summary_view = ZoneSummaryView()
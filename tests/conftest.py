@@ -102,7 +102,7 @@ def cleanup_test_data():
     if os.path.exists(resources_file):
         fieldnames = ['id','zona_id','nombre','tipo','cantidad_unitaria','peso',
                      'duracion_recoleccion','hormigas_requeridas','estado',
-                     'hora_creacion','hora_recoleccion']
+                     'hora_creacion','hora_recoleccion','hora_inicio_recoleccion']
         _write_csv_data(resources_file, fieldnames, filtered_resources)
     
     if os.path.exists(threats_file):
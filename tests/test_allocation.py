@@ -0,0 +1,122 @@
+import itertools
+import random
+import time
+
+from fastapi.testclient import TestClient
+from main import app
+
+from models.resource import Resource, TipoRecurso, EstadoRecurso
+from models.threat import Threat, TipoAmenaza, EstadoAmenaza
+from repositories.resource_repository import ResourceRepository
+from repositories.threat_repository import ThreatRepository
+from repositories.zone_repository import ZoneRepository
+from services.allocation import AllocationCandidates, allocate_zone, solve_knapsack
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_allocation.py -v
+
+client = TestClient(app)
+
+
+def _fuerza_bruta(weights, values, capacity):
+    best = 0.0
+    for mask in itertools.product((0, 1), repeat=len(weights)):
+        if sum(w for w, m in zip(weights, mask) if m) <= capacity:
+            best = max(best, sum(v for v, m in zip(values, mask) if m))
+    return best
+
+
+def test_mochila_exacta_coincide_con_fuerza_bruta():
+    """Con pocas celdas la solución es la óptima"""
+    rng = random.Random(7)
+    for _ in range(40):
+        n = rng.randint(1, 10)
+        weights = [rng.randint(0, 12) for _ in range(n)]
+        values = [round(rng.uniform(0, 20), 3) for _ in range(n)]
+        capacity = rng.randint(0, 30)
+
+        result = solve_knapsack(weights, values, capacity)
+
+        assert result.exact
+        assert sum(weights[i] for i in result.selected) <= capacity
+        assert abs(result.value - _fuerza_bruta(weights, values, capacity)) < 1e-6
+        assert result.bound >= result.value - 1e-9
+
+
+def test_mochila_por_nucleo_es_rapida_y_cercana_a_la_cota():
+    """Decenas de miles de candidatos se resuelven en milisegundos con poca pérdida"""
+    rng = random.Random(11)
+    weights = [rng.randint(1, 20) for _ in range(20000)]
+    values = [w * rng.uniform(0.5, 2.0) for w in weights]
+
+    start = time.perf_counter()
+    result = solve_knapsack(weights, values, 5000)
+    elapsed = time.perf_counter() - start
+
+    assert sum(weights[i] for i in result.selected) <= 5000
+    assert result.value >= result.bound * 0.999
+    assert elapsed < 1.0
+
+
+def test_asignacion_neutraliza_amenazas_y_luego_elige_recursos():
+    """Las amenazas baratas primero; los recursos según su valor por segundo"""
+    threats = [
+        Threat(id=1, zona_id=1, nombre="cara", tipo=TipoAmenaza.SERPIENTE, costo_hormigas=50),
+        Threat(id=2, zona_id=1, nombre="barata", tipo=TipoAmenaza.ARANA, costo_hormigas=4),
+    ]
+    resources = [
+        Resource(id=1, zona_id=1, nombre="lento", tipo=TipoRecurso.HOJA, cantidad_unitaria=10, peso=10,
+                 duracion_recoleccion=100, hormigas_requeridas=3),
+        Resource(id=2, zona_id=1, nombre="rapido", tipo=TipoRecurso.FLOR, cantidad_unitaria=5, peso=2,
+                 duracion_recoleccion=1, hormigas_requeridas=3),
+        Resource(id=3, zona_id=1, nombre="medio", tipo=TipoRecurso.SEMILLA, cantidad_unitaria=4, peso=2,
+                 duracion_recoleccion=2, hormigas_requeridas=3),
+    ]
+
+    result = allocate_zone(1, 8, resources, threats)
+
+    assert [t["id"] for t in result["amenazas"]] == [2]
+    assert result["amenazas_pendientes"] == [1]
+    assert [r["id"] for r in result["recursos"]] == [2]
+    assert result["hormigas_asignadas"] == 7
+    assert result["hormigas_libres"] == 1
+    assert result["valor_por_segundo"] == 10
+
+
+def test_indice_de_candidatos_sigue_los_cambios(tmp_path):
+    """Solo los recursos disponibles y las amenazas activas son candidatos"""
+    resources = ResourceRepository(str(tmp_path / "resources.csv"))
+    threats = ThreatRepository(str(tmp_path / "threats.csv"))
+    zones = ZoneRepository(str(tmp_path / "zones.csv"))
+    index = AllocationCandidates(resources, threats, zones)
+
+    recurso = resources.create(Resource(id=0, zona_id=3, nombre="hoja", tipo=TipoRecurso.HOJA, cantidad_unitaria=2,
+                                        peso=3, duracion_recoleccion=2, hormigas_requeridas=1))
+    amenaza = threats.create(Threat(id=0, zona_id=3, nombre="abeja", tipo=TipoAmenaza.ABEJA, costo_hormigas=2))
+    zona = index.allocate({3: 10})["zonas"][0]
+    assert zona["candidatos"] == 2
+    assert zona["hormigas_asignadas"] == 3
+
+    recurso.estado = EstadoRecurso.EN_RECOLECCION
+    resources.update(recurso.id, recurso)
+    amenaza.estado = EstadoAmenaza.EN_COMBATE
+    threats.update(amenaza.id, amenaza)
+    zona = index.allocate({3: 10})["zonas"][0]
+    assert zona["candidatos"] == 0
+    assert zona["hormigas_libres"] == 10
+
+
+def test_endpoint_asignacion():
+    """POST /colony/allocation responde por zona y valida las cantidades"""
+    client.post("/resources/zone/1", json={"nombre": "Recurso Asignable", "tipo": "FRUTO", "cantidad_unitaria": 3,
+                                           "peso": 2, "duracion_recoleccion": 5, "hormigas_requeridas": 1})
+
+    response = client.post("/colony/allocation", json={"hormigas": {"1": 1000, "2": 0}})
+    assert response.status_code == 200
+    body = response.json()
+    assert [z["zona_id"] for z in body["zonas"]] == [1, 2]
+    assert body["zonas"][0]["recursos"]
+    assert body["zonas"][1]["hormigas_asignadas"] == 0
+
+    assert client.post("/colony/allocation", json={"hormigas": {"1": -1}}).status_code == 400
+    assert client.post("/colony/allocation", json={"hormigas": {}}).status_code == 400
@@ -0,0 +1,157 @@
+import gzip
+import os
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from main import app
+
+from models.resource import Resource, TipoRecurso, EstadoRecurso
+from models.threat import Threat, TipoAmenaza, EstadoAmenaza
+from repositories.partitioned_repository import PartitionedThreatRepository
+from repositories.resource_repository import ResourceRepository
+from repositories.threat_repository import ThreatRepository
+from repositories.zone_repository import ZoneRepository
+from services.archiver import Archiver, list_archived, merge_archived
+from services.zone_summary import ZoneSummaryView
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_archive.py -v
+
+client = TestClient(app)
+
+NOW = datetime(2024, 3, 10, 12, 0, 0)
+
+
+def _recurso(nombre, estado=EstadoRecurso.DISPONIBLE, hora_recoleccion=None):
+    return Resource(id=0, zona_id=1, nombre=nombre, tipo=TipoRecurso.HOJA, cantidad_unitaria=1, peso=1,
+                    duracion_recoleccion=1, hormigas_requeridas=1, estado=estado,
+                    hora_creacion=NOW - timedelta(days=60), hora_recoleccion=hora_recoleccion)
+
+
+def _repos(tmp_path):
+    resources = ResourceRepository(str(tmp_path / "resources.csv"))
+    threats = ThreatRepository(str(tmp_path / "threats.csv"))
+    resources.create_many([
+        _recurso("viejo febrero", EstadoRecurso.RECOLECTADO, datetime(2024, 2, 20)),
+        _recurso("viejo marzo", EstadoRecurso.RECOLECTADO, datetime(2024, 3, 2)),
+        _recurso("reciente", EstadoRecurso.RECOLECTADO, NOW - timedelta(hours=1)),
+        _recurso("vivo"),
+        _recurso("ultimo", EstadoRecurso.RECOLECTADO, datetime(2024, 1, 5)),
+    ])
+    threats.create_many([
+        Threat(id=0, zona_id=1, nombre="resuelta", tipo=TipoAmenaza.ABEJA, costo_hormigas=3,
+               estado=EstadoAmenaza.RESUELTA, hora_deteccion=datetime(2024, 2, 1), hora_resolucion=datetime(2024, 2, 2)),
+        Threat(id=0, zona_id=1, nombre="activa", tipo=TipoAmenaza.ARANA, costo_hormigas=5,
+               hora_deteccion=datetime(2024, 2, 1)),
+    ])
+    return resources, threats
+
+
+def test_archivado_mueve_filas_terminales_a_particiones_mensuales(tmp_path):
+    """Solo las filas terminales fuera de la retención salen del CSV principal"""
+    resources, threats = _repos(tmp_path)
+    result = Archiver(resources, threats).archive(now=NOW)
+
+    assert result == {"resources": 3, "threats": 1}
+    assert [r.nombre for r in resources.get_all()] == ["reciente", "vivo"]
+    assert [t.nombre for t in threats.get_all()] == ["activa"]
+    assert resources.archive_repo.partitions() == ["2024-01", "2024-02", "2024-03"]
+    assert threats.archive_repo.partitions() == ["2024-02"]
+    assert os.path.exists(tmp_path / "archive" / "resources-2024-02.csv.gz")
+
+    nuevo = resources.create(_recurso("nuevo"))
+    assert nuevo.id == 6
+
+    archived = resources.get_archived()
+    assert [(r.id, r.nombre, r.estado) for r in archived] == [
+        (5, "ultimo", EstadoRecurso.RECOLECTADO), (1, "viejo febrero", EstadoRecurso.RECOLECTADO),
+        (2, "viejo marzo", EstadoRecurso.RECOLECTADO)
+    ]
+    assert [t.nombre for t in threats.get_archived(zona_id=1)] == ["resuelta"]
+
+
+def test_archivados_sucesivos_agregan_a_la_particion(tmp_path):
+    """Cada archivado agrega un miembro gzip al final de la partición, sin reescribirla"""
+    resources, threats = _repos(tmp_path)
+    archiver = Archiver(resources, threats)
+    archiver.archive(now=NOW)
+    resources.create(_recurso("mas", EstadoRecurso.RECOLECTADO, datetime(2024, 2, 25)))
+    assert archiver.archive(now=NOW)["resources"] == 1
+
+    with gzip.open(tmp_path / "archive" / "resources-2024-02.csv.gz", "rt", encoding="utf-8") as f:
+        assert sum(1 for line in f if line.startswith("id,")) == 1
+    assert [r.nombre for r in resources.get_archived(months=["2024-02"])] == ["viejo febrero", "mas"]
+    assert [r.nombre for r in resources.get_archived()] == ["ultimo", "viejo febrero", "mas", "viejo marzo"]
+
+
+def test_consulta_con_archivados_filtra_por_rango_y_poda_particiones(tmp_path):
+    """El rango sobre el campo de partición solo abre los meses necesarios"""
+    resources, threats = _repos(tmp_path)
+    Archiver(resources, threats).archive(now=NOW)
+    os.remove(tmp_path / "archive" / "resources-2024-02.csv.gz")
+
+    en_marzo = list_archived(resources, "hora_recoleccion", time_field="hora_recoleccion",
+                             after=datetime(2024, 3, 1), before=datetime(2024, 4, 1))
+    assert [r.nombre for r in en_marzo] == ["viejo marzo"]
+
+    todos = merge_archived(resources.get_all(), resources.get_archived())
+    assert [r.id for r in todos] == [2, 3, 4, 5]
+
+
+def test_archivado_publica_cambios_y_las_vistas_lo_descuentan(tmp_path):
+    """Las vistas restan las filas archivadas igual que al reconstruirse desde el CSV"""
+    resources, threats = _repos(tmp_path)
+    view = ZoneSummaryView(resources, threats, ZoneRepository(str(tmp_path / "zones.csv")))
+    view.ensure_started()
+    received = []
+    resources.change_log.subscribe(received.append)
+
+    Archiver(resources, threats).archive(now=NOW)
+
+    assert {(e.entity, e.action, e.entity_id) for e in received} == {
+        ("resource", "archived", 1), ("resource", "archived", 2), ("resource", "archived", 5),
+        ("threat", "archived", 1)
+    }
+    assert view.summary(1)["recursos"]["por_estado"] == {"disponible": 1, "recolectado": 1}
+
+
+def test_endpoints_de_archivo():
+    """include_archived es opcional y el estado del archivado se expone en /admin"""
+    normal = client.get("/resources").json()
+    con_archivo = client.get("/resources", params={"include_archived": "true"})
+    assert con_archivo.status_code == 200
+    assert {r["id"] for r in normal} <= {r["id"] for r in con_archivo.json()}
+    assert client.get("/threats", params={"include_archived": "true"}).status_code == 200
+
+    status = client.get("/admin/archive").json()
+    assert set(status["partitions"]) == {"resources", "threats"}
+
+
+def test_ids_archivados_o_eliminados_no_se_reutilizan(tmp_path):
+    """La secuencia persistida de IDs evita que una fila nueva oculte a una archivada"""
+    resources = ResourceRepository(str(tmp_path / "resources.csv"))
+    resources.create_many([_recurso(f"hoja {i}", EstadoRecurso.RECOLECTADO, datetime(2024, 2, i)) for i in (1, 2)])
+    resources.create(_recurso("hoja 3"))
+    assert resources.archive(NOW) == 2
+    assert resources.delete(3) == "deleted"
+
+    # También desde otra instancia (p. ej. tras reiniciar el proceso)
+    nuevo = ResourceRepository(str(tmp_path / "resources.csv")).create(_recurso("hoja 4"))
+    assert nuevo.id == 4
+    todos = merge_archived(resources.get_all(), resources.get_archived())
+    assert [(r.id, r.nombre) for r in todos] == [(1, "hoja 1"), (2, "hoja 2"), (4, "hoja 4")]
+
+    # Sin secuencia (p. ej. datos de una versión anterior) se parte del mayor ID archivado
+    os.remove(tmp_path / "resources.csv.seq")
+    resources.delete(4)
+    assert resources.create_many([_recurso("hoja 5")])[0].id == 3
+
+    # El backend particionado comparte la secuencia con el CSV único
+    threats = PartitionedThreatRepository(str(tmp_path / "threats.csv"))
+    threats.create_many([
+        Threat(id=0, zona_id=i, nombre=f"abeja {i}", tipo=TipoAmenaza.ABEJA, costo_hormigas=1,
+               estado=EstadoAmenaza.RESUELTA, hora_resolucion=datetime(2024, 2, 1))
+        for i in (1, 2)
+    ])
+    assert threats.archive(NOW) == 2
+    assert threats.create(Threat(id=0, zona_id=1, nombre="araña", tipo=TipoAmenaza.ARANA, costo_hormigas=1)).id == 3
@@ -0,0 +1,116 @@
+import csv
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from main import app
+
+from config.collection_timers_config import CollectionTimersConfig
+from models.resource import Resource, TipoRecurso, EstadoRecurso
+from repositories.resource_repository import ResourceRepository, FIELDNAMES
+from services.collection_timers import CollectionTimers
+from services.metrics import metrics
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_collection_timers.py -v
+
+client = TestClient(app)
+
+
+def _resource(i, estado=EstadoRecurso.DISPONIBLE, inicio=None, duracion=30):
+    return Resource(id=0, zona_id=1, nombre=f"hoja {i}", tipo=TipoRecurso.HOJA, cantidad_unitaria=10,
+                    peso=2, duracion_recoleccion=duracion, hormigas_requeridas=2,
+                    estado=estado, hora_inicio_recoleccion=inicio)
+
+
+def _timers(tmp_path):
+    repo = ResourceRepository(str(tmp_path / "resources.csv"))
+    timers = CollectionTimers(repo)
+    repo.change_log.subscribe(timers.on_change)
+    return repo, timers
+
+
+def test_transicion_a_recoleccion_programa_y_completa(tmp_path):
+    """Al entrar en recolección se programa el temporizador y al vencer se marca recolectado"""
+    repo, timers = _timers(tmp_path)
+    resource = repo.create(_resource(1))
+    inicio = datetime.now() - timedelta(seconds=100)
+    resource.estado = EstadoRecurso.EN_RECOLECCION
+    resource.hora_inicio_recoleccion = inicio
+    repo.update(resource.id, resource)
+    assert len(timers) == 1
+
+    assert timers.flush_due(now=inicio + timedelta(seconds=29)) == 0
+    assert timers.flush_due(now=inicio + timedelta(seconds=30)) == 1
+
+    collected = repo.get_by_id(resource.id)
+    assert collected.estado == EstadoRecurso.RECOLECTADO
+    assert collected.hora_recoleccion == inicio + timedelta(seconds=30)
+    assert collected.cantidad_unitaria == 10
+    assert len(timers) == 0
+
+
+def test_cambio_de_estado_cancela_el_temporizador(tmp_path):
+    """Si el recurso sale de recolección antes de vencer, el temporizador se descarta"""
+    repo, timers = _timers(tmp_path)
+    resource = repo.create(_resource(1, EstadoRecurso.EN_RECOLECCION, datetime.now() - timedelta(seconds=100)))
+    assert len(timers) == 1
+
+    resource.estado = EstadoRecurso.DISPONIBLE
+    repo.update(resource.id, resource)
+
+    assert len(timers) == 0
+    assert timers.flush_due() == 0
+    assert repo.get_by_id(resource.id).estado == EstadoRecurso.DISPONIBLE
+
+
+def test_rebuild_desde_el_csv_y_lotes(tmp_path, monkeypatch):
+    """Los temporizadores se reconstruyen del CSV y los vencidos se aplican en lotes"""
+    repo = ResourceRepository(str(tmp_path / "resources.csv"))
+    inicio = datetime.now() - timedelta(hours=1)
+    repo.create_many([_resource(i, EstadoRecurso.EN_RECOLECCION, inicio) for i in range(2500)])
+    repo.create_many([_resource("legacy", EstadoRecurso.EN_RECOLECCION, None, duracion=600)])
+    repo.create_many([_resource("libre")])
+
+    timers = CollectionTimers(repo)
+    assert timers.rebuild() == 2501
+    assert timers.get_status()["next_due"] == (inicio + timedelta(seconds=30)).isoformat()
+
+    monkeypatch.setattr(CollectionTimersConfig, "BATCH_SIZE", 1000)
+    writes_before = metrics.repository_writes.value(repo.csv_file, "rewrite")
+    assert timers.flush_due() == 2500
+    assert metrics.repository_writes.value(repo.csv_file, "rewrite") == writes_before + 3
+
+    # El recurso sin hora de inicio empieza a contar desde la reconstrucción
+    assert len(timers) == 1
+    assert len(repo.get_all(estado=EstadoRecurso.RECOLECTADO.value)) == 2500
+
+
+def test_repositorio_migra_encabezado_anterior(tmp_path):
+    """Un CSV sin la columna hora_inicio_recoleccion se migra conservando los registros"""
+    csv_file = tmp_path / "resources.csv"
+    with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDNAMES[:-1])
+        writer.writerow([1, 1, 'hoja 1', 'HOJA', 10, 2, 30, 2, 'en_recoleccion', '2025-11-19T10:00:00', ''])
+
+    repo = ResourceRepository(str(csv_file))
+    repo.create_many([_resource(2)])
+
+    with open(csv_file, encoding='utf-8') as f:
+        assert next(csv.reader(f)) == FIELDNAMES
+    assert [r.nombre for r in repo.get_all()] == ['hoja 1', 'hoja 2']
+    assert repo.get_by_id(1).hora_inicio_recoleccion is None
+
+
+def test_put_en_recoleccion_registra_hora_de_inicio():
+    """PUT a en_recoleccion registra la hora de inicio de la recolección"""
+    created = client.post("/resources/zone/1", json={
+        "nombre": "Recurso Temporizador", "tipo": "HOJA", "cantidad_unitaria": 10,
+        "peso": 2, "duracion_recoleccion": 30, "hormigas_requeridas": 2
+    }).json()
+    assert created["hora_inicio_recoleccion"] is None
+
+    response = client.put(f"/resources/{created['id']}", json={"estado": "en_recoleccion"})
+    assert response.status_code == 200
+    assert response.json()["hora_inicio_recoleccion"] is not None
+    assert client.get("/resources/timers/status").status_code == 200
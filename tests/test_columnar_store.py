@@ -0,0 +1,79 @@
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from models.resource import Resource, TipoRecurso, EstadoRecurso
+from models.threat import Threat, TipoAmenaza, EstadoAmenaza
+from schemas.resource_schema import ResourceResponse
+from services.columnar_store import ColumnarStore
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_columnar_store.py -v
+
+
+def _resource(resource_id: int, now: datetime) -> Resource:
+    return Resource(
+        id=resource_id, zona_id=resource_id % 5, nombre=f"Hoja {resource_id % 7}",
+        tipo=list(TipoRecurso)[resource_id % len(TipoRecurso)], cantidad_unitaria=resource_id % 13,
+        peso=resource_id % 11, duracion_recoleccion=30, hormigas_requeridas=resource_id % 4 + 1,
+        estado=EstadoRecurso.RECOLECTADO if resource_id % 3 == 0 else EstadoRecurso.DISPONIBLE,
+        hora_creacion=now - timedelta(seconds=resource_id, microseconds=resource_id),
+        hora_recoleccion=now if resource_id % 3 == 0 else None
+    )
+
+
+def test_ida_y_vuelta_conserva_los_valores():
+    """put/get/remove reconstruyen el mismo dataclass, incluidas fechas None y microsegundos"""
+    now = datetime.now()
+    store = ColumnarStore(Resource)
+    recursos = [_resource(resource_id, now) for resource_id in range(1, 50)]
+    for recurso in recursos:
+        store.put(recurso)
+    assert len(store) == 49
+    assert [vista.to_model() for vista in store] == recursos
+    assert store.get(7).nombre == "Hoja 0" and store.get(7).hora_recoleccion is None
+
+    modificado = _resource(7, now)
+    modificado.estado = EstadoRecurso.RECOLECTADO
+    store.put(modificado)
+    store.remove(8)
+    store.remove(8)
+    assert len(store) == 48
+    assert store.get(7).estado == EstadoRecurso.RECOLECTADO
+    assert store.get(8) is None and 8 not in store and store.get(500) is None
+
+    amenazas = ColumnarStore(Threat)
+    detectada = datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc)
+    amenazas.put(Threat(id=3, zona_id=1, nombre="Araña", tipo=TipoAmenaza.ARANA, costo_hormigas=4,
+                        estado=EstadoAmenaza.EN_COMBATE, hora_deteccion=detectada))
+    amenaza = amenazas.get(3).to_model()
+    assert amenaza.hora_deteccion == detectada.astimezone().replace(tzinfo=None)
+    assert amenaza.estado == EstadoAmenaza.EN_COMBATE and amenaza.hora_resolucion is None
+
+
+def test_vistas_validan_con_from_attributes():
+    """Las vistas sirven directamente como fuente de los schemas de respuesta"""
+    now = datetime.now()
+    store = ColumnarStore(Resource)
+    store.put(_resource(3, now))
+    respuesta = ResourceResponse.model_validate(store.get(3))
+    assert respuesta.model_dump() == ResourceResponse.model_validate(_resource(3, now)).model_dump()
+
+
+def test_ocupa_menos_memoria_que_los_dataclasses():
+    """20k filas en columnas usan bastante menos memoria que 20k dataclasses"""
+    now = datetime.now()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        recursos = [_resource(resource_id, now) for resource_id in range(1, 20001)]
+        dataclasses_bytes = tracemalloc.get_traced_memory()[0] - before
+
+        store = ColumnarStore(Resource)
+        before = tracemalloc.get_traced_memory()[0]
+        for recurso in recursos:
+            store.put(recurso)
+        store_bytes = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    assert len(store) == 20000
+    assert store_bytes * 3 < dataclasses_bytes
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from main import app
+
+from models.resource import Resource, TipoRecurso, EstadoRecurso
+from models.threat import Threat, TipoAmenaza, EstadoAmenaza
+from models.zone import Zona, TipoZona
+from repositories.resource_repository import ResourceRepository
+from repositories.threat_repository import ThreatRepository
+from repositories.zone_repository import ZoneRepository
+from services.demand_ledger import DemandLedger
+from services.threat_escalation import with_escalation_all
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_demand_ledger.py -v
+
+client = TestClient(app)
+
+
+def _resource(nombre, zona_id, hormigas):
+    return Resource(id=0, zona_id=zona_id, nombre=nombre, tipo=TipoRecurso.HOJA, cantidad_unitaria=5,
+                    peso=1, duracion_recoleccion=10, hormigas_requeridas=hormigas)
+
+
+def _ledger(tmp_path):
+    resources = ResourceRepository(str(tmp_path / "resources.csv"))
+    threats = ThreatRepository(str(tmp_path / "threats.csv"))
+    zones = ZoneRepository(str(tmp_path / "zones.csv"))
+    zones.crearZonas([Zona(id=1, nombre="Zona 1", tipo=TipoZona.JARDIN), Zona(id=2, nombre="Zona 2", tipo=TipoZona.LAGO)])
+    resources.create_many([_resource("a", 1, 3), _resource("b", 1, 2), _resource("c", 2, 4)])
+    ledger = DemandLedger(resources, threats, zones)
+    ledger.ensure_started()
+    return ledger, resources, threats
+
+
+def test_ledger_suma_recursos_disponibles_y_amenazas_pendientes(tmp_path):
+    """La demanda se actualiza con cada creación, cambio de estado y eliminación"""
+    ledger, resources, threats = _ledger(tmp_path)
+    assert ledger.snapshot()["total"] == 9
+    assert ledger.demand(1) == {"zona_id": 1, "recursos": 5, "amenazas": 0, "total": 5}
+
+    threat = threats.create(Threat(id=0, zona_id=1, nombre="araña", tipo=TipoAmenaza.ARANA, costo_hormigas=6))
+    assert ledger.demand(1)["total"] == 11
+
+    threat.estado = EstadoAmenaza.EN_COMBATE
+    threats.update(threat.id, threat)
+    assert ledger.demand(1)["amenazas"] == 6
+    threat.estado = EstadoAmenaza.RESUELTA
+    threats.update(threat.id, threat)
+    assert ledger.demand(1)["amenazas"] == 0
+
+    recurso = resources.get_by_id(1)
+    recurso.estado = EstadoRecurso.EN_RECOLECCION
+    resources.update(recurso.id, recurso)
+    resources.delete(3)
+
+    assert ledger.snapshot()["zonas"] == [
+        {"zona_id": 1, "recursos": 2, "amenazas": 0, "total": 2},
+        {"zona_id": 2, "recursos": 0, "amenazas": 0, "total": 0},
+    ]
+    assert ledger.total == 2
+    assert ledger.demand(99) is None
+
+
+def test_ledger_usa_el_costo_escalado(tmp_path):
+    """La demanda de una amenaza activa es su costo escalado al leer, el mismo que reportan GET /threats y la asignación"""
+    ledger, _, threats = _ledger(tmp_path)
+    threats.create_many([
+        Threat(id=0, zona_id=2, nombre=f"araña {i}", tipo=TipoAmenaza.ARANA, costo_hormigas=4,
+               hora_deteccion=datetime.now() - timedelta(hours=2))
+        for i in range(2)
+    ])
+    now = datetime.now()
+    escaladas = sum(t.costo_hormigas for t in with_escalation_all(threats.get_all(), now))
+    assert escaladas > 8
+    assert ledger.demand(2, now=now) == {"zona_id": 2, "recursos": 4, "amenazas": escaladas, "total": 4 + escaladas}
+    assert ledger.snapshot(now=now)["total"] == 9 + escaladas
+
+    # Al salir de activa se persiste el costo escalado y deja de crecer
+    amenaza = threats.get_all()[0]
+    amenaza.estado = EstadoAmenaza.RESUELTA
+    threats.update(amenaza.id, amenaza)
+    assert ledger.demand(2, now=now)["amenazas"] == escaladas // 2
+
+
+def test_ledger_publica_en_el_registro_de_cambios_en_orden(tmp_path):
+    """Cada variación se publica como evento 'demand' después del cambio que la causó"""
+    ledger, resources, threats = _ledger(tmp_path)
+    received = []
+    resources.change_log.subscribe(received.append)
+
+    threats.create(Threat(id=0, zona_id=2, nombre="abeja", tipo=TipoAmenaza.ABEJA, costo_hormigas=5))
+    resources.create(_resource("sin demanda", 2, 0))
+
+    assert [(e.entity, e.action) for e in received] == [
+        ("threat", "created"), ("demand", "updated"), ("resource", "created")
+    ]
+    assert [e.seq for e in received] == sorted(e.seq for e in received)
+    assert received[1].data == {"zona_id": 2, "recursos": 4, "amenazas": 5, "total": 9}
+
+
+def test_endpoint_demanda_de_la_colonia():
+    """GET /colony/demand refleja los cambios hechos por la API"""
+    before = client.get("/colony/demand/1").json()
+    client.post("/threats/zone/1", json={"nombre": "Amenaza Demanda", "tipo": "MANTIS", "costo_hormigas": 7})
+
+    after = client.get("/colony/demand/1").json()
+    assert after["amenazas"] == before["amenazas"] + 7
+    assert after["total"] == before["total"] + 7
+
+    body = client.get("/colony/demand").json()
+    assert body["total"] == sum(z["total"] for z in body["zonas"])
+    assert client.get("/colony/demand/987654").status_code == 404
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import threading
+
+from fastapi.testclient import TestClient
+from main import app
+
+from models.resource import Resource, TipoRecurso, EstadoRecurso
+from models.threat import Threat, TipoAmenaza
+from models.zone import Zona, TipoZona
+from repositories.change_log import ChangeLog
+from repositories.resource_repository import ResourceRepository
+from repositories.threat_repository import ThreatRepository
+from repositories.zone_repository import ZoneRepository
+from endpoints.events__controller import event_stream
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_events.py -v
+
+client = TestClient(app)
+
+
+class _FakeRequest:
+    async def is_disconnected(self):
+        return False
+
+
+def _resource(nombre="hoja 1", zona_id=1):
+    return Resource(id=0, zona_id=zona_id, nombre=nombre, tipo=TipoRecurso.HOJA, cantidad_unitaria=5,
+                    peso=1, duracion_recoleccion=10, hormigas_requeridas=2)
+
+
+async def _take(generator, count, timeout=2.0):
+    items = []
+    async def consume():
+        async for item in generator:
+            if item.startswith("retry:") or item.startswith(":"):
+                continue
+            items.append(item)
+            if len(items) == count:
+                break
+    await asyncio.wait_for(consume(), timeout)
+    await generator.aclose()
+    return items
+
+
+def _parse(item):
+    fields = dict(line.split(": ", 1) for line in item.strip().split("\n"))
+    return fields["event"], json.loads(fields["data"]), fields.get("id")
+
+
+def test_change_log_since_y_ventana_acotada():
+    """since() debe retornar los eventos posteriores o None si ya no se retienen"""
+    log = ChangeLog(max_events=3)
+    for i in range(5):
+        log.publish("resource", "created", i + 1, 1)
+
+    assert log.version == 5
+    assert [e.seq for e in log.since(2)] == [3, 4, 5]
+    assert log.since(5) == []
+    assert log.since(1) is None
+    assert log.since(99) is None
+
+
+def test_repositorios_publican_cambios(tmp_path):
+    """Crear, actualizar y eliminar debe publicar eventos con el estado previo"""
+    resources = ResourceRepository(str(tmp_path / "resources.csv"))
+    threats = ThreatRepository(str(tmp_path / "threats.csv"))
+    zones = ZoneRepository(str(tmp_path / "zones.csv"))
+    log = resources.change_log
+    assert threats.change_log is log and zones.change_log is log
+
+    received = []
+    log.subscribe(received.append)
+
+    zones.crearZona(Zona(id=7, nombre="Zona", tipo=TipoZona.LAGO))
+    resource = resources.create(_resource(zona_id=7))
+    resource.estado = EstadoRecurso.EN_RECOLECCION
+    resources.update(resource.id, resource)
+    resources.delete(resource.id)
+    threats.create(Threat(id=0, zona_id=7, nombre="araña 1", tipo=TipoAmenaza.ARANA, costo_hormigas=3))
+    zones.eliminarZona(7)
+
+    assert [(e.entity, e.action) for e in received] == [
+        ("zone", "created"), ("resource", "created"), ("resource", "updated"),
+        ("resource", "deleted"), ("threat", "created"), ("zone", "deleted"),
+    ]
+    update = received[2]
+    assert update.previous.estado == EstadoRecurso.DISPONIBLE
+    assert update.data.estado == EstadoRecurso.EN_RECOLECCION
+    assert received[3].data is None and received[3].previous.id == resource.id
+    assert [e.seq for e in received] == sorted(e.seq for e in received)
+
+
+def test_event_stream_reanuda_desde_last_event_id_con_filtros():
+    """Con Last-Event-ID debe reenviar solo los eventos retenidos que cumplen los filtros"""
+    log = ChangeLog()
+    log.publish("resource", "created", 1, 1, data=_resource())
+    log.publish("threat", "created", 1, 1)
+    log.publish("resource", "created", 2, 2, data=_resource("hoja 2", 2))
+    log.publish("resource", "updated", 1, 1, data=_resource())
+
+    items = asyncio.run(_take(event_stream(log, _FakeRequest(), zona_id=1, entidad="resource", last_event_id=1), 1))
+
+    event, data, seq = _parse(items[0])
+    assert event == "resource.updated"
+    assert seq == "4"
+    assert data["id"] == 1 and data["data"]["estado"] == "disponible"
+
+
+def test_event_stream_entrega_cambios_en_vivo_desde_otros_hilos():
+    """Los cambios publicados por otros hilos (schedulers) deben llegar al stream"""
+    log = ChangeLog()
+
+    async def scenario():
+        generator = event_stream(log, _FakeRequest())
+        first = await generator.__anext__()
+        assert first.startswith("retry:")
+        threading.Timer(0.05, lambda: log.publish("threat", "created", 9, 2)).start()
+        return await _take(generator, 1)
+
+    event, data, _ = _parse(asyncio.run(scenario())[0])
+    assert event == "threat.created"
+    assert data["id"] == 9 and data["zona_id"] == 2
+
+
+def test_event_stream_informa_historial_no_disponible():
+    """Si Last-Event-ID es más antiguo que lo retenido, debe emitir un evento reset"""
+    log = ChangeLog(max_events=1)
+    log.publish("zone", "created", 1, 1)
+    log.publish("zone", "created", 2, 2)
+
+    items = asyncio.run(_take(event_stream(log, _FakeRequest(), last_event_id=0), 1))
+    event, data, _ = _parse(items[0])
+    assert event == "reset"
+    assert data["version"] == 2
+
+
+def test_endpoint_events_valida_entidad():
+    """GET /events debe rechazar entidades desconocidas"""
+    assert client.get("/events?entidad=hormiga").status_code == 400
+    assert client.get("/events", headers={"Last-Event-ID": "abc"}).status_code == 400
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+
+from config.resource_depletion_config import ResourceDepletionConfig
+from config.threat_escalation_config import ThreatEscalationConfig, LINEAR
+from models.resource import Resource, TipoRecurso, EstadoRecurso
+from models.threat import Threat, TipoAmenaza, EstadoAmenaza
+from repositories.resource_repository import ResourceRepository
+from repositories.threat_repository import ThreatRepository
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_field_projection.py -v
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def recursos(tmp_path, monkeypatch):
+    repo = ResourceRepository(str(tmp_path / "resources.csv"))
+    monkeypatch.setattr("endpoints.resources__controller.resource_repo", repo)
+    monkeypatch.setattr(ResourceDepletionConfig, "ENABLED", True)
+    inicio = datetime.now() - timedelta(seconds=47)
+    repo.create_many([
+        Resource(id=0, zona_id=i % 2 + 1, nombre=f"Hoja {i}", tipo=TipoRecurso.HOJA, cantidad_unitaria=20,
+                 peso=2, duracion_recoleccion=100, hormigas_requeridas=4,
+                 estado=EstadoRecurso.EN_RECOLECCION if i % 3 == 0 else EstadoRecurso.DISPONIBLE,
+                 hora_creacion=datetime(2024, 5, 1, 10, i),
+                 hora_inicio_recoleccion=inicio if i % 3 == 0 else None)
+        for i in range(6)
+    ])
+    return repo
+
+
+@pytest.fixture
+def amenazas(tmp_path, monkeypatch):
+    repo = ThreatRepository(str(tmp_path / "threats.csv"))
+    monkeypatch.setattr("endpoints.threats__controller.threat_repo", repo)
+    monkeypatch.setattr(ThreatEscalationConfig, "ENABLED", True)
+    monkeypatch.setattr(ThreatEscalationConfig, "CURVES", {TipoAmenaza.ARANA: (LINEAR, 0, 1.0, 3.0)})
+    repo.create_many([
+        Threat(id=0, zona_id=1, nombre=f"Araña {i}", tipo=TipoAmenaza.ARANA, costo_hormigas=4,
+               estado=EstadoAmenaza.RESUELTA if i == 2 else EstadoAmenaza.ACTIVA,
+               hora_deteccion=datetime.now() - timedelta(hours=1, minutes=30) if i else None)
+        for i in range(4)
+    ])
+    return repo
+
+
+def _subconjunto(filas: list, campos: list) -> list:
+    return [{campo: fila[campo] for campo in campos} for fila in filas]
+
+
+def test_listado_y_detalle_de_recursos_con_fields(recursos):
+    """Solo los campos pedidos, con los mismos valores que la respuesta completa (incluido el agotamiento)"""
+    completos = client.get("/resources", params={"zona_id": 1}).json()
+    assert [r["cantidad_unitaria"] for r in completos] == [11, 20, 20]
+
+    respuesta = client.get("/resources", params={"zona_id": 1, "fields": "id,cantidad_unitaria"})
+    assert respuesta.status_code == 200
+    assert respuesta.json() == _subconjunto(completos, ["id", "cantidad_unitaria"])
+    assert client.get("/resources", params={"fields": " estado , id,estado"}).json() == \
+        _subconjunto(client.get("/resources").json(), ["estado", "id"])
+
+    # Las lecturas que unen otras fuentes (particiones archivadas) se proyectan al responder
+    archivados = {"zona_id": 2, "include_archived": True, "fields": "nombre,hora_creacion"}
+    assert client.get("/resources", params=archivados).json() == [
+        {"nombre": f"Hoja {i}", "hora_creacion": f"2024-05-01T10:0{i}:00"} for i in (1, 3, 5)
+    ]
+
+    assert client.get("/resources/1", params={"fields": "cantidad_unitaria,estado"}).json() == \
+        {"cantidad_unitaria": 11, "estado": "en_recoleccion"}
+    assert client.get("/resources/99", params={"fields": "id"}).status_code == 404
+
+
+def test_listado_y_detalle_de_amenazas_con_fields(amenazas):
+    """El costo proyectado es el escalado; el detalle conserva el registro de hora_deteccion"""
+    completos = client.get("/threats").json()
+    assert [t["costo_hormigas"] for t in completos] == [4, 10, 4, 10]
+    assert client.get("/threats", params={"fields": "costo_hormigas,id"}).json() == \
+        _subconjunto(completos, ["costo_hormigas", "id"])
+    assert client.get("/threats", params={"estado": "resuelta", "fields": "nombre"}).json() == [{"nombre": "Araña 2"}]
+
+    assert client.get("/threats/1", params={"fields": "id,hora_deteccion"}).json()["hora_deteccion"] is not None
+    assert amenazas.get_by_id(1).hora_deteccion is not None
+
+
+@pytest.mark.parametrize("ruta", ["/resources", "/resources/1", "/threats", "/threats/1"])
+def test_campos_invalidos(ruta, recursos, amenazas):
+    """Un campo desconocido o una lista vacía responden 400"""
+    assert client.get(ruta, params={"fields": "id,color"}).status_code == 400
+    assert client.get(ruta, params={"fields": " , "}).status_code == 400
@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+from benchmarks.load_harness import parse_mix, main
+from config.scheduler_config import SchedulerConfig
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_load_harness.py -v
+
+
+def test_parse_mix_valida_rutas():
+    """Debe interpretar la mezcla y rechazar rutas desconocidas"""
+    assert parse_mix("GET /resources?zona_id=:70,PUT /threats/{id}:30") == {
+        "GET /resources?zona_id=": 70.0,
+        "PUT /threats/{id}": 30.0,
+    }
+    with pytest.raises(ValueError):
+        parse_mix("DELETE /todo:10")
+
+
+def test_main_reporta_metricas_por_ruta(tmp_path):
+    """Debe ejecutar la carga en proceso y reportar throughput, latencias y errores por ruta"""
+    cwd = os.getcwd()
+    interval = SchedulerConfig.INTERVAL_SECONDS
+    repo_resources = os.path.getsize("data/resources.csv") if os.path.exists("data/resources.csv") else None
+    report = main([
+        "--rows", "30", "--zones", "3", "--requests", "40", "--concurrency", "4",
+        "--scheduler-interval", "1", "--workdir", str(tmp_path),
+        "--mix", "GET /resources?zona_id=:60,POST /resources/zone/{id}:40",
+    ])
+
+    assert os.getcwd() == cwd
+    assert SchedulerConfig.INTERVAL_SECONDS == interval
+    assert report["total_requests"] == 40
+    assert report["error_rate"] == 0.0
+    routes = report["routes"]
+    assert sum(r["requests"] for r in routes.values()) == 40
+    for summary in routes.values():
+        assert summary["latency_histogram"]["le_inf"] == summary["requests"]
+    # Los datos se escriben en el directorio de trabajo aislado, no en data/ del repo
+    assert os.path.exists(tmp_path / "data" / "resources.csv")
+    repo_after = os.path.getsize("data/resources.csv") if os.path.exists("data/resources.csv") else None
+    assert repo_after == repo_resources
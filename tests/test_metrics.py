@@ -0,0 +1,60 @@
+from fastapi.testclient import TestClient
+from main import app
+
+from services.metrics import Histogram, Counter, metrics
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_metrics.py -v
+
+client = TestClient(app)
+
+
+def test_histogram_render_formato_prometheus():
+    """El histograma debe renderizar buckets acumulativos, suma y conteo"""
+    histogram = Histogram("latencia_prueba", "Ayuda", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5, "/a")
+
+    lines = histogram.render()
+    assert "# TYPE latencia_prueba histogram" in lines
+    assert 'latencia_prueba_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latencia_prueba_bucket{route="/a",le="1.0"} 2' in lines
+    assert 'latencia_prueba_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latencia_prueba_count{route="/a"} 3' in lines
+
+
+def test_counter_escapa_etiquetas():
+    """Las etiquetas deben escaparse según el formato de texto"""
+    counter = Counter("contador_prueba", "Ayuda", ("file",))
+    counter.inc('a"b', amount=2)
+    assert 'contador_prueba{file="a\\"b"} 2' in counter.render()
+
+
+def test_metrics_endpoint_expone_latencia_y_io_por_ruta():
+    """GET /metrics debe incluir la latencia por ruta y la E/S de los CSV"""
+    before = metrics.http_request_duration.count("GET", "/resources", "200")
+    rows_before = metrics.repository_rows_read.value("data/resources.csv")
+
+    assert client.get("/resources").status_code == 200
+    client.post("/resources/zone/1", json={
+        "nombre": "Recurso Métricas", "tipo": "HOJA", "cantidad_unitaria": 1,
+        "peso": 1, "duracion_recoleccion": 1, "hormigas_requeridas": 1
+    })
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert metrics.http_request_duration.count("GET", "/resources", "200") == before + 1
+    assert 'http_request_duration_seconds_count{method="GET",route="/resources",status="200"}' in body
+    assert 'http_request_rows_read_count{route="/resources"}' in body
+    assert 'repository_writes_total{file="data/resources.csv",mode="rewrite"}' in body
+    assert 'repository_lock_wait_seconds_count{file="data/resources.csv"}' in body
+    assert metrics.repository_rows_read.value("data/resources.csv") >= rows_before
+
+
+def test_metrics_ruta_no_encontrada():
+    """Las rutas inexistentes se agrupan bajo 'unmatched' para no explotar la cardinalidad"""
+    client.get("/no-existe")
+    assert metrics.http_request_duration.count("GET", "unmatched", "404") >= 1
@@ -0,0 +1,97 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+
+from models.resource import Resource, TipoRecurso, EstadoRecurso
+from models.threat import Threat, TipoAmenaza, EstadoAmenaza
+from repositories.change_log import serialize_entity
+from repositories.partitioned_repository import PartitionedResourceRepository
+from repositories.resource_repository import ResourceRepository, FIELDNAMES
+from repositories.threat_repository import ThreatRepository
+from services.metrics import metrics
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_mmap_projection.py -v
+
+client = TestClient(app)
+
+
+def _resources(cantidad: int) -> list:
+    nombres = ["Hoja", 'Hoja "grande", seca', "Semilla\r\nde dos líneas", "Flor, roja", "Ñandú"]
+    return [
+        Resource(id=0, zona_id=i % 3 + 1, nombre=nombres[i % len(nombres)], tipo=list(TipoRecurso)[i % 7],
+                 cantidad_unitaria=i, peso=i % 5, duracion_recoleccion=30, hormigas_requeridas=1,
+                 estado=EstadoRecurso.RECOLECTADO if i % 2 else EstadoRecurso.DISPONIBLE,
+                 hora_creacion=datetime(2024, 5, 1, 10, 0, i % 60, i),
+                 hora_recoleccion=datetime(2024, 5, 2) if i % 2 else None)
+        for i in range(cantidad)
+    ]
+
+
+def test_proyeccion_coincide_con_los_modelos(tmp_path):
+    """Solo las columnas pedidas, con los mismos valores que el modelo completo"""
+    repo = ResourceRepository(str(tmp_path / "resources.csv"))
+    repo.create_many(_resources(20))
+    with open(repo.csv_file, 'a', encoding='utf-8') as f:
+        f.write("\n")
+    recursos = repo.get_all()
+
+    columnas = ["estado", "id", "hora_recoleccion"]
+    assert repo.project(columnas) == [{c: getattr(r, c) for c in columnas} for r in recursos]
+    assert repo.project(["nombre"], zona_id=2, estado="disponible") == \
+        [{"nombre": r.nombre} for r in recursos if r.zona_id == 2 and r.estado == EstadoRecurso.DISPONIBLE]
+    # Con raw, el resultado es el mismo JSON que serializar el modelo
+    assert repo.project(FIELDNAMES, raw=True) == [serialize_entity(r) for r in recursos]
+    assert repo.project([]) == [{} for _ in recursos]
+
+    with pytest.raises(ValueError):
+        repo.project(["id", "color"])
+
+
+def test_columnas_ausentes_y_valores_invalidos(tmp_path):
+    """Columnas fuera del encabezado quedan vacías; un enum desconocido falla como Enum(valor)"""
+    path = tmp_path / "threats.csv"
+    repo = ThreatRepository(str(path))
+    path.write_text(
+        "id,zona_id,nombre,tipo,costo_hormigas,estado,hora_deteccion\r\n"
+        "1,3,Araña,ARANA,4,activa,2024-05-01T10:00:00\r\n"
+        "2,3,Abeja,ABEJA,2,resuelta\r\n",
+        encoding='utf-8'
+    )
+    assert repo.project(["id", "hora_resolucion", "estado"]) == [
+        {"id": 1, "hora_resolucion": None, "estado": EstadoAmenaza.ACTIVA},
+        {"id": 2, "hora_resolucion": None, "estado": EstadoAmenaza.RESUELTA},
+    ]
+    assert repo.project(["hora_deteccion"], raw=True) == [{"hora_deteccion": "2024-05-01T10:00:00"}, {"hora_deteccion": None}]
+
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write("3,3,Dragón,DRAGON,4,activa,\r\n")
+    assert len(repo.project(["id", "estado"])) == 3
+    with pytest.raises(ValueError):
+        repo.project(["tipo"])
+
+
+def test_metricas_y_backend_particionado(tmp_path):
+    """Se cuentan las filas recorridas; el backend particionado une las zonas en orden de ID"""
+    repo = PartitionedResourceRepository(str(tmp_path / "resources.csv"))
+    repo.create_many(_resources(12))
+    archivo = repo._partition(1).csv_file
+    antes = metrics.repository_rows_read.value(archivo)
+    assert repo.project(["zona_id"], zona_id=1) == [{"zona_id": 1}] * 4
+    assert metrics.repository_rows_read.value(archivo) - antes == 4
+
+    assert repo.project(["zona_id"]) == [{"zona_id": i % 3 + 1} for i in range(12)]
+    assert repo.project(["id", "peso"], estado="recolectado") == \
+        [{"id": r.id, "peso": r.peso} for r in repo.get_all(estado="recolectado")]
+
+
+def test_sync_exporta_desde_la_proyeccion():
+    """El estado completo de /sync conserva el formato de serialize_entity"""
+    amenaza = client.post("/threats/zone/1", json={"nombre": "Amenaza Sync", "tipo": "ABEJA", "costo_hormigas": 3}).json()
+    estado = client.get("/sync").json()
+    exportada = next(t for t in estado["threats"] if t["id"] == amenaza["id"])
+    assert exportada == serialize_entity(Threat(
+        id=amenaza["id"], zona_id=1, nombre="Amenaza Sync", tipo=TipoAmenaza.ABEJA, costo_hormigas=3
+    ))
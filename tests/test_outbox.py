@@ -0,0 +1,203 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from models.resource import Resource, TipoRecurso, EstadoRecurso
+from repositories.change_log import ChangeLog
+from repositories.outbox_repository import OutboxRepository
+from repositories.resource_repository import ResourceRepository
+from services.metrics import metrics
+from services.outbox import OutboxService
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_outbox.py -v
+
+SUBSCRIBER = "http://hormigas.local/api/cambios"
+
+
+def _stand_in(fail_first: int = 0, status: int = 503):
+    """Servidor de prueba del subsistema suscriptor: registra los lotes recibidos"""
+    app = FastAPI()
+    app.state.received = []
+    app.state.calls = 0
+
+    @app.post("/api/cambios")
+    async def recibir(request: Request):
+        app.state.calls += 1
+        if app.state.calls <= fail_first:
+            return JSONResponse({"error": "no disponible"}, status_code=status)
+        app.state.received.append(await request.json())
+        return {"ok": True}
+
+    return app
+
+
+def _service(tmp_path, app, **overrides):
+    repo = OutboxRepository(str(tmp_path / "outbox.csv"), str(tmp_path / "cursors.csv"))
+    service = OutboxService(repo, [SUBSCRIBER], transport=httpx.ASGITransport(app=app))
+    service.backoff_base = 0
+    for name, value in overrides.items():
+        setattr(service, name, value)
+    return service
+
+
+def _publish(log, count):
+    for i in range(count):
+        resource = Resource(id=i + 1, zona_id=1, nombre=f"hoja {i}", tipo=TipoRecurso.HOJA, cantidad_unitaria=5,
+                            peso=1, duracion_recoleccion=10, hormigas_requeridas=2)
+        log.publish("resource", "created", resource.id, 1, data=resource)
+
+
+async def _deliver(service):
+    async with service.create_client() as client:
+        return await service.deliver_pending(client)
+
+
+def test_outbox_entrega_en_lotes_y_compacta(tmp_path):
+    """Los cambios se entregan en lotes ordenados, se avanza el cursor y se compacta el outbox"""
+    app = _stand_in()
+    service = _service(tmp_path, app, batch_size=3, max_in_flight=2)
+    log = ChangeLog()
+    service.attach(log)
+    _publish(log, 8)
+
+    totals = asyncio.run(_deliver(service))
+
+    assert totals == {SUBSCRIBER: 8}
+    seqs = sorted(e["seq"] for batch in app.state.received for e in batch["events"])
+    assert seqs == list(range(1, 9))
+    assert max(len(batch["events"]) for batch in app.state.received) == 3
+    assert app.state.received[0]["events"][0]["data"]["nombre"] == "hoja 0"
+    assert service.outbox_repo.get_cursor(SUBSCRIBER) == 8
+    assert service.outbox_repo.read_after(0, 100) == []
+
+
+def test_outbox_reintenta_con_backoff(tmp_path):
+    """Los errores transitorios se reintentan hasta que el suscriptor acepta el lote"""
+    app = _stand_in(fail_first=2)
+    service = _service(tmp_path, app)
+    log = ChangeLog()
+    service.attach(log)
+    _publish(log, 2)
+
+    assert asyncio.run(_deliver(service)) == {SUBSCRIBER: 2}
+    assert app.state.calls == 3
+
+
+def test_outbox_conserva_cambios_si_el_suscriptor_falla(tmp_path):
+    """Si se agotan los reintentos el cursor no avanza y los cambios sobreviven a un reinicio"""
+    app = _stand_in(fail_first=100)
+    service = _service(tmp_path, app, max_retries=1)
+    log = ChangeLog()
+    service.attach(log)
+    _publish(log, 2)
+
+    assert asyncio.run(_deliver(service)) == {SUBSCRIBER: 0}
+    assert service.failures[SUBSCRIBER] == 1
+
+    # Un nuevo proceso retoma los pendientes desde el disco
+    restarted = _service(tmp_path, _stand_in())
+    assert restarted.outbox_repo.last_seq == 2
+    assert asyncio.run(_deliver(restarted)) == {SUBSCRIBER: 2}
+
+
+def test_outbox_entrega_en_segundo_plano(tmp_path):
+    """Con el loop iniciado, los cambios publicados llegan al suscriptor sin intervención"""
+    app = _stand_in()
+    service = _service(tmp_path, app)
+    log = ChangeLog()
+    service.start(log)
+    try:
+        _publish(log, 3)
+        deadline = time.time() + 5
+        while service.outbox_repo.get_cursor(SUBSCRIBER) < 3 and time.time() < deadline:
+            time.sleep(0.02)
+    finally:
+        service.stop()
+
+    assert not service.is_running
+    assert service.get_status()["cursors"] == {SUBSCRIBER: 3}
+
+
+def test_outbox_descarta_lotes_rechazados_sin_bloquear(tmp_path):
+    """Un rechazo permanente (4xx) va al archivo de descarte y el cursor sigue con los lotes siguientes"""
+    app = _stand_in(fail_first=1, status=422)
+    service = _service(tmp_path, app, batch_size=2, max_in_flight=1)
+    log = ChangeLog()
+    service.attach(log)
+    _publish(log, 4)
+    antes = metrics.outbox_dead_lettered.value(SUBSCRIBER)
+
+    assert asyncio.run(_deliver(service)) == {SUBSCRIBER: 0}
+    assert asyncio.run(_deliver(service)) == {SUBSCRIBER: 2}
+    assert app.state.calls == 2
+    assert [e["seq"] for e in app.state.received[0]["events"]] == [3, 4]
+    assert service.outbox_repo.get_cursor(SUBSCRIBER) == 4
+
+    descartados = service.outbox_repo.read_dead_letters()
+    assert [(d["subscriber"], d["status"], d["seq"]) for d in descartados] == [(SUBSCRIBER, "422", "1"), (SUBSCRIBER, "422", "2")]
+    assert service.get_status()["dead_lettered"] == {SUBSCRIBER: 2}
+    assert metrics.outbox_dead_lettered.value(SUBSCRIBER) - antes == 2
+
+
+def test_outbox_se_escribe_dentro_de_la_escritura(tmp_path, monkeypatch):
+    """El append ocurre antes de que retorne la escritura; si falla, el lote se publica igual y se reintenta en orden"""
+    service = _service(tmp_path, _stand_in())
+    repo = ResourceRepository(str(tmp_path / "resources.csv"), change_log=ChangeLog())
+    service.attach(repo.change_log)
+    recibidos = []
+    repo.change_log.subscribe(recibidos.append)
+    recursos = repo.create_many([
+        Resource(id=0, zona_id=1, nombre=f"hoja {i}", tipo=TipoRecurso.HOJA, cantidad_unitaria=5,
+                 peso=1, duracion_recoleccion=10, hormigas_requeridas=2)
+        for i in range(3)
+    ])
+    assert service.outbox_repo.last_seq == 3
+
+    def sin_disco(events):
+        raise OSError("disco lleno")
+
+    with monkeypatch.context() as m:
+        m.setattr(service.outbox_repo, "append", sin_disco)
+        for recurso in recursos:
+            recurso.peso = 9
+        assert len(repo.update_many(recursos)) == 3
+        # Los suscriptores en memoria reciben todos los cambios que ya quedaron en el CSV
+        assert [(e.action, e.entity_id) for e in recibidos[3:]] == [("updated", 1), ("updated", 2), ("updated", 3)]
+        assert service.get_status()["unrecorded"] == 3
+        assert service.retry_unrecorded() == 3
+
+    repo.create(recursos[0])
+    assert service.get_status()["unrecorded"] == 0
+    pendientes = service.outbox_repo.read_after(3, 10)
+    assert [(r["action"], r["id"]) for r in pendientes] == \
+        [("updated", 1), ("updated", 2), ("updated", 3), ("created", 4)]
+    service.detach()
+
+
+def test_journal_que_falla_no_corta_la_publicacion(tmp_path):
+    """Un error de un journal se registra sin propagarse: el resto del lote se publica"""
+    repo = ResourceRepository(str(tmp_path / "resources.csv"), change_log=ChangeLog())
+    recursos = repo.create_many([
+        Resource(id=0, zona_id=1, nombre=f"hoja {i}", tipo=TipoRecurso.HOJA, cantidad_unitaria=5,
+                 peso=1, duracion_recoleccion=10, hormigas_requeridas=2)
+        for i in range(3)
+    ])
+    recibidos = []
+    repo.change_log.subscribe(recibidos.append)
+
+    def journal_roto(event):
+        raise ValueError("journal roto")
+
+    repo.change_log.add_journal(journal_roto)
+    antes = metrics.change_log_journal_errors.value()
+    for recurso in recursos:
+        recurso.estado = EstadoRecurso.RECOLECTADO
+    assert len(repo.update_many(recursos)) == 3
+    assert [e.entity_id for e in recibidos] == [1, 2, 3]
+    assert metrics.change_log_journal_errors.value() - antes == 3
+    assert all(r.estado == EstadoRecurso.RECOLECTADO for r in repo.get_all())
@@ -0,0 +1,175 @@
+import random
+import threading
+from datetime import datetime, timedelta
+
+from models.resource import Resource, TipoRecurso, EstadoRecurso
+from models.threat import Threat, TipoAmenaza, EstadoAmenaza
+from repositories.change_log import serialize_entity
+from repositories.csv_io import file_lock
+from repositories.partitioned_repository import PartitionedResourceRepository, PartitionedThreatRepository
+from repositories.resource_repository import ResourceRepository
+from repositories.zone_repository import ZoneRepository
+from services.archiver import Archiver
+from services.metrics import metrics
+from services.zone_summary import ZoneSummaryView
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_partitioned_repository.py -v
+
+
+def _recurso(i, zona_id):
+    return Resource(id=0, zona_id=zona_id, nombre=f"recurso {i}", tipo=TipoRecurso.HOJA, cantidad_unitaria=i,
+                    peso=2, duracion_recoleccion=10, hormigas_requeridas=1, hora_creacion=datetime(2024, 1, 1))
+
+
+def _filas(entities):
+    return [serialize_entity(e) for e in entities]
+
+
+def test_mismo_comportamiento_que_el_csv_unico(tmp_path):
+    """La misma secuencia de operaciones deja el mismo estado en ambos backends"""
+    plano = ResourceRepository(str(tmp_path / "plano" / "resources.csv"))
+    particionado = PartitionedResourceRepository(str(tmp_path / "part" / "resources.csv"))
+    rng = random.Random(1)
+
+    for repo in (plano, particionado):
+        repo.create_many([_recurso(i, (i % 3) + 1) for i in range(30)])
+        repo.create(_recurso(99, 2))
+    for _ in range(20):
+        resource_id = rng.randint(1, 31)
+        for repo in (plano, particionado):
+            recurso = repo.get_by_id(resource_id)
+            if recurso is not None:
+                recurso.estado = EstadoRecurso.EN_RECOLECCION
+                repo.update(resource_id, recurso)
+    changes = {resource_id: {"cantidad_unitaria": 0} for resource_id in range(1, 32, 4)}
+    for repo in (plano, particionado):
+        repo.update_fields(changes, condition=lambda r: r.estado == EstadoRecurso.DISPONIBLE)
+        assert repo.delete(5) == "deleted"
+        assert repo.delete(5) == "already_deleted"
+        assert repo.delete(500) == "never_existed"
+
+    assert _filas(particionado.get_all()) == _filas(plano.get_all())
+    assert _filas(particionado.get_all(zona_id=2, estado="disponible")) == _filas(plano.get_all(zona_id=2, estado="disponible"))
+    assert serialize_entity(particionado.get_by_id(12)) == serialize_entity(plano.get_by_id(12))
+    assert particionado.get_by_id(5) is None
+    assert particionado.resource_name_exists_in_zone("recurso 99", 2)
+    assert particionado.partitions() == [1, 2, 3]
+
+
+def test_consultas_por_zona_solo_leen_su_particion(tmp_path):
+    """get_all(zona_id) y get_by_id no recorren las particiones de otras zonas"""
+    repo = PartitionedResourceRepository(str(tmp_path / "resources.csv"))
+    repo.create_many([_recurso(i, (i % 2) + 1) for i in range(10)])
+    otra = str(tmp_path / "resources" / "zona-2.csv")
+    antes = metrics.repository_rows_read.value(otra)
+
+    assert len(repo.get_all(zona_id=1)) == 5
+    assert repo.get_by_id(1).zona_id == 1
+    assert metrics.repository_rows_read.value(otra) == antes
+    assert repo.get_by_id(2).zona_id == 2
+    assert metrics.repository_rows_read.value(otra) > antes
+    assert repo.get_all(zona_id=42) == []
+
+
+def test_escrituras_en_zonas_distintas_no_se_bloquean(tmp_path):
+    """Con la partición de la zona 1 bloqueada, la zona 2 sigue aceptando escrituras"""
+    repo = PartitionedResourceRepository(str(tmp_path / "resources.csv"))
+    repo.create_many([_recurso(1, 1), _recurso(2, 2)])
+    done = {1: threading.Event(), 2: threading.Event()}
+
+    def crear(zona_id):
+        repo.create(_recurso(10 + zona_id, zona_id))
+        done[zona_id].set()
+
+    with file_lock(str(tmp_path / "resources" / "zona-1.csv")):
+        threads = [threading.Thread(target=crear, args=(zona_id,)) for zona_id in (1, 2)]
+        for thread in threads:
+            thread.start()
+        assert done[2].wait(2)
+        assert not done[1].is_set()
+    assert done[1].wait(2)
+    for thread in threads:
+        thread.join()
+    assert sorted(r.id for r in repo.get_all()) == [1, 2, 3, 4]
+
+
+def test_suscriptores_se_notifican_fuera_del_lock_de_la_particion(tmp_path):
+    """Mientras un suscriptor procesa un evento, la partición ya admite otras escrituras"""
+    repo = PartitionedResourceRepository(str(tmp_path / "resources.csv"))
+    repo.create(_recurso(1, 1))
+    libre = []
+
+    def listener(event):
+        if event.entity_id == 2:
+            lector = threading.Thread(target=lambda: repo.get_by_id(1))
+            lector.start()
+            lector.join(2)
+            libre.append(not lector.is_alive())
+
+    repo.change_log.subscribe(listener)
+    try:
+        recurso = repo.create(_recurso(2, 1))
+    finally:
+        repo.change_log.unsubscribe(listener)
+    assert libre == [True]
+    assert recurso.id == 2
+
+
+def test_instancias_comparten_el_mapa_de_ids(tmp_path):
+    """Otra instancia sobre el mismo directorio encuentra lo creado y no repite IDs"""
+    uno = PartitionedThreatRepository(str(tmp_path / "threats.csv"))
+    dos = PartitionedThreatRepository(str(tmp_path / "threats.csv"))
+    amenaza = uno.create(Threat(id=0, zona_id=4, nombre="araña", tipo=TipoAmenaza.ARANA, costo_hormigas=3))
+    otra = dos.create(Threat(id=0, zona_id=5, nombre="abeja", tipo=TipoAmenaza.ABEJA, costo_hormigas=2))
+
+    assert dos.get_by_id(amenaza.id).nombre == "araña"
+    assert otra.id == amenaza.id + 1
+    assert dos.delete(amenaza.id) is True
+    assert uno.get_by_id(amenaza.id) is None
+
+
+def test_migra_el_csv_unico_y_mueve_entre_zonas(tmp_path):
+    """Al activarse reparte el CSV existente por zona; cambiar de zona mueve la fila"""
+    plano = ResourceRepository(str(tmp_path / "resources.csv"))
+    plano.create_many([_recurso(i, (i % 2) + 1) for i in range(6)])
+    originales = _filas(plano.get_all())
+
+    repo = PartitionedResourceRepository(str(tmp_path / "resources.csv"))
+    assert _filas(repo.get_all()) == originales
+    assert repo.partitions() == [1, 2]
+    # El CSV único queda marcado como migrado: el backend csv ya no lo sirve desactualizado
+    assert not (tmp_path / "resources.csv").exists()
+    assert (tmp_path / "resources.csv.migrated").exists()
+
+    recurso = repo.get_by_id(1)
+    recurso.zona_id = 7
+    repo.update(1, recurso)
+    assert repo.get_by_id(1).zona_id == 7
+    assert [r.id for r in repo.get_all(zona_id=7)] == [1]
+    assert 1 not in [r.id for r in repo.get_all(zona_id=1)]
+
+
+def test_vistas_y_archivado_sobre_particiones(tmp_path):
+    """Las vistas materializadas y el archivado funcionan igual sobre el backend particionado"""
+    resources = PartitionedResourceRepository(str(tmp_path / "resources.csv"))
+    threats = PartitionedThreatRepository(str(tmp_path / "threats.csv"))
+    resources.create_many([_recurso(i, (i % 2) + 1) for i in range(6)])
+    view = ZoneSummaryView(resources, threats, ZoneRepository(str(tmp_path / "zones.csv")))
+    view.ensure_started()
+
+    recurso = resources.get_by_id(2)
+    recurso.estado = EstadoRecurso.RECOLECTADO
+    recurso.hora_recoleccion = datetime(2024, 1, 2)
+    resources.update(2, recurso)
+    threats.create(Threat(id=0, zona_id=1, nombre="mantis", tipo=TipoAmenaza.MANTIS, costo_hormigas=4,
+                          estado=EstadoAmenaza.RESUELTA, hora_deteccion=datetime(2024, 1, 1),
+                          hora_resolucion=datetime(2024, 1, 1)))
+    threats.create(Threat(id=0, zona_id=1, nombre="ancla", tipo=TipoAmenaza.ARANA, costo_hormigas=1))
+
+    assert Archiver(resources, threats).archive(now=datetime(2024, 3, 1)) == {"resources": 1, "threats": 1}
+    assert [r.id for r in resources.get_archived()] == [2]
+    assert resources.get_by_id(2) is None
+
+    reconstruida = ZoneSummaryView(resources, threats, ZoneRepository(str(tmp_path / "zones.csv")))
+    assert view.summaries() == reconstruida.summaries()
@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+
+from services.profiler import SamplingProfiler, ProfilerBusyError
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_profiler.py -v
+
+client = TestClient(app)
+
+
+def _trabajo_ocupado(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@pytest.fixture
+def hilo_ocupado():
+    stop = threading.Event()
+    thread = threading.Thread(target=_trabajo_ocupado, args=(stop,), name="hilo-prueba")
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+def test_capture_retorna_pilas_colapsadas(hilo_ocupado):
+    """Cada línea debe ser 'hilo;frame;...;frame conteo' con la raíz primero"""
+    output = SamplingProfiler().capture(seconds=0.2, hz=50)
+
+    lines = [line for line in output.splitlines() if line.startswith("hilo-prueba;")]
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert "_trabajo_ocupado (test_profiler.py:" in stack
+
+
+def test_capture_filtra_por_hilo(hilo_ocupado):
+    """El filtro debe conservar solo los hilos cuyo nombre empieza con el prefijo"""
+    output = SamplingProfiler().capture(seconds=0.1, hz=50, thread_filter="hilo-")
+    assert output
+    assert all(line.startswith("hilo-prueba;") for line in output.splitlines())
+
+
+def test_capture_concurrente_falla():
+    """Solo se permite una captura a la vez"""
+    instance = SamplingProfiler()
+    instance._capture_lock.acquire()
+    try:
+        with pytest.raises(ProfilerBusyError):
+            instance.capture(seconds=0.1, hz=10)
+    finally:
+        instance._capture_lock.release()
+
+
+def test_endpoint_profile(hilo_ocupado):
+    """GET /admin/profile debe responder texto plano con las pilas colapsadas"""
+    response = client.get("/admin/profile?seconds=0.2&hz=50")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "hilo-prueba;" in response.text
+
+
+@pytest.mark.parametrize("query", ["seconds=0", "seconds=1000", "hz=0", "hz=100000"])
+def test_endpoint_profile_parametros_invalidos(query):
+    """Debe devolver 400 ante parámetros fuera de rango"""
+    assert client.get(f"/admin/profile?{query}").status_code == 400
@@ -0,0 +1,60 @@
+import json
+
+from benchmarks.repository_benchmark import run_benchmarks, compare_with_baseline, main
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_repository_benchmark.py -v
+
+
+def test_run_benchmarks_mide_todas_las_operaciones():
+    """Debe medir cada operación pública de los tres repositorios"""
+    report = run_benchmarks([50], iterations=3)
+    results = report["results"]
+
+    operations = {(r["repository"], r["operation"]) for r in results}
+    for repository in ("ResourceRepository", "ThreatRepository", "ZoneRepository"):
+        for operation in ("create", "get_by_id", "get_all_filtered", "delete"):
+            assert (repository, operation) in operations
+    assert ("ResourceRepository", "update") in operations
+    assert ("ResourceRepository", "name_exists") in operations
+    assert ("ZoneRepository", "exists") in operations
+    # La matriz no es pareja: lo que un repositorio no tiene queda informado, no en silencio
+    assert report["meta"]["not_applicable"] == {
+        "ResourceRepository": ["exists"],
+        "ThreatRepository": ["exists", "name_exists"],
+        "ZoneRepository": ["name_exists", "update"],
+    }
+    for r in results:
+        assert r["rows"] == 50
+        assert r["p50_ms"] <= r["p99_ms"]
+        assert r["peak_memory_kb"] >= 0
+
+
+def test_compare_with_baseline_detecta_regresiones():
+    """Debe reportar solo las operaciones que empeoran más que el umbral"""
+    base = {"results": [
+        {"backend": "csv", "repository": "R", "operation": "a", "rows": 1, "p50_ms": 1.0, "ops_per_sec": 1000},
+        {"backend": "csv", "repository": "R", "operation": "b", "rows": 1, "p50_ms": 1.0, "ops_per_sec": 1000},
+    ]}
+    current = {"results": [
+        {"backend": "csv", "repository": "R", "operation": "a", "rows": 1, "p50_ms": 1.1, "ops_per_sec": 950},
+        {"backend": "csv", "repository": "R", "operation": "b", "rows": 1, "p50_ms": 2.0, "ops_per_sec": 500},
+    ]}
+
+    regressions = compare_with_baseline(current, base, threshold=0.25)
+    assert [r["operation"] for r in regressions] == ["b"]
+
+
+def test_cli_falla_ante_regresion(tmp_path):
+    """El CLI debe escribir el JSON y retornar 1 si hay regresiones contra la línea base"""
+    output = tmp_path / "bench.json"
+    assert main(["--rows", "20", "--iterations", "2", "--output", str(output)]) == 0
+
+    baseline = json.loads(output.read_text())
+    for r in baseline["results"]:
+        r["p50_ms"] = 0.0
+    baseline_file = tmp_path / "baseline.json"
+    baseline_file.write_text(json.dumps(baseline))
+
+    assert main(["--rows", "20", "--iterations", "2", "--output", str(output),
+                 "--baseline", str(baseline_file)]) == 1
@@ -0,0 +1,95 @@
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+
+from config.resource_depletion_config import ResourceDepletionConfig
+from models.resource import Resource, TipoRecurso, EstadoRecurso
+from endpoints.resources__controller import resource_repo
+from repositories.resource_repository import ResourceRepository
+from repositories.threat_repository import ThreatRepository
+from services.world_stream import apply_transitions
+from services.resource_depletion import remaining_quantity, materialize_depletion
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_resource_depletion.py -v
+
+client = TestClient(app)
+
+NOW = datetime(2025, 11, 20, 12, 0, 0)
+
+
+@pytest.fixture
+def agotamiento(monkeypatch):
+    monkeypatch.setattr(ResourceDepletionConfig, "ENABLED", True)
+
+
+def _resource(segundos, estado=EstadoRecurso.EN_RECOLECCION, cantidad=20, duracion=100):
+    return Resource(id=1, zona_id=1, nombre="hoja", tipo=TipoRecurso.HOJA, cantidad_unitaria=cantidad,
+                    peso=2, duracion_recoleccion=duracion, hormigas_requeridas=4, estado=estado,
+                    hora_inicio_recoleccion=NOW - timedelta(seconds=segundos))
+
+
+def test_cantidad_en_forma_cerrada(agotamiento):
+    """La cantidad disminuye linealmente y se agota al cumplirse duracion_recoleccion"""
+    assert remaining_quantity(_resource(0), NOW) == 20
+    assert remaining_quantity(_resource(50), NOW) == 10
+    assert remaining_quantity(_resource(51), NOW) == 10
+    assert remaining_quantity(_resource(100), NOW) == 0
+    assert remaining_quantity(_resource(500), NOW) == 0
+
+
+def test_sin_agotamiento_fuera_de_recoleccion_o_deshabilitado(agotamiento, monkeypatch):
+    """Solo se agotan los recursos en recolección y con el modelo habilitado"""
+    assert remaining_quantity(_resource(50, EstadoRecurso.DISPONIBLE), NOW) == 20
+    monkeypatch.setattr(ResourceDepletionConfig, "ENABLED", False)
+    assert remaining_quantity(_resource(50), NOW) == 20
+
+
+def test_materializa_al_interrumpir(agotamiento):
+    """Al volver a disponible la cantidad restante queda fija"""
+    resource = _resource(25)
+    materialize_depletion(resource, EstadoRecurso.DISPONIBLE, NOW)
+    assert resource.cantidad_unitaria == 15
+
+
+def test_endpoints_calculan_al_leer_y_persisten_al_interrumpir(agotamiento):
+    """GET muestra la cantidad actual sin escribir; PUT a disponible la persiste"""
+    resource = resource_repo.create(Resource(
+        id=0, zona_id=1, nombre="Recurso Agotamiento", tipo=TipoRecurso.HOJA, cantidad_unitaria=20,
+        peso=2, duracion_recoleccion=100, hormigas_requeridas=4, estado=EstadoRecurso.EN_RECOLECCION,
+        hora_inicio_recoleccion=datetime.now() - timedelta(seconds=50)
+    ))
+
+    assert client.get(f"/resources/{resource.id}").json()["cantidad_unitaria"] == 10
+    assert resource_repo.get_by_id(resource.id).cantidad_unitaria == 20
+    assert client.put(f"/resources/{resource.id}", json={"estado": "en_recoleccion", "cantidad_unitaria": 15}).status_code == 400
+
+    response = client.put(f"/resources/{resource.id}", json={"estado": "disponible"})
+    assert response.json()["cantidad_unitaria"] == 10
+    assert resource_repo.get_by_id(resource.id).cantidad_unitaria == 10
+
+
+def test_cambiar_cantidad_en_recoleccion_no_descuenta_dos_veces(agotamiento, tmp_path):
+    """La cantidad escrita durante la recolección ya descuenta lo recolectado: el agotamiento vuelve a contar desde ahí"""
+    resource = resource_repo.create(Resource(
+        id=0, zona_id=1, nombre="Recurso Cantidad Parcial", tipo=TipoRecurso.HOJA, cantidad_unitaria=10,
+        peso=2, duracion_recoleccion=10, hormigas_requeridas=1, estado=EstadoRecurso.EN_RECOLECCION,
+        hora_inicio_recoleccion=datetime.now() - timedelta(seconds=5)
+    ))
+    assert client.get(f"/resources/{resource.id}").json()["cantidad_unitaria"] == 5
+    response = client.put(f"/resources/{resource.id}", json={"estado": "en_recoleccion", "cantidad_unitaria": 4})
+    assert response.json()["cantidad_unitaria"] == 4
+    assert client.get(f"/resources/{resource.id}").json()["cantidad_unitaria"] == 4
+
+    # Misma regla para las transiciones enviadas por el WebSocket
+    resources = ResourceRepository(str(tmp_path / "resources.csv"))
+    threats = ThreatRepository(str(tmp_path / "threats.csv"))
+    resources.create(replace(resource, id=0))
+    result = apply_transitions(
+        [{"entity": "resource", "id": 1, "estado": "en_recoleccion", "cantidad_unitaria": 4}], resources, threats
+    )
+    assert result["applied"] == [["resource", 1]]
+    assert remaining_quantity(resources.get_by_id(1)) == 4
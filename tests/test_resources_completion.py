@@ -0,0 +1,149 @@
+import asyncio
+from datetime import datetime, timezone
+
+import httpx
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
+from typing import Optional
+
+from models.resource import Resource, TipoRecurso, EstadoRecurso
+from repositories.resource_repository import ResourceRepository
+from services.metrics import metrics
+from services.resources_completion import ResourcesCompletionPoller
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_resources_completion.py -v
+
+API_URL = "http://recoleccion.local/api/zones"
+OTHER_URL = "http://recoleccion.local/api/caida"
+MIXED_URL = "http://recoleccion.local/api/mixta"
+
+
+def _collection_api():
+    """Servidor de prueba de la API de recolección, con cursor incremental"""
+    app = FastAPI()
+    app.state.cursors = []
+
+    @app.get("/api/zones")
+    async def zonas(cursor: Optional[str] = Query(None)):
+        app.state.cursors.append(cursor)
+        if cursor == "c1":
+            return {"items": [], "cursor": "c1"}
+        return {"items": [
+            {"zone_id": 1, "resource_id": 1, "resource_name": "hoja 1", "resource_type": "HOJA", "status": "completed"},
+            {"zone_id": 1, "resource_id": 2, "resource_name": "hoja 2", "resource_type": "HOJA", "status": "in_progress"},
+            {"zone_id": 1, "resource_id": 3, "resource_name": "hoja 3", "resource_type": "HOJA", "status": "completed",
+             "completed_at": "2025-11-20T10:00:00"},
+        ], "cursor": "c1"}
+
+    @app.get("/api/mixta")
+    async def mixta(cursor: Optional[str] = Query(None)):
+        app.state.cursors.append(cursor)
+        if cursor == "m1":
+            return {"items": [], "cursor": "m1"}
+        return {"items": [
+            {"resource_id": "abc", "status": "completed"},
+            {"resource_id": 2, "status": "completed", "completed_at": "ayer"},
+            "no es un objeto",
+            {"resource_id": 1, "status": "completed", "completed_at": "2025-11-20T10:00:00Z"},
+        ], "cursor": "m1"}
+
+    @app.get("/api/caida")
+    async def caida():
+        return JSONResponse({"error": "fuera de servicio"}, status_code=503)
+
+    return app
+
+
+def _repo(tmp_path) -> ResourceRepository:
+    repo = ResourceRepository(str(tmp_path / "resources.csv"))
+    repo.create_many([
+        Resource(id=0, zona_id=1, nombre=f"hoja {i}", tipo=TipoRecurso.HOJA, cantidad_unitaria=12,
+                 peso=3, duracion_recoleccion=30, hormigas_requeridas=2, estado=EstadoRecurso.EN_RECOLECCION)
+        for i in range(1, 4)
+    ])
+    return repo
+
+
+async def _poll(poller, rounds=1):
+    async with poller.create_client() as client:
+        return [await poller.poll(client) for _ in range(rounds)]
+
+
+def test_poll_aplica_completados_en_una_escritura_parcial(tmp_path):
+    """Las recolecciones completadas se aplican con una sola reescritura sin perder cantidad ni peso"""
+    api = _collection_api()
+    repo = _repo(tmp_path)
+    poller = ResourcesCompletionPoller(repo, [API_URL], transport=httpx.ASGITransport(app=api))
+    writes_before = metrics.repository_writes.value(repo.csv_file, "rewrite")
+
+    first, second = asyncio.run(_poll(poller, rounds=2))
+
+    assert first == {"polled": 1, "completions": 2, "applied": 2, "errors": {}}
+    assert second["completions"] == 0
+    assert api.state.cursors == [None, "c1"]
+    assert metrics.repository_writes.value(repo.csv_file, "rewrite") == writes_before + 1
+
+    collected = repo.get_by_id(1)
+    assert collected.estado == EstadoRecurso.RECOLECTADO
+    assert collected.cantidad_unitaria == 12 and collected.peso == 3
+    assert repo.get_by_id(3).hora_recoleccion.isoformat() == "2025-11-20T10:00:00"
+    assert repo.get_by_id(2).estado == EstadoRecurso.EN_RECOLECCION
+
+
+def test_poll_tolera_urls_caidas(tmp_path):
+    """Una URL con error no impide aplicar lo reportado por las demás"""
+    api = _collection_api()
+    repo = _repo(tmp_path)
+    poller = ResourcesCompletionPoller(repo, [OTHER_URL, API_URL], transport=httpx.ASGITransport(app=api))
+
+    result = asyncio.run(_poll(poller))[0]
+
+    assert result["applied"] == 2
+    assert list(result["errors"]) == [OTHER_URL]
+    assert OTHER_URL not in poller.cursors
+
+
+def test_poll_now_reutiliza_el_cliente_entre_rondas(tmp_path):
+    """poll_now se ejecuta en el loop dedicado desde otro hilo y conserva el pool de conexiones"""
+    api = _collection_api()
+    repo = _repo(tmp_path)
+    poller = ResourcesCompletionPoller(repo, [API_URL], transport=httpx.ASGITransport(app=api))
+    try:
+        assert poller.poll_now(timeout=5)["applied"] == 2
+        client = poller._client
+        assert poller.poll_now(timeout=5)["applied"] == 0
+        assert poller._client is client
+    finally:
+        poller.stop()
+    assert poller._client is None
+
+
+def test_poll_now_sin_urls_no_hace_nada(tmp_path):
+    """Sin URLs configuradas la tarea no inicia el loop ni hace peticiones"""
+    poller = ResourcesCompletionPoller(ResourceRepository(str(tmp_path / "resources.csv")), [])
+    assert poller.poll_now() == {"polled": 0, "completions": 0, "applied": 0, "errors": {}}
+    assert not poller._loop.is_running
+
+
+def test_poll_omite_detalles_invalidos_y_persiste_cursores(tmp_path):
+    """Los detalles mal formados se omiten sin frenar la ronda; fechas con zona se guardan en hora local"""
+    api = _collection_api()
+    repo = _repo(tmp_path)
+    poller = ResourcesCompletionPoller(repo, [MIXED_URL], transport=httpx.ASGITransport(app=api))
+
+    result = asyncio.run(_poll(poller))[0]
+
+    assert result["applied"] == 1
+    assert result["errors"] == {MIXED_URL: "3 detalles inválidos omitidos"}
+    esperada = datetime(2025, 11, 20, 10, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    assert repo.get_by_id(1).hora_recoleccion == esperada
+    assert repo.get_by_id(2).estado == EstadoRecurso.EN_RECOLECCION
+    # El archivado compara fechas: no debe fallar por una fecha con zona horaria
+    assert repo.archive(datetime(2026, 1, 1)) == 1
+
+    # Un nuevo proceso retoma desde el cursor confirmado
+    reiniciado = ResourcesCompletionPoller(repo, [MIXED_URL], transport=httpx.ASGITransport(app=api))
+    assert reiniciado.cursors == {MIXED_URL: "m1"}
+    asyncio.run(_poll(reiniciado))
+    assert api.state.cursors == [None, "m1"]
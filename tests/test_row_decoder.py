@@ -0,0 +1,148 @@
+import csv
+import gc
+from datetime import datetime
+
+import pytest
+
+from benchmarks.decoder_benchmark import run_decoder_benchmark, main
+from models.resource import Resource, TipoRecurso, EstadoRecurso
+from repositories.partitioned_repository import PartitionedResourceRepository
+from repositories.resource_repository import ResourceRepository, FIELDNAMES
+from repositories.threat_repository import ThreatRepository
+from services.metrics import metrics
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_row_decoder.py -v
+
+
+def _dict_reader_models(repo) -> list:
+    with open(repo.csv_file, 'r', encoding='utf-8') as f:
+        return [repo._dict_to_model(row) for row in csv.DictReader(f)]
+
+
+def test_decodifica_igual_que_dict_reader(tmp_path):
+    """Comillas, comas y saltos de línea en textos, líneas vacías y fechas vacías"""
+    repo = ResourceRepository(str(tmp_path / "resources.csv"))
+    nombres = ["Hoja simple", 'Hoja "grande", seca', "Semilla\nde dos líneas", "Flor, roja", "Ñandú"]
+    repo.create_many([
+        Resource(id=0, zona_id=i % 2 + 1, nombre=nombre, tipo=TipoRecurso.HOJA, cantidad_unitaria=i,
+                 peso=2, duracion_recoleccion=30, hormigas_requeridas=1,
+                 hora_creacion=datetime(2024, 5, 1, 10, 0, i, 123456),
+                 hora_recoleccion=datetime(2024, 5, 1, 11) if i % 2 else None)
+        for i, nombre in enumerate(nombres)
+    ])
+    with open(repo.csv_file, 'a', encoding='utf-8') as f:
+        f.write("\n")
+
+    esperados = _dict_reader_models(repo)
+    assert [r.nombre for r in esperados] == nombres
+    assert repo.get_all() == esperados
+    assert repo.get_all(zona_id=2) == [r for r in esperados if r.zona_id == 2]
+    assert repo.get_all(estado="disponible", zona_id=1) == [r for r in esperados if r.zona_id == 1]
+    assert repo.get_all(estado="recolectado") == []
+    assert repo.get_by_id(4).nombre == "Flor, roja"
+    assert repo.get_by_id(99) is None
+
+
+def test_columnas_en_otro_orden_y_valores_invalidos(tmp_path):
+    """Las posiciones salen del encabezado; un enum desconocido falla como Enum(valor)"""
+    path = tmp_path / "threats.csv"
+    repo = ThreatRepository(str(path))
+    path.write_text(
+        "nombre,id,zona_id,tipo,costo_hormigas,estado,hora_resolucion,hora_deteccion\n"
+        "Araña,1,3,ARANA,4,activa,,2024-05-01T10:00:00\n",
+        encoding='utf-8'
+    )
+    amenaza = repo.get_by_id(1)
+    assert (amenaza.nombre, amenaza.zona_id, amenaza.hora_deteccion) == ("Araña", 3, datetime(2024, 5, 1, 10))
+    assert amenaza.hora_resolucion is None
+
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write("Dragón,2,3,DRAGON,4,activa,,\n")
+    with pytest.raises(ValueError):
+        repo.get_all()
+
+
+def test_vistas_coinciden_con_los_modelos(tmp_path):
+    """scan() filtra igual que get_all y cada vista convierte sus campos al leerlos"""
+    repo = ResourceRepository(str(tmp_path / "resources.csv"))
+    nombres = ["Hoja", 'Hoja "grande", seca', "Semilla\r\nde dos líneas", "Flor, roja"]
+    repo.create_many([
+        Resource(id=0, zona_id=i % 2 + 1, nombre=nombres[i % 4], tipo=list(TipoRecurso)[i % 7],
+                 cantidad_unitaria=i, peso=1, duracion_recoleccion=30, hormigas_requeridas=1,
+                 estado=EstadoRecurso.RECOLECTADO if i % 3 else EstadoRecurso.DISPONIBLE,
+                 hora_creacion=datetime(2024, 5, 1, 10, 0, i), hora_recoleccion=datetime(2024, 5, 2) if i % 3 else None)
+        for i in range(12)
+    ])
+    with open(repo.csv_file, 'a', encoding='utf-8') as f:
+        f.write("\n")
+
+    vistas = repo.scan()
+    # El recolector de ciclos se suspende solo durante la lectura
+    assert gc.isenabled()
+    assert [v.to_model() for v in vistas] == repo.get_all()
+    assert [(v.id, v.nombre, v.tipo, v.hora_recoleccion) for v in vistas] == \
+        [(r.id, r.nombre, r.tipo, r.hora_recoleccion) for r in repo.get_all()]
+    assert [v.to_model() for v in repo.scan(zona_id=2, estado="recolectado")] == \
+        repo.get_all(zona_id=2, estado="recolectado")
+
+    particionado = PartitionedResourceRepository(str(tmp_path / "particiones" / "resources.csv"))
+    particionado.create_many(repo.get_all())
+    assert [v.to_model() for v in particionado.scan()] == particionado.get_all()
+    assert [v.id for v in particionado.scan(zona_id=1)] == [r.id for r in particionado.get_all(zona_id=1)]
+
+
+def test_vista_con_enum_invalido_falla_al_leer(tmp_path):
+    """Un enum desconocido falla como Enum(valor) recién al leer ese campo (o al filtrar por él)"""
+    path = tmp_path / "threats.csv"
+    repo = ThreatRepository(str(path))
+    path.write_text(
+        "id,zona_id,nombre,tipo,costo_hormigas,estado,hora_deteccion,hora_resolucion\n"
+        "1,3,Dragón,DRAGON,4,activa,,\n",
+        encoding='utf-8'
+    )
+    vista, = repo.scan()
+    assert (vista.id, vista.nombre, vista.hora_deteccion) == (1, "Dragón", None)
+    with pytest.raises(ValueError):
+        vista.tipo
+    with pytest.raises(ValueError):
+        vista.to_model()
+
+    path.write_text(
+        "id,zona_id,nombre,tipo,costo_hormigas,estado,hora_deteccion,hora_resolucion\n"
+        "1,3,Araña,ARANA,4,perdida,,\n",
+        encoding='utf-8'
+    )
+    with pytest.raises(ValueError):
+        repo.scan(estado="activa")
+
+
+def test_metricas_cuentan_filas_recorridas(tmp_path):
+    """Las filas descartadas por el filtro también cuentan como leídas"""
+    repo = ResourceRepository(str(tmp_path / "resources.csv"))
+    repo.create_many([
+        Resource(id=0, zona_id=i % 4, nombre=f"r{i}", tipo=TipoRecurso.FLOR, cantidad_unitaria=1, peso=1,
+                 duracion_recoleccion=1, hormigas_requeridas=1, estado=EstadoRecurso.DISPONIBLE)
+        for i in range(20)
+    ])
+    antes = metrics.repository_rows_read.value(repo.csv_file)
+    assert len(repo.get_all(zona_id=1)) == 5
+    assert metrics.repository_rows_read.value(repo.csv_file) - antes == 20
+
+
+def test_benchmark_compara_ambos_caminos(tmp_path):
+    """El benchmark verifica que ambos caminos coincidan y reporta la aceleración"""
+    results = run_decoder_benchmark(300, repeat=1)["results"]
+    assert {(r["repository"], r["operation"]) for r in results} == {
+        (repository, operation)
+        for repository in ("ResourceRepository", "ThreatRepository")
+        for operation in ("full_scan", "view_scan", "zone_scan", "projected_scan")
+    }
+    assert all(r["rows"] == 300 and r["speedup"] > 0 for r in results)
+    vistas = run_decoder_benchmark(50, repeat=1, operations=["view_scan"])["results"]
+    assert [(r["operation"], r["matched"]) for r in vistas] == [("view_scan", 50)] * 2
+
+    output = tmp_path / "decoder.json"
+    assert main(["--rows", "100", "--repeat", "1", "--output", str(output)]) == 0
+    assert main(["--rows", "100", "--repeat", "1", "--min-speedup", "1000"]) == 1
+    assert output.exists()
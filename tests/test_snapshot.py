@@ -0,0 +1,137 @@
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+from main import app
+
+from models.resource import Resource, TipoRecurso, EstadoRecurso
+from models.threat import Threat, TipoAmenaza
+from repositories.partitioned_repository import PartitionedThreatRepository
+from repositories.resource_repository import ResourceRepository
+from repositories.threat_repository import ThreatRepository
+from services.metrics import metrics
+from services.snapshotter import Snapshotter
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_snapshot.py -v
+
+client = TestClient(app)
+
+
+def _resources(cantidad: int, inicio: int = 0) -> list:
+    return [
+        Resource(id=0, zona_id=i % 3 + 1, nombre=f'Hoja "{i}", seca' if i % 4 == 0 else f"Hoja {i}",
+                 tipo=TipoRecurso.HOJA, cantidad_unitaria=i, peso=2, duracion_recoleccion=30,
+                 hormigas_requeridas=1, hora_creacion=datetime(2024, 5, 1, 10, 0, i % 60, i),
+                 estado=EstadoRecurso.RECOLECTADO if i % 2 else EstadoRecurso.DISPONIBLE,
+                 hora_recoleccion=datetime(2024, 5, 2) if i % 2 else None)
+        for i in range(inicio, inicio + cantidad)
+    ]
+
+
+def test_snapshot_mas_registro_de_cambios(tmp_path):
+    """Tras el snapshot solo se decodifican las filas agregadas o modificadas después, sin leer el CSV"""
+    repo = ResourceRepository(str(tmp_path / "resources.csv"))
+    repo.create_many(_resources(30))
+    assert repo.write_snapshot() == 30
+    assert (tmp_path / "resources.csv.snap").exists()
+
+    def filas_parseadas(lectura):
+        antes = metrics.repository_rows_read.value(repo.csv_file)
+        resultado = lectura()
+        return resultado, metrics.repository_rows_read.value(repo.csv_file) - antes
+
+    assert filas_parseadas(repo.load_all) == (repo.get_all(), 0)
+    repo.create_many(_resources(5, inicio=30))
+    cargados, parseadas = filas_parseadas(repo.load_all)
+    assert cargados == repo.get_all() and len(cargados) == 35
+    # Solo las 5 filas agregadas después del snapshot se parsearon como texto
+    assert parseadas == 5
+
+    # Las reescrituras (update, update_fields, delete, archivado) también se registran
+    recurso = repo.get_by_id(3)
+    recurso.estado = EstadoRecurso.EN_RECOLECCION
+    repo.update(3, recurso)
+    repo.update_fields({4: {"nombre": "Hoja\r\nrenombrada, seca"}, 8: {"peso": 9}})
+    assert repo.delete(10) == "deleted"
+    assert repo.archive(datetime(2024, 6, 1)) == 16
+    cargados, parseadas = filas_parseadas(repo.load_all)
+    assert cargados == repo.get_all() and len(cargados) == 18
+    assert parseadas == 8
+
+    # Un nuevo snapshot parte del anterior, guarda el estado actual y vacía el registro
+    assert repo.write_snapshot() == 18
+    assert repo.snapshot.load().entities == repo.get_all()
+    assert filas_parseadas(repo.load_all) == (repo.get_all(), 0)
+
+    # Una escritura que no pasó por el registro cambia la versión del CSV: se lee completo
+    with open(repo.csv_file, 'a', encoding='utf-8') as f:
+        f.write("99,1,Intrusa,HOJA,1,1,1,1,disponible,2024-05-01T10:00:00,,\n")
+    assert filas_parseadas(repo.load_all) == (repo.get_all(), 19)
+
+
+def test_snapshot_invalido_se_ignora(tmp_path):
+    """Un snapshot dañado, de otro esquema o con fechas con zona horaria nunca altera la lectura"""
+    repo = ThreatRepository(str(tmp_path / "threats.csv"))
+    repo.create_many([
+        Threat(id=0, zona_id=1, nombre=f"Araña {i}", tipo=TipoAmenaza.ARANA, costo_hormigas=i,
+               hora_deteccion=datetime(2024, 5, 1, 12) if i % 2 else None)
+        for i in range(10)
+    ])
+    repo.write_snapshot()
+    snapshot = tmp_path / "threats.csv.snap"
+    contenido = bytearray(snapshot.read_bytes())
+    contenido[-3] ^= 0xFF
+    snapshot.write_bytes(bytes(contenido))
+    assert repo.snapshot.load() is None
+    assert repo.load_all() == repo.get_all()
+
+    snapshot.write_bytes(b"")
+    assert repo.snapshot.load() is None
+    assert len(repo.load_all()) == 10
+
+    # Otro esquema (p. ej. un snapshot de recursos en el lugar del de amenazas)
+    recursos = ResourceRepository(str(tmp_path / "resources.csv"))
+    recursos.create_many(_resources(3))
+    recursos.write_snapshot()
+    snapshot.write_bytes((tmp_path / "resources.csv.snap").read_bytes())
+    assert repo.snapshot.load() is None
+    assert repo.load_all() == repo.get_all()
+
+    # Las fechas con zona horaria no se pueden guardar: no se escribe el snapshot
+    repo.create(Threat(id=0, zona_id=1, nombre="Mantis", tipo=TipoAmenaza.MANTIS, costo_hormigas=1,
+                       hora_deteccion=datetime(2024, 5, 1, 12, tzinfo=timezone.utc)))
+    assert repo.write_snapshot() == 0
+    assert repo.load_all() == repo.get_all()
+
+
+def test_snapshot_particionado_y_endpoint(tmp_path, monkeypatch):
+    """El backend particionado guarda un snapshot por zona; /admin/snapshot los escribe"""
+    repo = PartitionedThreatRepository(str(tmp_path / "threats.csv"))
+    repo.create_many([
+        Threat(id=0, zona_id=i % 2 + 1, nombre=f"Abeja {i}", tipo=TipoAmenaza.ABEJA, costo_hormigas=2,
+               hora_deteccion=datetime(2024, 5, 1, 12))
+        for i in range(6)
+    ])
+    resources = ResourceRepository(str(tmp_path / "resources.csv"))
+    resources.create_many(_resources(4))
+    servicio = Snapshotter(resources, repo)
+    monkeypatch.setattr("endpoints.admin__controller.snapshotter", servicio)
+
+    respuesta = client.post("/admin/snapshot")
+    assert respuesta.status_code == 200
+    assert respuesta.json() == {"resources": 4, "threats": 6}
+    assert sorted(p.name for p in (tmp_path / "threats").glob("*.snap")) == ["zona-1.csv.snap", "zona-2.csv.snap"]
+    assert repo.load_all() == repo.get_all()
+    assert client.get("/admin/snapshot").json()["rows"] == {"resources": 4, "threats": 6}
+
+    # Mover una amenaza de zona queda en el registro de ambas particiones
+    amenaza = repo.get_by_id(1)
+    amenaza.zona_id = 2
+    repo.update(1, amenaza)
+    origen = str(tmp_path / "threats" / "zona-1.csv")
+    antes = metrics.repository_rows_read.value(origen)
+    cargadas = repo.load_all()
+    # En la partición de origen solo se registró la eliminación: no se parseó ninguna fila
+    assert metrics.repository_rows_read.value(origen) == antes
+    assert cargadas == repo.get_all()
+    assert [t.id for t in cargadas if t.zona_id == 2] == [1, 2, 4, 6]
@@ -0,0 +1,63 @@
+from fastapi.testclient import TestClient
+from main import app
+
+from endpoints.sync__controller import resource_repo
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_sync.py -v
+
+client = TestClient(app)
+
+RESOURCE_DATA = {
+    "tipo": "HOJA", "cantidad_unitaria": 10, "peso": 2,
+    "duracion_recoleccion": 30, "hormigas_requeridas": 2
+}
+
+
+def test_sync_sin_version_retorna_estado_completo():
+    """Sin `since` se retorna el estado completo con la versión y época actuales"""
+    response = client.get("/sync")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["full"] is True
+    assert body["version"] == resource_repo.change_log.version
+    assert body["epoch"] == resource_repo.change_log.epoch
+    assert {z["id"] for z in body["zones"]} >= {1, 2}
+
+
+def test_sync_incremental_con_tombstones():
+    """Solo se retornan los cambios posteriores, colapsados por entidad, y las eliminaciones"""
+    epoch = client.get("/sync").json()["epoch"]
+
+    # Garantizar que haya al menos un evento antes de la versión consultada
+    keep = client.post("/resources/zone/1", json={"nombre": "Recurso Sync 1", **RESOURCE_DATA}).json()
+    since = resource_repo.change_log.version
+    client.put(f"/resources/{keep['id']}", json={"estado": "en_recoleccion"})
+    gone = client.post("/resources/zone/2", json={"nombre": "Recurso Sync 2", **RESOURCE_DATA}).json()
+    client.delete(f"/resources/{gone['id']}")
+    threat = client.post("/threats/zone/1", json={"nombre": "Amenaza Sync", "tipo": "ARANA", "costo_hormigas": 3}).json()
+
+    body = client.get(f"/sync?since={since}&epoch={epoch}").json()
+
+    assert body["full"] is False
+    assert body["version"] == resource_repo.change_log.version
+    assert [(r["id"], r["estado"]) for r in body["resources"]] == [(keep["id"], "en_recoleccion")]
+    assert [t["id"] for t in body["threats"]] == [threat["id"]]
+    assert body["deleted"]["resources"] == [gone["id"]]
+    assert body["zones"] == []
+
+    # Sin cambios nuevos la respuesta queda vacía y conserva la versión
+    again = client.get(f"/sync?since={body['version']}&epoch={epoch}").json()
+    assert again["full"] is False and again["version"] == body["version"] and again["resources"] == []
+
+
+def test_sync_version_desconocida_o_otra_epoca_retorna_estado_completo():
+    """Versiones futuras, de otro proceso o sin época no se pueden resolver con el registro: estado completo"""
+    client.post("/resources/zone/1", json={"nombre": "Recurso Sync Epoca", **RESOURCE_DATA})
+    version = resource_repo.change_log.version
+    # Sin `epoch` la versión podría ser de antes de un reinicio
+    assert client.get(f"/sync?since={version - 1}").json()["full"] is True
+    assert client.get(f"/sync?since={version - 1}&epoch={resource_repo.change_log.epoch}").json()["full"] is False
+    assert client.get(f"/sync?since={version + 1000}").json()["full"] is True
+    assert client.get(f"/sync?since=1&epoch=otra-epoca").json()["full"] is True
+    assert client.get("/sync?since=-1").status_code == 400
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+
+from config.threat_escalation_config import ThreatEscalationConfig, LINEAR, EXPONENTIAL
+from models.threat import Threat, TipoAmenaza, EstadoAmenaza
+from endpoints.threats__controller import threat_repo
+from services.threat_escalation import escalated_cost, materialize_escalation
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_threat_escalation.py -v
+
+client = TestClient(app)
+
+NOW = datetime(2025, 11, 20, 12, 0, 0)
+
+
+@pytest.fixture
+def curvas(monkeypatch):
+    monkeypatch.setattr(ThreatEscalationConfig, "ENABLED", True)
+    monkeypatch.setattr(ThreatEscalationConfig, "CURVES", {
+        TipoAmenaza.ARANA: (LINEAR, 600, 0.5, 3.0),
+        TipoAmenaza.SERPIENTE: (EXPONENTIAL, 0, 1.0, 5.0),
+    })
+
+
+def _threat(tipo, horas, estado=EstadoAmenaza.ACTIVA, costo=10):
+    return Threat(id=1, zona_id=1, nombre="amenaza", tipo=tipo, costo_hormigas=costo, estado=estado,
+                  hora_deteccion=NOW - timedelta(hours=horas))
+
+
+def test_curvas_por_tipo(curvas):
+    """El costo crece según la curva del tipo, tras el período de gracia y hasta el máximo"""
+    assert escalated_cost(_threat(TipoAmenaza.ARANA, 0.1), NOW) == 10
+    assert escalated_cost(_threat(TipoAmenaza.ARANA, 2 + 600 / 3600), NOW) == 20
+    assert escalated_cost(_threat(TipoAmenaza.ARANA, 100), NOW) == 30
+    assert escalated_cost(_threat(TipoAmenaza.SERPIENTE, 2), NOW) == 40
+    assert escalated_cost(_threat(TipoAmenaza.SERPIENTE, 10), NOW) == 50
+
+
+def test_solo_escalan_amenazas_activas_detectadas(curvas):
+    """Las amenazas en combate, resueltas o sin detectar conservan su costo"""
+    assert escalated_cost(_threat(TipoAmenaza.SERPIENTE, 2, EstadoAmenaza.EN_COMBATE), NOW) == 10
+    assert escalated_cost(_threat(TipoAmenaza.SERPIENTE, 2, EstadoAmenaza.RESUELTA), NOW) == 10
+    sin_detectar = _threat(TipoAmenaza.SERPIENTE, 2)
+    sin_detectar.hora_deteccion = None
+    assert escalated_cost(sin_detectar, NOW) == 10
+
+
+def test_materializa_al_salir_de_activa(curvas):
+    """Al cambiar de estado el costo escalado queda fijo en la amenaza"""
+    threat = _threat(TipoAmenaza.SERPIENTE, 2)
+    materialize_escalation(threat, EstadoAmenaza.EN_COMBATE, NOW)
+    assert threat.costo_hormigas == 40
+
+    otra = _threat(TipoAmenaza.SERPIENTE, 2)
+    materialize_escalation(otra, EstadoAmenaza.ACTIVA, NOW)
+    assert otra.costo_hormigas == 10
+
+
+def test_endpoints_escalan_al_leer_y_persisten_al_cambiar_estado(curvas):
+    """GET responde con el costo escalado sin escribir; PUT lo persiste al salir de 'activa'"""
+    threat = threat_repo.create(Threat(
+        id=0, zona_id=1, nombre="Serpiente antigua", tipo=TipoAmenaza.SERPIENTE, costo_hormigas=10,
+        hora_deteccion=datetime.now() - timedelta(hours=2)
+    ))
+
+    response = client.get(f"/threats/{threat.id}")
+    assert response.json()["costo_hormigas"] == 40
+    assert threat.id in [t["id"] for t in client.get("/threats?zona_id=1").json() if t["costo_hormigas"] == 40]
+    assert threat_repo.get_by_id(threat.id).costo_hormigas == 10
+
+    response = client.put(f"/threats/{threat.id}", json={"estado": "en_combate"})
+    assert response.json()["costo_hormigas"] == 40
+    assert threat_repo.get_by_id(threat.id).costo_hormigas == 40
@@ -0,0 +1,126 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from main import app
+
+from models.resource import Resource, TipoRecurso, EstadoRecurso
+from models.threat import Threat, TipoAmenaza, EstadoAmenaza
+from repositories.resource_repository import ResourceRepository
+from repositories.threat_repository import ThreatRepository
+from repositories.zone_repository import ZoneRepository
+from services.time_index import TimeIndex
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_time_index.py -v
+
+client = TestClient(app)
+
+
+def test_rangos_coinciden_con_filtrar_la_tabla(tmp_path):
+    """El rango [after, before) por índice equivale a filtrar todas las filas"""
+    resources = ResourceRepository(str(tmp_path / "resources.csv"))
+    threats = ThreatRepository(str(tmp_path / "threats.csv"))
+    index = TimeIndex(resources, threats, ZoneRepository(str(tmp_path / "zones.csv")))
+    now = datetime.now().replace(microsecond=0)
+    rng = random.Random(9)
+    resources.create_many([
+        Resource(id=0, zona_id=rng.randint(1, 2), nombre=f"r{i}", tipo=TipoRecurso.HOJA, cantidad_unitaria=1,
+                 peso=1, duracion_recoleccion=1, hormigas_requeridas=1,
+                 hora_creacion=now - timedelta(minutes=rng.randint(0, 120)))
+        for i in range(40)
+    ])
+    threats.create_many([
+        Threat(id=0, zona_id=1, nombre=f"t{i}", tipo=TipoAmenaza.ARANA, costo_hormigas=1,
+               hora_deteccion=now - timedelta(minutes=rng.randint(0, 120)))
+        for i in range(40)
+    ])
+    index.ensure_started()
+    for resource_id in range(1, 41, 3):
+        recurso = resources.get_by_id(resource_id)
+        recurso.estado = EstadoRecurso.RECOLECTADO
+        recurso.hora_recoleccion = now - timedelta(minutes=resource_id)
+        resources.update(resource_id, recurso)
+    resources.delete(2)
+    amenaza = threats.get_by_id(5)
+    amenaza.estado = EstadoAmenaza.RESUELTA
+    amenaza.hora_resolucion = now
+    threats.update(5, amenaza)
+
+    after, before = now - timedelta(minutes=60), now - timedelta(minutes=10)
+    en_rango = lambda value: value is not None and after <= value < before
+    assert [r.id for r in index.resources_between("hora_creacion", after, before)] == \
+        [r.id for r in resources.get_all() if en_rango(r.hora_creacion)]
+    assert [r.id for r in index.resources_between("hora_recoleccion", after, before, estado="recolectado")] == \
+        [r.id for r in resources.get_all() if en_rango(r.hora_recoleccion)]
+    assert [r.id for r in index.resources_between("hora_creacion", after=after, zona_id=2)] == \
+        [r.id for r in resources.get_all(zona_id=2) if r.hora_creacion >= after]
+    assert [t.id for t in index.threats_between("hora_deteccion", before=before)] == \
+        [t.id for t in threats.get_all() if t.hora_deteccion < before]
+    assert [t.id for t in index.threats_between("hora_resolucion", after=now)] == [5]
+
+
+def test_construccion_ordena_una_sola_vez(tmp_path, monkeypatch):
+    """Construir no inserta ordenado fila por fila (cuadrático): 4x filas cuesta cerca de 4x"""
+    resources = ResourceRepository(str(tmp_path / "resources.csv"))
+    index = TimeIndex(resources, ThreatRepository(str(tmp_path / "threats.csv")),
+                      ZoneRepository(str(tmp_path / "zones.csv")))
+    now = datetime(2024, 5, 1)
+
+    def _crear(desde: int, hasta: int):
+        # Fechas en orden descendente: cada insort desplazaría la lista completa
+        resources.create_many([
+            Resource(id=0, zona_id=1, nombre=f"r{i}", tipo=TipoRecurso.HOJA, cantidad_unitaria=1, peso=1,
+                     duracion_recoleccion=1, hormigas_requeridas=1, hora_creacion=now - timedelta(seconds=i))
+            for i in range(desde, hasta)
+        ])
+
+    def _tiempo() -> float:
+        tiempos = []
+        for _ in range(2):
+            started = time.perf_counter()
+            index.bootstrap()
+            tiempos.append(time.perf_counter() - started)
+        return min(tiempos)
+
+    def _insercion_por_fila(*args):
+        raise AssertionError("bootstrap no debe usar insort")
+
+    filas = 20000
+    _crear(1, filas + 1)
+    chico = _tiempo()
+    _crear(filas + 1, 4 * filas + 1)
+    with monkeypatch.context() as m:
+        m.setattr("services.time_index.insort", _insercion_por_fila)
+        grande = _tiempo()
+    assert grande < chico * 8
+
+    # Después de construir, los cambios sí se insertan ordenados
+    index.ensure_started()
+    _crear(0, 1)
+    ultimos = index.resources_between("hora_creacion", after=now - timedelta(seconds=1))
+    assert [r.nombre for r in ultimos] == ["r1", "r0"]
+    assert len(index.resources_between("hora_creacion")) == 4 * filas + 1
+    index.stop()
+
+
+def test_endpoints_filtran_por_rango_de_fechas():
+    """created_after/created_before en GET /resources y GET /threats"""
+    inicio = datetime.now() - timedelta(seconds=1)
+    recurso = client.post("/resources/zone/1", json={"nombre": "Recurso Reciente", "tipo": "HOJA", "cantidad_unitaria": 1,
+                                                     "peso": 1, "duracion_recoleccion": 1, "hormigas_requeridas": 1}).json()
+    amenaza = client.post("/threats/zone/1", json={"nombre": "Amenaza Reciente", "tipo": "ABEJA", "costo_hormigas": 3}).json()
+
+    # La hora de detección se fija en la primera lectura de la amenaza
+    client.get(f"/threats/{amenaza['id']}")
+
+    recientes = client.get("/resources", params={"created_after": inicio.isoformat()}).json()
+    assert recurso["id"] in [r["id"] for r in recientes]
+    anteriores = client.get("/resources", params={"created_before": inicio.isoformat()}).json()
+    assert recurso["id"] not in [r["id"] for r in anteriores]
+
+    utc = inicio.astimezone(timezone.utc).isoformat()
+    recientes = client.get("/threats", params={"created_after": utc, "zona_id": 1}).json()
+    assert amenaza["id"] in [t["id"] for t in recientes]
+    assert client.get("/resources", params={"created_after": utc, "time_field": "nombre"}).status_code == 400
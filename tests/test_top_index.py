@@ -0,0 +1,143 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from main import app
+
+from models.resource import Resource, TipoRecurso, EstadoRecurso
+from models.threat import Threat, TipoAmenaza, EstadoAmenaza
+from repositories.resource_repository import ResourceRepository
+from repositories.threat_repository import ThreatRepository
+from repositories.zone_repository import ZoneRepository
+from services.threat_escalation import escalated_cost
+from services.top_index import TopIndex
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_top_index.py -v
+
+client = TestClient(app)
+
+
+def _index(tmp_path):
+    resources = ResourceRepository(str(tmp_path / "resources.csv"))
+    threats = ThreatRepository(str(tmp_path / "threats.csv"))
+    index = TopIndex(resources, threats, ZoneRepository(str(tmp_path / "zones.csv")))
+    return index, resources, threats
+
+
+def test_top_recursos_coincide_con_ordenar_la_tabla(tmp_path):
+    """Tras altas, cambios de estado y bajas el índice equivale a ordenar todo"""
+    index, resources, _ = _index(tmp_path)
+    rng = random.Random(3)
+    resources.create_many([
+        Resource(id=0, zona_id=rng.randint(1, 3), nombre=f"r{i}", tipo=TipoRecurso.HOJA,
+                 cantidad_unitaria=rng.randint(1, 20), peso=rng.randint(1, 9),
+                 duracion_recoleccion=rng.randint(1, 60), hormigas_requeridas=1)
+        for i in range(60)
+    ])
+    index.ensure_started()
+    for resource_id in rng.sample(range(1, 61), 15):
+        recurso = resources.get_by_id(resource_id)
+        recurso.estado = EstadoRecurso.EN_RECOLECCION
+        resources.update(resource_id, recurso)
+    for resource_id in rng.sample(range(1, 61), 10):
+        resources.delete(resource_id)
+
+    disponibles = [r for r in resources.get_all() if r.estado == EstadoRecurso.DISPONIBLE]
+    esperado = {
+        "value": sorted(disponibles, key=lambda r: (-r.cantidad_unitaria * r.peso, r.id)),
+        "weight": sorted(disponibles, key=lambda r: (-r.peso, r.id)),
+        "duration": sorted(disponibles, key=lambda r: (r.duracion_recoleccion, r.id)),
+    }
+    for order, expected in esperado.items():
+        assert [r.id for r in index.top_resources(7, order)] == [r.id for r in expected[:7]]
+        en_zona = [r.id for r in expected if r.zona_id == 2][:5]
+        assert [r.id for r in index.top_resources(5, order, zona_id=2)] == en_zona
+
+
+def test_top_amenazas_por_costo_escalado_y_antiguedad(tmp_path):
+    """El corte por multiplicador máximo no pierde amenazas que escalaron"""
+    index, _, threats = _index(tmp_path)
+    now = datetime.now()
+    rng = random.Random(5)
+    created = threats.create_many([
+        Threat(id=0, zona_id=1, nombre=f"t{i}", tipo=rng.choice(list(TipoAmenaza)),
+               costo_hormigas=rng.randint(1, 30), hora_deteccion=now - timedelta(hours=rng.uniform(0, 6)))
+        for i in range(50)
+    ])
+    index.ensure_started()
+    resuelta = threats.get_by_id(created[0].id)
+    resuelta.estado = EstadoAmenaza.RESUELTA
+    threats.update(resuelta.id, resuelta)
+
+    activas = [t for t in threats.get_all() if t.estado == EstadoAmenaza.ACTIVA]
+    por_costo = sorted(activas, key=lambda t: (-escalated_cost(t, now), t.id))
+    top = index.top_threats(8, "cost", now=now)
+    assert [t.id for t in top] == [t.id for t in por_costo[:8]]
+    assert [t.costo_hormigas for t in top] == [escalated_cost(t, now) for t in por_costo[:8]]
+
+    por_edad = sorted(activas, key=lambda t: (t.hora_deteccion, t.id))
+    assert [t.id for t in index.top_threats(8, "age", now=now)] == [t.id for t in por_edad[:8]]
+    assert index.top_threats(3, "cost", zona_id=99) == []
+
+
+def _tiempo_de_construccion(index) -> float:
+    """Mejor de dos construcciones completas de la vista desde los CSV"""
+    tiempos = []
+    for _ in range(2):
+        started = time.perf_counter()
+        index.bootstrap()
+        tiempos.append(time.perf_counter() - started)
+    return min(tiempos)
+
+
+def test_construccion_ordena_una_sola_vez(tmp_path, monkeypatch):
+    """Construir no inserta ordenado fila por fila (cuadrático): 4x filas cuesta cerca de 4x"""
+    index, resources, _ = _index(tmp_path)
+
+    def _insercion_por_fila(*args):
+        raise AssertionError("bootstrap no debe usar insort")
+
+    # Claves en orden descendente: cada insort desplazaría la lista completa
+    filas = 20000
+    resources.create_many([
+        Resource(id=0, zona_id=i % 3 + 1, nombre=f"r{i}", tipo=TipoRecurso.HOJA, cantidad_unitaria=i,
+                 peso=i, duracion_recoleccion=1, hormigas_requeridas=1)
+        for i in range(1, filas + 1)
+    ])
+    chico = _tiempo_de_construccion(index)
+    resources.create_many([
+        Resource(id=0, zona_id=i % 3 + 1, nombre=f"r{i}", tipo=TipoRecurso.HOJA, cantidad_unitaria=i,
+                 peso=i, duracion_recoleccion=1, hormigas_requeridas=1)
+        for i in range(filas + 1, 4 * filas + 1)
+    ])
+    with monkeypatch.context() as m:
+        m.setattr("services.top_index.insort", _insercion_por_fila)
+        grande = _tiempo_de_construccion(index)
+    assert grande < chico * 8
+
+    # Después de construir, los cambios sí se insertan ordenados
+    index.ensure_started()
+    resources.create(Resource(id=0, zona_id=1, nombre="mayor", tipo=TipoRecurso.HOJA, cantidad_unitaria=10 ** 12,
+                              peso=1, duracion_recoleccion=1, hormigas_requeridas=1))
+    assert [r.nombre for r in index.top_resources(2, "value")] == ["mayor", f"r{4 * filas}"]
+    en_zona = [i for i in range(4 * filas, 0, -1) if i % 3 + 1 == 2][:2]
+    assert [r.id for r in index.top_resources(2, "value", zona_id=2)] == en_zona
+    index.stop()
+
+
+def test_endpoints_top():
+    """GET /threats/top y /resources/top validan el criterio y limitan a k"""
+    client.post("/threats/zone/1", json={"nombre": "Amenaza Top", "tipo": "AGUILA", "costo_hormigas": 999})
+    top = client.get("/threats/top", params={"k": 1, "zona_id": 1}).json()
+    assert top[0]["nombre"] == "Amenaza Top"
+    assert client.get("/threats/top", params={"by": "size"}).status_code == 400
+
+    client.post("/resources/zone/1", json={"nombre": "Recurso Top", "tipo": "FRUTO", "cantidad_unitaria": 999,
+                                           "peso": 999, "duracion_recoleccion": 5, "hormigas_requeridas": 1})
+    response = client.get("/resources/top", params={"k": 2, "by": "value"})
+    assert response.status_code == 200
+    assert response.json()[0]["nombre"] == "Recurso Top"
+    assert len(response.json()) <= 2
+    assert client.get("/resources/top", params={"by": "size"}).status_code == 400
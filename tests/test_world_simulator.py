@@ -0,0 +1,81 @@
+import random
+from datetime import datetime
+
+from models.resource import EstadoRecurso
+from models.threat import EstadoAmenaza
+from repositories.resource_repository import ResourceRepository
+from repositories.threat_repository import ThreatRepository
+from repositories.zone_repository import ZoneRepository
+from services.world_simulator import WorldSimulator, main
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_world_simulator.py -v
+
+
+def _simulator(tmp_path, batch_size=50):
+    return WorldSimulator(
+        resource_repo=ResourceRepository(str(tmp_path / "resources.csv")),
+        threat_repo=ThreatRepository(str(tmp_path / "threats.csv")),
+        zone_repo=ZoneRepository(str(tmp_path / "zones.csv")),
+        batch_size=batch_size
+    )
+
+
+def test_ensure_zones_crea_las_faltantes(tmp_path):
+    """Debe crear zonas hasta alcanzar la cantidad pedida sin duplicar"""
+    simulator = _simulator(tmp_path)
+    assert simulator.ensure_zones(5) == [1, 2, 3, 4, 5]
+    assert simulator.ensure_zones(3) == [1, 2, 3, 4, 5]
+    assert len(simulator.zone_repo.obtenerTodasLasZonas()) == 5
+
+
+def test_run_genera_entidades_en_bloque(tmp_path):
+    """Debe escribir ticks * entidades por tick con IDs únicos y secuenciales"""
+    random.seed(7)
+    simulator = _simulator(tmp_path, batch_size=25)
+    zone_ids = simulator.ensure_zones(4)
+
+    totals = simulator.run(
+        ticks=20, zone_ids=zone_ids, resources_per_tick=5, threats_per_tick=2,
+        tick_seconds=60, start=datetime(2025, 1, 1)
+    )
+
+    resources = simulator.resource_repo.get_all()
+    threats = simulator.threat_repo.get_all()
+    assert totals == {"resources": 100, "threats": 40}
+    assert [r.id for r in resources] == list(range(1, 101))
+    assert [t.id for t in threats] == list(range(1, 41))
+    assert {r.zona_id for r in resources} <= set(zone_ids)
+    # Los nombres continúan la secuencia de los schedulers (hoja 1, hoja 2, ...)
+    assert len({(r.tipo, r.nombre) for r in resources}) == 100
+
+
+def test_run_aplica_estados_con_horas_coherentes(tmp_path):
+    """Los recursos recolectados y las amenazas resueltas deben tener hora de cierre posterior"""
+    random.seed(11)
+    simulator = _simulator(tmp_path)
+    zone_ids = simulator.ensure_zones(2)
+    simulator.run(ticks=50, zone_ids=zone_ids, resources_per_tick=4, threats_per_tick=4, tick_seconds=30)
+
+    resources = simulator.resource_repo.get_all()
+    threats = simulator.threat_repo.get_all()
+    assert {r.estado for r in resources} == set(EstadoRecurso)
+    assert {t.estado for t in threats} == set(EstadoAmenaza)
+    for r in resources:
+        if r.estado == EstadoRecurso.RECOLECTADO:
+            assert r.hora_recoleccion > r.hora_creacion
+        else:
+            assert r.hora_recoleccion is None
+    for t in threats:
+        if t.estado == EstadoAmenaza.RESUELTA:
+            assert t.hora_resolucion > t.hora_deteccion
+
+
+def test_cli_escribe_en_el_directorio_indicado(tmp_path, capsys):
+    """El CLI debe generar los CSV en el directorio de datos indicado"""
+    main(["--ticks", "3", "--zones", "2", "--resources-per-tick", "2",
+          "--threats-per-tick", "1", "--data-dir", str(tmp_path), "--seed", "1"])
+
+    assert len(ResourceRepository(str(tmp_path / "resources.csv")).get_all()) == 6
+    assert len(ThreatRepository(str(tmp_path / "threats.csv")).get_all()) == 3
+    assert "Recursos: 6" in capsys.readouterr().out
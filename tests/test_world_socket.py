@@ -0,0 +1,192 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+from main import app
+
+from config.change_feed_config import ChangeFeedConfig
+from models.resource import Resource, TipoRecurso, EstadoRecurso
+from models.threat import Threat, TipoAmenaza, EstadoAmenaza
+from repositories.change_log import ChangeLog
+from repositories.resource_repository import ResourceRepository
+from repositories.threat_repository import ThreatRepository
+from services.world_stream import FIELDS, build_delta, apply_transitions
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_world_socket.py -v
+
+client = TestClient(app)
+
+RESOURCE_DATA = {
+    "tipo": "HOJA", "cantidad_unitaria": 10, "peso": 2,
+    "duracion_recoleccion": 30, "hormigas_requeridas": 2
+}
+
+
+def _row(entity, row):
+    return dict(zip(FIELDS[entity], row))
+
+
+def _receive_types(websocket, count):
+    messages = {}
+    for _ in range(count):
+        message = websocket.receive_json()
+        messages[message["type"]] = message
+    return messages
+
+
+def test_build_delta_colapsa_cambios_de_una_entidad():
+    """Los cambios de una misma entidad en un frame se colapsan conservando la creación"""
+    log = ChangeLog()
+    resource = Resource(id=1, zona_id=1, nombre="hoja", tipo=TipoRecurso.HOJA, cantidad_unitaria=5,
+                        peso=1, duracion_recoleccion=10, hormigas_requeridas=2)
+    events = [
+        log.publish("resource", "created", 1, 1, data=resource),
+        log.publish("resource", "updated", 1, 1, data=resource),
+        log.publish("threat", "created", 5, 1),
+        log.publish("threat", "deleted", 5, 1),
+        log.publish("resource", "created", 2, 2, data=resource),
+    ]
+
+    frame = build_delta(events, zonas={1})
+
+    assert frame["version"] == 5
+    assert [c[:3] for c in frame["changes"]] == [["resource", "created", 1]]
+    assert build_delta(events[-1:], zonas={1}) is None
+
+
+def test_apply_transitions_en_bloque(tmp_path, monkeypatch):
+    """Las transiciones válidas se persisten con una escritura por entidad y las inválidas se rechazan"""
+    resources = ResourceRepository(str(tmp_path / "resources.csv"))
+    threats = ThreatRepository(str(tmp_path / "threats.csv"))
+    resources.create_many([
+        Resource(id=0, zona_id=1, nombre=f"hoja {i}", tipo=TipoRecurso.HOJA, cantidad_unitaria=5,
+                 peso=1, duracion_recoleccion=10, hormigas_requeridas=2)
+        for i in range(3)
+    ])
+    threats.create(Threat(id=0, zona_id=1, nombre="araña", tipo=TipoAmenaza.ARANA, costo_hormigas=3))
+    # El lote se valida con una sola lectura del CSV, no con un get_by_id (recorrido completo) por ID
+    for repo in (resources, threats):
+        monkeypatch.setattr(repo, "get_by_id", None)
+
+    result = apply_transitions([
+        {"entity": "resource", "id": 1, "estado": "recolectado"},
+        {"entity": "resource", "id": 2, "estado": "en_recoleccion", "cantidad_unitaria": 99},
+        {"entity": "threat", "id": 1, "estado": "resuelta"},
+        {"entity": "resource", "id": 42, "estado": "recolectado"},
+        {"entity": "hormiga", "id": 1},
+    ], resources, threats)
+
+    monkeypatch.undo()
+    assert result["applied"] == [["resource", 1]]
+    assert sorted((r["entity"], r["id"]) for r in result["rejected"]) == [
+        ("hormiga", 1), ("resource", 2), ("resource", 42), ("threat", 1)
+    ]
+    collected = resources.get_by_id(1)
+    assert collected.estado == EstadoRecurso.RECOLECTADO and collected.hora_recoleccion is not None
+    assert threats.get_by_id(1).estado == EstadoAmenaza.ACTIVA
+
+
+def test_apply_transitions_no_pisa_escrituras_concurrentes(tmp_path, monkeypatch):
+    """Una escritura concurrente durante la validación se aplica después, sin perderse"""
+    resources = ResourceRepository(str(tmp_path / "resources.csv"))
+    threats = ThreatRepository(str(tmp_path / "threats.csv"))
+    resources.create(Resource(id=0, zona_id=1, nombre="hoja", tipo=TipoRecurso.HOJA, cantidad_unitaria=5,
+                              peso=1, duracion_recoleccion=10, hormigas_requeridas=2))
+    escritores = []
+
+    def materialize_depletion(resource, estado, now):
+        escritor = threading.Thread(target=lambda: resources.update_fields({1: {"peso": 7}}))
+        escritor.start()
+        escritor.join(0.2)
+        escritores.append(escritor)
+
+    monkeypatch.setattr("services.world_stream.materialize_depletion", materialize_depletion)
+    result = apply_transitions([{"entity": "resource", "id": 1, "estado": "recolectado"}], resources, threats)
+    escritores[0].join(2)
+
+    assert result["applied"] == [["resource", 1]]
+    recurso = resources.get_by_id(1)
+    assert (recurso.estado, recurso.peso) == (EstadoRecurso.RECOLECTADO, 7)
+
+
+def test_websocket_snapshot_y_deltas_de_zonas_suscritas():
+    """Debe enviar un snapshot compacto de las zonas suscritas y luego solo sus cambios"""
+    created = client.post("/resources/zone/1", json={"nombre": "Recurso WS 1", **RESOURCE_DATA}).json()
+
+    with client.websocket_connect("/ws/world") as websocket:
+        websocket.send_json({"type": "subscribe", "zonas": [1]})
+        snapshot = websocket.receive_json()
+        assert snapshot["type"] == "snapshot"
+        assert snapshot["fields"]["resource"][0] == "id"
+        rows = [_row("resource", r) for r in snapshot["resource"]]
+        assert created["id"] in [r["id"] for r in rows]
+        assert all(r["zona_id"] == 1 for r in rows)
+        assert [z[0] for z in snapshot["zone"]] == [1]
+
+        client.post("/resources/zone/2", json={"nombre": "Recurso WS otra zona", **RESOURCE_DATA})
+        nuevo = client.post("/resources/zone/1", json={"nombre": "Recurso WS 2", **RESOURCE_DATA}).json()
+
+        delta = websocket.receive_json()
+        assert delta["type"] == "delta"
+        assert delta["version"] > snapshot["version"]
+        assert [c[:3] for c in delta["changes"]] == [["resource", "created", nuevo["id"]]]
+        assert _row("resource", delta["changes"][0][3])["nombre"] == "Recurso WS 2"
+
+
+def test_websocket_no_pierde_cambios_durante_el_snapshot(monkeypatch):
+    """Lo escrito después de leer el snapshot y antes de enviarlo llega como delta"""
+    from endpoints import world__controller
+    leer = world__controller._read_snapshot
+    escritos = []
+
+    def _read_snapshot(zonas):
+        snapshot = leer(zonas)
+        escritos.append(world__controller.resource_repo.create(Resource(
+            id=0, zona_id=1, nombre="Recurso WS durante snapshot", tipo=TipoRecurso.HOJA, cantidad_unitaria=1,
+            peso=1, duracion_recoleccion=1, hormigas_requeridas=1)))
+        # El evento llega a la tarea de deltas antes de que termine la suscripción
+        time.sleep(0.3)
+        return snapshot
+
+    monkeypatch.setattr(ChangeFeedConfig, "DELTA_FLUSH_MILLISECONDS", 0)
+    monkeypatch.setattr(world__controller, "_read_snapshot", _read_snapshot)
+    with client.websocket_connect("/ws/world") as websocket:
+        websocket.send_json({"type": "subscribe", "zonas": [1]})
+        snapshot = websocket.receive_json()
+        assert escritos[0].id not in [_row("resource", r)["id"] for r in snapshot["resource"]]
+
+        # Un cambio posterior no debe adelantarse al guardado durante el snapshot
+        despues = client.post("/resources/zone/1", json={"nombre": "Recurso WS después", **RESOURCE_DATA}).json()
+        ids = []
+        while despues["id"] not in ids:
+            delta = websocket.receive_json()
+            assert delta["type"] == "delta"
+            ids.extend(c[2] for c in delta["changes"])
+        assert ids == [escritos[0].id, despues["id"]]
+
+
+def test_websocket_transiciones_por_el_mismo_socket():
+    """El cliente puede enviar transiciones en lote y recibe el ack y el delta resultante"""
+    resource = client.post("/resources/zone/1", json={"nombre": "Recurso WS transición", **RESOURCE_DATA}).json()
+
+    with client.websocket_connect("/ws/world") as websocket:
+        websocket.send_json({"type": "subscribe", "zonas": [1]})
+        assert websocket.receive_json()["type"] == "snapshot"
+
+        websocket.send_json({"type": "transitions", "ref": 7, "changes": [
+            {"entity": "resource", "id": resource["id"], "estado": "en_recoleccion"},
+            {"entity": "threat", "id": 987654, "estado": "en_combate"},
+        ]})
+        messages = _receive_types(websocket, 2)
+
+        ack = messages["ack"]
+        assert ack["ref"] == 7
+        assert ack["applied"] == [["resource", resource["id"]]]
+        assert ack["rejected"][0]["id"] == 987654
+        change = messages["delta"]["changes"][0]
+        assert change[:3] == ["resource", "updated", resource["id"]]
+        assert _row("resource", change[3])["estado"] == "en_recoleccion"
+
+        websocket.send_json({"type": "desconocido"})
+        assert websocket.receive_json()["type"] == "error"
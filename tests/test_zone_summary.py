@@ -0,0 +1,143 @@
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+
+from models.resource import Resource, TipoRecurso, EstadoRecurso
+from models.threat import Threat, TipoAmenaza, EstadoAmenaza
+from models.zone import Zona, TipoZona
+from repositories.resource_repository import ResourceRepository
+from repositories.threat_repository import ThreatRepository
+from repositories.zone_repository import ZoneRepository
+from services.materialized_view import MaterializedView
+from services.threat_escalation import with_escalation_all
+from services.zone_summary import ZoneSummaryView
+
+# PARA EJECUTAR ESTOS TESTS, USAR:
+# pytest tests/test_zone_summary.py -v
+
+client = TestClient(app)
+
+
+def _repos(tmp_path):
+    return (ResourceRepository(str(tmp_path / "resources.csv")),
+            ThreatRepository(str(tmp_path / "threats.csv")),
+            ZoneRepository(str(tmp_path / "zones.csv")))
+
+
+def _recalcular(resources, threats, zona_id):
+    """Cálculo por recorrido completo, usado como referencia"""
+    en_zona = [r for r in resources.get_all() if r.zona_id == zona_id]
+    pendientes = [t for t in threats.get_all() if t.zona_id == zona_id and t.estado != EstadoAmenaza.RESUELTA]
+    return {
+        "total": len(en_zona),
+        "por_tipo": dict(Counter(r.tipo.value for r in en_zona)),
+        "por_estado": dict(Counter(r.estado.value for r in en_zona)),
+        "masa_disponible": sum(r.cantidad_unitaria * r.peso for r in en_zona if r.estado == EstadoRecurso.DISPONIBLE),
+        "activas": len(pendientes),
+        "amenazas_por_tipo": dict(Counter(t.tipo.value for t in pendientes)),
+        "demanda_hormigas": sum(t.costo_hormigas for t in pendientes),
+    }
+
+
+def _comparable(summary):
+    return {
+        **{k: v for k, v in summary["recursos"].items()},
+        "activas": summary["amenazas"]["activas"],
+        "amenazas_por_tipo": summary["amenazas"]["por_tipo"],
+        "demanda_hormigas": summary["amenazas"]["demanda_hormigas"],
+    }
+
+
+def test_vista_incremental_coincide_con_recorrido(tmp_path):
+    """Tras creaciones, actualizaciones y eliminaciones la vista coincide con un recálculo completo"""
+    random.seed(7)
+    resources, threats, zones = _repos(tmp_path)
+    zones.crearZonas([Zona(id=i, nombre=f"Zona {i}", tipo=TipoZona.JARDIN) for i in (1, 2)])
+    resources.create_many([
+        Resource(id=0, zona_id=random.choice([1, 2]), nombre=f"r{i}", tipo=random.choice(list(TipoRecurso)),
+                 cantidad_unitaria=random.randint(1, 20), peso=random.randint(1, 5),
+                 duracion_recoleccion=10, hormigas_requeridas=2)
+        for i in range(30)
+    ])
+
+    view = ZoneSummaryView(resources, threats, zones)
+    view.ensure_started()
+
+    threats.create_many([
+        Threat(id=0, zona_id=random.choice([1, 2]), nombre=f"t{i}", tipo=random.choice(list(TipoAmenaza)),
+               costo_hormigas=random.randint(1, 9))
+        for i in range(10)
+    ])
+    for resource in random.sample(resources.get_all(), 10):
+        resource.estado = random.choice(list(EstadoRecurso))
+        resource.cantidad_unitaria = max(1, resource.cantidad_unitaria - 1)
+        resources.update(resource.id, resource)
+    for resource in random.sample(resources.get_all(), 5):
+        resources.delete(resource.id)
+    for threat in random.sample(threats.get_all(), 4):
+        threat.estado = EstadoAmenaza.RESUELTA
+        threats.update(threat.id, threat)
+    threats.delete(threats.get_all()[0].id)
+
+    for zona_id in (1, 2):
+        assert _comparable(view.summary(zona_id)) == _recalcular(resources, threats, zona_id)
+
+    zones.crearZona(Zona(id=3, nombre="Zona 3", tipo=TipoZona.LAGO))
+    assert view.summary(3)["recursos"]["total"] == 0
+    zones.eliminarZona(3)
+    assert view.summary(3) is None
+    assert [s["zona_id"] for s in view.summaries()] == [1, 2]
+
+
+def test_demanda_usa_el_costo_escalado(tmp_path):
+    """Las amenazas activas aportan su costo escalado al leer, igual que GET /threats"""
+    resources, threats, zones = _repos(tmp_path)
+    detectada = datetime.now() - timedelta(hours=2)
+    creadas = threats.create_many([
+        Threat(id=0, zona_id=1, nombre=f"t{i}", tipo=TipoAmenaza.ARANA, costo_hormigas=4, hora_deteccion=detectada)
+        for i in range(3)
+    ])
+    view = ZoneSummaryView(resources, threats, zones)
+    view.ensure_started()
+    en_combate = threats.get_by_id(creadas[0].id)
+    en_combate.estado = EstadoAmenaza.EN_COMBATE
+    en_combate.costo_hormigas = 9
+    threats.update(en_combate.id, en_combate)
+
+    now = datetime.now()
+    esperado = sum(t.costo_hormigas for t in with_escalation_all(threats.get_all(), now))
+    assert esperado > 9 + 2 * 4
+    assert view.summary(1, now=now)["amenazas"]["demanda_hormigas"] == esperado
+    assert view.summaries(now=now)[0]["amenazas"]["activas"] == 3
+
+
+def test_endpoints_resumen_de_zonas():
+    """GET /zones/summary y /zones/{id}/summary reflejan los cambios sin recorrer los CSV"""
+    before = client.get("/zones/1/summary").json()
+    client.post("/resources/zone/1", json={
+        "nombre": "Recurso Resumen", "tipo": "FLOR", "cantidad_unitaria": 4,
+        "peso": 3, "duracion_recoleccion": 10, "hormigas_requeridas": 1
+    })
+
+    after = client.get("/zones/1/summary").json()
+    assert after["recursos"]["total"] == before["recursos"]["total"] + 1
+    assert after["recursos"]["masa_disponible"] == before["recursos"]["masa_disponible"] + 12
+    assert after["recursos"]["por_tipo"]["FLOR"] == before["recursos"]["por_tipo"].get("FLOR", 0) + 1
+
+    zonas = [s["zona_id"] for s in client.get("/zones/summary").json()]
+    assert {1, 2} <= set(zonas)
+    assert client.get("/zones/987654/summary").status_code == 404
+
+
+def test_vista_sin_reset_no_se_puede_instanciar(tmp_path):
+    """Una vista que no implementa reset() falla al crearse, no en su primer uso"""
+    class VistaIncompleta(MaterializedView):
+        def apply_resource(self, resource, sign: int):
+            pass
+
+    with pytest.raises(TypeError):
+        VistaIncompleta(*_repos(tmp_path))